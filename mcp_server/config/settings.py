@@ -39,16 +39,33 @@ class ServerConfig(BaseSettings):
     workspace_path: Path = Field(default_factory=lambda: Path("/workspaces/Loop-Orchestrator"))
     schedules_file: Path = Field(default_factory=lambda: Path(".roo/schedules.json"))
     task_timing_file: Path = Field(default="task_timing.tsv")
+    task_timing_segments_dir: Path = Field(default="task_timing_segments")
     persistent_memory_file: Path = Field(default="persistent-memory.md")
     todo_file: Path = Field(default="TODO.md")
     modes_file: Path = Field(default=".roomodes")
     backups_dir: Path = Field(default="backups")
+    search_index_file: Path = Field(default=".mcp_cache/search_index.sqlite3")
+    backup_store_dir: Path = Field(default="backups/store")
+    shared_cache_file: Path = Field(default=".mcp_cache/shared_cache.sqlite3")
     
     # System integration settings
     python_version_min: str = Field(default="3.10.0", description="Minimum Python version required")
     command_failure_limit: int = Field(default=3, ge=1, le=10, description="Command failure limit before escalation")
     time_tracking_enabled: bool = Field(default=True, description="Enable automatic time tracking")
     persistent_memory_max_lines: int = Field(default=300, ge=100, le=1000, description="Max lines in persistent memory")
+    task_timing_partition: str = Field(
+        default="day",
+        description="Task timing segment granularity (day, week)",
+        pattern="^(day|week)$"
+    )
+    task_timing_compress_after_days: Optional[int] = Field(
+        default=7, ge=1, le=365,
+        description="Gzip task timing segments older than this many days (None disables)"
+    )
+    orphaned_task_hours: int = Field(
+        default=24, ge=1, le=720,
+        description="Report started tasks open longer than this many hours as orphaned"
+    )
     
     # Logging and error handling
     log_level: str = Field(
@@ -58,6 +75,15 @@ class ServerConfig(BaseSettings):
     )
     error_recovery_enabled: bool = Field(default=True, description="Enable automatic error recovery")
     backup_before_modify: bool = Field(default=True, description="Create backups before file modifications")
+    backup_store_enabled: bool = Field(
+        default=True,
+        description="Keep file tool backups in the deduplicating content-addressed backup store"
+    )
+    backup_keep_versions: int = Field(default=50, ge=1, description="Backup versions kept per file")
+    backup_max_age_days: Optional[int] = Field(
+        default=30, ge=1,
+        description="Drop backup versions older than this many days, except each file's latest (None disables)"
+    )
     
     # Timeout and performance settings
     operation_timeout: int = Field(default=300, ge=30, le=3600, description="Default operation timeout in seconds")
@@ -70,6 +96,63 @@ class ServerConfig(BaseSettings):
     performance_monitoring: bool = Field(default=True, description="Enable real-time performance monitoring")
     batch_processing_enabled: bool = Field(default=True, description="Enable batch processing for MCP requests")
     algorithm_optimization: bool = Field(default=True, description="Enable optimized algorithms for critical paths")
+    search_index_enabled: bool = Field(default=True, description="Narrow search_in_files with the persistent trigram index")
+    search_index_max_file_size: int = Field(
+        default=4 * 1024 * 1024, ge=1024,
+        description="Files larger than this are not indexed and always searched"
+    )
+    search_mmap_threshold: int = Field(
+        default=1024 * 1024, ge=1,
+        description="Files at least this large are searched through a memory map without decoding the whole file"
+    )
+    search_backend: str = Field(
+        default="auto",
+        description="Where search_in_files scans files: inline, thread, process, or auto (chosen from file count and bytes)",
+        pattern="^(auto|inline|thread|process)$"
+    )
+    search_workers: int = Field(default=0, ge=0, le=64, description="Search worker threads or processes; 0 uses one per CPU, up to 8")
+    search_process_min_bytes: int = Field(
+        default=16 * 1024 * 1024, ge=0,
+        description="Scans reading at least this many bytes use worker processes when backend is auto"
+    )
+    search_cache_queries: int = Field(
+        default=32, ge=0, le=1024,
+        description="Recent search_in_files queries whose per-file results are reused for unchanged files"
+    )
+    shared_cache_enabled: bool = Field(
+        default=False,
+        description="Share parsed TODO.md and persistent memory between server processes through a SQLite file"
+    )
+    shared_cache_max_entries: int = Field(default=256, ge=1, description="Parse results kept in the shared cache")
+    file_cache_enabled: bool = Field(default=True, description="Cache decoded file contents for read_project_file")
+    file_cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0, description="Byte budget of the file content cache")
+    file_cache_compress: bool = Field(default=False, description="Keep cached file contents zlib-compressed")
+    walk_exclude_dirs: List[str] = Field(
+        default=[".git", ".hg", ".svn", "__pycache__", "node_modules", ".mcp_cache",
+                 ".pytest_cache", ".mypy_cache", ".tox", "backups", "venv*", ".venv*"],
+        description="Directory name globs never descended into by the search and listing tools"
+    )
+    walk_respect_gitignore: bool = Field(default=True, description="Skip files ignored by .gitignore when searching and listing")
+    watch_enabled: bool = Field(default=True, description="Watch the workspace for changes and invalidate caches as they happen")
+    watch_backend: str = Field(
+        default="auto",
+        description="Change detection backend: inotify, poll, or auto (inotify with polling fallback)",
+        pattern="^(auto|inotify|poll)$"
+    )
+    watch_poll_interval: float = Field(default=2.0, ge=0.1, le=300, description="Seconds between scans of the polling watcher")
+    list_page_size: int = Field(
+        default=1000, ge=1, le=100000,
+        description="Entries per page of the flat list_project_structure listing"
+    )
+    write_fsync_mode: str = Field(
+        default="batch",
+        description="When file writes are fsynced: off, always (before returning) or batch (group commit shortly after)",
+        pattern="^(off|always|batch)$"
+    )
+    write_fsync_interval_ms: int = Field(
+        default=50, ge=0, le=10000,
+        description="Delay over which batched fsyncs are coalesced"
+    )
     
     # Development workflow settings
     workflow_stages: List[str] = Field(
@@ -86,8 +169,9 @@ class ServerConfig(BaseSettings):
         extra="ignore"
     )
     
-    @field_validator("schedules_file", "task_timing_file", "persistent_memory_file", 
-               "todo_file", "modes_file", "backups_dir")
+    @field_validator("schedules_file", "task_timing_file", "task_timing_segments_dir",
+               "persistent_memory_file", "todo_file", "modes_file", "backups_dir",
+               "search_index_file", "backup_store_dir", "shared_cache_file")
     @classmethod
     def validate_paths(cls, v):
         """Ensure paths are relative to workspace."""
@@ -115,6 +199,10 @@ class ServerConfig(BaseSettings):
         """Get absolute path to task timing file."""
         return self.get_absolute_path(self.task_timing_file)
     
+    def get_task_timing_segments_dir(self) -> Path:
+        """Get absolute path to task timing segments directory."""
+        return self.get_absolute_path(self.task_timing_segments_dir)
+    
     def get_persistent_memory_path(self) -> Path:
         """Get absolute path to persistent memory file."""
         return self.get_absolute_path(self.persistent_memory_file)
@@ -131,6 +219,18 @@ class ServerConfig(BaseSettings):
         """Get absolute path to backups directory."""
         return self.get_absolute_path(self.backups_dir)
     
+    def get_search_index_path(self) -> Path:
+        """Get absolute path to the search index database."""
+        return self.get_absolute_path(self.search_index_file)
+    
+    def get_shared_cache_path(self) -> Path:
+        """Get absolute path to the shared parse cache database."""
+        return self.get_absolute_path(self.shared_cache_file)
+    
+    def get_backup_store_dir(self) -> Path:
+        """Get absolute path to the backup store directory."""
+        return self.get_absolute_path(self.backup_store_dir)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary."""
         return {
@@ -143,16 +243,23 @@ class ServerConfig(BaseSettings):
             "file_paths": {
                 "schedules": str(self.schedules_file),
                 "task_timing": str(self.task_timing_file),
+                "task_timing_segments": str(self.task_timing_segments_dir),
                 "persistent_memory": str(self.persistent_memory_file),
                 "todo": str(self.todo_file),
                 "modes": str(self.modes_file),
-                "backups": str(self.backups_dir)
+                "backups": str(self.backups_dir),
+                "search_index": str(self.search_index_file),
+                "backup_store": str(self.backup_store_dir),
+                "shared_cache": str(self.shared_cache_file)
             },
             "system_settings": {
                 "python_version_min": self.python_version_min,
                 "command_failure_limit": self.command_failure_limit,
                 "time_tracking_enabled": self.time_tracking_enabled,
-                "persistent_memory_max_lines": self.persistent_memory_max_lines
+                "persistent_memory_max_lines": self.persistent_memory_max_lines,
+                "task_timing_partition": self.task_timing_partition,
+                "task_timing_compress_after_days": self.task_timing_compress_after_days,
+                "orphaned_task_hours": self.orphaned_task_hours
             },
             "performance_settings": {
                 "operation_timeout": self.operation_timeout,
@@ -164,7 +271,27 @@ class ServerConfig(BaseSettings):
                 "batch_processing_enabled": self.batch_processing_enabled,
                 "algorithm_optimization": self.algorithm_optimization,
                 "cache_enabled": self.cache_enabled,
-                "cache_ttl": self.cache_ttl
+                "cache_ttl": self.cache_ttl,
+                "search_index_enabled": self.search_index_enabled,
+                "search_index_max_file_size": self.search_index_max_file_size,
+                "search_mmap_threshold": self.search_mmap_threshold,
+                "search_backend": self.search_backend,
+                "search_workers": self.search_workers,
+                "search_process_min_bytes": self.search_process_min_bytes,
+                "search_cache_queries": self.search_cache_queries,
+                "shared_cache_enabled": self.shared_cache_enabled,
+                "shared_cache_max_entries": self.shared_cache_max_entries,
+                "file_cache_enabled": self.file_cache_enabled,
+                "file_cache_max_bytes": self.file_cache_max_bytes,
+                "file_cache_compress": self.file_cache_compress,
+                "walk_exclude_dirs": self.walk_exclude_dirs,
+                "walk_respect_gitignore": self.walk_respect_gitignore,
+                "list_page_size": self.list_page_size,
+                "watch_enabled": self.watch_enabled,
+                "watch_backend": self.watch_backend,
+                "watch_poll_interval": self.watch_poll_interval,
+                "write_fsync_mode": self.write_fsync_mode,
+                "write_fsync_interval_ms": self.write_fsync_interval_ms
             },
             "workflow_settings": {
                 "workflow_stages": self.workflow_stages,
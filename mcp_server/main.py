@@ -7,11 +7,14 @@ file system access, and development tools for the Loop-Orchestrator project.
 
 import logging
 import asyncio
+import json
 import sys
 from typing import Dict, Any, Optional
 from pathlib import Path
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
 from .config.settings import get_server_config, validate_environment
 from .config.settings import setup_logging
@@ -22,7 +25,8 @@ from .tools.orchestrator import (
 )
 from .tools.filesystem import (
     read_project_file, write_project_file, list_project_structure,
-    search_in_files, backup_file, restore_file
+    search_in_files, backup_file, restore_file, read_project_files, write_project_files,
+    list_backups
 )
 from .tools.development import (
     get_system_status as get_comprehensive_system_status,
@@ -30,6 +34,9 @@ from .tools.development import (
     error_recovery, sync_environment
 )
 from .utils.helpers import format_timestamp
+from .utils.workspace_watcher import get_workspace_watcher
+from .utils.search_pool import shutdown_process_pool
+from .utils.tool_metrics import instrument_tool, render_prometheus, start_monitoring, tool_metrics_report
 
 
 # Global server instance
@@ -57,10 +64,17 @@ def create_server() -> FastMCP:
     
     logger.info(f"Creating Loop-Orchestrator MCP Server v{config.version}")
     
+    if config.performance_monitoring:
+        start_monitoring()
+    
+    def tool():
+        """Register a tool whose calls are timed, sized and counted in the performance monitor."""
+        return lambda func: server.tool()(instrument_tool(func))
+    
     # Register all tools with proper error handling and logging
     
     # Orchestrator Management Tools
-    @server.tool()
+    @tool()
     async def get_schedule_status_tool(
         schedule_id: Optional[str] = None,
         include_inactive: bool = False,
@@ -69,7 +83,7 @@ def create_server() -> FastMCP:
         """Read and parse .roo/schedules.json to get current schedule status."""
         return await get_schedule_status(schedule_id, include_inactive, format_output)
     
-    @server.tool()
+    @tool()
     async def manage_schedules_tool(
         action: str,
         schedule_data: Optional[Dict[str, Any]] = None,
@@ -79,7 +93,7 @@ def create_server() -> FastMCP:
         """Create, update, activate/deactivate schedules in .roo/schedules.json."""
         return await manage_schedules(action, schedule_data, schedule_id, update_fields)
     
-    @server.tool()
+    @tool()
     async def track_task_time_tool(
         task_description: str,
         mode: Optional[str] = None,
@@ -92,7 +106,7 @@ def create_server() -> FastMCP:
         priority_enum = PriorityType(priority)
         return await track_task_time(task_description, mode, priority_enum, start_tracking, task_id)
     
-    @server.tool()
+    @tool()
     async def get_time_tracking_tool(
         filter_mode: Optional[str] = None,
         filter_priority: Optional[str] = None,
@@ -105,7 +119,7 @@ def create_server() -> FastMCP:
         priority_enum = PriorityType(filter_priority) if filter_priority else None
         return await get_time_tracking(filter_mode, priority_enum, start_date, end_date, limit)
     
-    @server.tool()
+    @tool()
     async def get_persistent_memory_tool(
         section: Optional[str] = None,
         include_metadata: bool = False,
@@ -116,7 +130,7 @@ def create_server() -> FastMCP:
         section_enum = PersistentMemorySection(section) if section else None
         return await get_persistent_memory(section_enum, include_metadata, search_pattern)
     
-    @server.tool()
+    @tool()
     async def update_persistent_memory_tool(
         section: str,
         content: str,
@@ -128,7 +142,7 @@ def create_server() -> FastMCP:
         section_enum = PersistentMemorySection(section)
         return await update_persistent_memory(section_enum, content, category, format_entry)
     
-    @server.tool()
+    @tool()
     async def get_todo_status_tool(
         include_completed: bool = False,
         search_pattern: Optional[str] = None
@@ -136,7 +150,7 @@ def create_server() -> FastMCP:
         """Read TODO.md for planning context."""
         return await get_todo_status(include_completed, search_pattern)
     
-    @server.tool()
+    @tool()
     async def delegate_task_tool(
         task_description: str,
         target_mode: Optional[str] = None,
@@ -151,17 +165,26 @@ def create_server() -> FastMCP:
         return await delegate_task(task_description, target_mode, priority_enum, context, requirements, deadline)
     
     # File System Tools
-    @server.tool()
+    @tool()
     async def read_project_file_tool(
         file_path: str,
         encoding: str = "utf-8",
         max_size_mb: Optional[float] = None,
-        include_metadata: bool = False
+        include_metadata: bool = False,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        byte_offset: Optional[int] = None,
+        byte_length: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Read any file in the Loop-Orchestrator project."""
-        return await read_project_file(file_path, encoding, max_size_mb, include_metadata)
+        """Read any file in the Loop-Orchestrator project, optionally by line or byte range or in chunks."""
+        return await read_project_file(
+            file_path, encoding, max_size_mb, include_metadata,
+            start_line, end_line, byte_offset, byte_length, chunk_size, cursor
+        )
     
-    @server.tool()
+    @tool()
     async def write_project_file_tool(
         file_path: str,
         content: str,
@@ -173,7 +196,27 @@ def create_server() -> FastMCP:
         """Write/update project files."""
         return await write_project_file(file_path, content, encoding, create_backup, append, ensure_directory)
     
-    @server.tool()
+    @tool()
+    async def read_project_files_tool(
+        file_paths: list,
+        encoding: str = "utf-8",
+        max_size_mb: Optional[float] = None,
+        include_metadata: bool = False
+    ) -> Dict[str, Any]:
+        """Read several project files in parallel in one call."""
+        return await read_project_files(file_paths, encoding, max_size_mb, include_metadata)
+    
+    @tool()
+    async def write_project_files_tool(
+        files: dict,
+        encoding: str = "utf-8",
+        create_backup: bool = True,
+        ensure_directory: bool = True
+    ) -> Dict[str, Any]:
+        """Write several project files as one all-or-nothing batch."""
+        return await write_project_files(files, encoding, create_backup, ensure_directory)
+    
+    @tool()
     async def list_project_structure_tool(
         directory: Optional[str] = None,
         recursive: bool = True,
@@ -182,15 +225,19 @@ def create_server() -> FastMCP:
         include_files: bool = True,
         file_pattern: Optional[str] = None,
         exclude_patterns: Optional[list] = None,
-        max_depth: Optional[int] = None
+        max_depth: Optional[int] = None,
+        flat: bool = False,
+        include_metadata: bool = True,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Recursive directory listing with filtering."""
+        """Recursive directory listing with filtering, or a flat listing paginated with next_cursor."""
         return await list_project_structure(
             directory, recursive, include_hidden, include_directories, include_files,
-            file_pattern, exclude_patterns, max_depth
+            file_pattern, exclude_patterns, max_depth, flat, include_metadata, page_size, cursor
         )
     
-    @server.tool()
+    @tool()
     async def search_in_files_tool(
         pattern: str,
         directory: Optional[str] = None,
@@ -199,15 +246,17 @@ def create_server() -> FastMCP:
         whole_word: bool = False,
         max_matches: Optional[int] = None,
         include_line_numbers: bool = True,
-        context_lines: int = 0
+        context_lines: int = 0,
+        ctx: Optional[Context] = None
     ) -> Dict[str, Any]:
-        """Regex search across project files."""
+        """Regex search across project files. Matches are streamed as progress notifications."""
         return await search_in_files(
             pattern, directory, file_pattern, case_sensitive, whole_word,
-            max_matches, include_line_numbers, context_lines
+            max_matches, include_line_numbers, context_lines,
+            progress_callback=ctx.report_progress if ctx else None
         )
     
-    @server.tool()
+    @tool()
     async def backup_file_tool(
         file_path: str,
         backup_name: Optional[str] = None,
@@ -217,17 +266,27 @@ def create_server() -> FastMCP:
         """Create backups before modifications."""
         return await backup_file(file_path, backup_name, include_timestamp, backup_directory)
     
-    @server.tool()
+    @tool()
     async def restore_file_tool(
         file_path: str,
         backup_path: Optional[str] = None,
-        create_backup_before_restore: bool = True
+        create_backup_before_restore: bool = True,
+        backup_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """Restore from backups."""
-        return await restore_file(file_path, backup_path, create_backup_before_restore)
+        return await restore_file(file_path, backup_path, create_backup_before_restore, backup_id)
+    
+    @tool()
+    async def list_backups_tool(
+        file_path: Optional[str] = None,
+        limit: int = 20,
+        prune: bool = False
+    ) -> Dict[str, Any]:
+        """List backup versions, optionally pruning the backup store."""
+        return await list_backups(file_path, limit, prune)
     
     # Development Tools
-    @server.tool()
+    @tool()
     async def get_system_status_tool(
         include_performance: bool = True,
         include_file_health: bool = True,
@@ -239,7 +298,7 @@ def create_server() -> FastMCP:
             include_performance, include_file_health, include_orchestrator_status, check_external_dependencies
         )
     
-    @server.tool()
+    @tool()
     async def switch_mode_tool(
         target_mode: str,
         task_context: Optional[Dict[str, Any]] = None,
@@ -251,7 +310,7 @@ def create_server() -> FastMCP:
         priority_enum = PriorityType(priority)
         return await switch_mode(target_mode, task_context, priority_enum, track_time)
     
-    @server.tool()
+    @tool()
     async def run_validation_tool(
         validation_type: str,
         target_path: Optional[str] = None,
@@ -261,7 +320,7 @@ def create_server() -> FastMCP:
         """Execute validation workflows."""
         return await run_validation(validation_type, target_path, validation_options, fail_fast)
     
-    @server.tool()
+    @tool()
     async def get_mode_capabilities_tool(
         filter_by_group: Optional[str] = None,
         include_instructions: bool = True
@@ -269,7 +328,7 @@ def create_server() -> FastMCP:
         """List available modes from .roomodes."""
         return await get_mode_capabilities(filter_by_group, include_instructions)
     
-    @server.tool()
+    @tool()
     async def error_recovery_tool(
         operation: str,
         error_context: Dict[str, Any],
@@ -279,7 +338,7 @@ def create_server() -> FastMCP:
         """Handle error scenarios and recovery procedures."""
         return await error_recovery(operation, error_context, recovery_strategy, create_checkpoint)
     
-    @server.tool()
+    @tool()
     async def sync_environment_tool(
         sync_type: str = "full",
         target_components: Optional[list] = None,
@@ -288,6 +347,17 @@ def create_server() -> FastMCP:
         """Coordinate environment synchronization."""
         return await sync_environment(sync_type, target_components, verify_sync)
     
+    # Metrics
+    @server.resource("metrics://tools", mime_type="application/json")
+    def tool_metrics_resource() -> str:
+        """Per-tool call counts, errors, latency percentiles, queue wait and payload sizes."""
+        return json.dumps(tool_metrics_report())
+    
+    @server.custom_route("/metrics", methods=["GET"])
+    async def prometheus_metrics(request: Request) -> PlainTextResponse:
+        """Prometheus scrape endpoint for the HTTP transports."""
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+    
     logger.info("Loop-Orchestrator MCP Server created successfully")
     return server
 
@@ -402,6 +472,7 @@ async def main():
     Main server entry point.
     """
     config = get_server_config()
+    watcher = None
     
     try:
         # Validate environment
@@ -413,6 +484,11 @@ async def main():
         # Create server
         server = get_server()
         
+        # Watch the workspace so caches are invalidated as files change
+        if config.watch_enabled and config.workspace_path.is_dir():
+            watcher = get_workspace_watcher()
+            watcher.start()
+        
         logging.info(f"Starting Loop-Orchestrator MCP Server v{config.version}")
         logging.info(f"Transport: {config.transport}, Port: {config.base_port}")
         
@@ -432,6 +508,10 @@ async def main():
     except Exception as e:
         logging.error(f"Server startup failed: {e}")
         sys.exit(1)
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        shutdown_process_pool()
 
 
 if __name__ == "__main__":
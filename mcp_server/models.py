@@ -4,11 +4,13 @@ Data Models for Loop-Orchestrator MCP Server
 Pydantic models for structured data handling and validation.
 """
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, IO, Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 from enum import Enum
 from pydantic import BaseModel, Field, field_validator, ConfigDict
+import csv
+import io
 import json
 
 
@@ -279,6 +281,111 @@ class TaskTimingData(BaseModel):
                 pass
 
 
+TASK_TIMING_FIELDS = [
+    "timestamp", "mode", "task_id", "start_time", "end_time",
+    "duration", "task", "result", "priority",
+]
+
+
+def task_timing_from_row(parts: List[str]) -> Optional[TaskTimingData]:
+    """Convert one parsed TSV row into a TaskTimingData entry (None for skipped rows)."""
+    if len(parts) < 7 or not any(part.strip() for part in parts):
+        return None
+    
+    entry_data = {
+        "timestamp": parts[0],
+        "mode": parts[1] or None,
+        "task_id": parts[2] or None,
+        "start_time": parts[3],
+        "end_time": parts[4] or None,
+        "duration": int(parts[5]) if parts[5] and parts[5].strip().isdigit() else None,
+        "task": parts[6],
+        "result": (parts[7] or None) if len(parts) > 7 else None,
+        "priority": parts[8] if len(parts) > 8 and parts[8] and parts[8].strip() in ["schedule", "todo", "normal"] else None,
+    }
+    return TaskTimingData(**entry_data)
+
+
+def _task_timing_to_row(entry: TaskTimingData) -> List[str]:
+    """Convert a TaskTimingData entry into TSV row values."""
+    return [
+        entry.timestamp or "",
+        entry.mode or "",
+        entry.task_id or "",
+        entry.start_time or "",
+        entry.end_time or "",
+        str(entry.duration) if entry.duration else "",
+        entry.task or "",
+        entry.result or "",
+        entry.priority.value if entry.priority else "",
+    ]
+
+
+def iter_tsv(fp: IO[str]) -> Iterator[TaskTimingData]:
+    """
+    Stream task timing entries from a TSV file object, one row at a time.
+    
+    Fields are parsed with the csv module, so values written by write_tsv that
+    contain tabs, newlines or quotes round-trip intact. The first row is treated
+    as the header and skipped. Open files with ``newline=""``.
+    
+    Args:
+        fp: Text file object positioned at the start of the TSV content
+        
+    Yields:
+        TaskTimingData entries in file order
+    """
+    reader = csv.reader(fp, delimiter="\t", quotechar='"')
+    if next(reader, None) is None:
+        return
+    
+    for parts in reader:
+        entry = task_timing_from_row(parts)
+        if entry is not None:
+            yield entry
+
+
+def write_tsv(fp: IO[str], rows: Iterable[TaskTimingData], include_header: bool = True) -> int:
+    """
+    Stream task timing entries to a TSV file object, one row at a time.
+    
+    Values containing tabs, newlines or quotes are quoted so iter_tsv can read
+    them back. Open files with ``newline=""``.
+    
+    Args:
+        fp: Text file object to write to
+        rows: Iterable of TaskTimingData entries (may be a generator)
+        include_header: Whether to write the header row first
+        
+    Returns:
+        Number of entries written
+    """
+    writer = csv.writer(fp, delimiter="\t", quotechar='"', lineterminator="\n")
+    if include_header:
+        writer.writerow(TASK_TIMING_FIELDS)
+    
+    count = 0
+    for entry in rows:
+        writer.writerow(_task_timing_to_row(entry))
+        count += 1
+    return count
+
+
+def format_tsv_row(entry: TaskTimingData) -> str:
+    """
+    Format a single task timing entry as a TSV line (with trailing newline).
+    
+    Args:
+        entry: Entry to format
+        
+    Returns:
+        The line exactly as write_tsv would write it
+    """
+    buffer = io.StringIO(newline="")
+    write_tsv(buffer, [entry], include_header=False)
+    return buffer.getvalue()
+
+
 class TaskTimingContainer(BaseModel):
     """Container for task timing data."""
     entries: List[TaskTimingData] = Field(default_factory=list)
@@ -286,53 +393,23 @@ class TaskTimingContainer(BaseModel):
     @classmethod
     def from_tsv(cls, content: str) -> "TaskTimingContainer":
         """Parse TSV content into task timing entries."""
-        entries = []
-        lines = content.strip().split("\n")
-        
-        if not lines:
-            return cls(entries=[])
-        
-        # Skip header
-        for line in lines[1:]:
-            if not line.strip():
-                continue
-                
-            parts = line.split("\t")
-            if len(parts) >= 7:
-                entry_data = {
-                    "timestamp": parts[0],
-                    "mode": parts[1] if len(parts) > 1 else None,
-                    "task_id": parts[2] if len(parts) > 2 else None,
-                    "start_time": parts[3] if len(parts) > 3 else "",
-                    "end_time": parts[4] if len(parts) > 4 else None,
-                    "duration": int(parts[5]) if len(parts) > 5 and parts[5] and parts[5].strip().isdigit() else None,
-                    "task": parts[6] if len(parts) > 6 else "",
-                    "result": parts[7] if len(parts) > 7 else None,
-                    "priority": parts[8] if len(parts) > 8 and parts[8] and parts[8].strip() in ["schedule", "todo", "normal"] else None,
-                }
-                entries.append(TaskTimingData(**entry_data))
-        
-        return cls(entries=entries)
+        return cls(entries=list(iter_tsv(io.StringIO(content, newline=""))))
+
+    @classmethod
+    def from_stream(cls, fp: IO[str]) -> "TaskTimingContainer":
+        """Parse task timing entries from an open TSV file object."""
+        return cls(entries=list(iter_tsv(fp)))
 
     def to_tsv(self) -> str:
         """Convert to TSV format."""
-        lines = ["timestamp\tmode\ttask_id\tstart_time\tend_time\tduration\ttask\tresult\tpriority"]
-        
-        for entry in self.entries:
-            line = "\t".join([
-                entry.timestamp or "",
-                entry.mode or "",
-                entry.task_id or "",
-                entry.start_time or "",
-                entry.end_time or "",
-                str(entry.duration) if entry.duration else "",
-                entry.task or "",
-                entry.result or "",
-                entry.priority.value if entry.priority else "",
-            ])
-            lines.append(line)
-        
-        return "\n".join(lines)
+        buffer = io.StringIO(newline="")
+        write_tsv(buffer, self.entries)
+        content = buffer.getvalue()
+        return content[:-1] if content.endswith("\n") else content
+
+    def write_to(self, fp: IO[str]) -> int:
+        """Write all entries as TSV to an open file object."""
+        return write_tsv(fp, self.entries)
 
 
 class PersistentMemoryEntry(BaseModel):
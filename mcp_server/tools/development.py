@@ -25,6 +25,7 @@ from ..models import (
 )
 from ..config.settings import get_server_config
 from ..utils.helpers import format_timestamp, safe_json_load
+from ..utils.tool_cache import cached_tool
 
 # Import performance optimizations
 try:
@@ -39,7 +40,16 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Seconds a cached system status is fresh, and then served while being refreshed
+SYSTEM_STATUS_TTL = 30
+SYSTEM_STATUS_STALE_TTL = 300
 
+
+@cached_tool(
+    ttl=SYSTEM_STATUS_TTL,
+    stale_ttl=SYSTEM_STATUS_STALE_TTL,
+    when=lambda args: not args["check_external_dependencies"]
+)
 async def get_system_status(
     include_performance: bool = True,
     include_file_health: bool = True,
@@ -58,16 +68,24 @@ async def get_system_status(
     Returns:
         Dictionary containing comprehensive system status
     """
+    # Performance optimization: Basic status is cached; concurrent cold calls share one
+    # collection, and a status past its TTL is served while it is refreshed
+    result = await _collect_system_status(
+        include_performance, include_file_health, include_orchestrator_status, check_external_dependencies
+    )
+    result['cache_timestamp'] = time.time()
+    return result
+
+
+async def _collect_system_status(
+    include_performance: bool,
+    include_file_health: bool,
+    include_orchestrator_status: bool,
+    check_external_dependencies: bool
+) -> Dict[str, Any]:
+    """Run the health checks for get_system_status."""
     config = get_server_config()
     
-    # Performance optimization: Check cache first for basic status
-    if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and intelligent_cache and not check_external_dependencies:
-        cache_key = f"system_status_{include_performance}_{include_file_health}_{include_orchestrator_status}"
-        cached_result = intelligent_cache.get(cache_key)
-        if cached_result is not None and time.time() - cached_result.get('cache_timestamp', 0) < 30:  # 30s cache
-            logger.debug("Cache hit for system status")
-            return cached_result
-    
     try:
         start_time = time.time()
         
@@ -322,12 +340,6 @@ async def get_system_status(
             }
         }
         
-        # Performance optimization: Cache the result for 30 seconds
-        if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and intelligent_cache and not check_external_dependencies:
-            result['cache_timestamp'] = time.time()
-            cache_key = f"system_status_{include_performance}_{include_file_health}_{include_orchestrator_status}"
-            intelligent_cache.set(cache_key, result)
-        
         # Record performance metrics
         if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and performance_monitor:
             performance_monitor.record_metric(
@@ -700,8 +712,9 @@ async def validate_orchestrator_files() -> Dict[str, Any]:
         timing_path = config.get_task_timing_path()
         if timing_path.exists():
             try:
+                # Only the header and first row are needed; don't load the whole file
                 with open(timing_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+                    lines = [line for line, _ in zip(f, range(2))]
                 if len(lines) < 2:
                     warnings.append("task_timing.tsv appears to be empty or missing header")
             except Exception as e:
@@ -778,6 +791,7 @@ async def validate_modes_configuration() -> Dict[str, Any]:
         }
 
 
+@cached_tool(files=lambda args: [get_server_config().get_modes_path()])
 async def get_mode_capabilities(
     filter_by_group: Optional[str] = None,
     include_instructions: bool = True
@@ -5,18 +5,19 @@ Tools for reading, writing, and managing files in the Loop-Orchestrator project.
 """
 
 import os
+import stat
 import shutil
 import glob
 import re
 import time
 import asyncio
 import threading
-import hashlib
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any, Optional, Union, Tuple, Callable, Awaitable
 from pathlib import Path
 from datetime import datetime
 import logging
 from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from ..models import FileOperationResult
 from ..config.settings import get_server_config
@@ -24,15 +25,23 @@ from ..utils.helpers import (
     ensure_directory, create_backup, restore_from_backup, validate_file_path,
     format_timestamp, safe_json_load, safe_json_save
 )
+from ..utils.search_index import get_search_index
+from ..utils.file_walker import WalkEntry, walk_workspace, matches_file_pattern
+from ..utils.mmap_search import compile_bytes_prefilter
+from ..utils.search_pool import (
+    choose_backend, default_workers, make_batches, scan_file, scan_batch,
+    get_process_pool, shutdown_process_pool
+)
+from ..utils.file_cache import get_file_cache, FileTooLargeError, decode_content
+from ..utils.search_cache import get_search_cache, file_identity
+from ..utils.workspace_watcher import publish_changes
+from ..utils.line_index import read_line_range, read_byte_range, read_chunk, DEFAULT_CHUNK_SIZE
+from ..utils.atomic_write import stage_text, commit_staged, sync_paths, break_hardlink
+from ..utils.backup_store import get_backup_store, backup_key
+from ..utils.tool_metrics import track_queue_wait
 
-# Import performance optimizations
-try:
-    from performance_optimizations import intelligent_cache, algorithm_optimizer
-    PERFORMANCE_OPTIMIZATIONS_AVAILABLE = True
-except ImportError:
-    PERFORMANCE_OPTIMIZATIONS_AVAILABLE = False
-    intelligent_cache = None
-    algorithm_optimizer = None
+# write tools take a create_backup flag, so they call the helper under this name
+create_file_backup = create_backup
 
 
 logger = logging.getLogger(__name__)
@@ -42,17 +51,56 @@ async def read_project_file(
     file_path: str,
     encoding: str = "utf-8",
     max_size_mb: Optional[float] = None,
-    include_metadata: bool = False
+    include_metadata: bool = False,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    byte_offset: Optional[int] = None,
+    byte_length: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    cursor: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Read any file in the Loop-Orchestrator project.
     
+    The whole file is returned unless a line range, byte range or streaming
+    chunk is requested; those read only the needed part of the file.
+    
     Args:
         file_path: Path to the file (relative to workspace)
         encoding: File encoding (default: utf-8)
-        max_size_mb: Maximum file size to read (optional)
+        max_size_mb: Maximum file size to read (optional, whole-file reads only)
         include_metadata: Whether to include file metadata in response
+        start_line: First line to read, 1-based (optional)
+        end_line: Last line to read, inclusive (optional)
+        byte_offset: First byte to read (optional)
+        byte_length: Number of bytes to read (optional)
+        chunk_size: Stream the file in chunks of about this many bytes (optional)
+        cursor: Continuation cursor from a previous chunk (optional)
         
+    Returns:
+        Dictionary containing file content and metadata
+    """
+    return _read_project_file(
+        file_path, encoding, max_size_mb, include_metadata,
+        start_line, end_line, byte_offset, byte_length, chunk_size, cursor
+    )
+
+
+def _read_project_file(
+    file_path: str,
+    encoding: str = "utf-8",
+    max_size_mb: Optional[float] = None,
+    include_metadata: bool = False,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    byte_offset: Optional[int] = None,
+    byte_length: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Read a file for read_project_file and read_project_files (blocking).
+    
     Returns:
         Dictionary containing file content and metadata
     """
@@ -70,45 +118,44 @@ async def read_project_file(
                 "timestamp": format_timestamp()
             }
         
-        # Check if file exists
-        if not target_path.exists():
+        # Ranged and streaming reads only touch the requested part of the file
+        if any(value is not None for value in (start_line, end_line, byte_offset, byte_length, chunk_size, cursor)):
+            return _read_file_range(
+                file_path, target_path, encoding, start_line, end_line,
+                byte_offset, byte_length, chunk_size, cursor
+            )
+        
+        # Read file content (one stat; unchanged files are served from the cache)
+        try:
+            content, _, file_stat = get_file_cache().read_text(
+                target_path, encoding,
+                max_size=int(max_size_mb * 1024 * 1024) if max_size_mb else None
+            )
+        except FileNotFoundError:
             return {
                 "success": False,
                 "error": f"File not found: {file_path}",
                 "file_path": file_path,
                 "timestamp": format_timestamp()
             }
-        
-        # Check file size
-        file_size = target_path.stat().st_size
-        if max_size_mb and file_size > max_size_mb * 1024 * 1024:
+        except FileTooLargeError as e:
             return {
                 "success": False,
-                "error": f"File too large: {file_size} bytes (max: {max_size_mb} MB)",
+                "error": f"File too large: {e.size} bytes (max: {max_size_mb} MB)",
                 "file_path": file_path,
-                "file_size": file_size,
+                "file_size": e.size,
                 "timestamp": format_timestamp()
             }
-        
-        # Read file content
-        try:
-            with open(target_path, 'r', encoding=encoding) as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            try:
-                with open(target_path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-            except Exception as e:
-                return {
-                    "success": False,
-                    "error": f"Could not decode file with encoding {encoding}: {str(e)}",
-                    "file_path": file_path,
-                    "timestamp": format_timestamp()
-                }
+        except LookupError as e:
+            return {
+                "success": False,
+                "error": f"Could not decode file with encoding {encoding}: {str(e)}",
+                "file_path": file_path,
+                "timestamp": format_timestamp()
+            }
+        file_size = file_stat.st_size
         
         # Get file metadata
-        file_stat = target_path.stat()
         metadata = {}
         if include_metadata:
             metadata = {
@@ -116,8 +163,8 @@ async def read_project_file(
                 "created": datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
                 "modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
                 "encoding": encoding,
-                "is_file": target_path.is_file(),
-                "is_directory": target_path.is_dir()
+                "is_file": stat.S_ISREG(file_stat.st_mode),
+                "is_directory": stat.S_ISDIR(file_stat.st_mode)
             }
         
         return {
@@ -139,6 +186,108 @@ async def read_project_file(
         }
 
 
+def _read_file_range(
+    file_path: str,
+    target_path: Path,
+    encoding: str,
+    start_line: Optional[int],
+    end_line: Optional[int],
+    byte_offset: Optional[int],
+    byte_length: Optional[int],
+    chunk_size: Optional[int],
+    cursor: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Read part of a file for read_project_file.
+    
+    Streaming (chunk_size/cursor) takes precedence over a line range, which
+    takes precedence over a byte range. Cursors are "offset:inode" strings;
+    a cursor is rejected if the file was replaced or truncated below it.
+    
+    Returns:
+        Dictionary containing the content and the range that was read
+    """
+    def _error(message: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": message,
+            "file_path": file_path,
+            "timestamp": format_timestamp()
+        }
+    
+    if not target_path.is_file():
+        return _error(f"File not found: {file_path}")
+    
+    if chunk_size is not None or cursor is not None:
+        if chunk_size is not None and chunk_size < 1:
+            return _error(f"Invalid chunk size: {chunk_size}")
+        offset = 0
+        if cursor:
+            try:
+                offset, inode = (int(part) for part in cursor.split(":"))
+            except ValueError:
+                return _error(f"Invalid cursor: {cursor}")
+            file_stat = target_path.stat()
+            if file_stat.st_ino != inode:
+                return _error("File was replaced since the cursor was issued")
+            if offset > file_stat.st_size:
+                return _error("File was truncated since the cursor was issued")
+        
+        data, next_offset, identity = read_chunk(target_path, offset, chunk_size or DEFAULT_CHUNK_SIZE)
+        content, _ = decode_content(data, encoding)
+        eof = next_offset >= identity[1]
+        return {
+            "success": True,
+            "file_path": file_path,
+            "content": content,
+            "size": identity[1],
+            "range": {"start_byte": offset, "end_byte": next_offset},
+            "next_cursor": None if eof else f"{next_offset}:{identity[0]}",
+            "eof": eof,
+            "timestamp": format_timestamp()
+        }
+    
+    if start_line is not None or end_line is not None:
+        data, range_info = read_line_range(target_path, start_line or 1, end_line)
+        content, _ = decode_content(data, encoding)
+    else:
+        data, range_info = read_byte_range(target_path, byte_offset or 0, byte_length)
+        content = data.decode(encoding, errors="replace")
+    
+    return {
+        "success": True,
+        "file_path": file_path,
+        "content": content,
+        "size": target_path.stat().st_size,
+        "range": range_info,
+        "timestamp": format_timestamp()
+    }
+
+
+def _backup_file(source_path: Path, workspace_path: Path, link: bool = False) -> Tuple[Optional[Path], Optional[int]]:
+    """
+    Back up a file before it is modified.
+    
+    Uses the backup store when it is enabled and a timestamped copy otherwise.
+    
+    Args:
+        source_path: File to back up
+        workspace_path: Workspace root
+        link: Whether the file is about to be replaced, so the backup may share its inode
+    
+    Returns:
+        Tuple of (backup path, backup store version id), or (None, None) if the backup failed
+    """
+    if not get_server_config().backup_store_enabled:
+        return create_file_backup(source_path, link=link), None
+    try:
+        version = get_backup_store().put(source_path, backup_key(source_path, workspace_path), link=link)
+    except Exception as e:
+        logger.error(f"Failed to create backup for {source_path}: {e}")
+        return None, None
+    return Path(version["object_path"]), version["id"]
+
+
 async def write_project_file(
     file_path: str,
     content: str,
@@ -175,36 +324,42 @@ async def write_project_file(
                 "timestamp": format_timestamp()
             }
         
-        # Create backup if file exists and backup is requested
         backup_path = None
-        if create_backup and target_path.exists():
-            backup_path = create_backup(target_path)
+        backup_id = None
+        fsync_mode = config.write_fsync_mode
+        exists = target_path.exists()
         
-        # Ensure parent directory exists
-        if ensure_directory:
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write file
-        if append:
-            # Append mode
-            mode = 'a'
-            if not target_path.exists():
-                mode = 'w'  # If file doesn't exist, create it
+        if append and exists:
+            # Appends modify the file in place, so the backup must be a real copy
+            if create_backup:
+                backup_path, backup_id = _backup_file(target_path, workspace_path)
+            with open(target_path, 'a', encoding=encoding) as f:
+                f.write(content)
+            sync_paths([target_path], fsync_mode)
+            file_size = target_path.stat().st_size
         else:
-            mode = 'w'
-        
-        with open(target_path, mode, encoding=encoding) as f:
-            f.write(content)
-        
-        # Get file size
-        file_size = target_path.stat().st_size
+            # Write a temporary file and swap it in, so readers never see a partial write
+            temp_path, file_size = stage_text(
+                target_path, content, encoding, ensure_directory, fsync=fsync_mode == "always"
+            )
+            if create_backup and exists:
+                # The old inode is replaced rather than modified, so linking it costs no copy
+                backup_path, backup_id = _backup_file(target_path, workspace_path, link=True)
+            try:
+                commit_staged(temp_path, target_path, fsync_mode)
+            except OSError:
+                if backup_path is not None and backup_path.exists() and os.path.samefile(backup_path, target_path):
+                    break_hardlink(backup_path)
+                raise
+        publish_changes([target_path])
         
         return {
             "success": True,
             "file_path": file_path,
             "operation": "append" if append else "write",
             "size": file_size,
-            "backup_created": backup_path,
+            "backup_created": str(backup_path.relative_to(workspace_path)) if backup_path else None,
+            "backup_id": backup_id,
             "timestamp": format_timestamp()
         }
         
@@ -214,9 +369,322 @@ async def write_project_file(
             "success": False,
             "error": str(e),
             "file_path": file_path,
-            "backup_created": backup_path,
+            "backup_created": str(backup_path.relative_to(workspace_path)) if backup_path else None,
+            "timestamp": format_timestamp()
+        }
+
+
+# Shared pool for batched file I/O
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    """Get the bounded thread pool used for batched file I/O."""
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=get_server_config().max_concurrent_operations,
+                thread_name_prefix="file-io"
+            )
+        return _io_executor
+
+
+def _run_io(func: Callable, *args, **kwargs) -> Awaitable[Any]:
+    """Run a function on the shared I/O pool, recording its queue wait for the calling tool."""
+    return asyncio.get_running_loop().run_in_executor(_get_io_executor(), track_queue_wait(func, *args, **kwargs))
+
+
+async def read_project_files(
+    file_paths: List[str],
+    encoding: str = "utf-8",
+    max_size_mb: Optional[float] = None,
+    include_metadata: bool = False
+) -> Dict[str, Any]:
+    """
+    Read several project files in parallel.
+    
+    Args:
+        file_paths: Paths to the files (relative to workspace)
+        encoding: File encoding (default: utf-8)
+        max_size_mb: Maximum size of each file (optional)
+        include_metadata: Whether to include file metadata in responses
+        
+    Returns:
+        Dictionary containing one read_project_file result per path, in input order
+    """
+    try:
+        files = await asyncio.gather(*(
+            _run_io(
+                _read_project_file, file_path, encoding, max_size_mb, include_metadata,
+                None, None, None, None, None, None
+            )
+            for file_path in file_paths
+        ))
+        failed = sum(1 for result in files if not result["success"])
+        
+        return {
+            "success": True,
+            "files": files,
+            "count": len(files),
+            "failed": failed,
+            "timestamp": format_timestamp()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error reading files: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": format_timestamp()
+        }
+
+
+async def write_project_files(
+    files: Dict[str, str],
+    encoding: str = "utf-8",
+    create_backup: bool = True,
+    ensure_directory: bool = True
+) -> Dict[str, Any]:
+    """
+    Write several project files as one all-or-nothing batch.
+    
+    All paths are validated first, new contents are staged in temporary
+    files in parallel, and existing files are backed up in a single step.
+    The staged files then replace their targets; if any replacement fails,
+    the files already replaced are rolled back.
+    
+    Args:
+        files: Mapping of path (relative to workspace) to content
+        encoding: File encoding (default: utf-8)
+        create_backup: Whether to back up existing files before writing
+        ensure_directory: Whether to create parent directories if they don't exist
+        
+    Returns:
+        Dictionary containing per-file results in input order
+    """
+    config = get_server_config()
+    workspace_path = config.workspace_path
+    targets = [(file_path, workspace_path / file_path) for file_path in files]
+    
+    invalid = [file_path for file_path, target_path in targets if not validate_file_path(target_path, workspace_path)]
+    if invalid:
+        return {
+            "success": False,
+            "error": f"Invalid file paths: {', '.join(invalid)}",
+            "timestamp": format_timestamp()
+        }
+    
+    staged: List[Optional[Tuple[Path, int]]] = []
+    originals: Dict[Path, Path] = {}
+    replaced: List[Path] = []
+    fsync_mode = config.write_fsync_mode
+    existed = [target_path.exists() for _, target_path in targets]
+    backups: List[Optional[Path]] = [None] * len(targets)
+    backup_ids: List[Optional[int]] = [None] * len(targets)
+    
+    try:
+        # Stage new contents in parallel
+        staged = await asyncio.gather(*(
+            _run_io(stage_text, target_path, files[file_path], encoding, ensure_directory, fsync_mode == "always")
+            for file_path, target_path in targets
+        ), return_exceptions=True)
+        errors = [(targets[i][0], result) for i, result in enumerate(staged) if isinstance(result, BaseException)]
+        if errors:
+            raise OSError(f"Could not write {errors[0][0]}: {errors[0][1]}")
+        
+        # Back up every existing target before anything is replaced; the old
+        # inodes are replaced rather than modified, so the backups are hard links
+        if create_backup:
+            backup_indexes = [i for i, exists in enumerate(existed) if exists]
+            results = await asyncio.gather(*(
+                _run_io(_backup_file, targets[i][1], workspace_path, link=True)
+                for i in backup_indexes
+            ))
+            for i, (backup_path, backup_id) in zip(backup_indexes, results):
+                if backup_path is None:
+                    raise OSError(f"Could not back up {targets[i][0]}")
+                backups[i] = backup_path
+                backup_ids[i] = backup_id
+        
+        # Keep the original inodes reachable so a failed batch can be rolled back
+        for (_, target_path), exists in zip(targets, existed):
+            if exists:
+                keep = target_path.with_name(f".{target_path.name}.{os.getpid()}.orig")
+                try:
+                    os.link(target_path, keep)
+                except OSError:
+                    shutil.copy2(target_path, keep)
+                originals[target_path] = keep
+        
+        for (_, target_path), (temp_path, _) in zip(targets, staged):
+            os.replace(temp_path, target_path)
+            replaced.append(target_path)
+        
+        # One round of fsyncs for the whole batch
+        parents = {target_path.parent for _, target_path in targets}
+        sync_paths([target_path for _, target_path in targets] + sorted(parents), fsync_mode)
+        
+    except Exception as e:
+        # Roll back replaced files and drop staged ones
+        for target_path in replaced:
+            try:
+                if target_path in originals:
+                    os.replace(originals.pop(target_path), target_path)
+                else:
+                    target_path.unlink()
+            except OSError as rollback_error:
+                logger.error(f"Could not roll back {target_path}: {rollback_error}")
+        for item in staged:
+            if isinstance(item, tuple) and item[0].exists():
+                item[0].unlink()
+        # Targets are back on their original inodes, which hard-linked backups share
+        for (_, target_path), backup_path in zip(targets, backups):
+            try:
+                if backup_path is not None and target_path.exists() and os.path.samefile(backup_path, target_path):
+                    break_hardlink(backup_path)
+            except OSError as detach_error:
+                logger.error(f"Could not detach backup {backup_path}: {detach_error}")
+        logger.error(f"Error writing files: {e}")
+        return {
+            "success": False,
+            "error": str(e),
             "timestamp": format_timestamp()
         }
+    
+    finally:
+        for keep in originals.values():
+            try:
+                keep.unlink()
+            except OSError:
+                pass
+        publish_changes([target_path for _, target_path in targets])
+    
+    return {
+        "success": True,
+        "files": [
+            {
+                "file_path": file_path,
+                "operation": "write" if exists else "create",
+                "size": size,
+                "backup_created": str(backup_path.relative_to(workspace_path)) if backup_path else None,
+                "backup_id": backup_id
+            }
+            for (file_path, _), exists, (_, size), backup_path, backup_id in zip(targets, existed, staged, backups, backup_ids)
+        ],
+        "count": len(targets),
+        "timestamp": format_timestamp()
+    }
+
+
+def _file_entry(item: WalkEntry, item_path: str, include_metadata: bool) -> Dict[str, Any]:
+    """Describe a listed file, statting it only when metadata is wanted."""
+    if not include_metadata:
+        return {"type": "file", "path": item_path}
+    try:
+        stat = item.stat()
+    except OSError:
+        return {"type": "file", "error": "Could not stat file", "path": item_path}
+    return {
+        "type": "file",
+        "size": stat.st_size,
+        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        "path": item_path
+    }
+
+
+def _list_flat(
+    target_path: Path,
+    workspace_path: Path,
+    include_hidden: bool,
+    include_directories: bool,
+    include_files: bool,
+    file_pattern: Optional[str],
+    exclude_patterns: Optional[List[str]],
+    max_depth: Optional[int],
+    include_metadata: bool,
+    page_size: int,
+    cursor: Optional[str]
+) -> Dict[str, Any]:
+    """
+    List one page of a directory tree as flat entries.
+    
+    The walk resumes right after the cursor entry without revisiting the
+    directories before it, and stops as soon as the page is full and one more
+    entry shows that another page follows.
+    
+    Args:
+        target_path: Directory to list
+        workspace_path: Workspace root
+        include_hidden: Whether to include hidden files/directories
+        include_directories: Whether to include directories
+        include_files: Whether to include files
+        file_pattern: Glob pattern to filter files
+        exclude_patterns: List of patterns to exclude
+        max_depth: Maximum depth to recurse
+        include_metadata: Whether to stat files for size and modification time
+        page_size: Maximum entries to return
+        cursor: Relpath of the last entry of the previous page
+    
+    Returns:
+        Dictionary with entries, their counts and next_cursor (None on the last page)
+    """
+    config = get_server_config()
+    rel_root = os.path.relpath(target_path, workspace_path)
+    entries = []
+    errors = []
+    dir_count = 0
+    file_count = 0
+    last_relpath = None
+    has_more = False
+    
+    for item in walk_workspace(
+        target_path,
+        include_hidden=include_hidden,
+        exclude_dirs=config.walk_exclude_dirs,
+        exclude_patterns=exclude_patterns,
+        respect_gitignore=config.walk_respect_gitignore,
+        max_depth=max_depth or None,
+        yield_pruned=include_directories,
+        on_error=lambda relpath, error: errors.append(relpath or "."),
+        ignore_root=workspace_path,
+        start_after=cursor
+    ):
+        if item.is_dir:
+            if not include_directories:
+                continue
+        elif not include_files or not item.entry.is_file():
+            continue
+        elif file_pattern and not matches_file_pattern(item.relpath, file_pattern):
+            continue
+        
+        if len(entries) == page_size:
+            has_more = True
+            break
+        
+        item_path = os.path.normpath(os.path.join(rel_root, item.relpath))
+        if item.is_dir:
+            entry = {"type": "directory", "path": item_path}
+            if item.pruned:
+                entry["pruned"] = True
+            dir_count += 1
+        else:
+            entry = _file_entry(item, item_path, include_metadata)
+            file_count += 1
+        entries.append(entry)
+        last_relpath = item.relpath
+    
+    page = {
+        "entries": entries,
+        "count": len(entries),
+        "directories": dir_count,
+        "files": file_count,
+        "next_cursor": last_relpath if has_more else None
+    }
+    if errors:
+        page["unreadable_directories"] = errors
+    return page
 
 
 async def list_project_structure(
@@ -227,11 +695,19 @@ async def list_project_structure(
     include_files: bool = True,
     file_pattern: Optional[str] = None,
     exclude_patterns: Optional[List[str]] = None,
-    max_depth: Optional[int] = None
+    max_depth: Optional[int] = None,
+    flat: bool = False,
+    include_metadata: bool = True,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Recursive directory listing with filtering.
     
+    The nested listing returns the whole tree. The flat listing returns
+    entries in walk order (each directory's entries, then its subdirectories)
+    one page at a time; pass next_cursor back as cursor to continue.
+    
     Args:
         directory: Directory to list (relative to workspace, default: workspace root)
         recursive: Whether to list recursively
@@ -241,9 +717,14 @@ async def list_project_structure(
         file_pattern: Glob pattern to filter files
         exclude_patterns: List of patterns to exclude
         max_depth: Maximum depth to recurse
+        flat: Return a paginated flat list instead of a nested structure
+            (implied by page_size or cursor)
+        include_metadata: Whether to stat files for size and modification time
+        page_size: Entries per page in the flat listing (default: list_page_size setting)
+        cursor: Continuation cursor from a previous page
         
     Returns:
-        Dictionary containing directory structure
+        Dictionary containing directory structure, or a page of entries
     """
     config = get_server_config()
     workspace_path = config.workspace_path
@@ -269,89 +750,77 @@ async def list_project_structure(
                 "timestamp": format_timestamp()
             }
         
-        # Build directory structure
+        if flat or page_size is not None or cursor is not None:
+            if page_size is not None and page_size < 1:
+                return {
+                    "success": False,
+                    "error": f"page_size must be positive: {page_size}",
+                    "directory": directory,
+                    "timestamp": format_timestamp()
+                }
+            page = _list_flat(
+                target_path, workspace_path, include_hidden, include_directories, include_files,
+                file_pattern, exclude_patterns, max_depth if recursive else 1,
+                include_metadata, page_size or config.list_page_size, cursor
+            )
+            return {
+                "success": True,
+                "directory": directory or "workspace_root",
+                "recursive": recursive,
+                **page,
+                "timestamp": format_timestamp()
+            }
+        
+        # Build directory structure from a single walk; directories register their
+        # children dictionaries so entries can be attached as they are yielded
         structure = {}
+        children_by_dir = {"": structure}
+        rel_root = os.path.relpath(target_path, workspace_path)
+        file_count = 0
+        dir_count = 0
         
-        def _build_structure(path: Path, current_depth: int = 0) -> Dict[str, Any]:
-            if max_depth and current_depth >= max_depth:
-                return {}
+        def _record_error(relpath: str, error: OSError) -> None:
+            items = children_by_dir.get(relpath)
+            if items is not None:
+                items["_error"] = "Permission denied" if isinstance(error, PermissionError) else f"OS error: {str(error)}"
             
-            items = {}
-            try:
-                for item in path.iterdir():
-                    # Skip hidden files if not requested
-                    if not include_hidden and item.name.startswith('.'):
-                        continue
-                    
-                    # Check exclude patterns
-                    if exclude_patterns and any(re.search(pattern, item.name) for pattern in exclude_patterns):
-                        continue
-                    
-                    # Check file pattern
-                    if file_pattern and not re.match(file_pattern.replace('*', '.*'), item.name):
-                        if item.is_file():
-                            continue
+        for item in walk_workspace(
+            target_path,
+            include_hidden=include_hidden,
+            exclude_dirs=config.walk_exclude_dirs,
+            exclude_patterns=exclude_patterns,
+            respect_gitignore=config.walk_respect_gitignore,
+            max_depth=max_depth or None,
+            recursive=recursive and include_directories,
+            yield_pruned=True,
+            on_error=_record_error,
+            ignore_root=workspace_path
+        ):
+            items = children_by_dir[item.relpath.rpartition("/")[0]]
+            item_path = os.path.normpath(os.path.join(rel_root, item.relpath))
                     
-                    if item.is_file() and include_files:
-                        try:
-                            stat = item.stat()
-                            items[item.name] = {
-                                "type": "file",
-                                "size": stat.st_size,
-                                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                                "path": str(item.relative_to(workspace_path))
-                            }
-                        except OSError:
-                            items[item.name] = {
-                                "type": "file",
-                                "error": "Could not stat file",
-                                "path": str(item.relative_to(workspace_path))
-                            }
+            if item.is_dir:
+                if not include_directories:
+                    continue
+                children = {}
+                items[item.name] = {
+                    "type": "directory",
+                    "children": children,
+                    "path": item_path
+                }
+                if item.pruned:
+                    items[item.name]["pruned"] = True
+                else:
+                    children_by_dir[item.relpath] = children
+                dir_count += 1
                     
-                    elif item.is_dir() and include_directories:
-                        if recursive:
-                            items[item.name] = {
-                                "type": "directory",
-                                "children": _build_structure(item, current_depth + 1),
-                                "path": str(item.relative_to(workspace_path))
-                            }
-                        else:
-                            items[item.name] = {
-                                "type": "directory",
-                                "children": {},
-                                "path": str(item.relative_to(workspace_path))
-                            }
-            
-            except PermissionError:
-                items["_error"] = "Permission denied"
-            except OSError as e:
-                items["_error"] = f"OS error: {str(e)}"
-            
-            return items
-        
-        structure = _build_structure(target_path)
-        
-        # Count items
-        def count_items(items):
-            count = 0
-            dirs = 0
-            files = 0
-            for name, item in items.items():
-                if name == "_error":
+            elif include_files and item.entry.is_file():
+                if file_pattern and not matches_file_pattern(item.relpath, file_pattern):
                     continue
-                if item["type"] == "file":
-                    files += 1
-                    count += 1
-                elif item["type"] == "directory":
-                    dirs += 1
-                    count += 1
-                    child_count, child_dirs, child_files = count_items(item.get("children", {}))
-                    count += child_count
-                    dirs += child_dirs
-                    files += child_files
-            return count, dirs, files
-        
-        total_count, dir_count, file_count = count_items(structure)
+                items[item.name] = _file_entry(item, item_path, include_metadata)
+                file_count += 1
+                    
+        total_count = dir_count + file_count
         
         return {
             "success": True,
@@ -374,6 +843,27 @@ async def list_project_structure(
         }
 
 
+def _match_dicts(relative_path: str, found: List[Tuple], include_line_numbers: bool) -> List[Dict[str, Any]]:
+    """Expand compact match tuples from the search workers into result dictionaries."""
+    file_matches = []
+    for line_num, line, match_text, match_start, match_end, context in found:
+        match_info = {
+            "file": relative_path,
+            "line_number": line_num if include_line_numbers else None,
+            "match_text": match_text,
+            "match_start": match_start,
+            "match_end": match_end,
+            "line_content": line
+        }
+        
+        # Add context lines
+        if context is not None:
+            match_info["context"] = context
+        
+        file_matches.append(match_info)
+    return file_matches
+
+
 async def search_in_files(
     pattern: str,
     directory: Optional[str] = None,
@@ -382,10 +872,16 @@ async def search_in_files(
     whole_word: bool = False,
     max_matches: Optional[int] = None,
     include_line_numbers: bool = True,
-    context_lines: int = 0
+    context_lines: int = 0,
+    progress_callback: Optional[Callable[[float, Optional[float], Optional[str]], Awaitable[None]]] = None
 ) -> Dict[str, Any]:
     """
-    Optimized regex search across project files with intelligent caching and parallel processing.
+    Optimized regex search across project files with incremental caching and parallel processing.
+    
+    Files are searched inline, on threads or on worker processes depending on the
+    size of the scan, but results are collected in file order; once max_matches
+    is reached the remaining workers are cancelled. Per-file results
+    are cached per query, so a repeated query only rescans files that changed.
     
     Args:
         pattern: Regex pattern to search for
@@ -396,21 +892,20 @@ async def search_in_files(
         max_matches: Maximum number of matches to return
         include_line_numbers: Whether to include line numbers in results
         context_lines: Number of context lines to include around matches
+        progress_callback: Async callable receiving (files searched, total files, message)
+            as results arrive; the message lists the new matches
         
     Returns:
-        Dictionary containing search results
+        Dictionary containing search results. files_searched counts the files
+        whose results are included (files_scanned scanned now plus
+        files_from_cache); files that failed or were not reached are left
+        out. total_matches is the number of matches returned, at most
+        max_matches. search_options reports whether the index, the result
+        cache or a parallel backend was actually used.
     """
     config = get_server_config()
     workspace_path = config.workspace_path
     
-    # Performance optimization: Check cache first
-    if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and intelligent_cache:
-        cache_key = f"search_{hashlib.md5(f'{pattern}{directory}{file_pattern}{case_sensitive}{whole_word}{max_matches}'.encode()).hexdigest()}"
-        cached_result = intelligent_cache.get(cache_key)
-        if cached_result is not None:
-            logger.info(f"Cache hit for search pattern: {pattern}")
-            return cached_result
-    
     try:
         if directory:
             search_path = workspace_path / directory
@@ -439,120 +934,219 @@ async def search_in_files(
                 "timestamp": format_timestamp()
             }
         
-        # Performance optimization: Use optimized algorithm if available
-        if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and algorithm_optimizer:
-            # Use optimized file search with early termination
-            results = algorithm_optimizer.optimize_file_search(
-                f"*{file_pattern or '*.py'}",
-                str(search_path),
-                max_matches or 100
-            )
-            
-            # Extract just the file paths for processing
-            files_to_search = [Path(r['file']) for r in results if 'file' in r]
-        else:
-            # Find files to search
-            files_to_search = []
+        search_cache = get_search_cache()
+        query_key = search_cache.query_key(pattern, flags, max_matches, include_line_numbers, context_lines)
+        
+        # Find files to search in a single walk, keeping the stat data for the index
+        text_extensions = {'.txt', '.md', '.py', '.json', '.yaml', '.yml', '.tsv', '.csv', '.html', '.css', '.js', '.ts', '.sh', '.bat'}
+        files_to_search = []
+        file_stats = {}
+        for item in walk_workspace(
+            search_path,
+            exclude_dirs=config.walk_exclude_dirs,
+            respect_gitignore=config.walk_respect_gitignore,
+            ignore_root=workspace_path
+        ):
+            if item.is_dir:
+                continue
             if file_pattern:
-                files_to_search = list(search_path.rglob(file_pattern))
-            else:
-                # Search all text files
-                text_extensions = {'.txt', '.md', '.py', '.json', '.yaml', '.yml', '.tsv', '.csv', '.html', '.css', '.js', '.ts', '.sh', '.bat'}
-                for ext in text_extensions:
-                    files_to_search.extend(search_path.rglob(f"*{ext}"))
+                if not matches_file_pattern(item.relpath, file_pattern):
+                    continue
+            elif os.path.splitext(item.name)[1] not in text_extensions:
+                continue
             
-            # Filter files by workspace boundary
-            files_to_search = [f for f in files_to_search if f.is_file() and validate_file_path(f, workspace_path)]
+            entry = item.entry
+            try:
+                if not entry.is_file():
+                    continue
+                # Only symlinks can lead outside the workspace
+                if entry.is_symlink() and not validate_file_path(Path(entry.path), workspace_path):
+                    continue
+                file_stats[entry.path] = entry.stat()
+            except OSError:
+                continue
+            files_to_search.append(Path(entry.path))
+        
+        # Narrow to files that can contain the pattern's required literals
+        files_considered = len(files_to_search)
+        index_used = False
+        if config.search_index_enabled and files_to_search:
+            try:
+                files_to_search = get_search_index().candidates(
+                    files_to_search, pattern, flags, stats=file_stats, root=search_path
+                )
+                index_used = True
+            except Exception as e:
+                logger.warning(f"Search index unavailable, scanning all files: {e}")
+        
+        # Files unchanged since this query last scanned them are served from the cache
+        entries = []
+        to_scan = []
+        for file_path in files_to_search:
+            key = os.path.abspath(file_path)
+            stat = file_stats.get(str(file_path))
+            identity = file_identity(stat) if stat else None
+            size = stat.st_size if stat else 0
+            cached = search_cache.lookup(query_key, key, identity) if identity else None
+            entries.append((file_path, key, identity, size, cached))
+            if cached is None:
+                to_scan.append((str(file_path), size))
+        
+        # Small scans run inline, larger ones on threads, and large ones on worker
+        # processes so regex matching is not serialized by the GIL
+        workers = config.search_workers or default_workers()
+        backend = choose_backend(
+            len(to_scan), sum(size for _, size in to_scan), config.search_backend,
+            config.search_process_min_bytes, workers
+        )
         
-        # Performance optimization: Use thread pool for parallel file processing
         matches = []
         total_matches = 0
-        files_searched = 0
-        max_workers = min(8, len(files_to_search))  # Limit concurrent workers
+        files_processed = 0
+        files_scanned = 0
+        files_from_cache = 0
+        stopped_early = False
+        scanned = {}
         
-        def search_file_worker(file_path: Path) -> Tuple[int, List[Dict]]:
-            """Worker function for parallel file search."""
+        # Set once enough matches are collected; thread workers check it and stop
+        cancel = threading.Event()
+        
+        # Large files are scanned memory-mapped when the pattern has a bytes form
+        scan = partial(
+            scan_file, regex=regex, prefilter=compile_bytes_prefilter(pattern, flags),
+            context_lines=context_lines, max_matches=max_matches,
+            mmap_threshold=config.search_mmap_threshold
+        )
+        scan_options = (pattern, flags, context_lines, max_matches, config.search_mmap_threshold)
+        
+        executor = None
+        futures = {}
+        batches = []
+        batch_results = {}
+        
+        async def _batch_result(number: int) -> List[Optional[List[Tuple]]]:
+            """Await a process batch; batches whose worker failed are scanned in-process."""
+            if number not in batch_results:
+                batch, future = batches[number]
+                try:
+                    batch_results[number] = await asyncio.wait_for(asyncio.wrap_future(future), timeout=30 * len(batch))
+                except asyncio.TimeoutError:
+                    logger.warning(f"Search batch of {len(batch)} files timed out")
+                    batch_results[number] = []
+                except Exception as e:
+                    logger.warning(f"Search worker process failed, scanning batch in-process: {e}")
+                    shutdown_process_pool(wait=False)
+                    batch_results[number] = await asyncio.to_thread(scan_batch, batch, *scan_options)
+            return batch_results[number]
+        
+        async def _scan_result(path: str, size: int) -> Optional[List[Tuple]]:
+            """Get the compact matches of a file from its backend; None if it was not searched."""
+            if backend == "inline":
+                try:
+                    return scan(path, size)
+                except Exception as e:
+                    logger.warning(f"Error searching in file {path}: {e}")
+                    return None
+            if backend == "thread":
+                return await asyncio.wait_for(asyncio.wrap_future(futures[path]), timeout=30)  # 30s timeout per file
+            number, index = futures[path]
+            results = await _batch_result(number)
+            return results[index] if index < len(results) else None
+        
+        async def _report_progress(file_matches: List[Dict]) -> None:
+            message = "\n".join(
+                f"{m['file']}:{m['line_number']}: {m['line_content']}" if m['line_number'] else f"{m['file']}: {m['line_content']}"
+                for m in file_matches
+            )
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                
-                file_matches = []
-                for line_num, line in enumerate(lines, 1):
-                    line_matches = list(regex.finditer(line))
-                    if line_matches:
-                        for match in line_matches:
-                            match_info = {
-                                "file": str(file_path.relative_to(workspace_path)),
-                                "line_number": line_num if include_line_numbers else None,
-                                "match_text": match.group(),
-                                "match_start": match.start(),
-                                "match_end": match.end(),
-                                "line_content": line.rstrip()
-                            }
-                            
-                            # Add context lines
-                            if context_lines > 0:
-                                start_line = max(0, line_num - 1 - context_lines)
-                                end_line = min(len(lines), line_num + context_lines)
-                                context = {
-                                    "context_start": start_line + 1,
-                                    "context_end": end_line,
-                                    "context_lines": [lines[i].rstrip() for i in range(start_line, end_line)]
-                                }
-                                match_info["context"] = context
-                            
-                            file_matches.append(match_info)
-                
-                return len(file_matches), file_matches
-                
+                await progress_callback(files_processed, len(files_to_search), message)
             except Exception as e:
-                logger.warning(f"Error searching in file {file_path}: {e}")
-                return 0, []
-        
-        # Use ThreadPoolExecutor for parallel processing
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all file search tasks
-            future_to_file = {executor.submit(search_file_worker, file_path): file_path
-                             for file_path in files_to_search}
+                logger.debug(f"Could not report search progress: {e}")
+        
+        # Results are awaited in file order so the event loop stays free to send
+        # progress notifications
+        try:
+            if backend == "thread":
+                executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(to_scan))))
+                for path, size in to_scan:
+                    futures[path] = executor.submit(scan, path, size, cancel=cancel)
+            elif backend == "process":
+                pool = get_process_pool(workers)
+                for batch in make_batches(to_scan, workers):
+                    for index, (path, _) in enumerate(batch):
+                        futures[path] = (len(batches), index)
+                    batches.append((batch, pool.submit(scan_batch, batch, *scan_options)))
             
-            # Collect results
-            for future in future_to_file:
-                try:
-                    matches_count, file_matches = future.result(timeout=30)  # 30s timeout per file
-                    files_searched += 1
-                    if file_matches:
-                        matches.extend(file_matches)
-                        total_matches += matches_count
-                        
-                        if max_matches and total_matches >= max_matches:
-                            break
-                            
-                except Exception as e:
-                    logger.warning(f"Error processing file {future_to_file[future]}: {e}")
-                    files_searched += 1
-                    continue
+            for file_path, key, identity, size, file_matches in entries:
+                files_processed += 1
+                if file_matches is not None:
+                    files_from_cache += 1
+                else:
+                    try:
+                        found = await _scan_result(str(file_path), size)
+                    except Exception as e:
+                        logger.warning(f"Error processing file {file_path}: {e}")
+                        continue
+                    if found is None:
+                        continue
+                    files_scanned += 1
+                    file_matches = _match_dicts(str(file_path.relative_to(workspace_path)), found, include_line_numbers)
+                    if identity:
+                        scanned[key] = (identity, file_matches)
+                
+                if file_matches:
+                    matches.extend(file_matches)
+                    total_matches += len(file_matches)
+                    
+                    if progress_callback:
+                        await _report_progress(file_matches)
+                    
+                    if max_matches and total_matches >= max_matches:
+                        stopped_early = True
+                        break
+        finally:
+            cancel.set()
+            for future in futures.values():
+                if backend == "thread":
+                    future.cancel()
+            for _, future in batches:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
+        
+        search_cache.store(query_key, scanned)
+        
+        if max_matches:
+            matches = matches[:max_matches]
+        files_skipped_by_index = files_considered - len(files_to_search)
+        # Only name a backend if it scanned anything; cache hits need none
+        backend_used = backend if files_scanned else None
         
         result = {
             "success": True,
             "pattern": pattern,
             "directory": directory or "workspace_root",
-            "files_searched": files_searched,
-            "total_matches": total_matches,
-            "matches": matches[:max_matches] if max_matches else matches,
+            "files_searched": files_scanned + files_from_cache,
+            "files_scanned": files_scanned,
+            "files_skipped_by_index": files_skipped_by_index,
+            "files_from_cache": files_from_cache,
+            "total_matches": len(matches),
+            "stopped_early": stopped_early,
+            "matches": matches,
             "search_options": {
                 "case_sensitive": case_sensitive,
                 "whole_word": whole_word,
                 "context_lines": context_lines,
                 "file_pattern": file_pattern,
-                "optimizations_applied": PERFORMANCE_OPTIMIZATIONS_AVAILABLE
+                "optimizations_applied": (
+                    files_skipped_by_index > 0 or files_from_cache > 0 or backend_used in ("thread", "process")
+                ),
+                "index_used": index_used,
+                "backend": backend_used
             },
             "timestamp": format_timestamp()
         }
         
-        # Performance optimization: Cache the result
-        if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and intelligent_cache and total_matches < 1000:
-            intelligent_cache.set(cache_key, result)
-        
         return result
         
     except Exception as e:
@@ -574,6 +1168,10 @@ async def backup_file(
     """
     Create backups before modifications.
     
+    Timestamped backups without a custom name or directory are kept in the
+    backup store, where unchanged content is stored only once; the result
+    then carries a backup_id that restore_file accepts.
+    
     Args:
         file_path: Path to file to backup (relative to workspace)
         backup_name: Custom backup name (optional)
@@ -606,6 +1204,20 @@ async def backup_file(
                 "timestamp": format_timestamp()
             }
         
+        # Plain timestamped backups go to the deduplicating backup store
+        if config.backup_store_enabled and backup_name is None and include_timestamp and backup_directory is None:
+            version = get_backup_store().put(source_path, backup_key(source_path, workspace_path))
+            backup_path = Path(version["object_path"])
+            return {
+                "success": True,
+                "source_file": file_path,
+                "backup_file": str(backup_path.relative_to(workspace_path)),
+                "backup_path": str(backup_path),
+                "backup_id": version["id"],
+                "deduplicated": version["deduplicated"],
+                "timestamp": format_timestamp()
+            }
+        
         # Create backup
         backup_path = create_backup(
             source_path, 
@@ -635,15 +1247,20 @@ async def backup_file(
 async def restore_file(
     file_path: str,
     backup_path: Optional[str] = None,
-    create_backup_before_restore: bool = True
+    create_backup_before_restore: bool = True,
+    backup_id: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Restore from backups.
     
+    Without backup_path or backup_id the file's latest version in the backup
+    store is restored, falling back to the newest timestamped backup file.
+    
     Args:
         file_path: Path to file to restore (relative to workspace)
         backup_path: Specific backup to restore from (relative to workspace)
         create_backup_before_restore: Whether to backup current file before restore
+        backup_id: Backup store version to restore (see list_backups)
         
     Returns:
         Dictionary containing restore result
@@ -663,36 +1280,61 @@ async def restore_file(
             }
         
         # Find backup to restore from
-        if backup_path:
+        version = None
+        backup_source = None
+        if backup_id is not None:
+            version = get_backup_store().get_version(backup_id)
+            if version is not None and version["path"] != backup_key(target_path, workspace_path):
+                return {
+                    "success": False,
+                    "error": f"Backup {backup_id} belongs to {version['path']}, not {file_path}",
+                    "file_path": file_path,
+                    "timestamp": format_timestamp()
+                }
+        elif backup_path:
             backup_source = workspace_path / backup_path
         else:
             # Find the most recent backup
-            backup_source = restore_from_backup(target_path)
+            if config.backup_store_enabled:
+                version = get_backup_store().latest(backup_key(target_path, workspace_path))
+            if version is None:
+                backup_source = restore_from_backup(target_path)
+        
+        if version is not None:
+            backup_source = Path(version["object_path"])
         
         if not backup_source or not backup_source.exists():
             return {
                 "success": False,
-                "error": f"Backup not found: {backup_path or 'auto-detect'}",
+                "error": f"Backup not found: {backup_id or backup_path or 'auto-detect'}",
                 "file_path": file_path,
                 "timestamp": format_timestamp()
             }
         
-        # Create backup of current file if it exists and requested
+        # Create backup of current file if it exists and requested; the file is
+        # replaced, not modified, so the backup may share its inode
         current_backup = None
+        current_backup_id = None
         if create_backup_before_restore and target_path.exists():
-            current_backup = create_backup(target_path)
-        
-        # Ensure parent directory exists
-        target_path.parent.mkdir(parents=True, exist_ok=True)
+            current_backup, current_backup_id = _backup_file(target_path, workspace_path, link=True)
         
         # Restore file
-        shutil.copy2(backup_source, target_path)
+        if version is not None:
+            get_backup_store().restore(version, target_path, config.write_fsync_mode)
+        else:
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = target_path.with_name(f".{target_path.name}.{os.getpid()}.restore")
+            shutil.copy2(backup_source, temp_path)
+            commit_staged(temp_path, target_path, config.write_fsync_mode)
+        publish_changes([target_path])
         
         return {
             "success": True,
             "file_path": file_path,
             "restored_from": str(backup_source.relative_to(workspace_path)),
+            "restored_backup_id": version["id"] if version is not None else None,
             "current_backup_created": str(current_backup.relative_to(workspace_path)) if current_backup else None,
+            "current_backup_id": current_backup_id,
             "timestamp": format_timestamp()
         }
         
@@ -703,4 +1345,71 @@ async def restore_file(
             "error": str(e),
             "file_path": file_path,
             "timestamp": format_timestamp()
-        }
\ No newline at end of file
+        }
+
+
+async def list_backups(
+    file_path: Optional[str] = None,
+    limit: int = 20,
+    prune: bool = False
+) -> Dict[str, Any]:
+    """
+    List versions in the backup store.
+    
+    Args:
+        file_path: File whose versions to list (relative to workspace; all files if omitted)
+        limit: Maximum number of versions to return, newest first
+        prune: Whether to apply the retention policy to every file and
+            compact the store before listing
+        
+    Returns:
+        Dictionary containing versions and store statistics
+    """
+    config = get_server_config()
+    workspace_path = config.workspace_path
+    
+    try:
+        key = None
+        if file_path is not None:
+            target_path = workspace_path / file_path
+            if not validate_file_path(target_path, workspace_path):
+                return {
+                    "success": False,
+                    "error": f"Invalid file path: {file_path}",
+                    "file_path": file_path,
+                    "timestamp": format_timestamp()
+                }
+            key = backup_key(target_path, workspace_path)
+        
+        store = get_backup_store()
+        gc_result = await _run_io(store.gc) if prune else None
+        versions = store.list_versions(key, limit)
+        
+        return {
+            "success": True,
+            "file_path": file_path,
+            "versions": [
+                {
+                    "backup_id": version["id"],
+                    "file_path": version["path"],
+                    "size": version["size"],
+                    "hash": version["hash"],
+                    "created": version["created"],
+                    "label": version["label"],
+                    "base_id": version["base_id"]
+                }
+                for version in versions
+            ],
+            "count": len(versions),
+            "pruned": gc_result,
+            "store": store.stats(),
+            "timestamp": format_timestamp()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error listing backups: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": format_timestamp()
+        }
@@ -14,21 +14,29 @@ import hashlib
 import asyncio
 import threading
 from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timedelta
+from datetime import timedelta
 from pathlib import Path
 import logging
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ..models import (
-    ScheduleData, SchedulesContainer, TaskTimingData, TaskTimingContainer,
+    ScheduleData, SchedulesContainer, TaskTimingData,
     PersistentMemoryEntry, SystemStatus, PriorityType, DelegationRequest,
     DelegationResult, ValidationResult, PersistentMemorySection
 )
 from ..config.settings import get_server_config
 from ..utils.helpers import (
     safe_json_load, safe_json_save, format_timestamp, calculate_duration,
-    create_backup, restore_from_backup
+    parse_timestamp, create_backup, restore_from_backup
 )
+from ..utils.orchestrator_io import append_task_timing_entries, backup_state_file
+from ..utils.workspace_watcher import publish_changes
+from ..utils.timing_store import get_task_timing_store, timing_file_lock
+from ..utils.timing_rollups import get_task_timing_rollups
+from ..utils.open_tasks import get_open_task_index
+from ..utils.todo_parser import get_todo_document
+from ..utils.tool_cache import cached_tool
 
 # Import performance optimizations
 try:
@@ -250,6 +258,7 @@ async def manage_schedules(
         # Save updated schedules
         with open(schedules_path, 'w', encoding='utf-8') as f:
             json.dump(schedules_container.dict(), f, indent=2)
+        publish_changes([schedules_path])
         
         return {
             "success": True,
@@ -299,7 +308,7 @@ async def track_task_time(
         current_timestamp = format_timestamp()
         
         if start_tracking:
-            # Start tracking - create new entry
+            # Start tracking - append new entry without re-reading existing rows
             new_entry = {
                 "timestamp": current_timestamp,
                 "mode": mode,
@@ -310,16 +319,17 @@ async def track_task_time(
                 "priority": priority.value if hasattr(priority, 'value') else str(priority)
             }
             
-            # Load existing timing data
-            if task_timing_path.exists():
-                with open(task_timing_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                timing_container = TaskTimingContainer.from_tsv(content)
-            else:
-                timing_container = TaskTimingContainer()
+            started_entry = TaskTimingData(**new_entry)
+            rollups = get_task_timing_rollups(task_timing_path)
             
-            # Add new entry
-            timing_container.entries.append(TaskTimingData(**new_entry))
+            # One critical section, so the signature and the row offset the
+            # index derives from the file size both describe this append
+            with timing_file_lock(task_timing_path):
+                signature = rollups.head_signature()
+                append_task_timing_entries([started_entry], task_timing_path)
+                rollups.apply_head_change(signature, added=[started_entry])
+                get_open_task_index(task_timing_path).record_start(signature, started_entry)
+            get_task_timing_store(task_timing_path).maybe_rollover()
             
         else:
             # Stop tracking - find and update existing entry
@@ -331,20 +341,24 @@ async def track_task_time(
                     "timestamp": format_timestamp()
                 }
             
-            with open(task_timing_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            timing_container = TaskTimingContainer.from_tsv(content)
-            
-            # Find the most recent started task with matching task_id
-            started_entry = None
-            for entry in reversed(timing_container.entries):
-                if (entry.task_id == task_id and 
-                    entry.result == "started" and 
-                    entry.end_time is None):
-                    started_entry = entry
-                    break
+            # Close the most recent open row for this task_id via the open-task
+            # index; only that row and the bytes after it are rewritten, through
+            # a journal so a crash mid-rewrite is replayed
+            rollups = get_task_timing_rollups(task_timing_path)
+            with timing_file_lock(task_timing_path):
+                signature = rollups.head_signature()
+                closed = get_open_task_index(task_timing_path).close(
+                    task_id,
+                    lambda entry: entry.model_copy(update={
+                        "end_time": current_timestamp,
+                        "result": "completed",
+                        "duration": calculate_duration(entry.start_time, current_timestamp)
+                    })
+                )
+                if closed:
+                    rollups.apply_head_change(signature, added=[closed[1]], removed=[closed[0]])
             
-            if not started_entry:
+            if not closed:
                 return {
                     "success": False,
                     "error": f"No active tracking found for task ID: {task_id}",
@@ -352,14 +366,7 @@ async def track_task_time(
                     "timestamp": format_timestamp()
                 }
             
-            # Update entry with end time and duration
-            started_entry.end_time = current_timestamp
-            started_entry.result = "completed"
-            started_entry.duration = calculate_duration(started_entry.start_time, current_timestamp)
-        
-        # Save updated timing data
-        with open(task_timing_path, 'w', encoding='utf-8') as f:
-            f.write(timing_container.to_tsv())
+            started_entry = closed[0]
         
         return {
             "success": True,
@@ -400,7 +407,11 @@ async def get_time_tracking(
         limit: Maximum number of entries to return
         
     Returns:
-        Dictionary containing filtered timing data and analysis
+        Dictionary containing filtered timing data and analysis. With a
+        limit, "entries" holds only the most recent matching rows, while
+        "statistics" and "mode_statistics" cover every matching row (as
+        "summary_scope": "all_matches" says); "filtered_entries" counts the
+        returned rows and "matching_entries" all of them.
     """
     config = get_server_config()
     task_timing_path = config.get_task_timing_path()
@@ -413,62 +424,47 @@ async def get_time_tracking(
                 "timestamp": format_timestamp()
             }
         
-        with open(task_timing_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        timing_container = TaskTimingContainer.from_tsv(content)
-        
-        # Apply filters
-        filtered_entries = timing_container.entries
+        # Invalid date filters are ignored, as before
+        start_dt = parse_timestamp(start_date)
+        end_dt = parse_timestamp(end_date)
         
-        if filter_mode:
-            filtered_entries = [e for e in filtered_entries if e.mode == filter_mode]
+        # Apply filters while streaming rows; only segments overlapping the date
+        # range are opened, and with a limit only the most recent rows are kept
+        timing_store = get_task_timing_store(task_timing_path)
+        filtered_entries = deque(maxlen=limit) if limit else []
         
-        if filter_priority:
-            filtered_entries = [e for e in filtered_entries if e.priority == filter_priority]
-        
-        if start_date:
-            try:
-                start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-                filtered_entries = [e for e in filtered_entries 
-                                  if datetime.fromisoformat(e.start_time.replace("Z", "+00:00")) >= start_dt]
-            except ValueError:
-                pass
+        for entry in timing_store.iter_entries(start_dt, end_dt):
+            if filter_mode and entry.mode != filter_mode:
+                continue
+            
+            if filter_priority and entry.priority != filter_priority:
+                continue
+            
+            filtered_entries.append(entry)
         
-        if end_date:
-            try:
-                end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-                filtered_entries = [e for e in filtered_entries 
-                                  if datetime.fromisoformat(e.start_time.replace("Z", "+00:00")) <= end_dt]
-            except ValueError:
-                pass
+        filtered_entries = list(filtered_entries)
         
-        # Apply limit
-        if limit:
-            filtered_entries = filtered_entries[-limit:]  # Get most recent entries
+        # Statistics cover all matching entries and come from the hourly rollups
+        rollups = get_task_timing_rollups(task_timing_path)
+        total_entries = rollups.total_entries()
+        summary = rollups.summarize(start_dt, end_dt, mode=filter_mode, priority=filter_priority)
+        total_duration = summary["total_duration"]
+        completed_tasks = summary["completed"]
+        started_tasks = summary["started"]
+        mode_stats = summary["by_mode"]
         
-        # Calculate statistics
-        total_duration = sum(e.duration or 0 for e in filtered_entries if e.duration)
-        completed_tasks = len([e for e in filtered_entries if e.result == "completed"])
-        started_tasks = len([e for e in filtered_entries if e.result == "started"])
-        
-        # Group by mode for analysis
-        mode_stats = {}
-        for entry in filtered_entries:
-            mode = entry.mode or "unknown"
-            if mode not in mode_stats:
-                mode_stats[mode] = {"count": 0, "total_duration": 0, "completed": 0}
-            mode_stats[mode]["count"] += 1
-            if entry.duration:
-                mode_stats[mode]["total_duration"] += entry.duration
-            if entry.result == "completed":
-                mode_stats[mode]["completed"] += 1
+        # Open and orphaned starts come from the open-task index, not a row scan
+        open_index = get_open_task_index(task_timing_path)
+        open_tasks = open_index.open_tasks()
+        orphaned_tasks = open_index.orphaned(timedelta(hours=config.orphaned_task_hours))
         
         return {
             "success": True,
             "timestamp": format_timestamp(),
-            "total_entries": len(timing_container.entries),
+            "total_entries": total_entries,
             "filtered_entries": len(filtered_entries),
+            "matching_entries": summary["count"],
+            "summary_scope": "all_matches",
             "statistics": {
                 "total_duration_seconds": total_duration,
                 "total_duration_formatted": str(timedelta(seconds=total_duration)),
@@ -477,6 +473,11 @@ async def get_time_tracking(
                 "average_duration": total_duration / completed_tasks if completed_tasks > 0 else 0
             },
             "mode_statistics": mode_stats,
+            "open_tasks": {
+                "count": len(open_tasks),
+                "orphaned_count": len(orphaned_tasks),
+                "orphaned": orphaned_tasks
+            },
             "entries": [
                 {
                     "timestamp": entry.timestamp,
@@ -502,6 +503,7 @@ async def get_time_tracking(
         }
 
 
+@cached_tool(files=lambda args: [get_server_config().get_persistent_memory_path()])
 async def get_persistent_memory(
     section: Optional[PersistentMemorySection] = None,
     include_metadata: bool = False,
@@ -518,17 +520,19 @@ async def get_persistent_memory(
     Returns:
         Dictionary containing persistent memory content
     """
+    # Performance optimization: Results are cached per argument set until
+    # persistent-memory.md changes, with concurrent cold reads sharing one parse
     config = get_server_config()
-    memory_path = config.get_persistent_memory_path()
-    
-    # Performance optimization: Check cache first
-    if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and intelligent_cache and not include_metadata and not search_pattern:
-        cache_key = f"persistent_memory_{section.value if section else 'all'}"
-        cached_result = intelligent_cache.get(cache_key)
-        if cached_result is not None:
-            logger.debug("Cache hit for persistent memory")
-            return cached_result
-    
+    return await _read_persistent_memory(config.get_persistent_memory_path(), section, include_metadata, search_pattern)
+
+
+async def _read_persistent_memory(
+    memory_path: Path,
+    section: Optional[PersistentMemorySection],
+    include_metadata: bool,
+    search_pattern: Optional[str]
+) -> Dict[str, Any]:
+    """Read and parse persistent-memory.md for get_persistent_memory."""
     try:
         if not memory_path.exists():
             return {
@@ -663,11 +667,6 @@ async def get_persistent_memory(
             }
         }
         
-        # Performance optimization: Cache the result for 60 seconds
-        if PERFORMANCE_OPTIMIZATIONS_AVAILABLE and intelligent_cache and not include_metadata and not search_pattern:
-            cache_key = f"persistent_memory_{section.value if section else 'all'}"
-            intelligent_cache.set(cache_key, result)
-        
         return result
         
     except Exception as e:
@@ -702,9 +701,9 @@ async def update_persistent_memory(
     
     try:
         # Create backup if enabled
-        backup_path = None
+        backup_path, backup_id = None, None
         if config.backup_before_modify and memory_path.exists():
-            backup_path = create_backup(memory_path)
+            backup_path, backup_id = backup_state_file(memory_path)
         
         # Read existing content
         if memory_path.exists():
@@ -750,12 +749,14 @@ async def update_persistent_memory(
                 "error": f"Persistent memory would exceed line limit ({line_count} > {config.persistent_memory_max_lines})",
                 "current_lines": line_count,
                 "max_lines": config.persistent_memory_max_lines,
-                "backup_created": backup_path
+                "backup_created": backup_path,
+                "backup_id": backup_id
             }
         
         # Save updated content
         with open(memory_path, 'w', encoding='utf-8') as f:
             f.write(updated_content)
+        publish_changes([memory_path])
         
         return {
             "success": True,
@@ -763,7 +764,8 @@ async def update_persistent_memory(
             "category": category,
             "timestamp": timestamp,
             "line_count": line_count,
-            "backup_created": backup_path
+            "backup_created": backup_path,
+            "backup_id": backup_id
         }
         
     except Exception as e:
@@ -800,39 +802,12 @@ async def get_todo_status(
                 "timestamp": format_timestamp()
             }
         
-        with open(todo_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Parse TODO items
-        todo_pattern = r'-\s*\[([ xX])\]\s*(.+)'
-        todos = []
-        
-        lines = content.split('\n')
-        current_section = None
-        
-        for line in lines:
-            if line.startswith('#'):
-                current_section = line.strip()
-            elif line.startswith('- ['):
-                match = re.match(todo_pattern, line)
-                if match:
-                    completed = match.group(1).lower() == 'x'
-                    todo_text = match.group(2).strip()
-                    
-                    # Apply filters
-                    if not include_completed and completed:
-                        continue
-                    
-                    if search_pattern and not re.search(search_pattern, todo_text, re.IGNORECASE):
-                        continue
-                    
-                    todo_item = {
-                        "text": todo_text,
-                        "completed": completed,
-                        "section": current_section,
-                        "line": line
-                    }
-                    todos.append(todo_item)
+        # Parsed once per file change; the search pattern is compiled once per query
+        document = get_todo_document(todo_path)
+        todos = [
+            dict(item)
+            for item in document.iter_items(include_completed=include_completed, search_pattern=search_pattern)
+        ]
         
         # Calculate statistics
         total_todos = len(todos)
@@ -846,6 +821,7 @@ async def get_todo_status(
             "completed_todos": completed_todos,
             "pending_todos": pending_todos,
             "completion_rate": (completed_todos / total_todos) * 100 if total_todos > 0 else 0,
+            "sections": document.section_summary(),
             "todos": todos
         }
         
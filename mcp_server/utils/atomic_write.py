@@ -0,0 +1,374 @@
+"""
+Atomic File Writes
+
+Write-to-temporary-file plus os.replace helpers used by the file tools, so a
+reader never sees a half-written file and a crash leaves either the old or
+the new content in place. Durability is controlled by the write_fsync_mode
+setting: "always" fsyncs the file and its directory before returning,
+"batch" hands them to a background group-commit thread that fsyncs
+everything written within write_fsync_interval_ms in one pass, and "off"
+leaves flushing to the operating system.
+
+Large append-mostly files that need one record near the end changed use
+replace_tail instead: the new tail is journaled next to the file and then
+patched in place, so the cost is proportional to the tail, not the file.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import atexit
+from typing import BinaryIO, Iterable, Optional, Set, Tuple, Union
+from pathlib import Path
+import logging
+
+from ..config.settings import get_server_config
+
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync_path(path: str) -> None:
+    """Fsync a file or directory by path; errors are logged, not raised."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as e:
+        logger.debug(f"Cannot open {path} for fsync: {e}")
+        return
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        # Directories cannot be fsynced on some platforms
+        logger.debug(f"Cannot fsync {path}: {e}")
+    finally:
+        os.close(fd)
+
+
+class FsyncBatcher:
+    """
+    Group commit for fsyncs.
+    
+    Paths scheduled within one interval are fsynced together by a single
+    daemon thread, so a burst of writes costs one round of fsyncs instead of
+    one per write and callers never wait on the disk.
+    """
+    
+    def __init__(self, interval: float):
+        """
+        Initialize FsyncBatcher.
+        
+        Args:
+            interval: Seconds to wait after the first scheduled path before syncing
+        """
+        self.interval = interval
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.synced = 0
+    
+    def schedule(self, paths: Iterable[Union[str, Path]]) -> None:
+        """
+        Queue paths (files or directories) to be fsynced soon.
+        
+        Args:
+            paths: Paths to sync
+        """
+        with self._lock:
+            self._pending.update(str(path) for path in paths)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="fsync-batcher", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+    
+    def flush(self) -> int:
+        """
+        Fsync everything queued so far.
+        
+        Returns:
+            Number of paths synced
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return 0
+        # Files before directories, so renames are persisted after their data
+        for path in sorted(pending, key=os.path.isdir):
+            _fsync_path(path)
+        with self._lock:
+            self.batches += 1
+            self.synced += len(pending)
+        return len(pending)
+    
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self.interval:
+                time.sleep(self.interval)
+            self.flush()
+
+
+# Global batcher instance
+_fsync_batcher: Optional[FsyncBatcher] = None
+_fsync_batcher_lock = threading.Lock()
+
+
+def get_fsync_batcher() -> FsyncBatcher:
+    """
+    Get the shared fsync batcher, configured from the server settings.
+    
+    Returns:
+        FsyncBatcher instance
+    """
+    global _fsync_batcher
+    with _fsync_batcher_lock:
+        if _fsync_batcher is None:
+            _fsync_batcher = FsyncBatcher(get_server_config().write_fsync_interval_ms / 1000)
+            atexit.register(_fsync_batcher.flush)
+        return _fsync_batcher
+
+
+def sync_paths(paths: Iterable[Union[str, Path]], fsync_mode: Optional[str] = None) -> None:
+    """
+    Make written paths durable according to the fsync mode.
+    
+    Args:
+        paths: Files and directories that were written
+        fsync_mode: "off", "always" or "batch" (default: write_fsync_mode setting)
+    """
+    fsync_mode = fsync_mode or get_server_config().write_fsync_mode
+    if fsync_mode == "always":
+        for path in paths:
+            _fsync_path(str(path))
+    elif fsync_mode == "batch":
+        get_fsync_batcher().schedule(paths)
+
+
+def stage_text(
+    target_path: Path,
+    content: str,
+    encoding: str = "utf-8",
+    ensure_directory: bool = True,
+    fsync: bool = False
+) -> Tuple[Path, int]:
+    """
+    Write content to a temporary file next to the target.
+    
+    The temporary file gets the target's permission bits, so replacing the
+    target with it does not change them.
+    
+    Args:
+        target_path: File the content is meant for
+        content: Text to write
+        encoding: Text encoding
+        ensure_directory: Whether to create the parent directory
+        fsync: Whether to fsync the temporary file before returning
+    
+    Returns:
+        Tuple of (temporary path, size in bytes)
+    """
+    if ensure_directory:
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    fd, temp_name = tempfile.mkstemp(dir=target_path.parent, prefix=f".{target_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(content)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+        if target_path.exists():
+            shutil.copymode(target_path, temp_name)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name), size
+
+
+def stage_bytes(
+    target_path: Path,
+    content: bytes,
+    ensure_directory: bool = True,
+    fsync: bool = False,
+    source: Optional[BinaryIO] = None
+) -> Tuple[Path, int]:
+    """
+    Write raw bytes to a temporary file next to the target.
+    
+    Binary counterpart of stage_text for callers that already hold encoded
+    content and must not have line endings translated.
+    
+    Args:
+        target_path: File the content is meant for
+        content: Bytes to write
+        ensure_directory: Whether to create the parent directory
+        fsync: Whether to fsync the temporary file before returning
+        source: Binary file whose remaining bytes are streamed after content
+    
+    Returns:
+        Tuple of (temporary path, size in bytes)
+    """
+    if ensure_directory:
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    fd, temp_name = tempfile.mkstemp(dir=target_path.parent, prefix=f".{target_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            if source is not None:
+                shutil.copyfileobj(source, f)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            size = f.tell()
+        if target_path.exists():
+            shutil.copymode(target_path, temp_name)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name), size
+
+
+def commit_staged(temp_path: Path, target_path: Path, fsync_mode: Optional[str] = None) -> None:
+    """
+    Atomically move a staged file over its target.
+    
+    Args:
+        temp_path: Staged file from stage_text or stage_bytes (already fsynced in "always" mode)
+        target_path: File to replace
+        fsync_mode: "off", "always" or "batch" (default: write_fsync_mode setting)
+    """
+    fsync_mode = fsync_mode or get_server_config().write_fsync_mode
+    try:
+        os.replace(temp_path, target_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    if fsync_mode == "always":
+        _fsync_path(str(target_path.parent))
+    elif fsync_mode == "batch":
+        get_fsync_batcher().schedule([target_path, target_path.parent])
+
+
+def atomic_write_text(
+    target_path: Path,
+    content: str,
+    encoding: str = "utf-8",
+    ensure_directory: bool = True,
+    fsync_mode: Optional[str] = None
+) -> int:
+    """
+    Replace a file's content atomically.
+    
+    Args:
+        target_path: File to write
+        content: Text to write
+        encoding: Text encoding
+        ensure_directory: Whether to create the parent directory
+        fsync_mode: "off", "always" or "batch" (default: write_fsync_mode setting)
+    
+    Returns:
+        Size of the written file in bytes
+    """
+    fsync_mode = fsync_mode or get_server_config().write_fsync_mode
+    temp_path, size = stage_text(target_path, content, encoding, ensure_directory, fsync=fsync_mode == "always")
+    commit_staged(temp_path, target_path, fsync_mode)
+    return size
+
+
+def _tail_journal(target_path: Path) -> Path:
+    """Get the journal path used by replace_tail for a file."""
+    return target_path.with_name(f".{target_path.name}.tail")
+
+
+def _apply_tail_journal(target_path: Path, journal_path: Path) -> int:
+    """Copy a committed tail journal over its target and remove the journal."""
+    with open(journal_path, 'rb') as src, open(target_path, 'r+b') as dst:
+        offset = int(src.readline())
+        dst.seek(offset)
+        shutil.copyfileobj(src, dst)
+        dst.truncate()
+        dst.flush()
+        os.fsync(dst.fileno())
+        size = dst.tell()
+    journal_path.unlink()
+    return size
+
+
+def replace_tail(target_path: Path, offset: int, content: bytes, source: Optional[BinaryIO] = None) -> int:
+    """
+    Replace everything from a byte offset onwards, crash-safely and in place.
+    
+    The new tail (content followed by the rest of source) is first staged
+    and committed as a journal next to the target, then copied over the
+    target from offset and the journal removed. A crash at any point leaves
+    either the old file or a journal that recover_tail replays, so I/O and
+    memory are proportional to the new tail only. Both the journal and the
+    target are fsynced whatever write_fsync_mode says, since recovery relies
+    on them.
+    
+    Callers must serialize writers of the target and call recover_tail
+    before writing to it.
+    
+    Args:
+        target_path: File to patch
+        offset: Byte offset the new tail starts at
+        content: Bytes written at offset
+        source: Binary file whose remaining bytes follow content
+    
+    Returns:
+        New size of the target in bytes
+    """
+    journal_path = _tail_journal(target_path)
+    temp_path, _ = stage_bytes(
+        target_path, f"{offset}\n".encode('ascii') + content,
+        ensure_directory=False, fsync=True, source=source
+    )
+    commit_staged(temp_path, journal_path, fsync_mode="always")
+    return _apply_tail_journal(target_path, journal_path)
+
+
+def recover_tail(target_path: Path) -> bool:
+    """
+    Finish a replace_tail that was interrupted after its journal was committed.
+    
+    Args:
+        target_path: File that may have a pending tail journal
+    
+    Returns:
+        True if a journal was replayed
+    """
+    journal_path = _tail_journal(target_path)
+    if not journal_path.exists():
+        return False
+    logger.warning(f"Replaying interrupted tail rewrite of {target_path}")
+    _apply_tail_journal(target_path, journal_path)
+    return True
+
+
+def break_hardlink(path: Path) -> None:
+    """
+    Give a hard-linked file its own copy of the data.
+    
+    Used when a backup was hard-linked to a file that is going to be
+    modified in place after all.
+    
+    Args:
+        path: Path to detach from its other links
+    """
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copy2(path, temp_name)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
@@ -0,0 +1,640 @@
+"""
+Content-Addressed Backup Store
+
+Deduplicating backup storage for the file tools. Each backed-up file
+content is stored once as an object named by its SHA-256 hash (zlib
+compressed, or hard-linked uncompressed when the source is about to be
+replaced), and a SQLite index records the versions of every file. Backing
+up unchanged content adds nothing, the latest version of a file is a single
+indexed lookup, and any version can be restored by id.
+
+Files that change a little at a time (append-mostly logs and notes) can be
+backed up as deltas: the new version is stored as a binary delta against
+the file's previous version, so an append costs about as much as the
+appended text. Delta chains are capped at MAX_DELTA_CHAIN versions, after
+which a full copy starts a new chain.
+
+Retention is applied per file on every backup: versions beyond
+backup_keep_versions, or older than backup_max_age_days (except the file's
+latest), are dropped and objects no version refers to are deleted. A kept
+delta whose base is dropped is turned into a full copy first.
+"""
+
+import os
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Union, Iterable, Iterator, Tuple
+from pathlib import Path
+import logging
+
+from ..config.settings import get_server_config
+from .atomic_write import commit_staged
+from .delta import make_delta, apply_delta
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+# Bytes read per step while hashing, compressing or restoring
+CHUNK_SIZE = 1024 * 1024
+
+# Longest run of delta versions before a full copy is stored again
+MAX_DELTA_CHAIN = 32
+
+# Latest contents kept in memory as delta bases, and the largest kept
+CONTENT_CACHE_ENTRIES = 8
+CONTENT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+class BackupStore:
+    """
+    Content-addressed object store with a per-file version index.
+    
+    Layout under the store root:
+        index.sqlite3: versions(id, path, hash, size, mtime_ns, created, label,
+            object, base_id, depth) and objects(hash, size, stored_size, compressed)
+        objects/<hash[:2]>/<hash>: uncompressed (hard-linked) object
+        objects/<hash[:2]>/<hash>.z: zlib-compressed object
+    
+    A version's object holds its full content (base_id NULL, object equal to
+    the content hash) or a delta against version base_id; depth counts the
+    deltas between the version and the nearest full copy.
+    """
+    
+    # Versions joined with how their object is stored
+    _VERSION_QUERY = "SELECT v.*, o.compressed FROM versions v JOIN objects o ON o.hash = v.object"
+    
+    def __init__(
+        self,
+        root: Path,
+        keep_versions: int = 50,
+        max_age_days: Optional[int] = 30,
+        max_chain: int = MAX_DELTA_CHAIN
+    ):
+        """
+        Initialize BackupStore.
+        
+        Args:
+            root: Store directory
+            keep_versions: Versions kept per file
+            max_age_days: Age after which versions other than a file's latest
+                are dropped (None keeps them regardless of age)
+            max_chain: Longest run of delta versions before a full copy
+        """
+        self.root = root
+        self.db_path = root / "index.sqlite3"
+        self.objects_dir = root / "objects"
+        self.keep_versions = keep_versions
+        self.max_age_days = max_age_days
+        self.max_chain = max_chain
+        self._lock = threading.Lock()
+        # Latest content per path as (version id, bytes), used as delta base
+        self._contents: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the index, creating the schema if needed."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 1:
+            # Version 1 stored only full copies
+            conn.executescript("""
+                ALTER TABLE versions ADD COLUMN object TEXT;
+                ALTER TABLE versions ADD COLUMN base_id INTEGER;
+                ALTER TABLE versions ADD COLUMN depth INTEGER NOT NULL DEFAULT 0;
+                UPDATE versions SET object = hash;
+                CREATE INDEX IF NOT EXISTS versions_object ON versions(object);
+            """)
+        elif version != SCHEMA_VERSION:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS objects (
+                    hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    stored_size INTEGER NOT NULL,
+                    compressed INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS versions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    created TEXT NOT NULL,
+                    label TEXT,
+                    object TEXT NOT NULL,
+                    base_id INTEGER,
+                    depth INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS versions_path ON versions(path, id);
+                CREATE INDEX IF NOT EXISTS versions_object ON versions(object);
+            """)
+        if version != SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.commit()
+        return conn
+    
+    def object_path(self, digest: str, compressed: bool) -> Path:
+        """
+        Get the file holding an object.
+        
+        Args:
+            digest: SHA-256 hex digest of the content
+            compressed: Whether the object is stored compressed
+        
+        Returns:
+            Object file path
+        """
+        return self.objects_dir / digest[:2] / (f"{digest}.z" if compressed else digest)
+    
+    def _version_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "path": row["path"],
+            "hash": row["hash"],
+            "size": row["size"],
+            "mtime_ns": row["mtime_ns"],
+            "created": row["created"],
+            "label": row["label"],
+            "base_id": row["base_id"],
+            "object_path": str(self.object_path(row["object"], row["compressed"]))
+        }
+    
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _write_object(self, source_path: Path, digest: str, link: bool) -> Dict[str, Any]:
+        """Add an object for the source content; returns its objects row values."""
+        size = source_path.stat().st_size
+        if link:
+            target = self.object_path(digest, False)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if not target.exists():
+                    os.link(source_path, target)
+                return {"size": size, "stored_size": size, "compressed": 0}
+            except OSError as e:
+                logger.debug(f"Cannot link backup object {digest}, compressing instead: {e}")
+        
+        with open(source_path, "rb") as src:
+            return self._write_compressed(digest, iter(lambda: src.read(CHUNK_SIZE), b""))
+    
+    def _write_compressed(self, digest: str, chunks: Iterable[bytes]) -> Dict[str, Any]:
+        """Store content as a compressed object; returns its objects row values."""
+        target = self.object_path(digest, True)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{digest}.", suffix=".tmp")
+        size = 0
+        try:
+            compressor = zlib.compressobj(6)
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    size += len(chunk)
+                    out.write(compressor.compress(chunk))
+                out.write(compressor.flush())
+                stored_size = out.tell()
+            os.replace(temp_name, target)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+        return {"size": size, "stored_size": stored_size, "compressed": 1}
+    
+    def _iter_object(self, digest: str, compressed: bool) -> Iterator[bytes]:
+        """Yield an object's content in chunks."""
+        decompressor = zlib.decompressobj() if compressed else None
+        with open(self.object_path(digest, compressed), "rb") as src:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield decompressor.decompress(chunk) if decompressor is not None else chunk
+        if decompressor is not None:
+            yield decompressor.flush()
+    
+    def _content(self, conn: sqlite3.Connection, row: sqlite3.Row) -> bytes:
+        """Rebuild a version's full content, applying its delta chain."""
+        cached = self._contents.get(row["path"])
+        if cached is not None and cached[0] == row["id"]:
+            return cached[1]
+        
+        chain = []
+        while row["base_id"] is not None:
+            chain.append(row)
+            row = conn.execute(self._VERSION_QUERY + " WHERE v.id = ?", (row["base_id"],)).fetchone()
+            if row is None:
+                raise ValueError(f"Backup version {chain[-1]['id']} has lost its base")
+        data = b"".join(self._iter_object(row["object"], row["compressed"]))
+        for delta_row in reversed(chain):
+            data = apply_delta(data, b"".join(self._iter_object(delta_row["object"], delta_row["compressed"])))
+        
+        expected = chain[0]["hash"] if chain else row["hash"]
+        if hashlib.sha256(data).hexdigest() != expected:
+            raise ValueError(f"Backup object {expected} is corrupt")
+        return data
+    
+    def _remember(self, key: str, version_id: int, data: bytes) -> None:
+        """Keep a file's latest content as the base for its next delta."""
+        self._contents.pop(key, None)
+        if len(data) <= CONTENT_CACHE_MAX_BYTES:
+            self._contents[key] = (version_id, data)
+            while len(self._contents) > CONTENT_CACHE_ENTRIES:
+                self._contents.popitem(last=False)
+    
+    def put(
+        self,
+        source_path: Path,
+        key: str,
+        label: Optional[str] = None,
+        link: bool = False,
+        delta: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Back up a file's current content.
+        
+        If the content equals the file's latest version, that version is
+        returned and nothing is stored.
+        
+        Args:
+            source_path: File to back up
+            key: Name the versions are recorded under (workspace-relative path)
+            label: Optional note stored with the version
+            link: Store a new object as a hard link to the source instead of
+                a compressed copy. Only safe when the source is about to be
+                replaced with os.replace, never when it is modified in place
+            delta: Store the content as a delta against the file's latest
+                version when that is less than half the size of the file
+        
+        Returns:
+            Version dictionary with id, path, hash, size, mtime_ns, created,
+            label, base_id, object_path and deduplicated
+        """
+        st = source_path.stat()
+        with self._lock:
+            conn = self._connect()
+            try:
+                latest = conn.execute(
+                    self._VERSION_QUERY + " WHERE v.path = ? ORDER BY v.id DESC LIMIT 1", (key,)
+                ).fetchone()
+                # Always hash: equal size and mtime do not prove equal content
+                data = None
+                if delta and latest is not None:
+                    with open(source_path, "rb") as f:
+                        data = f.read()
+                    digest = hashlib.sha256(data).hexdigest()
+                else:
+                    digest = self._hash_file(source_path)
+                if latest is not None and latest["hash"] == digest:
+                    return dict(self._version_dict(latest), deduplicated=True)
+                
+                object_digest, base_id, depth = digest, None, 0
+                deduplicated = self._has_object(conn, digest)
+                if not deduplicated:
+                    delta_bytes = None
+                    if data is not None and latest["depth"] < self.max_chain:
+                        delta_bytes = make_delta(self._content(conn, latest), data, max_size=len(data) // 2)
+                    if delta_bytes is not None:
+                        object_digest = hashlib.sha256(delta_bytes).hexdigest()
+                        base_id, depth = latest["id"], latest["depth"] + 1
+                        if not self._has_object(conn, object_digest):
+                            self._add_object(conn, object_digest, self._write_compressed(object_digest, [delta_bytes]))
+                    elif data is not None:
+                        self._add_object(conn, digest, self._write_compressed(digest, [data]))
+                    else:
+                        self._add_object(conn, digest, self._write_object(source_path, digest, link))
+                
+                cursor = conn.execute(
+                    "INSERT INTO versions (path, hash, size, mtime_ns, created, label, object, base_id, depth) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, digest, st.st_size, st.st_mtime_ns, datetime.now(timezone.utc).isoformat(), label,
+                     object_digest, base_id, depth)
+                )
+                version_id = cursor.lastrowid
+                if data is not None:
+                    self._remember(key, version_id, data)
+                removed = self._apply_retention(conn, key)
+                conn.commit()
+                row = conn.execute(self._VERSION_QUERY + " WHERE v.id = ?", (version_id,)).fetchone()
+            finally:
+                conn.close()
+        
+        if removed:
+            logger.debug(f"Dropped {removed} old backup versions of {key}")
+        return dict(self._version_dict(row), deduplicated=deduplicated)
+    
+    def _has_object(self, conn: sqlite3.Connection, digest: str) -> bool:
+        obj = conn.execute("SELECT compressed FROM objects WHERE hash = ?", (digest,)).fetchone()
+        return obj is not None and self.object_path(digest, obj["compressed"]).exists()
+    
+    @staticmethod
+    def _add_object(conn: sqlite3.Connection, digest: str, values: Dict[str, Any]) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO objects (hash, size, stored_size, compressed) VALUES (?, ?, ?, ?)",
+            (digest, values["size"], values["stored_size"], values["compressed"])
+        )
+    
+    def _materialize(self, conn: sqlite3.Connection, row: sqlite3.Row) -> str:
+        """Turn a delta version into a full copy; returns its former object."""
+        data = self._content(conn, row)
+        if not self._has_object(conn, row["hash"]):
+            self._add_object(conn, row["hash"], self._write_compressed(row["hash"], [data]))
+        conn.execute(
+            "UPDATE versions SET object = ?, base_id = NULL, depth = 0 WHERE id = ?", (row["hash"], row["id"])
+        )
+        return row["object"]
+    
+    def _apply_retention(self, conn: sqlite3.Connection, key: Optional[str] = None) -> int:
+        """Drop versions outside the retention policy and their orphaned objects."""
+        stale = []
+        released = set()
+        paths = [key] if key is not None else [row[0] for row in conn.execute("SELECT DISTINCT path FROM versions")]
+        cutoff = None
+        if self.max_age_days is not None:
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=self.max_age_days)).isoformat()
+        for path in paths:
+            rows = conn.execute(
+                self._VERSION_QUERY + " WHERE v.path = ? ORDER BY v.id DESC", (path,)
+            ).fetchall()
+            stale_ids = {
+                row["id"] for position, row in enumerate(rows)
+                if position >= self.keep_versions or (position > 0 and cutoff and row["created"] < cutoff)
+            }
+            if not stale_ids:
+                continue
+            # Kept deltas must not depend on dropped versions
+            for row in rows:
+                if row["id"] not in stale_ids and row["base_id"] in stale_ids:
+                    released.add(self._materialize(conn, row))
+            stale.extend((row["id"], row["object"]) for row in rows if row["id"] in stale_ids)
+        if not stale:
+            return 0
+        
+        conn.executemany("DELETE FROM versions WHERE id = ?", ((version_id,) for version_id, _ in stale))
+        for digest in {digest for _, digest in stale} | released:
+            if conn.execute("SELECT 1 FROM versions WHERE object = ? LIMIT 1", (digest,)).fetchone():
+                continue
+            obj = conn.execute("SELECT compressed FROM objects WHERE hash = ?", (digest,)).fetchone()
+            conn.execute("DELETE FROM objects WHERE hash = ?", (digest,))
+            if obj is not None:
+                try:
+                    self.object_path(digest, obj["compressed"]).unlink()
+                except FileNotFoundError:
+                    pass
+        return len(stale)
+    
+    def latest(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest version of a file.
+        
+        Args:
+            key: Workspace-relative path
+        
+        Returns:
+            Version dictionary, or None if the file has no backups
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    self._VERSION_QUERY + " WHERE v.path = ? ORDER BY v.id DESC LIMIT 1", (key,)
+                ).fetchone()
+            finally:
+                conn.close()
+        return self._version_dict(row) if row else None
+    
+    def get_version(self, version_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a version by id.
+        
+        Args:
+            version_id: Version id
+        
+        Returns:
+            Version dictionary, or None if no such version exists
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(self._VERSION_QUERY + " WHERE v.id = ?", (version_id,)).fetchone()
+            finally:
+                conn.close()
+        return self._version_dict(row) if row else None
+    
+    def list_versions(self, key: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List versions, newest first.
+        
+        Args:
+            key: Workspace-relative path (None lists every file's versions)
+            limit: Maximum number of versions to return
+        
+        Returns:
+            List of version dictionaries
+        """
+        query = self._VERSION_QUERY + (" WHERE v.path = ?" if key is not None else "") + " ORDER BY v.id DESC"
+        params: tuple = (key,) if key is not None else ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(query, params).fetchall()
+            finally:
+                conn.close()
+        return [self._version_dict(row) for row in rows]
+    
+    def restore(self, version: Dict[str, Any], target_path: Path, fsync_mode: Optional[str] = None) -> int:
+        """
+        Atomically replace a file with a stored version.
+        
+        Args:
+            version: Version dictionary from put, latest, get_version or list_versions
+            target_path: File to write
+            fsync_mode: "off", "always" or "batch" (default: write_fsync_mode setting)
+        
+        Returns:
+            Number of bytes restored
+        
+        Raises:
+            FileNotFoundError: If the version's object is missing
+            ValueError: If the object content does not match its hash
+        """
+        fsync_mode = fsync_mode or get_server_config().write_fsync_mode
+        if version.get("base_id") is not None:
+            chunks: Iterable[bytes] = [self.read_version(version["id"])]
+        else:
+            object_path = Path(version["object_path"])
+            chunks = self._iter_object(object_path.name.split(".")[0], object_path.suffix == ".z")
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        fd, temp_name = tempfile.mkstemp(dir=target_path.parent, prefix=f".{target_path.name}.", suffix=".tmp")
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    out.write(chunk)
+                size = out.tell()
+                if fsync_mode == "always":
+                    os.fsync(out.fileno())
+            if digest.hexdigest() != version["hash"]:
+                raise ValueError(f"Backup object {version['hash']} is corrupt")
+            if target_path.exists():
+                os.chmod(temp_name, target_path.stat().st_mode & 0o7777)
+            os.utime(temp_name, ns=(version["mtime_ns"], version["mtime_ns"]))
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+        commit_staged(Path(temp_name), target_path, fsync_mode)
+        return size
+    
+    def read_version(self, version_id: int) -> bytes:
+        """
+        Get the full content of a version.
+        
+        Args:
+            version_id: Version id
+        
+        Returns:
+            File content as bytes
+        
+        Raises:
+            KeyError: If no such version exists
+            ValueError: If the stored data is damaged
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(self._VERSION_QUERY + " WHERE v.id = ?", (version_id,)).fetchone()
+                if row is None:
+                    raise KeyError(version_id)
+                return self._content(conn, row)
+            finally:
+                conn.close()
+    
+    def gc(self) -> Dict[str, Any]:
+        """
+        Apply retention to every file, compress hard-linked objects and
+        delete object files the index does not know about.
+        
+        Returns:
+            Dictionary with dropped version, compressed object and removed file counts
+        """
+        compressed = 0
+        removed_files = 0
+        with self._lock:
+            conn = self._connect()
+            try:
+                dropped = self._apply_retention(conn)
+                conn.commit()
+                
+                known = {}
+                for row in conn.execute("SELECT hash, compressed FROM objects").fetchall():
+                    known[row["hash"]] = row["compressed"]
+                
+                for digest, is_compressed in known.items():
+                    if is_compressed:
+                        continue
+                    raw_path = self.object_path(digest, False)
+                    try:
+                        values = self._write_object(raw_path, digest, link=False)
+                    except FileNotFoundError:
+                        continue
+                    conn.execute(
+                        "UPDATE objects SET stored_size = ?, compressed = 1 WHERE hash = ?",
+                        (values["stored_size"], digest)
+                    )
+                    conn.commit()
+                    raw_path.unlink()
+                    known[digest] = 1
+                    compressed += 1
+                
+                if self.objects_dir.exists():
+                    for object_file in self.objects_dir.glob("*/*"):
+                        digest = object_file.name.split(".")[0]
+                        expected = self.object_path(digest, bool(known.get(digest, 0)))
+                        if digest not in known or object_file != expected:
+                            object_file.unlink()
+                            removed_files += 1
+            finally:
+                conn.close()
+        return {"dropped_versions": dropped, "compressed_objects": compressed, "removed_files": removed_files}
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+        
+        Returns:
+            Dictionary with file, version, delta version and object counts and
+            logical and stored sizes
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                files, versions, deltas, logical = conn.execute(
+                    "SELECT COUNT(DISTINCT path), COUNT(*), COUNT(base_id), COALESCE(SUM(size), 0) FROM versions"
+                ).fetchone()
+                objects, stored = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM objects"
+                ).fetchone()
+            finally:
+                conn.close()
+        return {
+            "files": files,
+            "versions": versions,
+            "delta_versions": deltas,
+            "objects": objects,
+            "logical_bytes": logical,
+            "stored_bytes": stored
+        }
+
+
+# Store instances by directory
+_stores: Dict[str, BackupStore] = {}
+
+
+def get_backup_store() -> BackupStore:
+    """
+    Get the backup store for the configured workspace.
+    
+    Returns:
+        BackupStore instance
+    """
+    config = get_server_config()
+    root = config.get_backup_store_dir()
+    store = _stores.get(str(root))
+    if store is None:
+        store = BackupStore(root, keep_versions=config.backup_keep_versions, max_age_days=config.backup_max_age_days)
+        _stores[str(root)] = store
+    return store
+
+
+def backup_key(path: Union[str, Path], workspace_path: Path) -> str:
+    """
+    Get the key a file's versions are recorded under.
+    
+    Args:
+        path: File path
+        workspace_path: Workspace root
+    
+    Returns:
+        Workspace-relative "/"-separated path
+    """
+    return Path(path).resolve().relative_to(workspace_path.resolve()).as_posix()
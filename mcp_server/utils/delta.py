@@ -0,0 +1,238 @@
+"""
+Binary Deltas
+
+rsync-style deltas between two versions of a file, used by the backup store
+for files that change a little at a time. A delta is a list of operations
+that rebuild the target from the base: COPY a range of the base, or INSERT
+literal bytes.
+
+Appends are detected first (the base is a prefix of the target) and encoded
+as one COPY plus one INSERT without scanning. Otherwise the common prefix and
+suffix are trimmed and the middle is matched against fixed-size blocks of
+the base: every offset of the target is looked up in a table of base blocks
+until a block matches, and matches are extended in both directions. Work is
+proportional to the changed bytes plus one lookup per unchanged block.
+"""
+
+from typing import List, Optional, Tuple
+
+
+# Marks the delta format
+MAGIC = b"DLT1"
+
+# Size of the base blocks matched against the target
+BLOCK_SIZE = 64
+
+# Bytes compared per step when measuring common prefixes and suffixes
+_COMPARE_CHUNK = 64 * 1024
+
+_COPY = 0x43  # "C"
+_INSERT = 0x49  # "I"
+
+
+class DeltaError(ValueError):
+    """Raised when a delta is malformed or does not fit its base."""
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise DeltaError("Truncated delta")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _common_prefix(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common prefix of a and b, at most limit."""
+    pos = 0
+    while pos + _COMPARE_CHUNK <= limit and a[pos:pos + _COMPARE_CHUNK] == b[pos:pos + _COMPARE_CHUNK]:
+        pos += _COMPARE_CHUNK
+    # Binary search inside the first differing chunk
+    low, high = pos, min(pos + _COMPARE_CHUNK, limit)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[pos:mid] == b[pos:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common suffix of a and b, at most limit."""
+    length = 0
+    while length + _COMPARE_CHUNK <= limit and \
+            a[len(a) - length - _COMPARE_CHUNK:len(a) - length] == b[len(b) - length - _COMPARE_CHUNK:len(b) - length]:
+        length += _COMPARE_CHUNK
+    low, high = length, min(length + _COMPARE_CHUNK, limit)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid:len(a) - length] == b[len(b) - mid:len(b) - length]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+class _DeltaWriter:
+    """Accumulates operations, merging adjacent copies."""
+    
+    def __init__(self, target: bytes):
+        self.target = target
+        self.ops: List[Tuple[int, int, int]] = []
+        self.inserted = 0
+    
+    def copy(self, offset: int, length: int) -> None:
+        if length <= 0:
+            return
+        if self.ops and self.ops[-1][0] == _COPY and self.ops[-1][1] + self.ops[-1][2] == offset:
+            _, start, previous = self.ops.pop()
+            self.ops.append((_COPY, start, previous + length))
+        else:
+            self.ops.append((_COPY, offset, length))
+    
+    def insert(self, start: int, end: int) -> None:
+        if end > start:
+            self.ops.append((_INSERT, start, end - start))
+            self.inserted += end - start
+    
+    def encode(self) -> bytes:
+        out = [MAGIC]
+        for op, a, b in self.ops:
+            out.append(bytes([op]))
+            if op == _COPY:
+                out.append(_varint(a))
+                out.append(_varint(b))
+            else:
+                out.append(_varint(b))
+                out.append(self.target[a:a + b])
+        return b"".join(out)
+
+
+def make_delta(base: bytes, target: bytes, max_size: Optional[int] = None, block_size: int = BLOCK_SIZE) -> Optional[bytes]:
+    """
+    Encode target as a delta against base.
+    
+    Args:
+        base: Previous version
+        target: New version
+        max_size: Give up once more than this many literal bytes are needed
+        block_size: Size of the base blocks used for matching
+    
+    Returns:
+        Delta bytes, or None if the delta would exceed max_size
+    """
+    writer = _DeltaWriter(target)
+    limit = min(len(base), len(target))
+    prefix = _common_prefix(base, target, limit)
+    
+    # Append-only change: no scan needed
+    if prefix == len(base):
+        writer.copy(0, prefix)
+        writer.insert(prefix, len(target))
+        if max_size is not None and writer.inserted > max_size:
+            return None
+        return writer.encode()
+    
+    suffix = _common_suffix(base, target, limit - prefix)
+    base_end = len(base) - suffix
+    target_end = len(target) - suffix
+    writer.copy(0, prefix)
+    
+    blocks = {}
+    for offset in range(prefix, base_end - block_size + 1, block_size):
+        blocks.setdefault(base[offset:offset + block_size], offset)
+    
+    pos = prefix
+    while pos < target_end:
+        insert_start = pos
+        offset = None
+        if blocks:
+            while pos + block_size <= target_end:
+                offset = blocks.get(target[pos:pos + block_size])
+                if offset is not None:
+                    break
+                pos += 1
+                if max_size is not None and writer.inserted + pos - insert_start > max_size:
+                    return None
+        if offset is None:
+            writer.insert(insert_start, target_end)
+            break
+        
+        # Extend the match backwards into the pending literal bytes
+        length = block_size
+        while pos > insert_start and offset > 0 and target[pos - 1] == base[offset - 1]:
+            pos -= 1
+            offset -= 1
+            length += 1
+        # and forwards, block by block and then byte by byte
+        while (pos + length + block_size <= target_end and offset + length + block_size <= base_end and
+               target[pos + length:pos + length + block_size] == base[offset + length:offset + length + block_size]):
+            length += block_size
+        while pos + length < target_end and offset + length < base_end and target[pos + length] == base[offset + length]:
+            length += 1
+        
+        writer.insert(insert_start, pos)
+        writer.copy(offset, length)
+        pos += length
+    
+    writer.copy(base_end, suffix)
+    if max_size is not None and writer.inserted > max_size:
+        return None
+    return writer.encode()
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """
+    Rebuild a version from its base and delta.
+    
+    Args:
+        base: Base version
+        delta: Delta from make_delta
+    
+    Returns:
+        Rebuilt bytes
+    
+    Raises:
+        DeltaError: If the delta is malformed or refers outside the base
+    """
+    if not delta.startswith(MAGIC):
+        raise DeltaError("Not a delta")
+    pieces = []
+    pos = len(MAGIC)
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op == _COPY:
+            offset, pos = _read_varint(delta, pos)
+            length, pos = _read_varint(delta, pos)
+            if offset + length > len(base):
+                raise DeltaError("Copy outside base")
+            pieces.append(base[offset:offset + length])
+        elif op == _INSERT:
+            length, pos = _read_varint(delta, pos)
+            if pos + length > len(delta):
+                raise DeltaError("Truncated delta")
+            pieces.append(delta[pos:pos + length])
+            pos += length
+        else:
+            raise DeltaError(f"Unknown delta operation {op}")
+    return b"".join(pieces)
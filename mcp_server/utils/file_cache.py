@@ -0,0 +1,239 @@
+"""
+File Content Cache
+
+Byte-budgeted LRU cache of decoded file contents for read_project_file.
+Entries are keyed by path and validated against the file's identity
+(inode, size, mtime_ns) from a single os.stat, so an edited or replaced file
+is never served stale. Entries are also dropped as soon as the workspace
+watcher (or a file tool in this process) reports their path changed; content
+can optionally be kept zlib-compressed to fit more files in the budget.
+"""
+
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Union
+from pathlib import Path
+import logging
+
+from ..config.settings import get_server_config
+from .workspace_watcher import FileChange, subscribe
+
+
+logger = logging.getLogger(__name__)
+
+# Files smaller than this are stored uncompressed even when compression is on
+COMPRESS_MIN_SIZE = 4096
+
+
+class FileTooLargeError(Exception):
+    """Raised when a file exceeds the requested maximum size."""
+    
+    def __init__(self, size: int):
+        super().__init__(f"File too large: {size} bytes")
+        self.size = size
+
+
+def decode_content(data: bytes, encoding: str) -> Tuple[str, str]:
+    """
+    Decode file bytes the way a text-mode read would.
+    
+    Falls back to latin-1 when the data is not valid in the requested
+    encoding; newlines are normalized to "\\n".
+    
+    Args:
+        data: Raw file bytes
+        encoding: Preferred encoding
+    
+    Returns:
+        Tuple of (text, encoding actually used)
+    """
+    try:
+        text = data.decode(encoding)
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+        encoding = "latin-1"
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text, encoding
+
+
+class FileContentCache:
+    """
+    LRU cache of decoded file contents bounded by a byte budget.
+    
+    Each entry holds (identity, requested encoding, used encoding, payload,
+    compressed, cost). The cost is the stored payload size in bytes.
+    """
+    
+    def __init__(self, max_bytes: int, compress: bool = False):
+        """
+        Initialize FileContentCache.
+        
+        Args:
+            max_bytes: Total payload bytes to keep; files above a quarter of
+                this are read but not cached
+            compress: Whether to keep content zlib-compressed
+        """
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._entries: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _identity(st: os.stat_result) -> Tuple[int, int, int]:
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[5]
+    
+    def read_text(
+        self,
+        path: Union[str, Path],
+        encoding: str = "utf-8",
+        max_size: Optional[int] = None
+    ) -> Tuple[str, str, os.stat_result]:
+        """
+        Read a file's text, served from cache when the file is unchanged.
+        
+        Args:
+            path: File path
+            encoding: Preferred encoding (latin-1 is used if decoding fails)
+            max_size: Maximum file size in bytes (optional)
+        
+        Returns:
+            Tuple of (text, encoding used, stat result)
+        
+        Raises:
+            FileTooLargeError: If the file exceeds max_size
+            OSError: If the file cannot be read
+        """
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        if max_size is not None and st.st_size > max_size:
+            raise FileTooLargeError(st.st_size)
+        identity = self._identity(st)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == identity and entry[1] == encoding:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                _, _, used_encoding, payload, compressed, _ = entry
+                if compressed:
+                    return zlib.decompress(payload).decode("utf-8"), used_encoding, st
+                return payload, used_encoding, st
+            self.misses += 1
+        
+        with open(key, "rb") as f:
+            data = f.read()
+        text, used_encoding = decode_content(data, encoding)
+        
+        # Stat again so a write racing with the read is not cached under the old identity
+        if len(data) != st.st_size or self._identity(os.stat(key)) != identity:
+            return text, used_encoding, st
+        
+        self._store(key, identity, encoding, used_encoding, text)
+        return text, used_encoding, st
+    
+    def _store(self, key: str, identity: Tuple[int, int, int], encoding: str, used_encoding: str, text: str) -> None:
+        compressed = self.compress and identity[1] >= COMPRESS_MIN_SIZE
+        payload = zlib.compress(text.encode("utf-8"), 1) if compressed else text
+        cost = len(payload) if compressed else identity[1]
+        if cost > self.max_bytes // 4:
+            return
+        
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (identity, encoding, used_encoding, payload, compressed, cost)
+            self._bytes += cost
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def invalidate(self, path: Union[str, Path]) -> None:
+        """
+        Drop a path from the cache.
+        
+        Args:
+            path: File path
+        """
+        with self._lock:
+            self._remove(os.path.abspath(path))
+    
+    def on_changes(self, changes: List[FileChange]) -> None:
+        """
+        Drop entries for changed paths.
+        
+        Args:
+            changes: Changed paths from the workspace watcher
+        """
+        with self._lock:
+            for change in changes:
+                if change.kind == "overflow":
+                    self._entries.clear()
+                    self._bytes = 0
+                    return
+                if change.is_dir:
+                    prefix = os.path.join(change.path, "")
+                    for key in [key for key in self._entries if key.startswith(prefix)]:
+                        self._remove(key)
+                else:
+                    self._remove(change.path)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with entry count, byte usage and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "compress": self.compress,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global cache instance
+_file_cache: Optional[FileContentCache] = None
+_file_cache_lock = threading.Lock()
+
+
+def get_file_cache() -> FileContentCache:
+    """
+    Get the shared file content cache, configured from the server settings.
+    
+    Returns:
+        FileContentCache instance
+    """
+    global _file_cache
+    with _file_cache_lock:
+        if _file_cache is None:
+            config = get_server_config()
+            # A zero budget turns the cache into a pass-through
+            max_bytes = config.file_cache_max_bytes if config.file_cache_enabled else 0
+            _file_cache = FileContentCache(max_bytes, config.file_cache_compress)
+            subscribe(_file_cache.on_changes)
+        return _file_cache
@@ -0,0 +1,349 @@
+"""
+Workspace File Walker
+
+Single-pass os.scandir-based directory walker shared by the search and
+listing tools. Excluded directories (version control, virtualenvs, backups,
+caches) are pruned before they are descended into, .gitignore files are
+honored at every level, and the os.DirEntry objects (with their cached
+type and stat data) are handed to callers so no path is stat'ed twice.
+"""
+
+import os
+import re
+import fnmatch
+from typing import List, Optional, Iterator, Iterable, Callable, Tuple, Pattern
+from pathlib import Path
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore glob (without anchoring) into a regex."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class GitIgnore:
+    """
+    Rules from one .gitignore file.
+    
+    Supports comments, negation (!), directory-only rules (trailing /),
+    anchored rules (leading or inner /) and ** wildcards. Paths are matched
+    relative to the directory containing the .gitignore.
+    """
+    
+    def __init__(self, rules: List[Tuple[Pattern, bool, bool]]):
+        """
+        Initialize GitIgnore.
+        
+        Args:
+            rules: (compiled regex, negate, directory_only) tuples in file order
+        """
+        self.rules = rules
+    
+    @classmethod
+    def parse(cls, lines: Iterable[str]) -> "GitIgnore":
+        """
+        Parse .gitignore lines.
+        
+        Args:
+            lines: Lines of a .gitignore file
+        
+        Returns:
+            GitIgnore instance
+        """
+        rules = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            line = line.rstrip() if not line.endswith("\\ ") else line
+            
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = _glob_to_regex(line)
+            if not anchored:
+                regex = f"(?:.*/)?{regex}"
+            rules.append((re.compile(f"^{regex}$"), negate, dir_only))
+        return cls(rules)
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional["GitIgnore"]:
+        """
+        Load a .gitignore file.
+        
+        Args:
+            path: Path to the .gitignore file
+        
+        Returns:
+            GitIgnore instance, or None if the file is missing or empty
+        """
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                ignore = cls.parse(f)
+        except OSError:
+            return None
+        return ignore if ignore.rules else None
+    
+    def match(self, relpath: str, is_dir: bool) -> Optional[bool]:
+        """
+        Check a path against the rules.
+        
+        Args:
+            relpath: Path relative to the .gitignore directory, "/"-separated
+            is_dir: Whether the path is a directory
+        
+        Returns:
+            True if ignored, False if re-included by a negation, None if no rule matched
+        """
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relpath):
+                result = not negate
+        return result
+
+
+class WalkEntry:
+    """
+    A file or directory found by walk_workspace.
+    
+    Attributes:
+        entry: The underlying os.DirEntry (type and stat data are cached)
+        relpath: Path relative to the walk root, "/"-separated
+        depth: Nesting depth below the walk root (0 for direct children)
+        is_dir: Whether the entry is a directory
+        pruned: Whether the directory was excluded and not descended into
+    """
+    
+    __slots__ = ("entry", "relpath", "depth", "is_dir", "pruned")
+    
+    def __init__(self, entry: os.DirEntry, relpath: str, depth: int, is_dir: bool, pruned: bool = False):
+        self.entry = entry
+        self.relpath = relpath
+        self.depth = depth
+        self.is_dir = is_dir
+        self.pruned = pruned
+    
+    @property
+    def name(self) -> str:
+        """Entry name."""
+        return self.entry.name
+    
+    @property
+    def path(self) -> str:
+        """Absolute path."""
+        return self.entry.path
+    
+    def stat(self) -> os.stat_result:
+        """Stat result (cached by os.DirEntry, follows symlinks)."""
+        return self.entry.stat()
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _leads_to(relpath: str, parts: Tuple[str, ...]) -> bool:
+    """Whether a directory sorts at or after a resume point's directory."""
+    dir_parts = tuple(relpath.split("/"))
+    return dir_parts >= parts or parts[:len(dir_parts)] == dir_parts
+
+
+def walk_workspace(
+    root: Path,
+    include_hidden: bool = True,
+    exclude_dirs: Optional[List[str]] = None,
+    exclude_patterns: Optional[List[str]] = None,
+    respect_gitignore: bool = True,
+    max_depth: Optional[int] = None,
+    recursive: bool = True,
+    descend: Optional[Callable[[WalkEntry], bool]] = None,
+    yield_pruned: bool = False,
+    on_error: Optional[Callable[[str, OSError], None]] = None,
+    ignore_root: Optional[Path] = None,
+    start_after: Optional[str] = None
+) -> Iterator[WalkEntry]:
+    """
+    Walk a directory tree once, pruning excluded directories up front.
+    
+    Each directory's entries are yielded together, sorted by name, before any
+    subdirectory is entered, so a directory always precedes its contents and
+    the order is stable across calls. That order is the same as comparing
+    (parent directory path components, name), which lets start_after resume
+    a walk without entering the directories already covered.
+    
+    Args:
+        root: Directory to walk
+        include_hidden: Whether to include names starting with "."
+        exclude_dirs: Directory name globs never descended into
+        exclude_patterns: Regexes searched in entry names; matches are skipped
+        respect_gitignore: Whether to honor .gitignore files in the tree
+        max_depth: Maximum depth to descend (None for unlimited)
+        recursive: Whether to descend into subdirectories at all
+        descend: Optional predicate deciding whether to enter a directory
+        yield_pruned: Whether to yield excluded directories (flagged pruned)
+        on_error: Called with (relpath, error) for unreadable directories
+        ignore_root: Ancestor of root (e.g. the workspace) whose .gitignore
+            files down to root also apply
+        start_after: Relpath of an entry yielded by an earlier walk; only
+            entries after it are yielded (the entry need not still exist)
+    
+    Yields:
+        WalkEntry objects
+    """
+    exclude_dir_regex = re.compile("|".join(fnmatch.translate(p) for p in exclude_dirs)) if exclude_dirs else None
+    exclude_regexes = [re.compile(p) for p in exclude_patterns or []]
+    
+    # Active gitignores are (base relpath, prefix, GitIgnore): a path is matched as
+    # prefix + the part of its relpath below base
+    ignores = []
+    if respect_gitignore and ignore_root is not None:
+        try:
+            parts = Path(root).resolve().relative_to(Path(ignore_root).resolve()).parts
+        except ValueError:
+            parts = ()
+        for i in range(len(parts)):
+            gitignore = GitIgnore.load(Path(ignore_root).joinpath(*parts[:i], ".gitignore"))
+            if gitignore:
+                ignores.append(("", "".join(f"{part}/" for part in parts[i:]), gitignore))
+    
+    # Resume point as (parent directory components, name)
+    resume_parts, resume_name = None, None
+    if start_after:
+        parent, _, resume_name = start_after.strip("/").rpartition("/")
+        resume_parts = tuple(parent.split("/")) if parent else ()
+    
+    # Stack of (directory path, relpath, depth, active gitignores)
+    stack = [(str(root), "", 0, ignores)]
+    
+    while stack:
+        dir_path, dir_rel, depth, ignores = stack.pop()
+        
+        # Before the resume point, directories are listed only to find the
+        # subdirectories leading to it; their entries were yielded already
+        skip_until = None
+        if resume_parts is not None:
+            dir_parts = tuple(dir_rel.split("/")) if dir_rel else ()
+            if dir_parts == resume_parts:
+                skip_until = resume_name
+            elif dir_parts < resume_parts:
+                skip_until = True
+            else:
+                resume_parts = None
+        
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            if on_error:
+                on_error(dir_rel, e)
+            else:
+                logger.debug(f"Cannot read directory {dir_path}: {e}")
+            continue
+        
+        if respect_gitignore and any(e.name == ".gitignore" for e in entries):
+            gitignore = GitIgnore.load(Path(dir_path) / ".gitignore")
+            if gitignore:
+                ignores = ignores + [(dir_rel, "", gitignore)]
+        
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if not include_hidden and name.startswith("."):
+                continue
+            if exclude_regexes and any(r.search(name) for r in exclude_regexes):
+                continue
+            
+            relpath = f"{dir_rel}/{name}" if dir_rel else name
+            is_dir = _is_dir(entry)
+            
+            if ignores:
+                ignored = None
+                for base, prefix, gitignore in ignores:
+                    match = gitignore.match(prefix + (relpath[len(base) + 1:] if base else relpath), is_dir)
+                    if match is not None:
+                        ignored = match
+                if ignored:
+                    continue
+            
+            seen = skip_until is not None and (skip_until is True or name <= skip_until)
+            
+            if is_dir and exclude_dir_regex and exclude_dir_regex.match(name):
+                if yield_pruned and not seen:
+                    yield WalkEntry(entry, relpath, depth, True, pruned=True)
+                continue
+            
+            walk_entry = WalkEntry(entry, relpath, depth, is_dir)
+            if not seen:
+                yield walk_entry
+            elif not is_dir or not _leads_to(relpath, resume_parts):
+                continue
+            
+            if (is_dir and recursive and not entry.is_symlink() and
+                    (max_depth is None or depth + 1 < max_depth) and
+                    (descend is None or descend(walk_entry))):
+                subdirs.append((entry.path, relpath, depth + 1, ignores))
+        
+        # Reverse so the first subdirectory is walked first
+        stack.extend(reversed(subdirs))
+
+
+def matches_file_pattern(relpath: str, file_pattern: str) -> bool:
+    """
+    Check a file against a glob pattern the way Path.rglob would.
+    
+    Args:
+        relpath: Path relative to the walk root, "/"-separated
+        file_pattern: Glob pattern; matched against the name unless it contains "/"
+    
+    Returns:
+        True if the file matches
+    """
+    if "/" in file_pattern:
+        return fnmatch.fnmatchcase(relpath, f"*{file_pattern}") or fnmatch.fnmatchcase(relpath, file_pattern)
+    return fnmatch.fnmatchcase(relpath.rsplit("/", 1)[-1], file_pattern)
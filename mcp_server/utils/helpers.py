@@ -11,11 +11,16 @@ import time
 import re
 import hashlib
 from typing import Dict, List, Any, Optional, Union, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from contextlib import contextmanager
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +40,27 @@ def format_timestamp(timestamp: Optional[str] = None) -> str:
     return timestamp
 
 
+def parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 timestamp into a timezone-aware UTC datetime.
+    
+    Args:
+        timestamp: Timestamp string ("Z" suffix and naive values are treated as UTC)
+        
+    Returns:
+        Aware datetime in UTC, or None if the timestamp is missing or invalid
+    """
+    if not timestamp:
+        return None
+    try:
+        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
 def calculate_duration(start_time: Optional[str], end_time: Optional[str]) -> int:
     """
     Calculate duration in seconds between two timestamps.
@@ -96,20 +122,99 @@ def ensure_directory(directory: Path) -> bool:
         return False
 
 
+# Linux ioctl that makes a file share another file's data blocks (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def clone_file(source_path: Path, target_path: Path) -> str:
+    """
+    Copy a file with its metadata, sharing data blocks when possible.
+    
+    On copy-on-write filesystems the copy is a reflink that takes no extra
+    space until either file changes; elsewhere it is a regular copy.
+    
+    Args:
+        source_path: File to copy
+        target_path: Destination path
+        
+    Returns:
+        "reflink" or "copy", depending on how the file was copied
+    """
+    if fcntl is not None and hasattr(fcntl, "ioctl"):
+        try:
+            with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source_path, target_path)
+            return "reflink"
+        except OSError:
+            pass
+    shutil.copy2(source_path, target_path)
+    return "copy"
+
+
+def _same_content(first: Path, second: Path, chunk_size: int = 1024 * 1024) -> bool:
+    """
+    Check whether two files hold the same bytes.
+    
+    Sizes and inode identity are checked first; otherwise the bytes are
+    compared. Matching mtimes prove nothing (edits within the timestamp
+    granularity, cp -p, touch -r), and filecmp caches results by mtime.
+    """
+    first_stat, second_stat = first.stat(), second.stat()
+    if first_stat.st_size != second_stat.st_size:
+        return False
+    if (first_stat.st_ino, first_stat.st_dev) == (second_stat.st_ino, second_stat.st_dev):
+        return True
+    with open(first, 'rb') as f1, open(second, 'rb') as f2:
+        while True:
+            chunk = f1.read(chunk_size)
+            if chunk != f2.read(chunk_size):
+                return False
+            if not chunk:
+                return True
+
+
+# Newest timestamped backup per (backup directory, source name), so a write
+# does not rescan the backup directory to find it
+_latest_backups: Dict[Tuple[str, str], Optional[Path]] = {}
+
+
+def _latest_backup(source_path: Path, backup_dir: Path) -> Optional[Path]:
+    """Get the newest backup of a source, scanning the backup directory only on a cache miss."""
+    key = (str(backup_dir), source_path.name)
+    if key in _latest_backups:
+        latest = _latest_backups[key]
+        if latest is None or latest.exists():
+            return latest
+    latest = restore_from_backup(source_path, backup_dir)
+    _latest_backups[key] = latest
+    return latest
+
+
 def create_backup(
     source_path: Path,
     backup_name: Optional[str] = None,
     include_timestamp: bool = True,
-    backup_dir: Optional[Path] = None
+    backup_dir: Optional[Path] = None,
+    link: bool = False
 ) -> Optional[Path]:
     """
     Create backup of a file.
     
+    Timestamped backups are skipped when the newest existing backup already
+    holds the same content; that backup is returned instead. The newest
+    backup is remembered per source, so the backup directory is only
+    scanned on the first backup of a source in this process. Backups are
+    reflinked where the filesystem supports it and copied otherwise.
+    
     Args:
         source_path: Path to source file
         backup_name: Custom backup name (optional)
         include_timestamp: Whether to include timestamp in backup name
         backup_dir: Directory for backups (defaults to source directory)
+        link: Hard-link the backup to the source instead of copying. Only
+            safe when the source is about to be replaced with os.replace,
+            never when it will be modified in place
         
     Returns:
         Path to backup file or None if backup failed
@@ -132,17 +237,39 @@ def create_backup(
         
         # Only add timestamp if backup_name is not provided
         if include_timestamp and not backup_name:
+            latest = _latest_backup(source_path, backup_dir)
+            if latest is not None and _same_content(source_path, latest):
+                logger.debug(f"Backup unchanged, reusing: {latest}")
+                return latest
+            
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             stem = source_path.stem
             suffix = source_path.suffix
             backup_filename = f"{stem}_{timestamp}{suffix}"
+            # Several backups in one second get a counter instead of overwriting each other
+            counter = 1
+            while (backup_dir / backup_filename).exists():
+                backup_filename = f"{stem}_{timestamp}_{counter}{suffix}"
+                counter += 1
         
         backup_path = backup_dir / backup_filename
         
         # Create backup
-        shutil.copy2(source_path, backup_path)
+        method = None
+        if link:
+            try:
+                if backup_path.exists():
+                    backup_path.unlink()
+                os.link(source_path, backup_path)
+                method = "hardlink"
+            except OSError:
+                method = None
+        if method is None:
+            method = clone_file(source_path, backup_path)
+        if include_timestamp and not backup_name:
+            _latest_backups[(str(backup_dir), source_path.name)] = backup_path
         
-        logger.info(f"Created backup: {backup_path}")
+        logger.info(f"Created backup ({method}): {backup_path}")
         return backup_path
         
     except Exception as e:
@@ -297,6 +424,23 @@ def generate_file_hash(file_path: Path, algorithm: str = "sha256") -> Optional[s
         return None
 
 
+def file_signature(file_path: Path) -> Optional[List[int]]:
+    """
+    Get a cheap change signature for a file without reading it.
+    
+    Args:
+        file_path: Path to file
+        
+    Returns:
+        [inode, mtime_ns, size] list (JSON-friendly), or None if the file is missing
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return [st.st_ino, st.st_mtime_ns, st.st_size]
+
+
 def sanitize_filename(filename: str, replacement: str = "_") -> str:
     """
     Sanitize filename by removing invalid characters.
@@ -402,44 +546,48 @@ def format_duration(seconds: int) -> str:
 
 
 @contextmanager
-def file_lock(file_path: Path, timeout: int = 30):
+def file_lock(file_path: Path, timeout: float = 30, poll_interval: float = 0.01):
     """
-    Context manager for file locking.
+    Context manager for an exclusive advisory lock on a file.
+    
+    The lock is an flock on a sibling ".lock" file, which is kept after
+    release so every process always locks the same inode. Acquisition polls
+    with a short sleep until the timeout; errors raised by the caller's body
+    propagate unchanged. Without fcntl (Windows) no lock is taken.
     
     Args:
         file_path: Path to file to lock
-        timeout: Lock timeout in seconds
+        timeout: Seconds to wait for the lock before giving up
+        poll_interval: Seconds to sleep between acquisition attempts
+    
+    Raises:
+        TimeoutError: If the lock could not be acquired within the timeout
     """
-    import fcntl
+    if fcntl is None:
+        yield
+        return
     
     lock_file = file_path.with_suffix(file_path.suffix + ".lock")
-    lock_handle = None
+    lock_handle = open(lock_file, 'a')
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Could not acquire lock for {file_path} within timeout")
+                time.sleep(poll_interval)
+    except BaseException:
+        lock_handle.close()
+        raise
     
     try:
-        lock_handle = open(lock_file, 'w')
-        # Try to acquire lock
-        fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
         yield
-    except (IOError, OSError):
-        # Lock acquisition failed
-        if lock_handle:
-            lock_handle.close()
-        time.sleep(1)
-        timeout -= 1
-        if timeout <= 0:
-            raise TimeoutError(f"Could not acquire lock for {file_path} within timeout")
-        # Retry
-        with file_lock(file_path, timeout):
-            yield
     finally:
-        # Release lock
-        try:
-            if lock_handle:
-                fcntl.flock(lock_handle.fileno(), fcntl.LOCK_UN)
-                lock_handle.close()
-                lock_file.unlink(missing_ok=True)
-        except (IOError, OSError):
-            pass
+        fcntl.flock(lock_handle.fileno(), fcntl.LOCK_UN)
+        lock_handle.close()
 
 
 def validate_email(email: str) -> bool:
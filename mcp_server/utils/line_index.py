@@ -0,0 +1,252 @@
+"""
+Line Offset Index
+
+Sparse per-file index of line start offsets used for ranged reads in
+read_project_file. The index is built in one chunked pass over the file's
+bytes and keeps the offset of every STRIDE-th line, so locating any line
+means seeking to the nearest checkpoint and scanning at most STRIDE - 1
+newlines. Indexes are cached per path and validated by the file's
+(inode, size, mtime_ns) identity.
+"""
+
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, Optional, Tuple, Union
+from pathlib import Path
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Keep the offset of every STRIDE-th line
+STRIDE = 64
+
+# Bytes read per step while building or scanning
+READ_CHUNK = 4 * 1024 * 1024
+SCAN_CHUNK = 64 * 1024
+
+# Number of file indexes kept in memory
+MAX_INDEXES = 64
+
+# Streaming chunk size when none is given
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class LineIndex:
+    """
+    Sparse line start offsets for one version of a file.
+    
+    Attributes:
+        identity: (inode, size, mtime_ns) of the indexed file
+        line_count: Number of lines, counted like readlines() (a trailing
+            partial line counts, an empty file has none)
+        checkpoints: Byte offset of lines 1, STRIDE + 1, 2 * STRIDE + 1, ...
+    """
+    
+    def __init__(self, identity: Tuple[int, int, int], checkpoints: array, line_count: int):
+        self.identity = identity
+        self.checkpoints = checkpoints
+        self.line_count = line_count
+    
+    @property
+    def size(self) -> int:
+        """Indexed file size in bytes."""
+        return self.identity[1]
+    
+    @classmethod
+    def build(cls, f, identity: Tuple[int, int, int]) -> "LineIndex":
+        """
+        Build an index from an open binary file in one pass.
+        
+        Args:
+            f: Binary file object positioned at the start
+            identity: (inode, size, mtime_ns) of the file
+        
+        Returns:
+            LineIndex instance
+        """
+        checkpoints = array("Q", [0])
+        newlines = 0
+        base = 0
+        last_byte = b""
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            # Start offsets of the lines following each newline in this chunk
+            starts = list(accumulate(len(part) + 1 for part in chunk.split(b"\n")[:-1]))
+            first = (-(newlines + 1)) % STRIDE
+            checkpoints.extend(base + start for start in starts[first::STRIDE])
+            newlines += len(starts)
+            base += len(chunk)
+            last_byte = chunk[-1:]
+        
+        line_count = newlines + (1 if base and last_byte != b"\n" else 0)
+        return cls(identity, checkpoints, line_count)
+    
+    def line_offset(self, f, line_number: int) -> int:
+        """
+        Get the byte offset where a line starts.
+        
+        Args:
+            f: Binary file object for the indexed file
+            line_number: 1-based line number; line_count + 1 gives the file size
+        
+        Returns:
+            Byte offset
+        """
+        if line_number > self.line_count:
+            return self.size
+        index, remaining = divmod(line_number - 1, STRIDE)
+        offset = self.checkpoints[index]
+        f.seek(offset)
+        while remaining:
+            chunk = f.read(SCAN_CHUNK)
+            pos = -1
+            while remaining:
+                pos = chunk.find(b"\n", pos + 1)
+                if pos == -1:
+                    break
+                remaining -= 1
+            if remaining:
+                offset += len(chunk)
+            else:
+                offset += pos + 1
+        return offset
+
+
+def _identity(st: os.stat_result) -> Tuple[int, int, int]:
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+# Cached indexes by path, least recently used first
+_indexes: "OrderedDict[str, LineIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_line_index(path: Union[str, Path], f=None) -> LineIndex:
+    """
+    Get the line index for a file, building it if the file changed.
+    
+    Args:
+        path: File path
+        f: Open binary file object for path (optional; opened if omitted)
+    
+    Returns:
+        LineIndex instance
+    """
+    key = str(path)
+    identity = _identity(os.fstat(f.fileno()) if f is not None else os.stat(key))
+    
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None and index.identity == identity:
+            _indexes.move_to_end(key)
+            return index
+    
+    if f is None:
+        with open(key, "rb") as handle:
+            index = LineIndex.build(handle, identity)
+    else:
+        f.seek(0)
+        index = LineIndex.build(f, identity)
+    logger.debug(f"Built line index for {key}: {index.line_count} lines")
+    
+    with _indexes_lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def read_line_range(path: Union[str, Path], start_line: int, end_line: Optional[int] = None) -> Tuple[bytes, Dict[str, int]]:
+    """
+    Read a range of lines without touching the rest of the file.
+    
+    Args:
+        path: File path
+        start_line: First line to read (1-based)
+        end_line: Last line to read, inclusive (default: end of file)
+    
+    Returns:
+        Tuple of (raw bytes, range info with start_line, end_line, total_lines,
+        start_byte and end_byte)
+    """
+    with open(path, "rb") as f:
+        index = get_line_index(path, f)
+        start_line = max(1, start_line)
+        end_line = index.line_count if end_line is None else min(end_line, index.line_count)
+        start = index.line_offset(f, start_line)
+        end = index.line_offset(f, end_line + 1) if end_line >= start_line else start
+        f.seek(start)
+        data = f.read(end - start)
+    
+    return data, {
+        "start_line": start_line,
+        "end_line": max(end_line, start_line - 1),
+        "total_lines": index.line_count,
+        "start_byte": start,
+        "end_byte": end
+    }
+
+
+def read_byte_range(path: Union[str, Path], offset: int, length: Optional[int] = None) -> Tuple[bytes, Dict[str, int]]:
+    """
+    Read a byte range.
+    
+    Args:
+        path: File path
+        offset: First byte to read
+        length: Number of bytes to read (default: to end of file)
+    
+    Returns:
+        Tuple of (raw bytes, range info with start_byte, end_byte and file_size)
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        offset = min(max(0, offset), size)
+        f.seek(offset)
+        data = f.read(length if length is not None else -1)
+    return data, {"start_byte": offset, "end_byte": offset + len(data), "file_size": size}
+
+
+def read_chunk(path: Union[str, Path], offset: int, chunk_size: int) -> Tuple[bytes, int, Tuple[int, int, int]]:
+    """
+    Read the next chunk for streaming, ending on a line boundary when possible.
+    
+    The chunk is extended to the end of its last line if that line ends
+    within another chunk_size bytes. Otherwise it is cut after its last
+    complete line, or at a UTF-8 character boundary if it holds no line end.
+    
+    Args:
+        path: File path
+        offset: Byte offset to start from
+        chunk_size: Target chunk size in bytes
+    
+    Returns:
+        Tuple of (raw bytes, next offset, file identity)
+    """
+    with open(path, "rb") as f:
+        identity = _identity(os.fstat(f.fileno()))
+        f.seek(offset)
+        data = f.read(chunk_size)
+        if len(data) == chunk_size and not data.endswith(b"\n"):
+            extra = f.read(chunk_size)
+            newline = extra.find(b"\n")
+            if newline != -1:
+                data += extra[:newline + 1]
+            elif extra and b"\n" in data:
+                data = data[:data.rfind(b"\n") + 1]
+            elif extra:
+                # No line end in reach; do not split a UTF-8 sequence
+                cut = len(data)
+                while cut > len(data) - 4 and cut > 0 and 0x80 <= data[cut - 1] < 0xC0:
+                    cut -= 1
+                if cut > 0 and data[cut - 1] >= 0xC0:
+                    cut -= 1
+                data = data[:cut] or data
+    return data, offset + len(data), identity
@@ -0,0 +1,258 @@
+"""
+Memory-Mapped File Search
+
+Byte-level regex scanning for large files, used by search_in_files above
+the search_mmap_threshold size. The file is memory-mapped and searched with
+a bytes regex derived from the user's pattern; only the lines it hits are
+decoded and checked with the original text regex, and line numbers and
+context are found by locating newlines around those hits. Nothing else in
+the file is decoded or split into lines.
+
+The bytes regex is a prefilter that matches every line the text regex
+matches. Patterns whose bytes form could miss matches (non-ASCII literals,
+".", negated sets, \\w/\\d/\\s, lookarounds, inline flags, ...) are not
+translated and the caller falls back to reading the file as text.
+"""
+
+import mmap
+import re
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+from pathlib import Path
+import logging
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+logger = logging.getLogger(__name__)
+
+# UTF-8 encodings of the non-ASCII characters re.IGNORECASE treats as equal
+# to an ASCII letter (dotted/dotless I, Kelvin sign, long s)
+_CASE_EXTRAS = {
+    "i": [b"\xc4\xb0", b"\xc4\xb1"],
+    "k": [b"\xe2\x84\xaa"],
+    "s": [b"\xc5\xbf"],
+}
+
+_WORD_BYTES = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+# Newlines are counted in slices of this size to bound temporary copies
+_COUNT_CHUNK = 8 * 1024 * 1024
+
+
+class _Untranslatable(Exception):
+    """Raised when a pattern has no byte-level superset translation."""
+
+
+def _escape(value: int) -> str:
+    return re.escape(chr(value))
+
+
+def _class_bytes(items) -> Optional[set]:
+    """Return the byte values of a set made of ASCII literals and ranges."""
+    values = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            values.add(av)
+        elif op is sre_constants.RANGE:
+            values.update(range(av[0], av[1] + 1))
+        else:
+            return None
+    if any(v >= 128 or v == 10 for v in values):
+        return None
+    return values
+
+
+def _case_extras(values, ignore_case: bool) -> List[bytes]:
+    if not ignore_case:
+        return []
+    extras = []
+    for letter, encoded in _CASE_EXTRAS.items():
+        if ord(letter) in values or ord(letter.upper()) in values:
+            extras.extend(encoded)
+    return extras
+
+
+def _is_word_node(node) -> bool:
+    """Whether a node always consumes exactly one ASCII word character."""
+    op, av = node
+    if op is sre_constants.LITERAL:
+        return av in _WORD_BYTES
+    if op is sre_constants.IN:
+        values = _class_bytes(av)
+        return bool(values) and values <= _WORD_BYTES
+    return False
+
+
+def _translate(nodes, ignore_case: bool) -> str:
+    """Translate a parsed sequence into a bytes pattern source string."""
+    nodes = list(nodes)
+    out = []
+    for i, (op, av) in enumerate(nodes):
+        if op is sre_constants.LITERAL:
+            if av >= 128 or av == 10:
+                raise _Untranslatable()
+            extras = _case_extras({av}, ignore_case)
+            if extras:
+                out.append("(?:" + "|".join([_escape(av)] + [re.escape(e.decode("latin-1")) for e in extras]) + ")")
+            else:
+                out.append(_escape(av))
+        
+        elif op is sre_constants.IN:
+            values = _class_bytes(av)
+            if not values:
+                raise _Untranslatable()
+            body = "".join(_escape(v) for v in sorted(values))
+            extras = _case_extras(values, ignore_case)
+            if extras:
+                out.append("(?:[" + body + "]|" + "|".join(re.escape(e.decode("latin-1")) for e in extras) + ")")
+            else:
+                out.append("[" + body + "]")
+        
+        elif op is sre_constants.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            if add_flags or del_flags:
+                raise _Untranslatable()
+            out.append("(?:" + _translate(sub, ignore_case) + ")")
+        
+        elif op is sre_constants.BRANCH:
+            out.append("(?:" + "|".join(_translate(branch, ignore_case) for branch in av[1]) + ")")
+        
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, sub = av
+            high_text = "" if high == sre_constants.MAXREPEAT else str(high)
+            lazy = "?" if op is sre_constants.MIN_REPEAT else ""
+            out.append("(?:" + _translate(sub, ignore_case) + "){" + f"{low},{high_text}" + "}" + lazy)
+        
+        elif op is sre_constants.AT:
+            # Lines are matched one at a time, so string anchors are line anchors
+            if av in (sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING):
+                out.append("^")
+            elif av in (sre_constants.AT_END, sre_constants.AT_END_STRING):
+                out.append("$")
+            elif av is sre_constants.AT_BOUNDARY and (
+                    (i > 0 and _is_word_node(nodes[i - 1])) or
+                    (i + 1 < len(nodes) and _is_word_node(nodes[i + 1]))):
+                # Next to an ASCII word character a Unicode word boundary is
+                # also a byte-level boundary (non-ASCII bytes are non-word)
+                out.append(r"\b")
+            else:
+                raise _Untranslatable()
+        
+        else:
+            raise _Untranslatable()
+    return "".join(out)
+
+
+def compile_bytes_prefilter(pattern: str, flags: int = 0) -> Optional["re.Pattern"]:
+    """
+    Build a bytes regex matching every line the text regex matches.
+    
+    Args:
+        pattern: Text regex pattern
+        flags: Text regex flags (only re.IGNORECASE is supported)
+    
+    Returns:
+        Compiled bytes regex, or None if the pattern cannot be translated safely
+    """
+    if flags & ~re.IGNORECASE:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+        if parsed.state.flags & ~(re.IGNORECASE | re.UNICODE):
+            return None
+        ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+        source = _translate(parsed, ignore_case)
+        bytes_flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        return re.compile(source.encode("latin-1"), bytes_flags)
+    except (_Untranslatable, re.error, RecursionError):
+        return None
+
+
+def _count_newlines(mm: mmap.mmap, start: int, end: int) -> int:
+    count = 0
+    while start < end:
+        stop = min(end, start + _COUNT_CHUNK)
+        count += mm[start:stop].count(b"\n")
+        start = stop
+    return count
+
+
+def _decode_line(raw: bytes) -> str:
+    """Decode a raw line the way a text-mode read would present it."""
+    if raw.endswith(b"\r\n"):
+        raw = raw[:-2] + b"\n"
+    return raw.decode("utf-8", errors="ignore")
+
+
+def iter_mapped_matches(
+    path: Path,
+    regex: "re.Pattern",
+    prefilter: "re.Pattern",
+    context_lines: int = 0
+) -> Iterator[Tuple[int, str, "re.Match", Optional[Dict[str, Any]]]]:
+    """
+    Search a file through a memory map.
+    
+    Args:
+        path: File to search (must not be empty)
+        regex: Compiled text regex; matched against each candidate line
+        prefilter: Bytes regex from compile_bytes_prefilter for the same pattern
+        context_lines: Number of context lines to include around matches
+    
+    Yields:
+        (line number, line text, text match, context dictionary or None)
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        pos = 0
+        counted_upto = 0
+        line_number = 1
+        
+        while pos < size:
+            hit = prefilter.search(mm, pos)
+            if hit is None:
+                break
+            
+            line_start = mm.rfind(b"\n", pos, hit.start()) + 1 or pos
+            line_end = mm.find(b"\n", hit.start())
+            next_pos = size if line_end == -1 else line_end + 1
+            
+            line_number += _count_newlines(mm, counted_upto, line_start)
+            counted_upto = line_start
+            pos = next_pos
+            
+            line = _decode_line(mm[line_start:next_pos])
+            line_matches = list(regex.finditer(line))
+            if not line_matches:
+                continue
+            
+            context = None
+            if context_lines > 0:
+                before = []
+                start = line_start
+                while start > 0 and len(before) < context_lines:
+                    prev_start = mm.rfind(b"\n", 0, start - 1) + 1
+                    before.append(_decode_line(mm[prev_start:start]).rstrip())
+                    start = prev_start
+                
+                after = []
+                start = next_pos
+                while start < size and len(after) < context_lines:
+                    end = mm.find(b"\n", start)
+                    end = size if end == -1 else end + 1
+                    after.append(_decode_line(mm[start:end]).rstrip())
+                    start = end
+                
+                context = {
+                    "context_start": line_number - len(before),
+                    "context_end": line_number + len(after),
+                    "context_lines": before[::-1] + [line.rstrip()] + after
+                }
+            
+            for match in line_matches:
+                yield line_number, line, match, context
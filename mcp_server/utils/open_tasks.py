@@ -0,0 +1,308 @@
+"""
+Open Task Index
+
+Persistent index of still-open ("started") task timing rows in the active
+task timing file, mapping task_id to the row's byte offset and start time.
+Stopping a task rewrites only that row and the bytes after it, through a
+crash-safe journaled tail rewrite, instead of parsing the whole file, and
+orphaned starts can be listed without touching the TSV at all.
+
+The index is validated against the active file's (inode, mtime, size)
+signature and rebuilt with one streaming pass when another writer has
+changed the file, so it survives restarts and untracked writes.
+"""
+
+import csv
+import io
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import logging
+
+from ..models import TaskTimingData, format_tsv_row, task_timing_from_row
+from .atomic_write import replace_tail
+from .helpers import safe_json_load, safe_json_save, format_timestamp, parse_timestamp, file_signature
+from .timing_store import get_task_timing_store, timing_file_lock
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+
+def _is_open(entry: TaskTimingData) -> bool:
+    """Check whether an entry is a still-open task start."""
+    return entry.task_id is not None and entry.result == "started" and entry.end_time is None
+
+
+def iter_rows_with_offsets(path: Path) -> Iterator[Tuple[int, int, Optional[TaskTimingData]]]:
+    """
+    Stream task timing rows together with their byte offsets.
+    
+    Lines are fed to the csv reader one at a time while counting bytes, so
+    quoted fields spanning several lines still get exact row boundaries.
+    
+    Args:
+        path: Task timing TSV file
+    
+    Yields:
+        (offset, length, entry) tuples; entry is None for the header and skipped rows
+    """
+    consumed = 0
+    
+    with open(path, 'rb') as f:
+        def lines() -> Iterator[str]:
+            nonlocal consumed
+            for raw in f:
+                consumed += len(raw)
+                yield raw.decode('utf-8')
+        
+        reader = csv.reader(lines(), delimiter="\t", quotechar='"')
+        offset = 0
+        first = True
+        for parts in reader:
+            entry = None if first else task_timing_from_row(parts)
+            first = False
+            yield offset, consumed - offset, entry
+            offset = consumed
+
+
+class OpenTaskIndex:
+    """
+    Index of open task rows in the active task timing file.
+    
+    Stored as JSON next to the segment manifest:
+    ``{"signature": [...], "tasks": {task_id: [{offset, length, start_time, mode, task}, ...]}}``.
+    Each task_id maps to a stack of open rows in file order, so stopping a
+    task closes its most recent start, as the full-scan lookup did.
+    """
+    
+    def __init__(self, head_path: Path, index_path: Path):
+        """
+        Initialize OpenTaskIndex.
+        
+        Args:
+            head_path: Active task timing file
+            index_path: Path of the JSON index file
+        """
+        self.head_path = head_path
+        self.index_path = index_path
+    
+    # Persistence
+    
+    def _empty(self) -> Dict[str, Any]:
+        """Create an empty index structure."""
+        return {"version": INDEX_VERSION, "signature": None, "tasks": {}}
+    
+    def _save(self, data: Dict[str, Any]) -> bool:
+        """Save the index atomically."""
+        data["updated_at"] = format_timestamp()
+        return safe_json_save(data, self.index_path)
+    
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Rebuild the index with one streaming pass over the active file.
+        
+        Returns:
+            The rebuilt index
+        """
+        data = self._empty()
+        signature = file_signature(self.head_path)
+        
+        if signature is not None:
+            for offset, length, entry in iter_rows_with_offsets(self.head_path):
+                if entry is not None and _is_open(entry):
+                    data["tasks"].setdefault(entry.task_id, []).append(self._record(entry, offset, length))
+        
+        data["signature"] = signature
+        self._save(data)
+        logger.info(f"Rebuilt open task index ({sum(len(r) for r in data['tasks'].values())} open)")
+        return data
+    
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the index, rebuilding it if the active file changed behind its back.
+        
+        Returns:
+            Index dictionary
+        """
+        data = safe_json_load(self.index_path) if self.index_path.exists() else None
+        if (not data or data.get("version") != INDEX_VERSION or
+                data.get("signature") != file_signature(self.head_path)):
+            return self.rebuild()
+        return data
+    
+    @staticmethod
+    def _record(entry: TaskTimingData, offset: int, length: int) -> Dict[str, Any]:
+        """Create an index record for an open row."""
+        return {
+            "offset": offset,
+            "length": length,
+            "start_time": entry.start_time,
+            "mode": entry.mode,
+            "task": entry.task
+        }
+    
+    def signature(self) -> Optional[List[int]]:
+        """Get the current signature of the active file."""
+        return file_signature(self.head_path)
+    
+    # Updates
+    
+    def record_start(self, previous_signature: Optional[List[int]], entry: TaskTimingData) -> bool:
+        """
+        Register a start row that was just appended to the active file.
+        
+        The row is located from the end of the file, so this is only valid
+        right after the append; if the index did not match the file before
+        the append it is left stale and rebuilt on next use.
+        
+        Args:
+            previous_signature: Active file signature taken before the append
+            entry: The appended entry
+        
+        Returns:
+            True if the index was updated incrementally
+        """
+        data = safe_json_load(self.index_path) if self.index_path.exists() else None
+        if not data or previous_signature is None or data.get("signature") != previous_signature:
+            return False
+        
+        signature = self.signature()
+        length = len(format_tsv_row(entry).encode('utf-8'))
+        offset = signature[2] - length
+        data["tasks"].setdefault(entry.task_id, []).append(self._record(entry, offset, length))
+        data["signature"] = signature
+        return self._save(data)
+    
+    def _read_row(self, record: Dict[str, Any]) -> Optional[TaskTimingData]:
+        """Read and parse the row an index record points at."""
+        with open(self.head_path, 'rb') as f:
+            f.seek(record["offset"])
+            raw = f.read(record["length"])
+        
+        try:
+            parts = next(csv.reader(io.StringIO(raw.decode('utf-8'), newline=''), delimiter="\t", quotechar='"'), None)
+        except (UnicodeDecodeError, csv.Error):
+            return None
+        return task_timing_from_row(parts) if parts else None
+    
+    def close(
+        self,
+        task_id: str,
+        update: Callable[[TaskTimingData], TaskTimingData]
+    ) -> Optional[Tuple[TaskTimingData, TaskTimingData]]:
+        """
+        Close the most recent open row for a task.
+        
+        The new row and the bytes after it are streamed through
+        replace_tail, so the cost is proportional to the distance from the
+        row to the end of the file (small for recent tasks), not to the file
+        size, and a crash mid-rewrite is replayed on the next locked write.
+        The offsets of later open rows are shifted by the change in row
+        length. Runs under the active file's lock.
+        
+        Args:
+            task_id: Task ID to close
+            update: Callable turning the started entry into the closed entry
+        
+        Returns:
+            (started_entry, closed_entry) tuple, or None if the task is not open
+        """
+        with timing_file_lock(self.head_path):
+            data = self.load()
+            
+            for attempt in range(2):
+                records = data["tasks"].get(task_id)
+                if not records:
+                    return None
+                
+                record = records[-1]
+                started_entry = self._read_row(record)
+                if started_entry is not None and started_entry.task_id == task_id and _is_open(started_entry):
+                    break
+                
+                # The index pointed at the wrong bytes; rebuild once from the file
+                logger.warning(f"Open task index out of date for task {task_id}, rebuilding")
+                data = self.rebuild()
+            else:
+                return None
+            
+            closed_entry = update(started_entry)
+            new_row = format_tsv_row(closed_entry).encode('utf-8')
+            
+            with open(self.head_path, 'rb') as f:
+                f.seek(record["offset"] + record["length"])
+                replace_tail(self.head_path, record["offset"], new_row, source=f)
+            
+            delta = len(new_row) - record["length"]
+            records.pop()
+            if not records:
+                del data["tasks"][task_id]
+            if delta:
+                for other in data["tasks"].values():
+                    for item in other:
+                        if item["offset"] > record["offset"]:
+                            item["offset"] += delta
+            
+            data["signature"] = self.signature()
+            self._save(data)
+            return started_entry, closed_entry
+    
+    # Queries
+    
+    def open_tasks(self) -> List[Dict[str, Any]]:
+        """
+        List all open tasks.
+        
+        Returns:
+            List of dictionaries with task_id, start_time, mode and task
+        """
+        data = self.load()
+        return [
+            {"task_id": task_id, "start_time": r["start_time"], "mode": r["mode"], "task": r["task"]}
+            for task_id, records in data["tasks"].items()
+            for r in records
+        ]
+    
+    def orphaned(self, older_than: timedelta, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        List open tasks started longer ago than a threshold.
+        
+        Args:
+            older_than: Age after which an open task counts as orphaned
+            now: Reference time (defaults to current UTC time)
+        
+        Returns:
+            List of open task dictionaries with an added open_hours field, oldest first
+        """
+        now = now or datetime.now(timezone.utc)
+        orphans = []
+        for task in self.open_tasks():
+            started = parse_timestamp(task["start_time"])
+            if started is None or now - started < older_than:
+                continue
+            orphans.append({**task, "open_hours": round((now - started).total_seconds() / 3600, 1)})
+        return sorted(orphans, key=lambda t: t["start_time"])
+
+
+# Index instances by head path
+_indexes: Dict[str, OpenTaskIndex] = {}
+
+
+def get_open_task_index(head_path: Optional[Path] = None) -> OpenTaskIndex:
+    """
+    Get the open task index for a task timing head file.
+    
+    Args:
+        head_path: Active task timing file (defaults to the configured file)
+    
+    Returns:
+        OpenTaskIndex instance
+    """
+    store = get_task_timing_store(head_path)
+    index = _indexes.get(str(store.head_path))
+    if index is None:
+        index = OpenTaskIndex(store.head_path, store.segments_dir / "open_tasks.json")
+        _indexes[str(store.head_path)] = index
+    return index
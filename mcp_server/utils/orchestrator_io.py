@@ -7,20 +7,27 @@ task_timing.tsv, persistent-memory.md, and other orchestrator components.
 
 import json
 import csv
-import re
 import os
 import time
-from typing import Dict, List, Any, Optional, Union, IO
-from datetime import datetime, timedelta
+import threading
+from typing import Dict, List, Any, Optional, Union, IO, Iterator, Iterable, Callable, Tuple
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import logging
 
 from ..models import (
     ScheduleData, SchedulesContainer, TaskTimingData, TaskTimingContainer,
-    PersistentMemoryEntry, PersistentMemorySection, PriorityType
+    PersistentMemoryEntry, PersistentMemorySection, PriorityType,
+    iter_tsv, write_tsv
 )
 from ..config.settings import get_server_config
-from ..utils.helpers import safe_json_load, safe_json_save, format_timestamp
+from ..utils.helpers import safe_json_load, safe_json_save, format_timestamp, create_backup
+from .timing_store import get_task_timing_store, timing_file_lock
+from .timing_rollups import get_task_timing_rollups
+from .todo_parser import get_todo_document
+from .backup_store import get_backup_store, backup_key
+from .workspace_watcher import FileChange, subscribe, publish_changes, watcher_active
+from .shared_cache import load_shared
 
 
 logger = logging.getLogger(__name__)
@@ -54,13 +61,27 @@ class OrchestratorIO:
         # File state tracking
         self._file_states = {}
         self._last_sync_times = {}
+        
+        # Change notifications for the files above: paths changed since their
+        # state was recorded, per-path change counters and parsed contents
+        self._lock = threading.Lock()
+        self._tracked = {
+            os.path.abspath(path) for path in (
+                self.schedules_path, self.task_timing_path, self.persistent_memory_path,
+                self.todo_path, self.modes_path
+            )
+        }
+        self._changed = set()
+        self._versions: Dict[str, int] = {}
+        self._loaded: Dict[str, Any] = {}
     
-    def get_file_state(self, file_path: Path) -> Dict[str, Any]:
+    def get_file_state(self, file_path: Path, checksum: bool = True) -> Dict[str, Any]:
         """
         Get current state of a file including timestamps and checksums.
         
         Args:
             file_path: Path to file
+            checksum: Whether to hash the file content
             
         Returns:
             Dictionary containing file state information
@@ -73,7 +94,7 @@ class OrchestratorIO:
             "exists": True,
             "last_modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
             "size": stat.st_size,
-            "checksum": self._calculate_file_checksum(file_path)
+            "checksum": self._calculate_file_checksum(file_path) if checksum else None
         }
     
     def _calculate_file_checksum(self, file_path: Path) -> Optional[str]:
@@ -98,12 +119,17 @@ class OrchestratorIO:
         Returns:
             True if file has changed, False otherwise
         """
-        current_state = self.get_file_state(file_path)
         file_key = str(file_path)
-        
         if file_key not in self._file_states:
             return True  # First time seeing this file
         
+        # A running watcher reports every change, so no stat or hash is needed
+        if watcher_active():
+            with self._lock:
+                return os.path.abspath(file_path) in self._changed
+        
+        current_state = self.get_file_state(file_path)
+        
         previous_state = self._file_states[file_key]
         
         return (
@@ -114,7 +140,72 @@ class OrchestratorIO:
     
     def update_file_state(self, file_path: Path) -> None:
         """Update tracked state for a file."""
-        self._file_states[str(file_path)] = self.get_file_state(file_path)
+        file_key = str(file_path)
+        with self._lock:
+            self._changed.discard(os.path.abspath(file_path))
+        self._file_states[file_key] = self.get_file_state(file_path, checksum=not watcher_active())
+    
+    def on_changes(self, changes: List[FileChange]) -> None:
+        """
+        Record change notifications for the orchestrator files.
+        
+        Args:
+            changes: Changed paths from the workspace watcher
+        """
+        with self._lock:
+            for change in changes:
+                if change.kind == "overflow":
+                    keys = self._tracked
+                elif change.path in self._tracked:
+                    keys = (change.path,)
+                else:
+                    continue
+                for key in keys:
+                    self._changed.add(key)
+                    self._versions[key] = self._versions.get(key, 0) + 1
+                    self._loaded.pop(key, None)
+    
+    def file_version(self, file_path: Path) -> int:
+        """
+        Get a counter that changes whenever a file is reported changed.
+        
+        Args:
+            file_path: Path to an orchestrator file
+            
+        Returns:
+            Change counter for use in cache keys
+        """
+        with self._lock:
+            return self._versions.get(os.path.abspath(file_path), 0)
+    
+    def load_if_changed(self, file_path: Path, loader: Callable[[], Any], copy: Callable[[Any], Any]) -> Any:
+        """
+        Parse an orchestrator file, reusing the last result while a watcher reports no change.
+        
+        Args:
+            file_path: File the loader reads
+            loader: Reads and parses the file
+            copy: Makes a copy of a parsed result safe to hand to callers
+            
+        Returns:
+            Parsed file content
+        """
+        if not watcher_active():
+            value = loader()
+            self.update_file_state(file_path)
+            return value
+        
+        file_key = os.path.abspath(file_path)
+        with self._lock:
+            if file_key in self._loaded and file_key not in self._changed:
+                return copy(self._loaded[file_key])
+        # Record the state first so a change during the read is not lost
+        self.update_file_state(file_path)
+        value = loader()
+        with self._lock:
+            if file_key not in self._changed:
+                self._loaded[file_key] = value
+        return copy(value)
 
 
 # Global orchestrator I/O instance
@@ -126,11 +217,46 @@ def get_orchestrator_io() -> OrchestratorIO:
     global _orchestrator_io
     if _orchestrator_io is None:
         _orchestrator_io = OrchestratorIO()
+        subscribe(_orchestrator_io.on_changes)
     return _orchestrator_io
 
 
 # Direct functions for common operations
 
+def backup_state_file(path: Path, backup_name: Optional[str] = None) -> Tuple[Optional[Path], Optional[int]]:
+    """
+    Back up an orchestrator state file before it is rewritten.
+    
+    With the backup store enabled the file is stored as a delta against its
+    previous backup, so growing files like persistent-memory.md and
+    task_timing.tsv cost about as much as what was added since. Otherwise a
+    full copy is written to the backups directory.
+    
+    Args:
+        path: State file to back up
+        backup_name: Name of the full copy (defaults to a timestamped name)
+    
+    Returns:
+        Tuple of (backup path, backup store version id); the path is None if
+        the backup failed
+    """
+    config = get_server_config()
+    try:
+        if config.backup_store_enabled:
+            version = get_backup_store().put(path, backup_key(path, config.workspace_path), delta=True)
+            return Path(version["object_path"]), version["id"]
+        if backup_name is None:
+            return create_backup(path), None
+        backup_path = config.get_backups_dir() / backup_name
+        backup_path.parent.mkdir(parents=True, exist_ok=True)
+        import shutil
+        shutil.copy2(path, backup_path)
+        return backup_path, None
+    except Exception as e:
+        logger.error(f"Failed to back up {path}: {e}")
+        return None, None
+
+
 def load_schedules() -> Optional[SchedulesContainer]:
     """
     Load schedules from .roo/schedules.json.
@@ -145,11 +271,13 @@ def load_schedules() -> Optional[SchedulesContainer]:
             logger.warning(f"Schedules file not found: {io.schedules_path}")
             return SchedulesContainer(schedules=[])
         
-        with open(io.schedules_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        def _load() -> SchedulesContainer:
+            with open(io.schedules_path, 'r', encoding='utf-8') as f:
+                return SchedulesContainer.from_dict(json.load(f))
         
-        schedules_container = SchedulesContainer.from_dict(data)
-        io.update_file_state(io.schedules_path)
+        schedules_container = io.load_if_changed(
+            io.schedules_path, _load, lambda container: container.model_copy(deep=True)
+        )
         
         logger.info(f"Loaded {len(schedules_container.schedules)} schedules")
         return schedules_container
@@ -187,6 +315,7 @@ def save_schedules(schedules_container: SchedulesContainer) -> bool:
         )
         
         if success:
+            publish_changes([io.schedules_path])
             io.update_file_state(io.schedules_path)
             logger.info(f"Saved {len(schedules_container.schedules)} schedules")
         
@@ -201,6 +330,10 @@ def load_task_timing() -> TaskTimingContainer:
     """
     Load task timing data from task_timing.tsv.
     
+    task_timing.tsv is the active segment: rows of the current period plus any
+    still-open tasks. Older rows live in time-partitioned segments; use
+    iter_task_timing_range() to query history.
+    
     Returns:
         TaskTimingContainer instance
     """
@@ -211,10 +344,9 @@ def load_task_timing() -> TaskTimingContainer:
             logger.info("Task timing file not found, creating new container")
             return TaskTimingContainer()
         
-        with open(io.task_timing_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with open(io.task_timing_path, 'r', encoding='utf-8', newline='') as f:
+            timing_container = TaskTimingContainer.from_stream(f)
         
-        timing_container = TaskTimingContainer.from_tsv(content)
         io.update_file_state(io.task_timing_path)
         
         logger.info(f"Loaded {len(timing_container.entries)} task timing entries")
@@ -240,21 +372,20 @@ def save_task_timing(timing_container: TaskTimingContainer) -> bool:
     try:
         # Create backup
         if io.task_timing_path.exists():
-            backup_path = io.config.get_backups_dir() / f"task_timing_backup_{int(time.time())}.tsv"
-            backup_path.parent.mkdir(parents=True, exist_ok=True)
-            import shutil
-            shutil.copy2(io.task_timing_path, backup_path)
+            backup_state_file(io.task_timing_path, f"task_timing_backup_{int(time.time())}.tsv")
         
         # Save timing data
-        tsv_content = timing_container.to_tsv()
         io.task_timing_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(io.task_timing_path, 'w', encoding='utf-8') as f:
-            f.write(tsv_content)
+        with open(io.task_timing_path, 'w', encoding='utf-8', newline='') as f:
+            write_tsv(f, timing_container.entries)
         
+        publish_changes([io.task_timing_path])
         io.update_file_state(io.task_timing_path)
         logger.info(f"Saved {len(timing_container.entries)} task timing entries")
         
+        _rollover_task_timing(io.task_timing_path)
+        
         return True
         
     except Exception as e:
@@ -262,6 +393,86 @@ def save_task_timing(timing_container: TaskTimingContainer) -> bool:
         return False
 
 
+def iter_task_timing(path: Optional[Path] = None) -> Iterator[TaskTimingData]:
+    """
+    Stream task timing entries from task_timing.tsv one row at a time.
+    
+    Args:
+        path: TSV file to read (defaults to the configured task timing file)
+        
+    Yields:
+        TaskTimingData entries in file order
+    """
+    path = path or get_orchestrator_io().task_timing_path
+    if not path.exists():
+        return
+    
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        yield from iter_tsv(f)
+
+
+def iter_task_timing_range(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    path: Optional[Path] = None
+) -> Iterator[TaskTimingData]:
+    """
+    Stream task timing entries across all time segments within a range.
+    
+    Only segments whose period overlaps the range are opened.
+    
+    Args:
+        start: Range start (inclusive, aware UTC)
+        end: Range end (inclusive, aware UTC)
+        path: Active task timing file (defaults to the configured file)
+        
+    Yields:
+        TaskTimingData entries whose start_time falls within the range
+    """
+    path = path or get_orchestrator_io().task_timing_path
+    yield from get_task_timing_store(path).iter_entries(start, end)
+
+
+def _rollover_task_timing(path: Path) -> None:
+    """Roll past-period rows out of the active task timing file if due."""
+    try:
+        get_task_timing_store(path).maybe_rollover()
+    except Exception as e:
+        logger.warning(f"Task timing rollover failed: {e}")
+
+
+def append_task_timing_entries(entries: Iterable[TaskTimingData], path: Optional[Path] = None) -> int:
+    """
+    Append entries to task_timing.tsv without reading the existing rows.
+    
+    Args:
+        entries: Entries to append
+        path: TSV file to append to (defaults to the configured task timing file)
+        
+    Returns:
+        Number of entries appended
+    """
+    path = path or get_orchestrator_io().task_timing_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Held so an open task being closed or a rollover cannot race the append
+    with timing_file_lock(path):
+        needs_header = not path.exists() or path.stat().st_size == 0
+        needs_newline = False
+        if not needs_header:
+            # Legacy files may not end with a newline; never glue a row onto the last one
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        
+        with open(path, 'a', encoding='utf-8', newline='') as f:
+            if needs_newline:
+                f.write("\n")
+            count = write_tsv(f, entries, include_header=needs_header)
+    publish_changes([path])
+    return count
+
+
 def load_persistent_memory() -> Dict[str, str]:
     """
     Load persistent memory content from persistent-memory.md.
@@ -276,12 +487,14 @@ def load_persistent_memory() -> Dict[str, str]:
             logger.info("Persistent memory file not found, creating new structure")
             return _create_default_persistent_memory()
         
-        with open(io.persistent_memory_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        def _parse() -> Dict[str, str]:
+            with open(io.persistent_memory_path, 'r', encoding='utf-8') as f:
+                return _parse_persistent_memory_sections(f.read())
         
-        # Parse sections
-        sections = _parse_persistent_memory_sections(content)
-        io.update_file_state(io.persistent_memory_path)
+        def _load() -> Dict[str, str]:
+            return load_shared("persistent_memory_sections", io.persistent_memory_path, _parse)
+        
+        sections = io.load_if_changed(io.persistent_memory_path, _load, dict)
         
         logger.info(f"Loaded persistent memory with {len(sections)} sections")
         return sections
@@ -306,10 +519,7 @@ def save_persistent_memory(sections: Dict[str, str]) -> bool:
     try:
         # Create backup
         if io.persistent_memory_path.exists():
-            backup_path = io.config.get_backups_dir() / f"persistent_memory_backup_{int(time.time())}.md"
-            backup_path.parent.mkdir(parents=True, exist_ok=True)
-            import shutil
-            shutil.copy2(io.persistent_memory_path, backup_path)
+            backup_state_file(io.persistent_memory_path, f"persistent_memory_backup_{int(time.time())}.md")
         
         # Build content
         content_parts = ["# Persistent Memory\\n"]
@@ -341,6 +551,7 @@ def save_persistent_memory(sections: Dict[str, str]) -> bool:
         with open(io.persistent_memory_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
+        publish_changes([io.persistent_memory_path])
         io.update_file_state(io.persistent_memory_path)
         logger.info(f"Saved persistent memory with {len(sections)} sections")
         
@@ -365,24 +576,10 @@ def load_todo_status() -> Dict[str, Any]:
             logger.info("TODO file not found")
             return {"todos": [], "total": 0, "completed": 0, "pending": 0}
         
-        with open(io.todo_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Parse TODO items
-        todo_pattern = r'-\s*\[([ xX])\]\s*(.+)'
-        todos = []
-        
-        lines = content.split('\\n')
-        for line in lines:
-            if line.startswith('- ['):
-                match = re.match(todo_pattern, line)
-                if match:
-                    completed = match.group(1).lower() == 'x'
-                    todo_text = match.group(2).strip()
-                    todos.append({"text": todo_text, "completed": completed})
-        
-        completed_count = sum(1 for todo in todos if todo["completed"])
-        pending_count = len(todos) - completed_count
+        document = get_todo_document(io.todo_path)
+        todos = [{"text": item["text"], "completed": item["completed"]} for item in document.items]
+        completed_count = document.completed_count
+        pending_count = document.pending_count
         
         io.update_file_state(io.todo_path)
         
@@ -631,48 +828,31 @@ def get_time_tracking_summary(
     Returns:
         Dictionary containing timing summary
     """
-    timing_container = load_task_timing()
+    io = get_orchestrator_io()
     
     try:
-        # Filter entries
-        current_time = datetime.utcnow()
+        # Summed from hourly rollups; only the partial hour at the cutoff is scanned
+        current_time = datetime.now(timezone.utc)
         cutoff_time = current_time - timedelta(hours=hours)
         
-        filtered_entries = []
-        for entry in timing_container.entries:
-            try:
-                entry_time = datetime.fromisoformat(entry.start_time.replace("Z", "+00:00"))
-                if entry_time >= cutoff_time:
-                    
-                    # Apply filters
-                    if mode and entry.mode != mode:
-                        continue
-                    if priority and entry.priority != priority:
-                        continue
-                    
-                    filtered_entries.append(entry)
-            except (ValueError, TypeError):
-                continue
+        summary = get_task_timing_rollups(io.task_timing_path).summarize(
+            start=cutoff_time, mode=mode, priority=priority
+        )
         
         # Calculate summary
-        total_duration = sum(e.duration or 0 for e in filtered_entries)
-        completed_entries = [e for e in filtered_entries if e.result == "completed"]
-        total_tasks = len(completed_entries)
+        total_duration = summary["total_duration"]
+        total_tasks = summary["completed"]
         avg_duration = total_duration / total_tasks if total_tasks > 0 else 0
         
         # Group by mode
-        mode_summary = {}
-        for entry in filtered_entries:
-            mode_name = entry.mode or "unknown"
-            if mode_name not in mode_summary:
-                mode_summary[mode_name] = {"count": 0, "total_duration": 0}
-            mode_summary[mode_name]["count"] += 1
-            if entry.duration:
-                mode_summary[mode_name]["total_duration"] += entry.duration
+        mode_summary = {
+            mode_name: {"count": stats["count"], "total_duration": stats["total_duration"]}
+            for mode_name, stats in summary["by_mode"].items()
+        }
         
         return {
             "period_hours": hours,
-            "total_entries": len(filtered_entries),
+            "total_entries": summary["count"],
             "total_duration_seconds": total_duration,
             "total_tasks": total_tasks,
             "average_duration_seconds": avg_duration,
@@ -0,0 +1,198 @@
+"""
+Search Result Cache
+
+Per-file results of search_in_files, kept for the most recent queries.
+A query is identified by everything that shapes a single file's matches
+(compiled pattern, flags, match limit, line numbers and context), and its
+entry maps each searched file to the file's identity (inode, size,
+mtime_ns) at scan time and the matches found. A repeated query rescans
+only the files whose identity changed or that the workspace watcher (or a
+file tool in this process) reported changed, and reuses the rest.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from ..config.settings import get_server_config
+from .workspace_watcher import FileChange, subscribe
+
+
+logger = logging.getLogger(__name__)
+
+# Queries whose cached matches would exceed this many are not kept
+MAX_CACHED_MATCHES = 10000
+
+Identity = Tuple[int, int, int]
+QueryKey = Tuple[str, int, Optional[int], bool, int]
+
+
+def file_identity(st: os.stat_result) -> Identity:
+    """
+    Get the identity a cached file result is validated against.
+    
+    Args:
+        st: Stat result of the file
+    
+    Returns:
+        Tuple of (inode, size, mtime_ns)
+    """
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class SearchResultCache:
+    """
+    LRU cache of per-file search results for the most recent queries.
+    
+    Each query entry is a dictionary of absolute path -> (identity, matches);
+    the least recently stored query is evicted first.
+    """
+    
+    def __init__(self, max_queries: int):
+        """
+        Initialize SearchResultCache.
+        
+        Args:
+            max_queries: Number of queries to keep results for; 0 disables the cache
+        """
+        self.max_queries = max_queries
+        self._queries: "OrderedDict[QueryKey, Dict[str, Tuple[Identity, Tuple[Dict[str, Any], ...]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def query_key(
+        pattern: str,
+        flags: int,
+        max_matches: Optional[int],
+        include_line_numbers: bool,
+        context_lines: int
+    ) -> QueryKey:
+        """
+        Build the key of a query from the options that shape per-file results.
+        
+        The directory and file pattern only choose which files are searched,
+        so queries differing in those share their per-file results.
+        
+        Args:
+            pattern: Final regex pattern, including any whole-word anchors
+            flags: Regex flags
+            max_matches: Per-query match limit
+            include_line_numbers: Whether matches carry line numbers
+            context_lines: Context lines included around matches
+        
+        Returns:
+            Hashable query key
+        """
+        return (pattern, flags, max_matches or None, include_line_numbers, context_lines)
+    
+    def lookup(self, key: QueryKey, path: str, identity: Identity) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached matches of one file if it is unchanged since it was scanned.
+        
+        Args:
+            key: Query key
+            path: Absolute file path
+            identity: Current identity of the file
+        
+        Returns:
+            List of matches, or None when the file needs to be scanned
+        """
+        with self._lock:
+            files = self._queries.get(key)
+            entry = files.get(path) if files is not None else None
+            if entry is None or entry[0] != identity:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(entry[1])
+    
+    def store(self, key: QueryKey, results: Dict[str, Tuple[Identity, List[Dict[str, Any]]]]) -> None:
+        """
+        Record the per-file results of a query run.
+        
+        Results are merged into the query's entry, so files the run did not
+        reach (after stopping early) keep any earlier results.
+        
+        Args:
+            key: Query key
+            results: Absolute path -> (identity at scan time, matches)
+        """
+        if not self.max_queries:
+            return
+        with self._lock:
+            files = self._queries.pop(key, None) or {}
+            for path, (identity, matches) in results.items():
+                files[path] = (identity, tuple(matches))
+            if sum(len(matches) for _, matches in files.values()) > MAX_CACHED_MATCHES:
+                return
+            self._queries[key] = files
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+    
+    def on_changes(self, changes: List[FileChange]) -> None:
+        """
+        Drop the results of changed paths from every query.
+        
+        Args:
+            changes: Changed paths from the workspace watcher
+        """
+        with self._lock:
+            for change in changes:
+                if change.kind == "overflow":
+                    self._queries.clear()
+                    return
+                for files in self._queries.values():
+                    if change.is_dir:
+                        prefix = os.path.join(change.path, "")
+                        for path in [path for path in files if path.startswith(prefix)]:
+                            del files[path]
+                    else:
+                        files.pop(change.path, None)
+    
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._queries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with query and file counts and per-file hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "queries": len(self._queries),
+                "files": sum(len(files) for files in self._queries.values()),
+                "max_queries": self.max_queries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global cache instance
+_search_cache: Optional[SearchResultCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """
+    Get the shared search result cache, configured from the server settings.
+    
+    Returns:
+        SearchResultCache instance
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            config = get_server_config()
+            _search_cache = SearchResultCache(config.search_cache_queries if config.cache_enabled else 0)
+            subscribe(_search_cache.on_changes)
+        return _search_cache
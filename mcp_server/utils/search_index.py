@@ -0,0 +1,427 @@
+"""
+Persistent Trigram Search Index
+
+SQLite-backed trigram index over workspace text files, used by
+search_in_files to narrow regex queries to candidate files before any file
+is opened. The index is kept up to date incrementally: files whose mtime or
+size changed since they were indexed, or that the workspace watcher reported
+changed, are re-read, removed files are dropped.
+
+Only ASCII trigrams are indexed. Text is folded before indexing (ASCII
+lowercased, the few non-ASCII characters that match ASCII letters under
+re.IGNORECASE mapped to those letters, newlines normalized), so candidate
+selection is a superset of the true matches for case-sensitive and
+case-insensitive queries alike.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple, Union
+from pathlib import Path
+import logging
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from ..config.settings import get_server_config
+from .workspace_watcher import FileChange, subscribe
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# ASCII uppercase -> lowercase, plus non-ASCII characters that re.IGNORECASE
+# treats as equal to an ASCII letter (dotted/dotless I, long s, Kelvin sign)
+_FOLD_TABLE = {ord(c): ord(c.lower()) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+_FOLD_TABLE.update({0x130: ord("i"), 0x131: ord("i"), 0x17F: ord("s"), 0x212A: ord("k")})
+
+_NON_ASCII = re.compile(r"[^\x01-\x7f]")
+
+# Query tree: None matches every file, ("lit", text) requires a literal,
+# ("and", [...]) / ("or", [...]) combine sub-queries
+Query = Optional[Tuple[str, Any]]
+
+
+def fold_text(text: str) -> str:
+    """
+    Fold text the way the index sees it.
+    
+    Args:
+        text: Decoded file content or literal
+    
+    Returns:
+        Folded text with normalized newlines and non-ASCII characters masked
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n").translate(_FOLD_TABLE)
+    return _NON_ASCII.sub("\x00", text)
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Get the set of indexable trigrams of some text.
+    
+    Args:
+        text: Raw (unfolded) text
+    
+    Returns:
+        Set of 3-character ASCII strings
+    """
+    folded = fold_text(text)
+    return {t for t in (folded[i:i + 3] for i in range(len(folded) - 2)) if "\x00" not in t}
+
+
+def _sequence_query(items) -> Query:
+    """Build a query from a parsed regex sequence."""
+    parts = []
+    run: List[str] = []
+    
+    def flush():
+        if len(run) >= 3:
+            parts.append(("lit", "".join(run)))
+        run.clear()
+    
+    for op, av in items:
+        if op is sre_constants.LITERAL and 0 < av < 128:
+            run.append(chr(av))
+            continue
+        if op is sre_constants.AT:
+            # Zero-width assertions keep neighbouring literals adjacent
+            continue
+        
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            parts.append(_sequence_query(av[-1]))
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            parts.append(_sequence_query(av))
+        elif op is sre_constants.BRANCH:
+            alternatives = [_sequence_query(alt) for alt in av[1]]
+            if all(alt is not None for alt in alternatives):
+                parts.append(("or", alternatives))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                    getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+            low, _, body = av
+            if low >= 1:
+                parts.append(_sequence_query(body))
+    
+    flush()
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else ("and", parts)
+
+
+def build_query(pattern: str, flags: int = 0) -> Query:
+    """
+    Extract the literals a regex requires as a trigram query.
+    
+    Args:
+        pattern: Regular expression
+        flags: re flags the pattern is compiled with
+    
+    Returns:
+        Query tree, or None if the pattern requires no indexable literal
+    """
+    try:
+        return _sequence_query(sre_parse.parse(pattern, flags))
+    except Exception as e:
+        logger.debug(f"Could not extract literals from {pattern!r}: {e}")
+        return None
+
+
+class TrigramIndex:
+    """
+    Persistent trigram index stored in a SQLite database.
+    
+    Tables:
+        files(id, path, mtime_ns, size, indexed, trigrams): one row per file;
+            indexed=0 marks files that are always candidates (too large or
+            unreadable); trigrams keeps the posted trigrams for removal
+        postings(tri, file_id): one row per distinct trigram per file
+    """
+    
+    def __init__(self, db_path: Path, max_file_size: int = 4 * 1024 * 1024):
+        """
+        Initialize TrigramIndex.
+        
+        Args:
+            db_path: SQLite database path
+            max_file_size: Files larger than this are not indexed
+        """
+        self.db_path = db_path
+        self.max_file_size = max_file_size
+        self._lock = threading.Lock()
+        # Paths reported changed since they were last indexed; catches edits
+        # that keep the size and land within one mtime tick
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+    
+    def on_changes(self, changes: List[FileChange]) -> None:
+        """
+        Mark changed files for re-indexing.
+        
+        Args:
+            changes: Changed paths from the workspace watcher
+        """
+        with self._dirty_lock:
+            self._dirty.update(change.path for change in changes if not change.is_dir)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating the schema if needed."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.executescript("""
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS postings;
+                CREATE TABLE files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    indexed INTEGER NOT NULL,
+                    trigrams TEXT
+                );
+                CREATE TABLE postings (
+                    tri TEXT NOT NULL,
+                    file_id INTEGER NOT NULL,
+                    PRIMARY KEY (tri, file_id)
+                ) WITHOUT ROWID;
+            """)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.commit()
+        return conn
+    
+    @staticmethod
+    def _remove_postings(conn: sqlite3.Connection, file_id: int, old_trigrams: Optional[str]) -> None:
+        """Remove a file's postings using its stored trigram list."""
+        if old_trigrams:
+            conn.executemany(
+                "DELETE FROM postings WHERE tri = ? AND file_id = ?",
+                ((old_trigrams[i:i + 3], file_id) for i in range(0, len(old_trigrams), 3))
+            )
+    
+    @staticmethod
+    def _stored_trigrams(conn: sqlite3.Connection, row: Optional[Tuple]) -> Optional[str]:
+        """Fetch the packed trigram list of a known file row."""
+        if row is None:
+            return None
+        return conn.execute("SELECT trigrams FROM files WHERE id = ?", (row[0],)).fetchone()[0]
+    
+    def _index_file(self, conn: sqlite3.Connection, path: str, st: os.stat_result,
+                    file_id: Optional[int], old_trigrams: Optional[str]) -> None:
+        """(Re)index one file."""
+        if file_id is not None:
+            self._remove_postings(conn, file_id, old_trigrams)
+        
+        file_trigrams: Optional[Set[str]] = None
+        if st.st_size <= self.max_file_size:
+            try:
+                with open(path, "rb") as f:
+                    file_trigrams = trigrams(f.read().decode("utf-8", errors="ignore"))
+            except OSError as e:
+                logger.debug(f"Could not index {path}: {e}")
+        
+        indexed = file_trigrams is not None
+        packed = "".join(sorted(file_trigrams)) if indexed else None
+        
+        if file_id is None:
+            cursor = conn.execute(
+                "INSERT INTO files (path, mtime_ns, size, indexed, trigrams) VALUES (?, ?, ?, ?, ?)",
+                (path, st.st_mtime_ns, st.st_size, int(indexed), packed)
+            )
+            file_id = cursor.lastrowid
+        else:
+            conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, indexed = ?, trigrams = ? WHERE id = ?",
+                (st.st_mtime_ns, st.st_size, int(indexed), packed, file_id)
+            )
+        
+        if indexed:
+            conn.executemany(
+                "INSERT OR IGNORE INTO postings (tri, file_id) VALUES (?, ?)",
+                ((tri, file_id) for tri in file_trigrams)
+            )
+    
+    def update(self, conn: sqlite3.Connection, paths: Iterable[Union[str, Path]],
+               stats: Optional[Dict[str, os.stat_result]] = None,
+               root: Optional[Path] = None) -> Dict[str, int]:
+        """
+        Bring the index up to date for a set of files.
+        
+        Args:
+            conn: Open database connection
+            paths: Files that should be indexed
+            stats: Optional pre-fetched stat results by path
+            root: Directory the paths were enumerated from; indexed files
+                under it that no longer exist are dropped
+        
+        Returns:
+            Dictionary mapping each existing path to its file id
+        """
+        known = {
+            row[0]: row[1:]
+            for row in conn.execute("SELECT path, id, mtime_ns, size FROM files")
+        }
+        ids: Dict[str, int] = {}
+        changed = 0
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        
+        for path in paths:
+            path = str(path)
+            try:
+                st = stats[path] if stats and path in stats else os.stat(path)
+            except OSError:
+                continue
+            
+            row = known.get(path)
+            if (row is not None and row[1] == st.st_mtime_ns and row[2] == st.st_size and
+                    not (dirty and os.path.abspath(path) in dirty)):
+                ids[path] = row[0]
+                continue
+            
+            self._index_file(conn, path, st, row[0] if row else None, self._stored_trigrams(conn, row))
+            changed += 1
+            if row is None:
+                ids[path] = conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()[0]
+            else:
+                ids[path] = row[0]
+        
+        if dirty:
+            # Files outside this search stay marked for the next one
+            dirty.difference_update(os.path.abspath(path) for path in ids)
+            with self._dirty_lock:
+                self._dirty |= dirty
+        
+        # Drop files under the enumerated root that no longer exist
+        removed = []
+        if root is not None:
+            prefix = os.path.join(str(root), "")
+            removed = [
+                row for path, row in known.items()
+                if path not in ids and path.startswith(prefix) and not os.path.exists(path)
+            ]
+        for row in removed:
+            self._remove_postings(conn, row[0], self._stored_trigrams(conn, row))
+            conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+        
+        if changed or removed:
+            conn.commit()
+            logger.info(f"Search index updated: {changed} files indexed, {len(removed)} removed")
+        return ids
+    
+    def _evaluate(self, conn: sqlite3.Connection, query: Query, cache: Dict[str, Set[int]]) -> Optional[Set[int]]:
+        """Evaluate a query tree to a set of file ids (None means all files)."""
+        if query is None:
+            return None
+        
+        kind, value = query
+        if kind == "lit":
+            result: Optional[Set[int]] = None
+            # Rarest trigrams first would be ideal; sorted order keeps lookups deterministic
+            for tri in sorted(trigrams(value)):
+                if tri not in cache:
+                    cache[tri] = {row[0] for row in conn.execute(
+                        "SELECT file_id FROM postings WHERE tri = ?", (tri,)
+                    )}
+                result = cache[tri] if result is None else result & cache[tri]
+                if not result:
+                    return set()
+            return result
+        
+        results = [self._evaluate(conn, sub, cache) for sub in value]
+        if kind == "and":
+            narrowed = [r for r in results if r is not None]
+            if not narrowed:
+                return None
+            result = narrowed[0]
+            for r in narrowed[1:]:
+                result = result & r
+            return result
+        
+        # "or"
+        if any(r is None for r in results):
+            return None
+        return set().union(*results)
+    
+    def candidates(self, paths: List[Path], pattern: str, flags: int = 0,
+                   stats: Optional[Dict[str, os.stat_result]] = None,
+                   root: Optional[Path] = None) -> List[Path]:
+        """
+        Narrow a list of files to those that may match a regex.
+        
+        Args:
+            paths: Files to consider, in search order
+            pattern: Regular expression
+            flags: re flags the pattern is compiled with
+            stats: Optional pre-fetched stat results by path
+            root: Directory the paths were enumerated from
+        
+        Returns:
+            Subset of paths (order preserved) that may contain a match
+        """
+        query = build_query(pattern, flags)
+        if query is None:
+            return paths
+        
+        with self._lock:
+            conn = self._connect()
+            try:
+                ids = self.update(conn, paths, stats, root)
+                matching = self._evaluate(conn, query, {})
+                if matching is None:
+                    return paths
+                unindexed = {row[0] for row in conn.execute("SELECT id FROM files WHERE indexed = 0")}
+            finally:
+                conn.close()
+        
+        keep = matching | unindexed
+        return [p for p in paths if ids.get(str(p)) in keep]
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+        
+        Returns:
+            Dictionary with file, unindexed file and posting counts
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                files = conn.execute("SELECT COUNT(*), SUM(indexed = 0) FROM files").fetchone()
+                postings = conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+            finally:
+                conn.close()
+        return {"files": files[0], "unindexed_files": files[1] or 0, "postings": postings}
+
+
+# Index instances by database path
+_indexes: Dict[str, TrigramIndex] = {}
+
+
+def get_search_index() -> TrigramIndex:
+    """
+    Get the trigram index for the configured workspace.
+    
+    Returns:
+        TrigramIndex instance
+    """
+    config = get_server_config()
+    db_path = config.get_search_index_path()
+    index = _indexes.get(str(db_path))
+    if index is None:
+        index = TrigramIndex(db_path, max_file_size=config.search_index_max_file_size)
+        subscribe(index.on_changes)
+        _indexes[str(db_path)] = index
+    return index
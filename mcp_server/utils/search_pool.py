@@ -0,0 +1,276 @@
+"""
+Search Worker Pool
+
+File scanning for search_in_files and the choice of where it runs. Small
+scans run inline, mid-sized ones on a thread pool, and large ones on a
+shared process pool so regex matching is not serialized by the GIL. Process
+workers receive contiguous batches of file paths, compile the pattern once,
+and return compact match tuples rather than match objects:
+
+    (line number, line text, match text, match start, match end, context)
+
+where context is the context dictionary shared by all matches on a line,
+or None.
+"""
+
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from .mmap_search import compile_bytes_prefilter, iter_mapped_matches
+
+
+logger = logging.getLogger(__name__)
+
+# Scans reading less than this run in the calling thread
+INLINE_MAX_BYTES = 256 * 1024
+
+# Process batches aim at this many bytes, so a worker spends its time matching
+# rather than exchanging messages, while early stops waste little work
+BATCH_TARGET_BYTES = 4 * 1024 * 1024
+BATCH_MAX_FILES = 256
+
+# Thread workers check the cancel flag every this many lines
+_CANCEL_CHECK_LINES = 1024
+
+Match = Tuple[int, str, str, int, int, Optional[Dict[str, Any]]]
+
+
+def default_workers() -> int:
+    """
+    Get the default number of search workers.
+    
+    Returns:
+        Number of CPUs, capped at 8
+    """
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def choose_backend(
+    file_count: int,
+    total_bytes: int,
+    requested: str = "auto",
+    process_min_bytes: int = 16 * 1024 * 1024,
+    workers: Optional[int] = None
+) -> str:
+    """
+    Choose where a scan runs from its size.
+    
+    Args:
+        file_count: Number of files to scan
+        total_bytes: Total size of those files
+        requested: Configured backend; anything but "auto" is used as is
+        process_min_bytes: Smallest scan worth starting worker processes for
+        workers: Number of workers available (default: one per CPU, up to 8)
+    
+    Returns:
+        "inline", "thread" or "process"
+    """
+    if requested != "auto":
+        return requested
+    if file_count <= 1 or total_bytes < INLINE_MAX_BYTES:
+        return "inline"
+    if (workers or default_workers()) > 1 and total_bytes >= process_min_bytes:
+        return "process"
+    return "thread"
+
+
+def make_batches(files: List[Tuple[str, int]], workers: int) -> List[List[Tuple[str, int]]]:
+    """
+    Split files into contiguous batches for process workers.
+    
+    Batches keep the file order, hold at most BATCH_MAX_FILES files, and are
+    small enough that every worker gets several of them.
+    
+    Args:
+        files: (path, size) pairs in search order
+        workers: Number of worker processes
+    
+    Returns:
+        List of batches
+    """
+    total = sum(size for _, size in files)
+    target = max(1, min(BATCH_TARGET_BYTES, total // (workers * 4)))
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for path, size in files:
+        batch.append((path, size))
+        batch_bytes += size
+        if batch_bytes >= target or len(batch) >= BATCH_MAX_FILES:
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _iter_text_matches(path: str, regex: "re.Pattern", context_lines: int, cancel: Optional[threading.Event]):
+    """Yield (line number, line, match, context) from a text-mode read."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+    
+    for line_num, line in enumerate(lines, 1):
+        if cancel is not None and not line_num % _CANCEL_CHECK_LINES and cancel.is_set():
+            return
+        context = None
+        for match in regex.finditer(line):
+            if context is None and context_lines > 0:
+                start_line = max(0, line_num - 1 - context_lines)
+                end_line = min(len(lines), line_num + context_lines)
+                context = {
+                    "context_start": start_line + 1,
+                    "context_end": end_line,
+                    "context_lines": [lines[i].rstrip() for i in range(start_line, end_line)]
+                }
+            yield line_num, line, match, context
+
+
+def scan_file(
+    path: str,
+    size: int,
+    regex: "re.Pattern",
+    prefilter: Optional["re.Pattern"],
+    context_lines: int = 0,
+    max_matches: Optional[int] = None,
+    mmap_threshold: int = 1024 * 1024,
+    cancel: Optional[threading.Event] = None
+) -> List[Match]:
+    """
+    Find the matches of a regex in one file.
+    
+    Files of at least mmap_threshold bytes are searched memory-mapped when the
+    pattern has a bytes prefilter; others are read as text.
+    
+    Args:
+        path: File path
+        size: File size in bytes
+        regex: Compiled text regex
+        prefilter: Bytes prefilter from compile_bytes_prefilter, or None
+        context_lines: Number of context lines to include around matches
+        max_matches: Stop after this many matches (optional)
+        mmap_threshold: Size at which files are memory-mapped
+        cancel: Event that stops the scan early when set (optional)
+    
+    Returns:
+        List of compact match tuples
+    
+    Raises:
+        OSError: If the file cannot be read
+    """
+    if prefilter is not None and size and size >= mmap_threshold:
+        found = iter_mapped_matches(path, regex, prefilter, context_lines)
+    else:
+        found = _iter_text_matches(path, regex, context_lines, cancel)
+    
+    matches = []
+    for line_num, line, match, context in found:
+        if (cancel is not None and cancel.is_set()) or (max_matches and len(matches) >= max_matches):
+            break
+        matches.append((line_num, line.rstrip(), match.group(), match.start(), match.end(), context))
+    return matches
+
+
+@lru_cache(maxsize=32)
+def _compile(pattern: str, flags: int) -> Tuple["re.Pattern", Optional["re.Pattern"]]:
+    return re.compile(pattern, flags), compile_bytes_prefilter(pattern, flags)
+
+
+def scan_batch(
+    files: List[Tuple[str, int]],
+    pattern: str,
+    flags: int,
+    context_lines: int = 0,
+    max_matches: Optional[int] = None,
+    mmap_threshold: int = 1024 * 1024
+) -> List[Optional[List[Match]]]:
+    """
+    Scan a batch of files; runs in a worker process.
+    
+    The batch stops once it has found max_matches in total, since the caller
+    stops there too, so the result may cover fewer files than were given.
+    
+    Args:
+        files: (path, size) pairs in search order
+        pattern: Regex pattern
+        flags: Regex flags
+        context_lines: Number of context lines to include around matches
+        max_matches: Match limit of the search (optional)
+        mmap_threshold: Size at which files are memory-mapped
+    
+    Returns:
+        Per-file list of compact match tuples, or None for unreadable files
+    """
+    regex, prefilter = _compile(pattern, flags)
+    results = []
+    found = 0
+    for path, size in files:
+        try:
+            matches = scan_file(path, size, regex, prefilter, context_lines, max_matches, mmap_threshold)
+        except Exception as e:
+            logger.warning(f"Error searching in file {path}: {e}")
+            results.append(None)
+            continue
+        results.append(matches)
+        found += len(matches)
+        if max_matches and found >= max_matches:
+            break
+    return results
+
+
+# Shared process pool
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Get the shared search process pool, starting it on first use.
+    
+    Workers are started from a fork server where available, so they do not
+    inherit the server's threads and open files.
+    
+    Args:
+        workers: Number of worker processes
+    
+    Returns:
+        ProcessPoolExecutor instance
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool_workers != workers:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _process_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+            _process_pool_workers = workers
+        return _process_pool
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """
+    Stop the shared search process pool, if it was started.
+    
+    The next search starts a new pool, so this also recovers from a worker
+    process that died.
+    
+    Args:
+        wait: Whether to wait for running batches to finish
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait, cancel_futures=True)
+            _process_pool = None
+
+
+atexit.register(shutdown_process_pool)
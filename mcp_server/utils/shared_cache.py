@@ -0,0 +1,248 @@
+"""
+Shared Parse Cache
+
+Optional SQLite store of parsed workspace files, shared by every MCP server
+process working on the same workspace. Entries are keyed by a namespace (the
+kind of parse) and the file path, and are only used while the file still has
+the (inode, mtime, size) signature it was parsed from, so a server that
+starts up or sees a file for the first time can reuse a parse another server
+already did.
+
+Values are stored as zlib-compressed JSON rather than pickles, so the
+database file cannot be used to run code in a server that reads it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Any, Optional, Callable
+from pathlib import Path
+import logging
+
+from ..config.settings import get_server_config
+from .helpers import file_signature
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+
+class SharedParseCache:
+    """
+    Parse results stored in a SQLite database shared between processes.
+    
+    Tables:
+        entries(namespace, path, ino, mtime_ns, size, value, stored_at): one
+            row per parsed file; value is zlib-compressed JSON
+    """
+    
+    def __init__(self, db_path: Path, max_entries: int = 256):
+        """
+        Initialize SharedParseCache.
+        
+        Args:
+            db_path: SQLite database path
+            max_entries: Entries kept; the least recently stored are dropped
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        # One connection per thread; sqlite3 connections are not shared
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, creating the schema if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.executescript("""
+                DROP TABLE IF EXISTS entries;
+                CREATE TABLE entries (
+                    namespace TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    ino INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    value BLOB NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, path)
+                );
+                CREATE INDEX entries_stored_at ON entries (stored_at);
+            """)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.commit()
+        self._local.conn = conn
+        return conn
+    
+    def get(self, namespace: str, path: str, signature: List[int]) -> Optional[Any]:
+        """
+        Get a stored parse result.
+        
+        Args:
+            namespace: Kind of parse result
+            path: Absolute file path
+            signature: Current [inode, mtime_ns, size] of the file
+        
+        Returns:
+            Decoded value, or None if missing, stale or unreadable
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT ino, mtime_ns, size, value FROM entries WHERE namespace = ? AND path = ?",
+                (namespace, path)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Shared cache read failed for {path}: {e}")
+            self.errors += 1
+            return None
+        
+        if row is None or list(row[:3]) != list(signature):
+            self.misses += 1
+            return None
+        try:
+            value = json.loads(zlib.decompress(row[3]))
+        except (zlib.error, ValueError) as e:
+            logger.debug(f"Ignoring corrupt shared cache entry for {path}: {e}")
+            self.errors += 1
+            return None
+        self.hits += 1
+        return value
+    
+    def put(self, namespace: str, path: str, signature: List[int], value: Any) -> bool:
+        """
+        Store a parse result, replacing any previous one for the file.
+        
+        Args:
+            namespace: Kind of parse result
+            path: Absolute file path
+            signature: [inode, mtime_ns, size] the value was parsed from
+            value: JSON-serializable parse result
+        
+        Returns:
+            True if stored, False otherwise
+        """
+        try:
+            data = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (namespace, path, signature[0], signature[1], signature[2], data, time.time())
+                )
+                conn.execute(
+                    "DELETE FROM entries WHERE rowid IN "
+                    "(SELECT rowid FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.debug(f"Shared cache write failed for {path}: {e}")
+            self.errors += 1
+            return False
+        self.stores += 1
+        return True
+    
+    def clear(self) -> None:
+        """Remove all stored entries."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with stored entry count and bytes, and this process's counters
+        """
+        row = self._connect().execute("SELECT COUNT(*), SUM(LENGTH(value)) FROM entries").fetchone()
+        return {
+            "entries": row[0],
+            "bytes": row[1] or 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors
+        }
+
+
+# Cache instances by database path
+_caches: Dict[str, SharedParseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedParseCache]:
+    """
+    Get the shared parse cache for the configured workspace.
+    
+    Returns:
+        SharedParseCache instance, or None if the shared tier is disabled
+    """
+    config = get_server_config()
+    if not config.shared_cache_enabled:
+        return None
+    db_path = config.get_shared_cache_path()
+    with _caches_lock:
+        cache = _caches.get(str(db_path))
+        if cache is None:
+            cache = SharedParseCache(db_path, max_entries=config.shared_cache_max_entries)
+            _caches[str(db_path)] = cache
+        return cache
+
+
+def load_shared(
+    namespace: str,
+    path: Path,
+    parse: Callable[[], Any],
+    encode: Optional[Callable[[Any], Any]] = None,
+    decode: Optional[Callable[[Any], Any]] = None
+) -> Any:
+    """
+    Parse a file, reusing the result another server process stored for it.
+    
+    Without the shared tier this just calls parse. Otherwise a stored result
+    for the file's current signature is decoded and returned; failing that
+    the file is parsed and the result stored if the file did not change
+    while it was read.
+    
+    Args:
+        namespace: Kind of parse result
+        path: File the parser reads
+        parse: Reads and parses the file
+        encode: Converts a parse result to JSON-serializable data (optional)
+        decode: Converts stored data back to a parse result (optional)
+    
+    Returns:
+        Parse result
+    """
+    cache = get_shared_cache()
+    signature = file_signature(path) if cache is not None else None
+    if signature is None:
+        return parse()
+    
+    key = os.path.abspath(path)
+    stored = cache.get(namespace, key, signature)
+    if stored is not None:
+        try:
+            return decode(stored) if decode else stored
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug(f"Ignoring undecodable shared cache entry for {path}: {e}")
+    
+    value = parse()
+    if file_signature(path) == signature:
+        cache.put(namespace, key, signature, encode(value) if encode else value)
+    return value
@@ -0,0 +1,347 @@
+"""
+Task Timing Rollups
+
+Pre-aggregated counters for task timing data, bucketed per hour x mode x
+priority. Summaries over any window are answered by summing buckets instead
+of scanning rows; only the partial hours at the window edges are read from
+the underlying segments.
+
+Rollups are kept per source: one bucket set for the active file, validated
+by its file signature, and one per segment, validated by the manifest row
+count. Stale sources are rebuilt lazily with a single streaming pass, so
+writes that bypass the incremental hooks are picked up on the next query.
+"""
+
+from typing import Dict, List, Any, Optional, Iterable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import logging
+
+from ..models import TaskTimingData, PriorityType, iter_tsv
+from .helpers import safe_json_load, safe_json_save, format_timestamp, parse_timestamp, file_signature
+from .timing_store import TaskTimingStore, get_task_timing_store
+
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS_VERSION = 1
+
+# Bucket value layout: [count, started, completed, total_duration]
+COUNT, STARTED, COMPLETED, DURATION = range(4)
+
+HOUR = timedelta(hours=1)
+
+
+def _hour_key(dt: Optional[datetime]) -> str:
+    """Get the bucket hour key for a datetime ("" when unknown)."""
+    return dt.strftime("%Y-%m-%dT%H") if dt else ""
+
+
+def _hour_start(key: str) -> datetime:
+    """Get the aware UTC start of a bucket hour key."""
+    return datetime.strptime(key, "%Y-%m-%dT%H").replace(tzinfo=timezone.utc)
+
+
+def _floor_hour(dt: datetime) -> datetime:
+    """Truncate a datetime to the start of its hour."""
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _priority_value(priority: Any) -> str:
+    """Normalize a priority to its string value."""
+    if priority is None:
+        return ""
+    return priority.value if hasattr(priority, 'value') else str(priority)
+
+
+def bucket_key(entry: TaskTimingData) -> str:
+    """
+    Get the rollup bucket key for an entry.
+    
+    Args:
+        entry: Task timing entry
+    
+    Returns:
+        Key of the form "<hour>|<mode>|<priority>"
+    """
+    hour = _hour_key(parse_timestamp(entry.start_time))
+    return f"{hour}|{entry.mode or ''}|{_priority_value(entry.priority)}"
+
+
+def _entry_values(entry: TaskTimingData) -> List[int]:
+    """Get a single entry's contribution as bucket values."""
+    return [
+        1,
+        1 if entry.result == "started" else 0,
+        1 if entry.result == "completed" else 0,
+        entry.duration or 0
+    ]
+
+
+def _add_entry(buckets: Dict[str, List[int]], entry: TaskTimingData, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) an entry's contribution to buckets."""
+    key = bucket_key(entry)
+    values = buckets.setdefault(key, [0, 0, 0, 0])
+    for i, value in enumerate(_entry_values(entry)):
+        values[i] += sign * value
+    if not any(values):
+        del buckets[key]
+
+
+def _build_buckets(entries: Iterable[TaskTimingData]) -> Dict[str, List[int]]:
+    """Aggregate entries into buckets with a single pass."""
+    buckets: Dict[str, List[int]] = {}
+    for entry in entries:
+        _add_entry(buckets, entry)
+    return buckets
+
+
+class TaskTimingRollups:
+    """
+    Hourly rollups of task timing data per mode and priority.
+    
+    Stored as JSON next to the segment manifest. The active file's buckets
+    are updated incrementally by track_task_time; segment buckets only change
+    on rollover and are rebuilt per segment when their row count changes.
+    """
+    
+    def __init__(self, store: TaskTimingStore):
+        """
+        Initialize TaskTimingRollups.
+        
+        Args:
+            store: Task timing store the rollups summarize
+        """
+        self.store = store
+        self.rollups_path = store.segments_dir / "rollups.json"
+    
+    # Persistence
+    
+    def _load(self) -> Dict[str, Any]:
+        """Load stored rollups (empty structure if none or incompatible)."""
+        data = safe_json_load(self.rollups_path) if self.rollups_path.exists() else None
+        if not data or data.get("version") != ROLLUPS_VERSION:
+            return {
+                "version": ROLLUPS_VERSION,
+                "head": {"signature": None, "buckets": {}},
+                "segments": {}
+            }
+        return data
+    
+    def _save(self, data: Dict[str, Any]) -> bool:
+        """Save rollups atomically."""
+        data["updated_at"] = format_timestamp()
+        return safe_json_save(data, self.rollups_path)
+    
+    def head_signature(self) -> Optional[List[int]]:
+        """Get the current signature of the active file."""
+        return file_signature(self.store.head_path)
+    
+    # Freshness
+    
+    def _refresh(self, data: Dict[str, Any]) -> bool:
+        """
+        Rebuild stale sources in place.
+        
+        Returns:
+            True if anything was rebuilt
+        """
+        changed = False
+        
+        signature = self.head_signature()
+        if data["head"]["signature"] != signature:
+            # Keep the signature taken before reading so a concurrent write
+            # leaves the rollups stale rather than silently wrong
+            buckets = {}
+            if signature is not None:
+                with open(self.store.head_path, 'r', encoding='utf-8', newline='') as f:
+                    buckets = _build_buckets(iter_tsv(f))
+            data["head"] = {"signature": signature, "buckets": buckets}
+            changed = True
+        
+        segments = self.store.load_manifest()["segments"]
+        for key in list(data["segments"]):
+            if key not in segments:
+                del data["segments"][key]
+                changed = True
+        
+        for key, info in segments.items():
+            cached = data["segments"].get(key)
+            if cached and cached.get("rows") == info.get("rows"):
+                continue
+            try:
+                with self.store._open_segment(info) as f:
+                    buckets = _build_buckets(iter_tsv(f))
+            except FileNotFoundError:
+                logger.warning(f"Task timing segment missing: {info['file']}")
+                buckets = {}
+            data["segments"][key] = {"rows": info.get("rows"), "buckets": buckets}
+            changed = True
+        
+        return changed
+    
+    def buckets(self) -> Dict[str, List[int]]:
+        """
+        Get merged buckets across all sources, rebuilding stale ones.
+        
+        Returns:
+            Dictionary mapping bucket keys to [count, started, completed, total_duration]
+        """
+        data = self._load()
+        if self._refresh(data):
+            self._save(data)
+        
+        merged: Dict[str, List[int]] = {}
+        sources = [data["head"]["buckets"]] + [s["buckets"] for s in data["segments"].values()]
+        for buckets in sources:
+            for key, values in buckets.items():
+                target = merged.setdefault(key, [0, 0, 0, 0])
+                for i, value in enumerate(values):
+                    target[i] += value
+        return merged
+    
+    def rebuild(self) -> None:
+        """Discard stored rollups and rebuild them from all sources."""
+        data = self._load()
+        data["head"]["signature"] = None
+        data["segments"] = {}
+        self._refresh(data)
+        self._save(data)
+    
+    # Incremental updates
+    
+    def apply_head_change(
+        self,
+        previous_signature: Optional[List[int]],
+        added: Iterable[TaskTimingData] = (),
+        removed: Iterable[TaskTimingData] = ()
+    ) -> bool:
+        """
+        Apply a known change to the active file's buckets.
+        
+        The change is only applied if the stored rollups matched the file
+        before the write; otherwise they are left stale and rebuilt lazily.
+        
+        Args:
+            previous_signature: Active file signature taken before the write
+            added: Entries written
+            removed: Entries replaced or deleted
+        
+        Returns:
+            True if the rollups were updated incrementally
+        """
+        data = self._load()
+        if previous_signature is None or data["head"]["signature"] != previous_signature:
+            return False
+        
+        buckets = data["head"]["buckets"]
+        for entry in removed:
+            _add_entry(buckets, entry, sign=-1)
+        for entry in added:
+            _add_entry(buckets, entry)
+        data["head"]["signature"] = self.head_signature()
+        return self._save(data)
+    
+    # Queries
+    
+    def summarize(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        mode: Optional[str] = None,
+        priority: Optional[PriorityType] = None
+    ) -> Dict[str, Any]:
+        """
+        Summarize entries whose start_time falls within a time range.
+        
+        Whole hours inside the range are summed from buckets; entries in the
+        partial hours at the range edges are read from the store.
+        
+        Args:
+            start: Range start (inclusive, aware UTC)
+            end: Range end (inclusive, aware UTC)
+            mode: Filter by mode (optional)
+            priority: Filter by priority (optional)
+        
+        Returns:
+            Dictionary with count, started, completed, total_duration and by_mode
+        """
+        priority_value = _priority_value(priority) if priority else None
+        summary = {"count": 0, "started": 0, "completed": 0, "total_duration": 0, "by_mode": {}}
+        
+        def add(entry_mode: str, values: List[int]) -> None:
+            summary["count"] += values[COUNT]
+            summary["started"] += values[STARTED]
+            summary["completed"] += values[COMPLETED]
+            summary["total_duration"] += values[DURATION]
+            stats = summary["by_mode"].setdefault(
+                entry_mode or "unknown", {"count": 0, "total_duration": 0, "completed": 0}
+            )
+            stats["count"] += values[COUNT]
+            stats["total_duration"] += values[DURATION]
+            stats["completed"] += values[COMPLETED]
+        
+        bounded = start is not None or end is not None
+        edge_hours = set()
+        
+        for key, values in self.buckets().items():
+            hour, entry_mode, entry_priority = key.split("|", 2)
+            if mode and entry_mode != mode:
+                continue
+            if priority_value and entry_priority != priority_value:
+                continue
+            if not hour:
+                # Rows without a parseable start time only match unbounded queries
+                if not bounded:
+                    add(entry_mode, values)
+                continue
+            
+            hour_start = _hour_start(hour)
+            if start and hour_start + HOUR <= start:
+                continue
+            if end and hour_start > end:
+                continue
+            if (start and hour_start < start) or (end and hour_start + HOUR > end):
+                edge_hours.add(hour_start)
+                continue
+            add(entry_mode, values)
+        
+        for hour_start in sorted(edge_hours):
+            window_start = max(start, hour_start) if start else hour_start
+            window_end = min(end, hour_start + HOUR) if end else hour_start + HOUR
+            for entry in self.store.iter_entries(window_start, window_end):
+                if _floor_hour(parse_timestamp(entry.start_time)) != hour_start:
+                    continue
+                if mode and entry.mode != mode:
+                    continue
+                if priority_value and _priority_value(entry.priority) != priority_value:
+                    continue
+                add(entry.mode, _entry_values(entry))
+        
+        return summary
+    
+    def total_entries(self) -> int:
+        """Count all entries across sources from the rollups."""
+        return sum(values[COUNT] for values in self.buckets().values())
+
+
+# Rollup instances by head path
+_rollups: Dict[str, TaskTimingRollups] = {}
+
+
+def get_task_timing_rollups(head_path: Optional[Path] = None) -> TaskTimingRollups:
+    """
+    Get the rollups for a task timing head file.
+    
+    Args:
+        head_path: Active task timing file (defaults to the configured file)
+    
+    Returns:
+        TaskTimingRollups instance
+    """
+    store = get_task_timing_store(head_path)
+    rollups = _rollups.get(str(store.head_path))
+    if rollups is None or rollups.store is not store:
+        rollups = TaskTimingRollups(store)
+        _rollups[str(store.head_path)] = rollups
+    return rollups
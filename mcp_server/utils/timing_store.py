@@ -0,0 +1,489 @@
+"""
+Time-Partitioned Task Timing Storage
+
+Keeps task_timing.tsv small by rolling closed rows from past periods into
+per-day or per-week segment files under a segments directory, tracked by a
+small JSON manifest. task_timing.tsv remains the active segment, so existing
+writers that append to it keep working unchanged.
+"""
+
+import gzip
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterator, Tuple, IO
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import logging
+
+from ..models import TaskTimingData, iter_tsv, write_tsv
+from ..config.settings import get_server_config
+from .helpers import safe_json_load, safe_json_save, format_timestamp, parse_timestamp, file_lock, file_signature
+from .atomic_write import recover_tail
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Head files whose lock the current thread holds, for re-entrant locking
+_held_locks = threading.local()
+
+
+@contextmanager
+def timing_file_lock(head_path: Path):
+    """
+    Hold the lock of an active task timing file.
+    
+    Every writer of the active file takes this lock. It is re-entrant within
+    a thread, so a caller can hold it across several writes and the index
+    updates that depend on them. The outermost acquisition also replays a
+    row rewrite that a crash interrupted, before anything else touches the file.
+    
+    Args:
+        head_path: Active task timing file
+    """
+    held = getattr(_held_locks, "paths", None)
+    if held is None:
+        held = _held_locks.paths = set()
+    
+    key = str(head_path)
+    if key in held:
+        yield
+        return
+    
+    with file_lock(head_path):
+        held.add(key)
+        try:
+            if head_path.exists():
+                recover_tail(head_path)
+            yield
+        finally:
+            held.discard(key)
+
+
+class TaskTimingStore:
+    """
+    Task timing storage partitioned into time segments.
+    
+    The head file (task_timing.tsv) holds rows of the current period plus any
+    still-open ("started") rows. Closed rows from earlier periods are moved
+    into segment files on rollover, and segments older than a configurable
+    age are gzip-compressed. Range queries only open the segments whose
+    period overlaps the requested window.
+    """
+    
+    def __init__(
+        self,
+        head_path: Path,
+        segments_dir: Optional[Path] = None,
+        partition: str = "day",
+        compress_after_days: Optional[int] = 7
+    ):
+        """
+        Initialize TaskTimingStore.
+        
+        Args:
+            head_path: Path to the active task timing TSV file
+            segments_dir: Directory for segment files and manifest
+            partition: Segment granularity ("day" or "week")
+            compress_after_days: Compress segments older than this many days (None disables)
+        """
+        if partition not in ("day", "week"):
+            raise ValueError("partition must be 'day' or 'week'")
+        
+        self.head_path = head_path
+        self.segments_dir = segments_dir or head_path.parent / "task_timing_segments"
+        self.manifest_path = self.segments_dir / "manifest.json"
+        self.partition = partition
+        self.compress_after_days = compress_after_days
+    
+    # Partition helpers
+    
+    def period_key(self, dt: datetime) -> str:
+        """Get the segment key for a datetime."""
+        if self.partition == "week":
+            year, week, _ = dt.isocalendar()
+            return f"{year}-W{week:02d}"
+        return dt.strftime("%Y-%m-%d")
+    
+    @staticmethod
+    def period_bounds(key: str) -> Tuple[datetime, datetime]:
+        """
+        Get the [start, end) UTC bounds of a segment key.
+        
+        The partition is read from the key format rather than the store
+        setting, so segments written under an earlier partition stay usable.
+        """
+        if "-W" in key:
+            year, week = key.split("-W")
+            start = datetime.fromisocalendar(int(year), int(week), 1)
+            end = start + timedelta(weeks=1)
+        else:
+            start = datetime.strptime(key, "%Y-%m-%d")
+            end = start + timedelta(days=1)
+        return start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)
+    
+    def segment_path(self, key: str, compressed: bool = False) -> Path:
+        """Get the file path for a segment key."""
+        name = f"{self.head_path.stem}_{key}{self.head_path.suffix}"
+        return self.segments_dir / (name + ".gz" if compressed else name)
+    
+    # Manifest
+    
+    def load_manifest(self) -> Dict[str, Any]:
+        """
+        Load the segment manifest.
+        
+        When the manifest was written under a different partition its
+        segments are kept: new segments use the current partition while the
+        old ones keep being read, and the head is rolled over on next use.
+        
+        Returns:
+            Manifest dictionary (empty manifest if none exists yet)
+        """
+        manifest = safe_json_load(self.manifest_path) if self.manifest_path.exists() else None
+        if not manifest:
+            return {
+                "version": MANIFEST_VERSION,
+                "partition": self.partition,
+                "head_period": None,
+                "segments": {}
+            }
+        if manifest.get("partition") != self.partition:
+            logger.info(
+                f"Task timing partition changed from {manifest.get('partition')} to {self.partition}; "
+                f"keeping {len(manifest['segments'])} existing segments"
+            )
+            manifest["partition"] = self.partition
+            manifest["head_period"] = None
+        return manifest
+    
+    def _save_manifest(self, manifest: Dict[str, Any]) -> bool:
+        """Save the segment manifest atomically."""
+        manifest["updated_at"] = format_timestamp()
+        return safe_json_save(manifest, self.manifest_path)
+    
+    # Reading
+    
+    def _open_segment(self, info: Dict[str, Any]) -> IO[str]:
+        """Open a segment file for reading."""
+        path = self.segments_dir / info["file"]
+        if info.get("compressed"):
+            return gzip.open(path, 'rt', encoding='utf-8', newline='')
+        return open(path, 'r', encoding='utf-8', newline='')
+    
+    def segments_for_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        manifest: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Get the segments whose period overlaps a time range.
+        
+        Args:
+            start: Range start (inclusive, aware UTC)
+            end: Range end (inclusive, aware UTC)
+            manifest: Manifest to use (loaded if None)
+        
+        Returns:
+            List of (key, segment_info) tuples in chronological order
+        """
+        manifest = manifest or self.load_manifest()
+        selected = []
+        # Day and week keys do not sort chronologically against each other
+        for key in sorted(manifest["segments"], key=lambda k: (self.period_bounds(k)[0], k)):
+            period_start, period_end = self.period_bounds(key)
+            if start and period_end <= start:
+                continue
+            if end and period_start > end:
+                continue
+            selected.append((key, manifest["segments"][key]))
+        return selected
+    
+    def iter_entries(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[TaskTimingData]:
+        """
+        Stream entries whose start_time falls within a time range.
+        
+        Only segments overlapping the range are opened; the head file is
+        always read. Without bounds, the full history is streamed.
+        
+        Args:
+            start: Range start (inclusive, aware UTC)
+            end: Range end (inclusive, aware UTC)
+        
+        Yields:
+            TaskTimingData entries, segments first, then the head file
+        """
+        for _, info in self.segments_for_range(start, end):
+            try:
+                with self._open_segment(info) as f:
+                    yield from self._filter_range(iter_tsv(f), start, end)
+            except FileNotFoundError:
+                logger.warning(f"Task timing segment missing: {info['file']}")
+        
+        if self.head_path.exists():
+            with open(self.head_path, 'r', encoding='utf-8', newline='') as f:
+                yield from self._filter_range(iter_tsv(f), start, end)
+    
+    @staticmethod
+    def _filter_range(
+        entries: Iterator[TaskTimingData],
+        start: Optional[datetime],
+        end: Optional[datetime]
+    ) -> Iterator[TaskTimingData]:
+        """Filter entries to a start_time range."""
+        if start is None and end is None:
+            yield from entries
+            return
+        
+        for entry in entries:
+            entry_dt = parse_timestamp(entry.start_time)
+            if entry_dt is None:
+                continue
+            if start and entry_dt < start:
+                continue
+            if end and entry_dt > end:
+                continue
+            yield entry
+    
+    def total_entries(self) -> int:
+        """Count all entries using manifest row counts plus the head file."""
+        manifest = self.load_manifest()
+        segment_rows = sum(info.get("rows", 0) for info in manifest["segments"].values())
+        head_rows = 0
+        if self.head_path.exists():
+            with open(self.head_path, 'r', encoding='utf-8', newline='') as f:
+                head_rows = sum(1 for _ in iter_tsv(f))
+        return segment_rows + head_rows
+    
+    # Rollover
+    
+    def maybe_rollover(self, now: Optional[datetime] = None) -> int:
+        """
+        Roll the head file over if the current period has changed.
+        
+        This only reads the manifest when no rollover is due, so it is cheap
+        to call after every write.
+        
+        Args:
+            now: Current time (defaults to utcnow)
+        
+        Returns:
+            Number of rows moved into segments
+        """
+        now = now or datetime.now(timezone.utc)
+        if self.load_manifest().get("head_period") == self.period_key(now):
+            return 0
+        return self.rollover(now)
+    
+    def rollover(self, now: Optional[datetime] = None, manifest: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Move closed rows from past periods out of the head file into segments.
+        
+        Rows of the current period, still-open rows and rows without a
+        parseable start_time stay in the head file. Segments past the
+        compression age are compressed afterwards.
+        
+        The split runs under the head file's lock. Moved rows are staged
+        first and only appended to their segments once the head is known not
+        to have changed while it was read; if it did (a writer that bypassed
+        the lock), nothing is moved and the rollover is retried on next use.
+        
+        Args:
+            now: Current time (defaults to utcnow)
+            manifest: Manifest to update (loaded under the lock if None)
+        
+        Returns:
+            Number of rows moved into segments
+        """
+        now = now or datetime.now(timezone.utc)
+        current_key = self.period_key(now)
+        moved = 0
+        
+        with timing_file_lock(self.head_path):
+            manifest = manifest or self.load_manifest()
+            if self.head_path.exists():
+                moved = self._split_head(current_key, manifest)
+                if moved is None:
+                    return 0
+            
+            manifest["head_period"] = current_key
+            if self.compress_after_days is not None:
+                self._compress_old_segments(manifest, now, self.compress_after_days)
+            self._save_manifest(manifest)
+        
+        if moved:
+            logger.info(f"Rolled {moved} task timing rows into segments")
+        return moved
+    
+    def _split_head(self, current_key: str, manifest: Dict[str, Any]) -> Optional[int]:
+        """
+        Split past-period closed rows out of the head file; the caller holds its lock.
+        
+        Returns:
+            Number of rows moved, or None if the head changed while being read
+        """
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.head_path.with_suffix(self.head_path.suffix + ".tmp")
+        signature = file_signature(self.head_path)
+        # Segment key -> [staged file, row count]; rows are mostly chronological, so few keys
+        staged: Dict[str, List[Any]] = {}
+        moved = 0
+        
+        try:
+            try:
+                with open(self.head_path, 'r', encoding='utf-8', newline='') as src, \
+                        open(temp_path, 'w', encoding='utf-8', newline='') as head_out:
+                    write_tsv(head_out, [])
+                    
+                    for entry in iter_tsv(src):
+                        entry_dt = parse_timestamp(entry.start_time)
+                        is_open = entry.result == "started" and entry.end_time is None
+                        key = self.period_key(entry_dt) if entry_dt else None
+                        
+                        if key is None or key >= current_key or is_open:
+                            write_tsv(head_out, [entry], include_header=False)
+                            continue
+                        
+                        if key not in staged:
+                            staged[key] = [open(self._staged_segment_path(key), 'w', encoding='utf-8', newline=''), 0]
+                        write_tsv(staged[key][0], [entry], include_header=False)
+                        staged[key][1] += 1
+                        moved += 1
+            finally:
+                for staged_file, _ in staged.values():
+                    staged_file.close()
+            
+            if file_signature(self.head_path) != signature:
+                logger.warning("Task timing file changed during rollover without holding its lock; retrying later")
+                return None
+            
+            for key, (_, rows) in staged.items():
+                with open(self._staged_segment_path(key), 'r', encoding='utf-8', newline='') as src, \
+                        self._open_segment_for_append(key, manifest) as dst:
+                    shutil.copyfileobj(src, dst)
+                manifest["segments"][key]["rows"] += rows
+            
+            if moved:
+                os.replace(temp_path, self.head_path)
+            return moved
+        finally:
+            temp_path.unlink(missing_ok=True)
+            for key in staged:
+                self._staged_segment_path(key).unlink(missing_ok=True)
+    
+    def _staged_segment_path(self, key: str) -> Path:
+        """Get the temporary file rows bound for a segment are staged in during rollover."""
+        return self.segments_dir / f".{self.segment_path(key).name}.staged"
+    
+    def _open_segment_for_append(self, key: str, manifest: Dict[str, Any]) -> IO[str]:
+        """Open a segment for appending, creating it and its manifest entry if needed."""
+        info = manifest["segments"].get(key)
+        if info is None:
+            period_start, period_end = self.period_bounds(key)
+            info = {
+                "file": self.segment_path(key).name,
+                "start": period_start.isoformat(),
+                "end": period_end.isoformat(),
+                "rows": 0,
+                "compressed": False
+            }
+            manifest["segments"][key] = info
+        
+        path = self.segments_dir / info["file"]
+        needs_header = not path.exists()
+        if info.get("compressed"):
+            # gzip supports appending new members to an existing archive
+            f = gzip.open(path, 'at', encoding='utf-8', newline='')
+        else:
+            f = open(path, 'a', encoding='utf-8', newline='')
+        if needs_header:
+            write_tsv(f, [])
+        return f
+    
+    def _compress_old_segments(self, manifest: Dict[str, Any], now: datetime, days: int) -> int:
+        """Compress uncompressed segments whose period ended more than `days` ago."""
+        cutoff = now - timedelta(days=days)
+        compressed = 0
+        
+        for key, info in manifest["segments"].items():
+            if info.get("compressed"):
+                continue
+            _, period_end = self.period_bounds(key)
+            if period_end > cutoff:
+                continue
+            
+            source = self.segments_dir / info["file"]
+            target = self.segment_path(key, compressed=True)
+            try:
+                with open(source, 'rb') as src, gzip.open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                source.unlink()
+            except OSError as e:
+                logger.warning(f"Failed to compress task timing segment {source}: {e}")
+                continue
+            
+            info["file"] = target.name
+            info["compressed"] = True
+            compressed += 1
+        
+        return compressed
+    
+    def compress_segments(self, older_than_days: Optional[int] = None, now: Optional[datetime] = None) -> int:
+        """
+        Compress segments older than a given age.
+        
+        Args:
+            older_than_days: Age threshold in days (defaults to the store setting)
+            now: Reference time (defaults to current UTC time)
+        
+        Returns:
+            Number of segments compressed
+        """
+        days = older_than_days if older_than_days is not None else (self.compress_after_days or 0)
+        manifest = self.load_manifest()
+        compressed = self._compress_old_segments(manifest, now or datetime.now(timezone.utc), days)
+        if compressed:
+            self._save_manifest(manifest)
+        return compressed
+
+
+# Store instances by head path
+_stores: Dict[str, TaskTimingStore] = {}
+
+
+def get_task_timing_store(head_path: Optional[Path] = None) -> TaskTimingStore:
+    """
+    Get the task timing store for a head file.
+    
+    Args:
+        head_path: Active task timing file (defaults to the configured file)
+    
+    Returns:
+        TaskTimingStore instance
+    """
+    config = get_server_config()
+    configured_head = config.get_task_timing_path()
+    head_path = head_path or configured_head
+    
+    store = _stores.get(str(head_path))
+    if store is None:
+        if head_path == configured_head:
+            segments_dir = config.get_task_timing_segments_dir()
+        else:
+            segments_dir = head_path.parent / config.task_timing_segments_dir.name
+        store = TaskTimingStore(
+            head_path,
+            segments_dir=segments_dir,
+            partition=config.task_timing_partition,
+            compress_after_days=config.task_timing_compress_after_days
+        )
+        _stores[str(head_path)] = store
+    return store
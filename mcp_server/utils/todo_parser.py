@@ -0,0 +1,300 @@
+"""
+TODO.md Parser
+
+Single-pass parser for TODO.md shared by the get_todo_status tool and
+orchestrator_io.load_todo_status. Parsed documents are cached per path and
+validated by the file's (inode, mtime, size) signature, so repeated planning
+queries are served from memory. When the file has only been appended to,
+just the new bytes are parsed. With the shared cache enabled, documents are
+also reused across server processes.
+"""
+
+import hashlib
+import re
+import threading
+from typing import Dict, List, Any, Optional, Iterable
+from pathlib import Path
+import logging
+
+from .helpers import file_signature
+from .shared_cache import load_shared
+
+
+logger = logging.getLogger(__name__)
+
+TODO_PATTERN = re.compile(r'-\s*\[([ xX])\]\s*(.+)')
+
+
+class TodoDocument:
+    """
+    Parsed TODO.md content.
+    
+    Holds the todo items in file order together with a per-section index and
+    completion counts. Items are dictionaries with text, completed, section
+    and line keys.
+    """
+    
+    def __init__(self):
+        """Initialize an empty TodoDocument."""
+        self.items: List[Dict[str, Any]] = []
+        self.sections: Dict[Optional[str], List[int]] = {}
+        self.completed_count = 0
+        self.signature: Optional[List[int]] = None
+        
+        # Incremental parse state at the end of the last complete line
+        self._parsed_upto = 0
+        self._prefix_digest: Optional[str] = None
+        self._committed_items = 0
+        self._committed_section: Optional[str] = None
+        self._section: Optional[str] = None
+    
+    def _clone(self) -> "TodoDocument":
+        """Copy the document so cached instances are never mutated in place."""
+        clone = TodoDocument()
+        clone.__dict__.update(self.__dict__)
+        clone.items = list(self.items)
+        clone.sections = {section: list(indexes) for section, indexes in self.sections.items()}
+        return clone
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the document, including its incremental parse state, to JSON-friendly data.
+        
+        Returns:
+            Dictionary accepted by from_dict
+        """
+        return {
+            "items": self.items,
+            "signature": self.signature,
+            "parsed_upto": self._parsed_upto,
+            "prefix_digest": self._prefix_digest,
+            "committed_items": self._committed_items,
+            "committed_section": self._committed_section,
+            "section": self._section
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TodoDocument":
+        """
+        Rebuild a document from to_dict output.
+        
+        Args:
+            data: Dictionary produced by to_dict
+        
+        Returns:
+            TodoDocument instance
+        """
+        document = cls()
+        document.items = data["items"]
+        for index, item in enumerate(document.items):
+            document.sections.setdefault(item["section"], []).append(index)
+            if item["completed"]:
+                document.completed_count += 1
+        document.signature = data["signature"]
+        document._parsed_upto = data["parsed_upto"]
+        document._prefix_digest = data["prefix_digest"]
+        document._committed_items = data["committed_items"]
+        document._committed_section = data["committed_section"]
+        document._section = data["section"]
+        return document
+    
+    @property
+    def total(self) -> int:
+        """Total number of todo items."""
+        return len(self.items)
+    
+    @property
+    def pending_count(self) -> int:
+        """Number of pending todo items."""
+        return len(self.items) - self.completed_count
+    
+    def _truncate(self, count: int) -> None:
+        """Drop items after the first `count`, keeping indexes consistent."""
+        for item in self.items[count:]:
+            if item["completed"]:
+                self.completed_count -= 1
+            indexes = self.sections[item["section"]]
+            indexes.pop()
+            if not indexes:
+                del self.sections[item["section"]]
+        del self.items[count:]
+    
+    def _feed(self, lines: Iterable[str]) -> None:
+        """Parse lines, continuing from the current section."""
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if line.startswith('#'):
+                self._section = line.strip()
+            elif line.startswith('- ['):
+                match = TODO_PATTERN.match(line)
+                if match:
+                    completed = match.group(1).lower() == 'x'
+                    self.sections.setdefault(self._section, []).append(len(self.items))
+                    self.items.append({
+                        "text": match.group(2).strip(),
+                        "completed": completed,
+                        "section": self._section,
+                        "line": line
+                    })
+                    if completed:
+                        self.completed_count += 1
+    
+    def iter_items(
+        self,
+        include_completed: bool = True,
+        search_pattern: Optional[str] = None,
+        section: Optional[str] = None
+    ) -> Iterable[Dict[str, Any]]:
+        """
+        Iterate todo items with optional filters.
+        
+        Args:
+            include_completed: Whether to include completed todos
+            search_pattern: Regular expression matched case-insensitively against todo text
+            section: Only yield todos under this section heading
+        
+        Yields:
+            Todo item dictionaries in file order
+        
+        Raises:
+            re.error: If search_pattern is not a valid regular expression
+        """
+        search = re.compile(search_pattern, re.IGNORECASE).search if search_pattern else None
+        
+        if section is not None:
+            items = (self.items[i] for i in self.sections.get(section, []))
+        else:
+            items = iter(self.items)
+        
+        for item in items:
+            if not include_completed and item["completed"]:
+                continue
+            if search and not search(item["text"]):
+                continue
+            yield item
+    
+    def section_summary(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get completion counts per section.
+        
+        Returns:
+            Dictionary mapping section headings to total/completed/pending counts
+        """
+        summary = {}
+        for section, indexes in self.sections.items():
+            completed = sum(1 for i in indexes if self.items[i]["completed"])
+            summary[section or "(none)"] = {
+                "total": len(indexes),
+                "completed": completed,
+                "pending": len(indexes) - completed
+            }
+        return summary
+
+
+def parse_todo_content(content: str) -> TodoDocument:
+    """
+    Parse TODO.md content in a single pass.
+    
+    Args:
+        content: TODO.md text
+    
+    Returns:
+        TodoDocument instance
+    """
+    document = TodoDocument()
+    document._feed(content.split('\n'))
+    return document
+
+
+def _parse_file(path: Path, document: Optional[TodoDocument] = None) -> TodoDocument:
+    """
+    Parse a TODO file, reusing a previous document when only appended to.
+    
+    The previous document is reused only if the file still starts with
+    every byte it parsed, checked against a digest of that whole prefix;
+    any edit before the old boundary means a full reparse.
+    
+    Args:
+        path: TODO.md path
+        document: Previously parsed document for the same path (optional)
+    
+    Returns:
+        Parsed TodoDocument (a new instance; the previous one is not modified)
+    """
+    signature = file_signature(path)
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    
+    start = 0
+    if (document is not None and document.signature is not None and
+            signature[0] == document.signature[0] and len(buffer) >= document._parsed_upto):
+        start = document._parsed_upto
+    
+    # Hashing the prefix is much cheaper than parsing it; the digest is then
+    # extended over the newly committed bytes
+    digest = hashlib.md5(buffer[:start])
+    if start and digest.hexdigest() != document._prefix_digest:
+        start = 0
+        digest = hashlib.md5()
+    
+    if start:
+        document = document._clone()
+        # Re-parse the partial last line (if any) on top of the committed state
+        document._truncate(document._committed_items)
+        document._section = document._committed_section
+    else:
+        document = TodoDocument()
+    
+    data = buffer[start:]
+    complete_end = data.rfind(b'\n') + 1
+    document._feed(data[:complete_end].decode('utf-8').split('\n'))
+    
+    document._parsed_upto = start + complete_end
+    document._committed_items = len(document.items)
+    document._committed_section = document._section
+    digest.update(data[:complete_end])
+    document._prefix_digest = digest.hexdigest()
+    
+    # A trailing line without newline is parsed but not committed
+    if complete_end < len(data):
+        document._feed([data[complete_end:].decode('utf-8')])
+    
+    document.signature = signature
+    logger.debug(f"Parsed {path} ({'incremental' if start else 'full'}, {document.total} todos)")
+    return document
+
+
+# Parsed documents by path
+_documents: Dict[str, TodoDocument] = {}
+_documents_lock = threading.Lock()
+
+
+def get_todo_document(path: Path) -> TodoDocument:
+    """
+    Get the parsed TODO document for a path, served from cache when unchanged.
+    
+    Args:
+        path: TODO.md path
+    
+    Returns:
+        TodoDocument instance (shared; do not mutate)
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    key = str(path)
+    with _documents_lock:
+        document = _documents.get(key)
+        signature = file_signature(path)
+        if signature is None:
+            _documents.pop(key, None)
+            raise FileNotFoundError(f"TODO file not found: {path}")
+        
+        if document is None or document.signature != signature:
+            previous = document
+            document = load_shared(
+                "todo_document", path, lambda: _parse_file(path, previous),
+                encode=TodoDocument.to_dict, decode=TodoDocument.from_dict
+            )
+            _documents[key] = document
+        return document
@@ -0,0 +1,66 @@
+"""
+Tool Result Caching
+
+cached_tool declares how a read-mostly tool's results are cached: the
+arguments that make up the key, the files whose changes invalidate a result,
+TTLs and size weight. Results are kept in the shared IntelligentCache from
+performance_optimizations when it is available, only for successful calls
+and only while cache_enabled is set; otherwise the tool runs uncached.
+"""
+
+from typing import Dict, Any, Optional, Callable, Iterable, Union
+import logging
+
+from ..config.settings import get_server_config
+
+# Performance optimization imports
+try:
+    from performance_optimizations import intelligent_cache
+    PERFORMANCE_OPTIMIZATIONS_AVAILABLE = True
+except ImportError:
+    PERFORMANCE_OPTIMIZATIONS_AVAILABLE = False
+    intelligent_cache = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _succeeded(result: Any) -> bool:
+    """Whether a tool result reports success."""
+    return isinstance(result, dict) and bool(result.get("success", False))
+
+
+def cached_tool(
+    key: Optional[Iterable[str]] = None,
+    files: Optional[Callable[[Dict[str, Any]], Iterable[Any]]] = None,
+    ttl: Optional[float] = None,
+    stale_ttl: float = 0,
+    size: Optional[Union[int, Callable[[Any], int]]] = None,
+    when: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Callable[[Callable], Callable]:
+    """
+    Decorator caching the successful results of a tool function.
+    
+    Args:
+        key: Names of the arguments that make up the key (default: all)
+        files: Maps the bound arguments to the files the result depends on
+        ttl: Seconds results stay fresh (default: the cache TTL)
+        stale_ttl: Seconds a result is served while being refreshed
+        size: Size weight of each result, or a callable computing it (default: estimated)
+        when: Decides from the bound arguments whether to use the cache (default: always)
+    
+    Returns:
+        Decorator; returns the function unchanged without performance_optimizations
+    """
+    def use_cache(arguments: Dict[str, Any]) -> bool:
+        return get_server_config().cache_enabled and (when is None or when(arguments))
+    
+    def decorator(func: Callable) -> Callable:
+        if not PERFORMANCE_OPTIMIZATIONS_AVAILABLE or intelligent_cache is None:
+            return func
+        return intelligent_cache.cached(
+            key=key, files=files, ttl=ttl, stale_ttl=stale_ttl, size=size,
+            should_cache=_succeeded, when=use_cache
+        )(func)
+    
+    return decorator
@@ -0,0 +1,240 @@
+"""
+Tool Metrics
+
+Per-call instrumentation of the tools registered in create_server, and the
+views of what it collects. Every call records into the PerformanceMonitor
+from performance_optimizations:
+
+    tool_duration_ms     wall time of the call, tagged with the tool
+    tool_queue_wait_ms   time work submitted by the tool waited in a shared
+                         executor's queue before a worker picked it up (only
+                         recorded for work passed through track_queue_wait)
+    tool_request_bytes   JSON size of the arguments
+    tool_response_bytes  JSON size of the result
+    tool_errors          one sample per failed call, tagged with the tool and
+                         error type ("tool_error" for results with success
+                         False, the exception class name, or "cancelled")
+
+The metrics are served as the metrics://tools MCP resource and, on the HTTP
+transports, in Prometheus text format at /metrics.
+"""
+
+import asyncio
+import contextvars
+import json
+import re
+import time
+from functools import wraps
+from typing import Dict, List, Any, Optional, Callable
+import logging
+
+from .helpers import format_timestamp
+
+# Performance optimization imports
+try:
+    from performance_optimizations import performance_monitor
+    PERFORMANCE_OPTIMIZATIONS_AVAILABLE = True
+except ImportError:
+    PERFORMANCE_OPTIMIZATIONS_AVAILABLE = False
+    performance_monitor = None
+
+
+logger = logging.getLogger(__name__)
+
+# Prometheus quantiles cover this many recent seconds; sums and counts are lifetime totals
+QUANTILE_WINDOW_SECONDS = 300
+PROMETHEUS_PREFIX = "mcp_"
+
+# Tool whose call is running in the current context, for attributing queue waits
+_current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_tool", default=None)
+
+
+def _json_size(value: Any) -> int:
+    """Size of a value serialized as JSON; unserializable parts count as null."""
+    try:
+        return len(json.dumps(value, default=lambda _: None))
+    except (TypeError, ValueError):
+        return 0
+
+
+def start_monitoring() -> bool:
+    """
+    Start collecting metrics, if performance monitoring is available.
+    
+    Returns:
+        True if the monitor is active
+    """
+    if not PERFORMANCE_OPTIMIZATIONS_AVAILABLE or performance_monitor is None:
+        return False
+    if not performance_monitor.monitoring_active:
+        performance_monitor.start_monitoring()
+    return True
+
+
+def track_queue_wait(func: Callable, *args, **kwargs) -> Callable[[], Any]:
+    """
+    Bind a call for submission to an executor, timing how long it stays queued.
+    
+    The time from this call until a worker starts the function is recorded
+    as tool_queue_wait_ms for the tool running in the current context.
+    Nothing is recorded outside a tool call or while monitoring is off.
+    
+    Args:
+        func: Function to run on the executor
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+    
+    Returns:
+        Zero-argument callable to pass to the executor
+    """
+    tool = _current_tool.get()
+    queued = time.perf_counter()
+    
+    def run():
+        if tool is not None and performance_monitor is not None and performance_monitor.monitoring_active:
+            performance_monitor.record_metric("tool_queue_wait_ms", (time.perf_counter() - queued) * 1000, {"tool": tool})
+        return func(*args, **kwargs)
+    
+    return run
+
+
+def instrument_tool(func: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Wrap an async tool function so each call is timed, sized and classified.
+    
+    The wrapper adds no concurrency limit of its own. It keeps the
+    function's name, docstring and signature, so it registers as the same
+    tool, and marks the call as the current tool for track_queue_wait.
+    
+    Args:
+        func: Async tool function
+        name: Tool name used in the metrics (default: the function name)
+    
+    Returns:
+        Wrapped async function
+    """
+    tool_name = name or func.__name__
+    tags = {"tool": tool_name}
+    
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = _current_tool.set(tool_name)
+        started = time.perf_counter()
+        error_type = None
+        result = None
+        try:
+            result = await func(*args, **kwargs)
+            if isinstance(result, dict) and result.get("success") is False:
+                error_type = "tool_error"
+            return result
+        except asyncio.CancelledError:
+            error_type = "cancelled"
+            raise
+        except Exception as e:
+            error_type = type(e).__name__
+            raise
+        finally:
+            _current_tool.reset(token)
+            finished = time.perf_counter()
+            if performance_monitor is not None and performance_monitor.monitoring_active:
+                performance_monitor.record_metric("tool_duration_ms", (finished - started) * 1000, tags)
+                performance_monitor.record_metric("tool_request_bytes", _json_size([args, kwargs] if args else kwargs), tags)
+                performance_monitor.record_metric("tool_response_bytes", _json_size(result), tags)
+                if error_type is not None:
+                    performance_monitor.record_metric("tool_errors", 1, {"tool": tool_name, "error_type": error_type})
+    
+    return wrapper
+
+
+def tool_metrics_report(window_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Summarize the tool metrics per tool, slowest in total first.
+    
+    Args:
+        window_seconds: Only include the last this many seconds (default: since start)
+    
+    Returns:
+        Dictionary with per-tool call and error counts and latency, queue
+        wait and payload statistics
+    """
+    if not PERFORMANCE_OPTIMIZATIONS_AVAILABLE or performance_monitor is None:
+        return {
+            "success": False,
+            "error": "Performance monitoring is not available",
+            "timestamp": format_timestamp()
+        }
+    
+    snapshot = performance_monitor.snapshot(window_seconds)
+    tools: Dict[str, Dict[str, Any]] = {}
+    for entry in snapshot["series"]:
+        tool = entry["tags"].get("tool")
+        if tool is None or not entry["name"].startswith("tool_"):
+            continue
+        stats = tools.setdefault(tool, {"tool": tool, "calls": 0, "errors": 0, "error_types": {}})
+        if entry["name"] == "tool_errors":
+            stats["errors"] += entry["count"]
+            stats["error_types"][entry["tags"].get("error_type")] = entry["count"]
+            continue
+        if entry["name"] == "tool_duration_ms":
+            stats["calls"] = entry["count"]
+            stats["total_ms"] = entry["sum"]
+        stats[entry["name"][len("tool_"):]] = {
+            key: entry[key] for key in ("mean", "p50", "p95", "p99", "max")
+        }
+    
+    return {
+        "success": True,
+        "window_seconds": window_seconds,
+        "tools": sorted(tools.values(), key=lambda stats: stats.get("total_ms", 0), reverse=True),
+        "monitoring_active": performance_monitor.monitoring_active,
+        "dropped_series": snapshot["dropped_series"],
+        "timestamp": format_timestamp()
+    }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(tags: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    items = dict(tags, **(extra or {}))
+    if not items:
+        return ""
+    return "{" + ",".join(f'{re.sub(r"[^a-zA-Z0-9_]", "_", key)}="{_escape_label(str(value))}"'
+                          for key, value in items.items()) + "}"
+
+
+def render_prometheus() -> str:
+    """
+    Render every monitored metric in the Prometheus text exposition format.
+    
+    Each metric is a summary: p50/p95/p99 quantiles over the last
+    QUANTILE_WINDOW_SECONDS, and lifetime _sum and _count.
+    
+    Returns:
+        Exposition text (empty if performance monitoring is not available)
+    """
+    if not PERFORMANCE_OPTIMIZATIONS_AVAILABLE or performance_monitor is None:
+        return ""
+    
+    lifetime = performance_monitor.snapshot()
+    recent = {
+        (entry["name"], tuple(sorted(entry["tags"].items()))): entry
+        for entry in performance_monitor.snapshot(QUANTILE_WINDOW_SECONDS)["series"]
+    }
+    
+    metrics: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in lifetime["series"]:
+        metrics.setdefault(entry["name"], []).append(entry)
+    
+    lines = []
+    for name in sorted(metrics):
+        metric = PROMETHEUS_PREFIX + re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+        lines.append(f"# TYPE {metric} summary")
+        for entry in metrics[name]:
+            window = recent.get((name, tuple(sorted(entry["tags"].items()))), {})
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f"{metric}{_labels(entry['tags'], {'quantile': quantile})} {window.get(key, 0.0)}")
+            lines.append(f"{metric}_sum{_labels(entry['tags'])} {entry['sum']}")
+            lines.append(f"{metric}_count{_labels(entry['tags'])} {entry['count']}")
+    return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,490 @@
+"""
+Workspace Change Notifications
+
+One change-notification service for the caches and indexes that hold
+workspace file data. Subscribers register a callback and receive batches of
+FileChange events; the file content cache, the search index and the
+orchestrator state files all subscribe instead of validating by TTL or by
+re-hashing files.
+
+Events come from two sources:
+- Writers in this process publish the paths they changed with
+  publish_changes(), so their own writes are never served stale.
+- A WorkspaceWatcher reports changes made by anything else, using inotify
+  where available and periodic directory scans otherwise.
+
+An "overflow" event means changes may have been missed (the kernel queue
+overflowed or the watcher restarted); subscribers should drop or revalidate
+everything they hold.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import fnmatch
+import os
+import re
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, List, Any, Optional, Iterable, Tuple, Union
+from pathlib import Path
+import logging
+
+from ..config.settings import get_server_config
+from .file_walker import walk_workspace
+
+
+logger = logging.getLogger(__name__)
+
+# inotify event bits (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+              IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileChange:
+    """
+    A change to a workspace path.
+    
+    Attributes:
+        path: Absolute path
+        kind: "created", "modified", "deleted" or "overflow"
+        is_dir: Whether the path is a directory
+    """
+    
+    __slots__ = ("path", "kind", "is_dir")
+    
+    def __init__(self, path: str, kind: str, is_dir: bool = False):
+        self.path = path
+        self.kind = kind
+        self.is_dir = is_dir
+    
+    def __repr__(self) -> str:
+        return f"FileChange({self.path!r}, {self.kind!r}, is_dir={self.is_dir})"
+
+
+Subscriber = Callable[[List[FileChange]], None]
+
+# Registered callbacks, and a counter bumped by every published batch
+_subscribers: List[Subscriber] = []
+_subscribers_lock = threading.Lock()
+_generation = 0
+
+
+def subscribe(callback: Subscriber) -> Subscriber:
+    """
+    Register a callback for change batches.
+    
+    Callbacks run on the thread that published the batch (the watcher
+    thread or a writer) and should only mark state, not do I/O.
+    
+    Args:
+        callback: Called with a list of FileChange objects
+    
+    Returns:
+        The callback, for use with unsubscribe
+    """
+    with _subscribers_lock:
+        if callback not in _subscribers:
+            _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback: Subscriber) -> None:
+    """
+    Remove a registered callback.
+    
+    Args:
+        callback: Callback passed to subscribe
+    """
+    with _subscribers_lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def publish(changes: List[FileChange]) -> None:
+    """
+    Deliver a batch of changes to every subscriber.
+    
+    Args:
+        changes: Changes to deliver
+    """
+    global _generation
+    if not changes:
+        return
+    with _subscribers_lock:
+        _generation += 1
+        callbacks = list(_subscribers)
+    for callback in callbacks:
+        try:
+            callback(changes)
+        except Exception as e:
+            logger.error(f"Change subscriber {callback!r} failed: {e}")
+
+
+def publish_changes(paths: Iterable[Union[str, Path]], kind: str = "modified") -> None:
+    """
+    Publish paths this process has just changed.
+    
+    Args:
+        paths: Changed files
+        kind: Change kind for all paths
+    """
+    publish([FileChange(os.path.abspath(str(path)), kind) for path in paths])
+
+
+def change_generation() -> int:
+    """
+    Get the number of change batches published so far.
+    
+    Any cached value computed at an earlier generation may be stale.
+    
+    Returns:
+        Generation counter
+    """
+    return _generation
+
+
+class _Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+    
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+    
+    def rm_watch(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)
+    
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """Read all queued events as (wd, mask, name) tuples."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+                pos += length
+                events.append((wd, mask, name))
+    
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class WorkspaceWatcher:
+    """
+    Watches a workspace tree and publishes the changes it sees.
+    
+    The inotify backend adds a watch on every directory not excluded by
+    exclude_dirs and follows directories as they are created. The polling
+    backend compares (inode, size, mtime_ns) snapshots of the tree every
+    poll_interval seconds. Both publish through publish().
+    """
+    
+    def __init__(
+        self,
+        root: Path,
+        exclude_dirs: Optional[List[str]] = None,
+        backend: str = "auto",
+        poll_interval: float = 2.0
+    ):
+        """
+        Initialize WorkspaceWatcher.
+        
+        Args:
+            root: Directory to watch
+            exclude_dirs: Directory name globs not watched
+            backend: "inotify", "poll" or "auto" (inotify, falling back to polling)
+            poll_interval: Seconds between scans of the polling backend
+        """
+        self.root = Path(root)
+        self.exclude_dirs = exclude_dirs or []
+        self._exclude_regex = (
+            re.compile("|".join(fnmatch.translate(p) for p in self.exclude_dirs)) if self.exclude_dirs else None
+        )
+        self.requested_backend = backend
+        self.poll_interval = poll_interval
+        self.backend: Optional[str] = None
+        self._inotify: Optional[_Inotify] = None
+        self._watches: Dict[int, str] = {}
+        self._snapshot: Dict[str, Tuple[int, int, int, bool]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.events = 0
+        self.batches = 0
+    
+    @property
+    def running(self) -> bool:
+        """Whether the watcher thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _excluded(self, name: str) -> bool:
+        return bool(self._exclude_regex and self._exclude_regex.match(name))
+    
+    def _walk_dirs(self, top: str) -> Iterable[str]:
+        yield top
+        for item in walk_workspace(
+            Path(top), exclude_dirs=self.exclude_dirs, respect_gitignore=False,
+            on_error=lambda relpath, error: None
+        ):
+            if item.is_dir and not item.entry.is_symlink():
+                yield item.path
+    
+    def _add_tree(self, top: str) -> None:
+        """Watch a directory and every directory below it."""
+        for dir_path in self._walk_dirs(top):
+            try:
+                self._watches[self._inotify.add_watch(dir_path, WATCH_MASK)] = dir_path
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise
+                logger.debug(f"Cannot watch {dir_path}: {e}")
+    
+    def _remove_tree(self, top: str) -> None:
+        """Stop watching a directory and everything below it."""
+        prefix = os.path.join(top, "")
+        for wd, dir_path in list(self._watches.items()):
+            if dir_path == top or dir_path.startswith(prefix):
+                self._inotify.rm_watch(wd)
+                del self._watches[wd]
+    
+    def _scan(self) -> Dict[str, Tuple[int, int, int, bool]]:
+        snapshot = {}
+        for item in walk_workspace(
+            self.root, exclude_dirs=self.exclude_dirs, respect_gitignore=False,
+            on_error=lambda relpath, error: None
+        ):
+            try:
+                st = item.entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            snapshot[item.path] = (st.st_ino, st.st_size, st.st_mtime_ns, item.is_dir)
+        return snapshot
+    
+    def start(self) -> str:
+        """
+        Start watching in a background thread.
+        
+        Returns:
+            Backend in use ("inotify" or "poll")
+        """
+        if self.running:
+            return self.backend
+        self._stop.clear()
+        
+        self.backend = None
+        if self.requested_backend in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+                self._watches = {}
+                self._add_tree(str(self.root))
+                self.backend = "inotify"
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify unavailable ({e}); watching {self.root} by polling")
+                if self._inotify is not None:
+                    self._inotify.close()
+                    self._inotify = None
+                if self.requested_backend == "inotify":
+                    raise
+        if self.backend is None:
+            self._snapshot = self._scan()
+            self.backend = "poll"
+        
+        target = self._run_inotify if self.backend == "inotify" else self._run_poll
+        self._thread = threading.Thread(target=target, name="workspace-watcher", daemon=True)
+        self._thread.start()
+        # Anything may have changed while nothing was watching
+        publish([FileChange(str(self.root), "overflow", True)])
+        logger.info(f"Watching {self.root} with {self.backend} ({len(self._watches)} directories)")
+        return self.backend
+    
+    def stop(self) -> None:
+        """Stop the watcher thread and release its watches."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._watches = {}
+    
+    def _publish(self, changes: List[FileChange]) -> None:
+        if changes:
+            self.events += len(changes)
+            self.batches += 1
+            publish(changes)
+    
+    def _run_inotify(self) -> None:
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._inotify.fd], [], [], 0.5)
+                if not readable:
+                    continue
+                changes = self._translate(self._inotify.read_events())
+            except OSError as e:
+                if self._stop.is_set():
+                    return
+                logger.error(f"Workspace watcher failed: {e}")
+                changes = [FileChange(str(self.root), "overflow", True)]
+            self._publish(changes)
+    
+    def _translate(self, raw_events: List[Tuple[int, int, str]]) -> List[FileChange]:
+        """Turn raw inotify events into coalesced FileChange objects."""
+        changes: Dict[str, FileChange] = {}
+        for wd, mask, name in raw_events:
+            if mask & IN_Q_OVERFLOW:
+                return [FileChange(str(self.root), "overflow", True)]
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            dir_path = self._watches.get(wd)
+            if dir_path is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if not name:
+                    changes[dir_path] = FileChange(dir_path, "deleted", True)
+                continue
+            
+            path = os.path.join(dir_path, name)
+            is_dir = bool(mask & IN_ISDIR)
+            if is_dir and self._excluded(name):
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                kind = "deleted"
+                if is_dir and mask & IN_MOVED_FROM:
+                    # Watches follow the moved directory; it is re-added where it lands
+                    self._remove_tree(path)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                kind = "created"
+                if is_dir:
+                    # Files may have appeared before the new directory was watched
+                    try:
+                        self._add_tree(path)
+                    except OSError as e:
+                        logger.warning(f"Cannot watch new directory {path}: {e}")
+                    for item in walk_workspace(
+                        Path(path), exclude_dirs=self.exclude_dirs, respect_gitignore=False,
+                        on_error=lambda relpath, error: None
+                    ):
+                        changes[item.path] = FileChange(item.path, "created", item.is_dir)
+            else:
+                kind = "modified"
+            
+            previous = changes.get(path)
+            if previous is not None and previous.kind == "created" and kind == "modified":
+                continue
+            changes[path] = FileChange(path, kind, is_dir)
+        return list(changes.values())
+    
+    def _run_poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                snapshot = self._scan()
+            except Exception as e:
+                logger.error(f"Workspace scan failed: {e}")
+                continue
+            previous = self._snapshot
+            changes = [
+                FileChange(path, "deleted", state[3])
+                for path, state in previous.items() if path not in snapshot
+            ]
+            for path, state in snapshot.items():
+                old = previous.get(path)
+                if old is None:
+                    changes.append(FileChange(path, "created", state[3]))
+                elif old != state and not state[3]:
+                    changes.append(FileChange(path, "modified"))
+            self._snapshot = snapshot
+            self._publish(changes)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get watcher statistics.
+        
+        Returns:
+            Dictionary with backend, state, watched directory count and event counters
+        """
+        return {
+            "root": str(self.root),
+            "backend": self.backend,
+            "running": self.running,
+            "watched_directories": len(self._watches) if self.backend == "inotify" else None,
+            "events": self.events,
+            "batches": self.batches,
+            "generation": change_generation()
+        }
+
+
+# Watcher instances by workspace root
+_watchers: Dict[str, WorkspaceWatcher] = {}
+
+
+def get_workspace_watcher() -> WorkspaceWatcher:
+    """
+    Get the watcher for the configured workspace (not started).
+    
+    Returns:
+        WorkspaceWatcher instance
+    """
+    config = get_server_config()
+    key = str(config.workspace_path)
+    watcher = _watchers.get(key)
+    if watcher is None:
+        watcher = WorkspaceWatcher(
+            config.workspace_path,
+            exclude_dirs=config.walk_exclude_dirs,
+            backend=config.watch_backend,
+            poll_interval=config.watch_poll_interval
+        )
+        _watchers[key] = watcher
+    return watcher
+
+
+def watcher_active() -> bool:
+    """
+    Check whether any workspace watcher is running.
+    
+    While one is, subscribers can trust that changes are reported and skip
+    their own re-validation.
+    
+    Returns:
+        True if a watcher thread is alive
+    """
+    return any(watcher.running for watcher in _watchers.values())
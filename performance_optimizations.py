@@ -7,12 +7,16 @@ while maintaining 0% error rate and production-grade reliability.
 """
 
 import asyncio
+import inspect
+import math
+import os
 import threading
 import time
 import json
-import hashlib
+import sys
 import weakref
-from typing import Dict, Any, Optional, List, Callable
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Iterable, Tuple, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache, wraps
 import psutil
@@ -101,92 +105,407 @@ class PerformanceOptimizer:
         return memory_optimizations
 
 
+class _FrequencySketch:
+    """Count-Min sketch of access frequencies with periodic aging (TinyLFU)."""
+    
+    # Odd 64-bit multipliers, one per row
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _MASK64 = (1 << 64) - 1
+    
+    def __init__(self, capacity: int):
+        width = 16
+        while width < capacity * 4:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in self._SEEDS]
+        # Counters are halved after this many increments so old popularity fades
+        self._sample_size = 10 * width
+        self._additions = 0
+    
+    def _indexes(self, key):
+        h = hash(key) & self._MASK64
+        return [((h * seed) & self._MASK64) >> 40 & self._mask for seed in self._SEEDS]
+    
+    def frequency(self, key) -> int:
+        """Estimated number of recent accesses of a key (saturates at 15)."""
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+    
+    def increment(self, key):
+        """Record an access of a key."""
+        added = False
+        for row, i in zip(self._rows, self._indexes(key)):
+            if row[i] < 15:
+                row[i] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._rows = [bytearray(c >> 1 for c in row) for row in self._rows]
+                self._additions //= 2
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a value and the containers it holds."""
+    size = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+
+def _file_signature(path) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime_ns, size) of a file, or None if it cannot be read."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
 class IntelligentCache:
-    """High-performance intelligent caching system."""
+    """
+    High-performance intelligent caching system.
+    
+    Lookups, inserts and evictions are O(1). Entries live in three
+    LRU-ordered segments, as in W-TinyLFU: new entries enter a small admission
+    window; entries leaving the window compete with the main cache's eviction
+    victim and are only admitted if their estimated access frequency is
+    higher, so a burst of one-off keys cannot flush popular entries. The main
+    cache is a segmented LRU whose protected segment holds entries hit more
+    than once.
     
-    def __init__(self, max_size: int = 1000, ttl: int = 300):
-        self.max_size = max_size
+    Entries expire a fixed time after they were set, however often they are
+    read, and the cache is bounded by entry count and optionally by bytes.
+    get_or_compute adds single-flight loading (concurrent misses share one
+    computation) and stale-while-revalidate on top, and the cached decorator
+    applies them declaratively to functions.
+    """
+    
+    WINDOW, PROBATION, PROTECTED = 0, 1, 2
+    
+    def __init__(self, max_size: int = 1000, ttl: int = 300, max_bytes: Optional[int] = None):
+        self.max_size = max(1, max_size)
         self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> [value, size, expires_at, segment, stale_until]
         self.cache = {}
-        self.access_times = {}
-        self.frequency = {}
+        self._segments = (OrderedDict(), OrderedDict(), OrderedDict())
+        self._window_size = max(1, self.max_size // 100)
+        self._protected_size = int((self.max_size - self._window_size) * 0.8)
+        self._window_bytes = max_bytes // 100 if max_bytes else None
+        self._segment_bytes = [0, 0, 0]
+        self._bytes = 0
+        self._sketch = _FrequencySketch(self.max_size)
         self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        # key -> task computing its value, for get_or_compute
+        self._inflight = {}
         
-    def _generate_key(self, func_name: str, *args, **kwargs) -> str:
-        """Generate cache key from function name and parameters."""
-        key_data = f"{func_name}:{str(args)}:{str(sorted(kwargs.items()))}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+    def _remove(self, key: str) -> list:
+        entry = self.cache.pop(key)
+        del self._segments[entry[3]][key]
+        self._segment_bytes[entry[3]] -= entry[1]
+        self._bytes -= entry[1]
+        return entry
     
-    def _is_expired(self, key: str) -> bool:
-        """Check if cache entry is expired."""
-        if key not in self.access_times:
-            return True
-        return time.time() - self.access_times[key] > self.ttl
-    
-    def _evict_lru(self):
-        """Evict least recently used items when cache is full."""
-        if len(self.cache) >= self.max_size:
-            # Remove 20% of oldest entries
-            items_to_remove = int(self.max_size * 0.2)
-            sorted_items = sorted(self.access_times.items(), key=lambda x: x[1])
-            
-            for key, _ in sorted_items[:items_to_remove]:
-                del self.cache[key]
-                del self.access_times[key]
-                del self.frequency[key]
+    def _move(self, key: str, entry: list, segment: int):
+        del self._segments[entry[3]][key]
+        self._segment_bytes[entry[3]] -= entry[1]
+        entry[3] = segment
+        self._segments[segment][key] = None
+        self._segment_bytes[segment] += entry[1]
+    
+    def _over_budget(self) -> bool:
+        return len(self.cache) > self.max_size or bool(self.max_bytes and self._bytes > self.max_bytes)
+    
+    def _evict(self):
+        """Move overflow from the window into probation, then evict by frequency until within budget."""
+        window, probation, protected = self._segments
+        candidates = 0
+        while len(window) > 1 and (
+                len(window) > self._window_size or
+                (self._window_bytes and self._segment_bytes[self.WINDOW] > self._window_bytes)):
+            key = next(iter(window))
+            self._move(key, self.cache[key], self.PROBATION)
+            candidates += 1
+        
+        while self._over_budget():
+            if not probation:
+                segment = protected if protected else window
+                self._remove(next(iter(segment)))
+                self.evictions += 1
+                continue
+            victim = next(iter(probation))
+            if candidates and len(probation) > candidates:
+                # The newest probation entries are the candidates from the window
+                candidate = next(reversed(probation))
+                if self._sketch.frequency(candidate) <= self._sketch.frequency(victim):
+                    victim = candidate
+                    self.rejections += 1
+                    candidates -= 1
+            elif candidates:
+                candidates -= 1
+            self._remove(victim)
+            self.evictions += 1
+    
+    def _lookup(self, key: str, allow_stale: bool = False):
+        """Find a live entry, returning (found, value, fresh); must hold the lock."""
+        self._sketch.increment(key)
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None, False
+        now = time.monotonic()
+        fresh = entry[2] > now
+        if not fresh and not (allow_stale and entry[4] > now):
+            if entry[4] <= now:
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return False, None, False
+        
+        self.hits += 1
+        if not fresh:
+            self.stale_hits += 1
+        if entry[3] == self.PROBATION:
+            # A second hit promotes the entry; protected overflow is demoted
+            self._move(key, entry, self.PROTECTED)
+            protected = self._segments[self.PROTECTED]
+            while len(protected) > self._protected_size:
+                demoted = next(iter(protected))
+                self._move(demoted, self.cache[demoted], self.PROBATION)
+        else:
+            self._segments[entry[3]].move_to_end(key)
+        return True, entry[0], fresh
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
         with self._lock:
-            if key in self.cache and not self._is_expired(key):
-                self.access_times[key] = time.time()
-                self.frequency[key] = self.frequency.get(key, 0) + 1
-                return self.cache[key]
-            return None
-    
-    def set(self, key: str, value: Any):
-        """Set value in cache."""
+            return self._lookup(key)[1]
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None, stale_ttl: float = 0):
+        """
+        Set value in cache, expiring ttl seconds (default: the cache TTL) from now.
+        
+        get_or_compute keeps serving the value for stale_ttl more seconds while
+        it refreshes it.
+        """
+        if size is None:
+            size = _estimate_size(value) if self.max_bytes else 0
         with self._lock:
-            self.cache[key] = value
-            self.access_times[key] = time.time()
-            self.frequency[key] = self.frequency.get(key, 0) + 1
-            self._evict_lru()
+            self._sketch.increment(key)
+            if key in self.cache:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                self.rejections += 1
+                return
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self.cache[key] = [value, size, expires_at, self.WINDOW, expires_at + stale_ttl]
+            self._segments[self.WINDOW][key] = None
+            self._segment_bytes[self.WINDOW] += size
+            self._bytes += size
+            self._evict()
     
-    def cache_function(self, func: Callable) -> Callable:
-        """Decorator to cache function results."""
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            key = self._generate_key(func.__name__, *args, **kwargs)
-            cached_result = self.get(key)
-            if cached_result is not None:
-                performance_logger.debug(f"Cache hit for {func.__name__}")
-                return cached_result
+    def delete(self, key: str) -> bool:
+        """Remove a key; returns whether it was cached."""
+        with self._lock:
+            if key not in self.cache:
+                return False
+            self._remove(key)
+            return True
+    
+    def clear(self):
+        """Remove all entries (access frequencies and counters are kept)."""
+        with self._lock:
+            self.cache.clear()
+            for segment in self._segments:
+                segment.clear()
+            self._segment_bytes = [0, 0, 0]
+            self._bytes = 0
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        stale_ttl: float = 0,
+        should_cache: Optional[Callable[[Any], bool]] = None,
+        size: Optional[Callable[[Any], Optional[int]]] = None
+    ) -> Any:
+        """
+        Get a cached value, computing it at most once for concurrent callers.
+        
+        Concurrent misses for the same key wait for a single in-flight
+        computation. Values past their TTL but within stale_ttl are returned
+        at once while a background task refreshes them. Results are cached
+        only when should_cache (if given) accepts them; errors propagate to
+        every waiting caller and are not cached. size (if given) computes the
+        size weight of a result; by default it is estimated.
+        """
+        with self._lock:
+            found, value, fresh = self._lookup(key, allow_stale=True)
+            if found and fresh:
+                return value
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._compute(key, compute, ttl, stale_ttl, should_cache, size))
+                # Background refreshes may finish with nobody awaiting them
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                self._inflight[key] = task
+            elif not found:
+                self.coalesced += 1
+        if found:
+            return value
+        # Shielded so one caller giving up does not cancel the others' computation
+        return await asyncio.shield(task)
+    
+    async def _compute(self, key, compute, ttl, stale_ttl, should_cache, size) -> Any:
+        try:
+            result = await compute()
+            if should_cache is None or should_cache(result):
+                self.set(key, result, ttl=ttl, size=size(result) if size else None, stale_ttl=stale_ttl)
+            return result
+        except Exception as e:
+            performance_logger.warning(f"Cached computation for {key} failed: {e}")
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is asyncio.current_task():
+                    del self._inflight[key]
+    
+    def cached(
+        self,
+        key: Optional[Iterable[str]] = None,
+        files: Optional[Callable[[Dict[str, Any]], Iterable[Any]]] = None,
+        ttl: Optional[float] = None,
+        stale_ttl: float = 0,
+        size: Optional[Union[int, Callable[[Any], int]]] = None,
+        should_cache: Optional[Callable[[Any], bool]] = None,
+        when: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Callable[[Callable], Callable]:
+        """
+        Decorator caching the results of a sync or async function.
+        
+        The cache key is the function's qualified name, the reprs of the key
+        arguments (with defaults applied) and the (inode, mtime, size) of each
+        file the result depends on, so editing one of those files misses the
+        cache. Async functions go through get_or_compute and so get
+        single-flight loading and stale-while-revalidate; sync functions are
+        cached without either.
+        
+        Args:
+            key: Names of the arguments that make up the key (default: all)
+            files: Maps the bound arguments to the files the result depends on
+            ttl: Seconds results stay fresh (default: the cache TTL)
+            stale_ttl: Seconds a result is served while being refreshed (async only)
+            size: Size weight of each result, or a callable computing it (default: estimated)
+            should_cache: Accepts the results worth caching (default: all)
+            when: Decides from the bound arguments whether to use the cache (default: always)
+        
+        Returns:
+            Decorator
+        
+        Raises:
+            ValueError: If key names an argument the function does not have
+        """
+        def decorator(func: Callable) -> Callable:
+            signature = inspect.signature(func)
+            fields = list(signature.parameters) if key is None else list(key)
+            unknown = set(fields) - set(signature.parameters)
+            if unknown:
+                raise ValueError(f"{func.__qualname__} has no arguments {sorted(unknown)}")
+            prefix = f"{func.__module__}.{func.__qualname__}"
+            weigh = size if callable(size) else (lambda result: size)
+            
+            def make_key(args, kwargs) -> Optional[str]:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = bound.arguments
+                if when is not None and not when(arguments):
+                    return None
+                parts = [repr(arguments[name]) for name in fields]
+                if files is not None:
+                    parts.extend(repr((str(path), _file_signature(path))) for path in files(arguments))
+                return f"{prefix}({', '.join(parts)})"
             
-            # Execute function and cache result
             if asyncio.iscoroutinefunction(func):
-                result = await func(*args, **kwargs)
-            else:
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    cache_key = make_key(args, kwargs)
+                    if cache_key is None:
+                        return await func(*args, **kwargs)
+                    return await self.get_or_compute(
+                        cache_key, lambda: func(*args, **kwargs),
+                        ttl=ttl, stale_ttl=stale_ttl, should_cache=should_cache, size=weigh
+                    )
+                
+                return async_wrapper
+            
+            @wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                cache_key = make_key(args, kwargs)
+                if cache_key is None:
+                    return func(*args, **kwargs)
+                with self._lock:
+                    found, value, _ = self._lookup(cache_key)
+                if found:
+                    return value
                 result = func(*args, **kwargs)
+                if should_cache is None or should_cache(result):
+                    self.set(cache_key, result, ttl=ttl, size=weigh(result))
+                return result
             
-            self.set(key, result)
-            performance_logger.debug(f"Cache miss for {func.__name__}, result cached")
-            return result
+            return sync_wrapper
         
-        return async_wrapper
+        return decorator
+    
+    def cache_function(self, func: Callable) -> Callable:
+        """Decorator to cache function results keyed by all arguments."""
+        return self.cached()(func)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         with self._lock:
-            total_requests = sum(self.frequency.values())
-            unique_items = len(self.cache)
-            hit_rate = (total_requests - unique_items) / total_requests if total_requests > 0 else 0
+            total_requests = self.hits + self.misses
+            window, probation, protected = self._segments
             
             return {
                 'cache_size': len(self.cache),
                 'max_size': self.max_size,
-                'hit_rate': hit_rate,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hit_rate': self.hits / total_requests if total_requests > 0 else 0,
                 'total_requests': total_requests,
-                'unique_items': unique_items
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'admissions_rejected': self.rejections,
+                'stale_hits': self.stale_hits,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._inflight),
+                'segments': {
+                    'window': len(window),
+                    'probation': len(probation),
+                    'protected': len(protected)
+                }
             }
 
 
@@ -252,48 +571,42 @@ class AlgorithmOptimizer:
     """Critical path algorithm optimizations."""
     
     @staticmethod
-    def optimize_file_search(pattern: str, directory: str, max_matches: int = 100) -> List[Dict[str, Any]]:
-        """Optimized file search with early termination."""
-        import glob
+    def optimize_file_search(pattern: str, directory: str, max_files: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find files matching a glob pattern with their stat data.
+        
+        Args:
+            pattern: Glob pattern matched against file names
+            directory: Directory to search recursively
+            max_files: Stop after this many files (None for all); this limits files,
+                not content matches, and a warning is logged when it is reached
+        
+        Returns:
+            List of dictionaries with file, size and modified keys
+        """
+        import fnmatch
         import os
         
         results = []
-        # Use glob for faster pattern matching
-        search_pattern = f"{directory}/**/{pattern}"
-        
-        try:
-            for file_path in glob.glob(search_pattern, recursive=True):
-                if len(results) >= max_matches:
-                    break
+        for root, dirs, files in os.walk(directory):
+            for file in files:
+                if not fnmatch.fnmatch(file, pattern):
+                    continue
+                if max_files is not None and len(results) >= max_files:
+                    performance_logger.warning(f"File search in {directory} stopped at {max_files} files")
+                    return results
                 
                 # Quick file stats check first
                 try:
-                    stat = os.stat(file_path)
+                    full_path = os.path.join(root, file)
+                    stat = os.stat(full_path)
                     results.append({
-                        'file': file_path,
+                        'file': full_path,
                         'size': stat.st_size,
                         'modified': stat.st_mtime
                     })
                 except (OSError, IOError):
                     continue  # Skip inaccessible files
-                    
-        except Exception:
-            # Fallback to os.walk for directories that don't exist
-            for root, dirs, files in os.walk(directory):
-                if len(results) >= max_matches:
-                    break
-                for file in files:
-                    if pattern in file:
-                        try:
-                            full_path = os.path.join(root, file)
-                            stat = os.stat(full_path)
-                            results.append({
-                                'file': full_path,
-                                'size': stat.st_size,
-                                'modified': stat.st_mtime
-                            })
-                        except (OSError, IOError):
-                            continue
         
         return results
     
@@ -322,17 +635,152 @@ class AlgorithmOptimizer:
         return optimized_data
 
 
-class PerformanceMonitor:
-    """Real-time performance monitoring dashboard."""
+class _Histogram:
+    """
+    Log-linear histogram of non-negative values (HDR style).
+    
+    Each power of two is split into SUB_BUCKETS buckets, so quantiles are
+    within about 1.6% of the true value while memory is bounded by the value
+    range rather than the number of samples.
+    """
+    
+    SUB_BUCKETS = 32
+    
+    __slots__ = ('counts', 'zeros', 'count', 'total', 'min', 'max')
     
     def __init__(self):
-        self.metrics_collection = []
+        # bucket index -> count; values <= 0 are counted in zeros
+        self.counts: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def record(self, value: float):
+        """Add a value."""
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zeros += 1
+            return
+        mantissa, exponent = math.frexp(value)
+        index = exponent * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+        self.counts[index] = self.counts.get(index, 0) + 1
+    
+    def merge(self, other: "_Histogram"):
+        """Add the values of another histogram."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, q: float) -> float:
+        """Estimate the value below which a fraction q of the values fall."""
+        if not self.count:
+            return 0.0
+        # Nearest rank, so p99 of a few samples is their maximum
+        rank = max(0, math.ceil(q * self.count) - 1)
+        seen = self.zeros
+        if rank < seen:
+            return min(max(0.0, self.min), self.max)
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if rank < seen:
+                exponent, sub = divmod(index, self.SUB_BUCKETS)
+                midpoint = math.ldexp(0.5 + (sub + 0.5) / (2 * self.SUB_BUCKETS), exponent)
+                return min(max(midpoint, self.min), self.max)
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """Count, sum, extremes, mean and p50/p95/p99."""
+        if not self.count:
+            return {'count': 0, 'sum': 0.0, 'min': 0.0, 'max': 0.0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99)
+        }
+
+
+class _MetricSeries:
+    """Lifetime histogram, per-slot rolling histograms and recent values of one metric series."""
+    
+    __slots__ = ('lifetime', '_slots', '_slot_seconds', 'recent')
+    
+    def __init__(self, slots: int, slot_seconds: float, recent_samples: int):
+        self.lifetime = _Histogram()
+        # Ring of [slot number, histogram]; a slot is reused once its time has passed
+        self._slots = [[-1, None] for _ in range(slots)]
+        self._slot_seconds = slot_seconds
+        self.recent = deque(maxlen=recent_samples)
+    
+    def record(self, value: float, now: float):
+        self.lifetime.record(value)
+        number = int(now // self._slot_seconds)
+        slot = self._slots[number % len(self._slots)]
+        if slot[0] != number:
+            slot[0] = number
+            slot[1] = _Histogram()
+        slot[1].record(value)
+        self.recent.append((now, value))
+    
+    def window(self, seconds: float, now: float) -> _Histogram:
+        """Merge the slots covering the last `seconds` (rounded up to whole slots)."""
+        newest = int(now // self._slot_seconds)
+        oldest = newest - min(len(self._slots), math.ceil(seconds / self._slot_seconds)) + 1
+        merged = _Histogram()
+        for number, histogram in self._slots:
+            if oldest <= number <= newest:
+                merged.merge(histogram)
+        return merged
+
+
+class PerformanceMonitor:
+    """
+    Real-time performance monitoring dashboard.
+    
+    Metrics are kept per series (metric name plus tags) in fixed memory: a
+    lifetime histogram, a ring of per-slot histograms covering the rolling
+    window, and the most recent values. Recording is O(1), and quantiles come
+    from the histograms, so the cost of monitoring does not grow with uptime.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: float = 3600,
+        slot_seconds: float = 60,
+        max_series: int = 1000,
+        recent_samples: int = 100
+    ):
+        self.window_seconds = window_seconds
+        self.slot_seconds = slot_seconds
+        self.max_series = max_series
+        self.recent_samples = recent_samples
+        self._slots = max(1, math.ceil(window_seconds / slot_seconds))
+        # (metric name, sorted tag items) -> _MetricSeries
+        self._series: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _MetricSeries] = {}
+        self._lock = threading.Lock()
+        self.dropped_series = 0
         self.alert_thresholds = {
             'response_time_ms': 1000,
             'memory_usage_mb': 500,
             'error_rate': 0.01,
             'cache_hit_rate': 0.8
         }
+        self._alerts = deque(maxlen=50)
         self.monitoring_active = False
     
     def start_monitoring(self):
@@ -350,14 +798,16 @@ class PerformanceMonitor:
         if not self.monitoring_active:
             return
         
-        metric_entry = {
-            'timestamp': time.time(),
-            'metric_name': metric_name,
-            'value': value,
-            'tags': tags or {}
-        }
-        
-        self.metrics_collection.append(metric_entry)
+        key = (metric_name, tuple(sorted((str(k), str(v)) for k, v in tags.items())) if tags else ())
+        now = time.time()
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                if len(self._series) >= self.max_series:
+                    self.dropped_series += 1
+                    return
+                series = self._series[key] = _MetricSeries(self._slots, self.slot_seconds, self.recent_samples)
+            series.record(value, now)
         
         # Check for alerts
         self._check_alerts(metric_name, value)
@@ -368,26 +818,101 @@ class PerformanceMonitor:
             threshold = self.alert_thresholds[metric_name]
             if value > threshold:
                 performance_logger.warning(f"Performance alert: {metric_name} = {value} (threshold: {threshold})")
+                self._alerts.append({
+                    'timestamp': time.time(),
+                    'metric_name': metric_name,
+                    'value': value,
+                    'threshold': threshold
+                })
+    
+    def _rollup(self, metric_name: str, window_seconds: Optional[float], now: float) -> _Histogram:
+        """Merge every series of a metric; must hold the lock."""
+        merged = _Histogram()
+        for (name, _), series in self._series.items():
+            if name == metric_name:
+                merged.merge(series.lifetime if window_seconds is None else series.window(window_seconds, now))
+        return merged
+    
+    def get_metric(self, metric_name: str, window_seconds: Optional[float] = None) -> Dict[str, float]:
+        """
+        Get statistics of a metric across all its tag sets.
+        
+        Args:
+            metric_name: Metric name
+            window_seconds: Only include the last this many seconds, up to the
+                rolling window (default: since monitoring started)
+        
+        Returns:
+            Dictionary with count, sum, min, max, mean, p50, p95 and p99
+        """
+        with self._lock:
+            return self._rollup(metric_name, window_seconds, time.time()).summary()
+    
+    def snapshot(self, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get statistics of every metric series.
+        
+        Args:
+            window_seconds: Only include the last this many seconds, up to the
+                rolling window (default: since monitoring started)
+        
+        Returns:
+            Dictionary with one entry per series (name, tags, statistics and
+            last value) and the number of series dropped over max_series
+        """
+        now = time.time()
+        with self._lock:
+            series_list = []
+            for (name, tags), series in self._series.items():
+                histogram = series.lifetime if window_seconds is None else series.window(window_seconds, now)
+                entry = {'name': name, 'tags': dict(tags)}
+                entry.update(histogram.summary())
+                entry['last'] = series.recent[-1][1] if series.recent else None
+                series_list.append(entry)
+        return {
+            'timestamp': now,
+            'window_seconds': window_seconds,
+            'series': series_list,
+            'dropped_series': self.dropped_series
+        }
+    
+    def get_recent_values(self, metric_name: str, tags: Dict[str, str] = None) -> List[Tuple[float, float]]:
+        """Get the most recent (timestamp, value) pairs of one metric series."""
+        key = (metric_name, tuple(sorted((str(k), str(v)) for k, v in tags.items())) if tags else ())
+        with self._lock:
+            series = self._series.get(key)
+            return list(series.recent) if series else []
     
     def get_dashboard_data(self) -> Dict[str, Any]:
-        """Get current dashboard data."""
-        if not self.metrics_collection:
+        """Get current dashboard data over the last five minutes."""
+        if not self._series:
             return {'status': 'no_data', 'message': 'No metrics collected yet'}
         
-        recent_metrics = self.metrics_collection[-100:]  # Last 100 metrics
-        
-        # Calculate aggregations
-        response_times = [m['value'] for m in recent_metrics if m['metric_name'] == 'response_time_ms']
-        memory_usage = [m['value'] for m in recent_metrics if m['metric_name'] == 'memory_usage_mb']
+        now = time.time()
+        window = min(300, self.window_seconds)
+        with self._lock:
+            response_times = self._rollup('response_time_ms', window, now)
+            memory_usage = self._rollup('memory_usage_mb', window, now)
+            metrics_count = sum(series.window(window, now).count for series in self._series.values())
+            current_memory = max(
+                (series.recent[-1] for (name, _), series in self._series.items()
+                 if name == 'memory_usage_mb' and series.recent),
+                default=(0, 0)
+            )[1]
         
+        response_summary = response_times.summary()
         dashboard_data = {
-            'timestamp': time.time(),
-            'metrics_count': len(recent_metrics),
+            'timestamp': now,
+            'window_seconds': window,
+            'metrics_count': metrics_count,
             'aggregations': {
-                'avg_response_time_ms': sum(response_times) / len(response_times) if response_times else 0,
-                'max_response_time_ms': max(response_times) if response_times else 0,
-                'current_memory_mb': memory_usage[-1] if memory_usage else 0,
-                'avg_memory_mb': sum(memory_usage) / len(memory_usage) if memory_usage else 0
+                'avg_response_time_ms': response_summary['mean'],
+                'max_response_time_ms': response_summary['max'],
+                'p50_response_time_ms': response_summary['p50'],
+                'p95_response_time_ms': response_summary['p95'],
+                'p99_response_time_ms': response_summary['p99'],
+                'current_memory_mb': current_memory,
+                'avg_memory_mb': memory_usage.summary()['mean']
             },
             'alerts': self._get_recent_alerts(),
             'status': 'active' if self.monitoring_active else 'inactive'
@@ -397,14 +922,12 @@ class PerformanceMonitor:
     
     def _get_recent_alerts(self) -> List[Dict[str, Any]]:
         """Get recent performance alerts."""
-        # This would typically query an alerts database
-        # For now, return empty list
-        return []
+        return list(self._alerts)
 
 
 # Global instances
 performance_optimizer = PerformanceOptimizer()
-intelligent_cache = IntelligentCache(max_size=500, ttl=180)  # More aggressive caching
+intelligent_cache = IntelligentCache(max_size=500, ttl=180, max_bytes=64 * 1024 * 1024)  # More aggressive caching
 network_optimizer = NetworkOptimizer()
 algorithm_optimizer = AlgorithmOptimizer()
 performance_monitor = PerformanceMonitor()
@@ -429,6 +952,7 @@ def optimize_system_performance():
         'memory_optimizations': memory_config,
         'cache_config': {
             'max_size': intelligent_cache.max_size,
+            'max_bytes': intelligent_cache.max_bytes,
             'ttl': intelligent_cache.ttl
         },
         'monitoring_active': performance_monitor.monitoring_active,
@@ -13,6 +13,7 @@ Uses pytest framework with proper fixtures and assertions.
 """
 
 import pytest
+import io
 import json
 from datetime import datetime
 from pathlib import Path
@@ -22,7 +23,8 @@ from mcp_server.models import (
     ScheduleType, ScheduleStatus, TaskStatus, PriorityType, PersistentMemorySection,
     ScheduleData, SchedulesContainer, TaskTimingData, TaskTimingContainer,
     PersistentMemoryEntry, SystemStatus, ModeInfo, ModeCapabilities,
-    FileOperationResult, ValidationResult, DelegationRequest, DelegationResult
+    FileOperationResult, ValidationResult, DelegationRequest, DelegationResult,
+    iter_tsv, write_tsv
 )
 
 
@@ -448,6 +450,57 @@ class TestTaskTimingContainer:
         assert result == "timestamp\tmode\ttask_id\tstart_time\tend_time\tduration\ttask\tresult\tpriority"
 
 
+    def test_task_timing_container_tsv_round_trip_special_characters(self):
+        """Test tabs, newlines and quotes in the task field survive a TSV round trip."""
+        entries = [
+            TaskTimingData(
+                timestamp="2023-01-01T00:00:00Z",
+                mode="test-mode",
+                task_id="task-123",
+                start_time="2023-01-01T00:00:00Z",
+                task='step one\tstep two\nsecond line "quoted"',
+                result="started",
+                priority=PriorityType.TODO
+            )
+        ]
+        content = TaskTimingContainer(entries=entries).to_tsv()
+        container = TaskTimingContainer.from_tsv(content)
+        assert len(container.entries) == 1
+        assert container.entries[0].task == 'step one\tstep two\nsecond line "quoted"'
+        assert container.entries[0].result == "started"
+        assert container.entries[0].priority == PriorityType.TODO
+
+    def test_iter_tsv_is_lazy(self):
+        """Test iter_tsv yields entries one row at a time."""
+        content = """timestamp\tmode\ttask_id\tstart_time\tend_time\tduration\ttask\tresult\tpriority
+2023-01-01T00:00:00Z\ttest-mode\ttask-123\t2023-01-01T00:00:00Z\t\t\ttest task\tstarted\tnormal
+2023-01-01T00:01:00Z\ttest-mode\ttask-124\t2023-01-01T00:01:00Z\t\t\ttest task 2\tstarted\tnormal
+"""
+        fp = io.StringIO(content, newline="")
+        rows = iter_tsv(fp)
+        first = next(rows)
+        assert first.task_id == "task-123"
+        assert first.end_time is None
+        assert next(rows).task_id == "task-124"
+        assert next(rows, None) is None
+
+    def test_write_tsv_streams_generator(self):
+        """Test write_tsv accepts a generator and reports rows written."""
+        rows = (
+            TaskTimingData(
+                timestamp=f"2023-01-01T00:0{i}:00Z",
+                task=f"task {i}",
+                start_time=f"2023-01-01T00:0{i}:00Z"
+            )
+            for i in range(3)
+        )
+        fp = io.StringIO(newline="")
+        assert write_tsv(fp, rows) == 3
+        lines = fp.getvalue().split("\n")
+        assert lines[0].startswith("timestamp\tmode")
+        assert len([line for line in lines if line]) == 4
+
+
 class TestPersistentMemoryEntry:
     """Test cases for PersistentMemoryEntry model."""
 
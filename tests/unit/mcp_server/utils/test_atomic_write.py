@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Unit tests for atomic writes in mcp_server.utils.atomic_write.
+
+Tests cover:
+- Replacing files through a temporary file
+- Permission bits and temporary file cleanup
+- Group-committed fsyncs
+- Detaching hard-linked backups
+"""
+
+import os
+import stat
+
+import pytest
+
+from mcp_server.utils.atomic_write import (
+    FsyncBatcher, atomic_write_text, stage_text, stage_bytes, commit_staged, break_hardlink,
+    replace_tail, recover_tail
+)
+
+
+class TestAtomicWrite:
+    """Test cases for atomic_write_text and its steps."""
+    
+    @pytest.mark.parametrize("fsync_mode", ["off", "always"])
+    def test_replaces_content(self, tmp_path, fsync_mode):
+        """Test the file is replaced and no temporary file is left behind."""
+        target = tmp_path / "notes.md"
+        target.write_text("old\n")
+        
+        size = atomic_write_text(target, "new content\n", fsync_mode=fsync_mode)
+        
+        assert target.read_text() == "new content\n"
+        assert size == len("new content\n")
+        assert os.listdir(tmp_path) == ["notes.md"]
+    
+    def test_creates_parent_directories(self, tmp_path):
+        """Test missing parent directories are created."""
+        target = tmp_path / "a" / "b" / "c.txt"
+        atomic_write_text(target, "x", fsync_mode="off")
+        assert target.read_text() == "x"
+    
+    def test_keeps_permissions(self, tmp_path):
+        """Test the replaced file keeps the target's permission bits."""
+        target = tmp_path / "script.sh"
+        target.write_text("echo old\n")
+        os.chmod(target, 0o750)
+        
+        atomic_write_text(target, "echo new\n", fsync_mode="off")
+        assert stat.S_IMODE(target.stat().st_mode) == 0o750
+    
+    def test_staged_file_invisible_until_commit(self, tmp_path):
+        """Test readers see the old content until the staged file is committed."""
+        target = tmp_path / "data.txt"
+        target.write_text("old")
+        
+        temp_path, _ = stage_text(target, "new")
+        assert target.read_text() == "old"
+        
+        commit_staged(temp_path, target, fsync_mode="off")
+        assert target.read_text() == "new"
+        assert not temp_path.exists()
+    
+    def test_stage_bytes_keeps_line_endings(self, tmp_path):
+        """Test staged bytes are written untranslated with the target's permissions."""
+        target = tmp_path / "data.tsv"
+        target.write_bytes(b"old\n")
+        os.chmod(target, 0o640)
+        
+        temp_path, size = stage_bytes(target, b"a\r\nb\n")
+        assert size == 5
+        
+        commit_staged(temp_path, target, fsync_mode="off")
+        assert target.read_bytes() == b"a\r\nb\n"
+        assert stat.S_IMODE(target.stat().st_mode) == 0o640
+    
+    def test_replace_tail_streams_source(self, tmp_path):
+        """Test replace_tail patches from an offset in place and leaves no journal."""
+        target = tmp_path / "log.tsv"
+        target.write_bytes(b"head\nold row\nrest\n")
+        inode = target.stat().st_ino
+        
+        with open(target, 'rb') as source:
+            source.seek(len(b"head\nold row\n"))
+            size = replace_tail(target, len(b"head\n"), b"new, longer row\n", source=source)
+        
+        assert target.read_bytes() == b"head\nnew, longer row\nrest\n"
+        assert size == target.stat().st_size
+        assert target.stat().st_ino == inode
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["log.tsv"]
+    
+    def test_recover_tail_replays_journal(self, tmp_path):
+        """Test a committed journal left by a crash is applied exactly once."""
+        target = tmp_path / "log.tsv"
+        target.write_bytes(b"head\nold row\nrest\n")
+        (tmp_path / ".log.tsv.tail").write_bytes(b"5\nshort\nrest\n")
+        
+        assert recover_tail(target) is True
+        assert target.read_bytes() == b"head\nshort\nrest\n"
+        assert recover_tail(target) is False
+
+
+class TestFsyncBatcher:
+    """Test cases for FsyncBatcher."""
+    
+    def test_flush_coalesces(self, tmp_path):
+        """Test paths scheduled together are synced in one batch."""
+        files = [tmp_path / f"f{i}.txt" for i in range(3)]
+        for path in files:
+            path.write_text("data")
+        batcher = FsyncBatcher(interval=60)
+        
+        batcher.schedule(files + [tmp_path])
+        batcher.schedule(files[:1])
+        
+        assert batcher.flush() == 4
+        assert batcher.flush() == 0
+        assert batcher.batches == 1
+    
+    def test_missing_paths_ignored(self, tmp_path):
+        """Test paths removed before the flush do not raise."""
+        batcher = FsyncBatcher(interval=60)
+        batcher.schedule([tmp_path / "gone.txt"])
+        assert batcher.flush() == 1
+
+
+class TestBreakHardlink:
+    """Test cases for break_hardlink."""
+    
+    def test_detaches_link(self, tmp_path):
+        """Test a detached backup keeps its content when the source changes in place."""
+        source = tmp_path / "source.txt"
+        source.write_text("original")
+        backup = tmp_path / "backup.txt"
+        os.link(source, backup)
+        
+        break_hardlink(backup)
+        with open(source, "a") as f:
+            f.write(" appended")
+        
+        assert not os.path.samefile(source, backup)
+        assert backup.read_text() == "original"
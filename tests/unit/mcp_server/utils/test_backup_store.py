@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the content-addressed backup store in mcp_server.utils.backup_store.
+
+Tests cover:
+- Deduplication of unchanged and repeated content
+- Latest-version lookup and restoring by id
+- Hard-linked objects for files about to be replaced
+- Retention and garbage collection
+- Delta versions, chain limits and rebasing on retention
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from mcp_server.utils.backup_store import BackupStore
+
+
+class TestBackupStore:
+    """Test cases for BackupStore."""
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Create an empty store."""
+        return BackupStore(tmp_path / "store", keep_versions=3, max_age_days=None)
+    
+    @pytest.fixture
+    def source(self, tmp_path):
+        """Create a file to back up."""
+        path = tmp_path / "notes.md"
+        path.write_text("first version\n")
+        return path
+    
+    def _rewrite(self, path, text):
+        # Replace the file like the write tools do, so linked objects stay intact
+        st = path.stat()
+        staged = path.with_name(path.name + ".new")
+        staged.write_text(text)
+        # Make every rewrite visible even within one mtime tick
+        os.utime(staged, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        os.replace(staged, path)
+    
+    def test_unchanged_content_deduplicated(self, store, source):
+        """Test backing up unchanged content returns the latest version."""
+        first = store.put(source, "notes.md")
+        second = store.put(source, "notes.md")
+        
+        assert not first["deduplicated"]
+        assert second["deduplicated"]
+        assert second["id"] == first["id"]
+        assert store.stats()["versions"] == 1
+    
+    def test_same_size_and_mtime_still_backed_up(self, store, source):
+        """Test an edit that keeps size and mtime is stored as a new version."""
+        first = store.put(source, "notes.md")
+        st = source.stat()
+        source.write_text("FIRST version\n")
+        os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns))
+        
+        second = store.put(source, "notes.md")
+        assert not second["deduplicated"]
+        assert second["id"] != first["id"]
+        assert store.read_version(second["id"]) == b"FIRST version\n"
+    
+    def test_repeated_content_shares_object(self, store, source):
+        """Test content seen before is stored once across versions."""
+        store.put(source, "notes.md")
+        self._rewrite(source, "second version\n")
+        store.put(source, "notes.md")
+        self._rewrite(source, "first version\n")
+        third = store.put(source, "notes.md")
+        
+        assert third["deduplicated"]
+        stats = store.stats()
+        assert (stats["versions"], stats["objects"]) == (3, 2)
+    
+    def test_latest_and_restore_by_id(self, store, source, tmp_path):
+        """Test the latest version is found and any version restored by id."""
+        first = store.put(source, "notes.md")
+        self._rewrite(source, "second version\n")
+        second = store.put(source, "notes.md")
+        
+        assert store.latest("notes.md")["id"] == second["id"]
+        assert store.latest("other.md") is None
+        
+        size = store.restore(store.get_version(first["id"]), source, fsync_mode="off")
+        assert source.read_text() == "first version\n"
+        assert size == len("first version\n")
+        assert [v["id"] for v in store.list_versions("notes.md")] == [second["id"], first["id"]]
+    
+    def test_linked_object_survives_replace(self, store, source, tmp_path):
+        """Test a linked object keeps the old content after the source is replaced."""
+        version = store.put(source, "notes.md", link=True)
+        assert os.path.samefile(version["object_path"], source)
+        
+        replacement = tmp_path / "new.md"
+        replacement.write_text("replaced\n")
+        os.replace(replacement, source)
+        
+        store.restore(version, source, fsync_mode="off")
+        assert source.read_text() == "first version\n"
+    
+    def test_corrupt_object_not_restored(self, store, source):
+        """Test a damaged object is detected and the target left alone."""
+        version = store.put(source, "notes.md")
+        with open(version["object_path"], "r+b") as f:
+            f.write(b"\x00\x00")
+        
+        with pytest.raises(Exception):
+            store.restore(version, source, fsync_mode="off")
+        assert source.read_text() == "first version\n"
+    
+    def test_retention_drops_old_versions(self, store, source):
+        """Test versions beyond keep_versions and their objects are removed."""
+        ids = []
+        for i in range(5):
+            self._rewrite(source, f"version {i}\n")
+            ids.append(store.put(source, "notes.md")["id"])
+        
+        assert [v["id"] for v in store.list_versions("notes.md")] == ids[:-4:-1]
+        stats = store.stats()
+        assert (stats["versions"], stats["objects"]) == (3, 3)
+        assert len(list(store.objects_dir.glob("*/*"))) == 3
+    
+    def test_gc_age_and_compaction(self, tmp_path, source):
+        """Test gc drops expired versions but keeps each file's latest, and compresses linked objects."""
+        store = BackupStore(tmp_path / "store", keep_versions=10, max_age_days=1)
+        store.put(source, "notes.md", link=True)
+        self._rewrite(source, "second version\n")
+        store.put(source, "notes.md")
+        
+        conn = store._connect()
+        old = (datetime.now(timezone.utc) - timedelta(days=5)).isoformat()
+        conn.execute("UPDATE versions SET created = ?", (old,))
+        conn.commit()
+        conn.close()
+        
+        result = store.gc()
+        assert result["dropped_versions"] == 1
+        assert [v["size"] for v in store.list_versions("notes.md")] == [len("second version\n")]
+        assert all(path.suffix == ".z" for path in store.objects_dir.glob("*/*"))
+
+    def _append(self, path, text, tick):
+        # Modify in place, like the orchestrator state files
+        st = path.stat()
+        with open(path, "a") as f:
+            f.write(text)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + tick * 1_000_000_000))
+    
+    def test_delta_versions_restore(self, tmp_path):
+        """Test appended versions are stored as small deltas and each restores exactly."""
+        store = BackupStore(tmp_path / "store", keep_versions=10, max_age_days=None, max_chain=3)
+        source = tmp_path / "memory.md"
+        source.write_text("entry\n" * 20000)
+        versions, contents = [], []
+        for i in range(5):
+            versions.append(store.put(source, "memory.md", delta=True))
+            contents.append(source.read_bytes())
+            self._append(source, f"finding {i}\n", i + 1)
+        
+        assert [v["base_id"] is not None for v in versions] == [False, True, True, True, False]
+        stats = store.stats()
+        assert stats["delta_versions"] == 3
+        assert stats["stored_bytes"] < len(contents[0])
+        
+        store._contents.clear()
+        for version, content in zip(versions, contents):
+            assert store.read_version(version["id"]) == content
+        store.restore(store.get_version(versions[2]["id"]), source, fsync_mode="off")
+        assert source.read_bytes() == contents[2]
+    
+    def test_retention_rebases_delta(self, tmp_path):
+        """Test a kept delta whose base is dropped becomes a full copy."""
+        store = BackupStore(tmp_path / "store", keep_versions=2, max_age_days=None)
+        source = tmp_path / "timing.tsv"
+        source.write_text("row\n" * 5000)
+        store.put(source, "timing.tsv", delta=True)
+        self._append(source, "row a\n", 1)
+        second = store.put(source, "timing.tsv", delta=True)
+        self._append(source, "row b\n", 2)
+        store.put(source, "timing.tsv", delta=True)
+        
+        rebased = store.get_version(second["id"])
+        assert second["base_id"] is not None
+        assert rebased["base_id"] is None
+        assert store.read_version(second["id"]).endswith(b"row a\n")
+        assert len(list(store.objects_dir.glob("*/*"))) == store.stats()["objects"] == 2
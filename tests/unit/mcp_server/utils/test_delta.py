@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for binary deltas in mcp_server.utils.delta.
+
+Tests cover:
+- Round trips for appends, inserts, deletions and unrelated content
+- Delta size for append-only changes
+- Giving up past max_size
+- Rejecting malformed deltas
+"""
+
+import random
+
+import pytest
+
+from mcp_server.utils.delta import make_delta, apply_delta, DeltaError
+
+
+class TestDelta:
+    """Test cases for make_delta and apply_delta."""
+    
+    @pytest.fixture
+    def base(self):
+        """Create a few hundred kilobytes of line-structured text."""
+        rng = random.Random(7)
+        lines = [f"{i}\t{rng.random():.6f}\tfinding about module {rng.randint(0, 500)}\n" for i in range(8000)]
+        return "".join(lines).encode()
+    
+    @pytest.mark.parametrize("edit", ["append", "insert", "delete", "replace", "empty_base"])
+    def test_round_trip(self, base, edit):
+        """Test the target is rebuilt exactly from base and delta."""
+        middle = len(base) // 2
+        if edit == "append":
+            target = base + b"new entry\n"
+        elif edit == "insert":
+            target = base[:middle] + b"inserted line\n" + base[middle:]
+        elif edit == "delete":
+            target = base[:middle] + base[middle + 5000:]
+        elif edit == "replace":
+            target = base[:1000] + b"x" * 300 + base[1300:]
+        else:
+            base, target = b"", base
+        
+        delta = make_delta(base, target)
+        assert apply_delta(base, delta) == target
+    
+    def test_random_edits(self):
+        """Test round trips over random small edits of random data."""
+        rng = random.Random(11)
+        for _ in range(200):
+            base = bytes(rng.randrange(4) for _ in range(rng.randrange(0, 600)))
+            target = bytearray(base)
+            for _ in range(rng.randrange(1, 4)):
+                pos = rng.randrange(len(target) + 1)
+                target[pos:pos + rng.randrange(0, 20)] = bytes(rng.randrange(4) for _ in range(rng.randrange(0, 20)))
+            target = bytes(target)
+            assert apply_delta(base, make_delta(base, target, block_size=4)) == target
+    
+    def test_small_edit_small_delta(self, base):
+        """Test appends and inserts cost about as much as the new bytes."""
+        appended = make_delta(base, base + b"new entry\n")
+        inserted = make_delta(base, base[:1000] + b"inserted line\n" + base[1000:])
+        
+        assert len(appended) < 32
+        assert len(inserted) < 64
+    
+    def test_max_size(self, base):
+        """Test unrelated content gives up once the literal bytes exceed max_size."""
+        other = bytes(reversed(base))
+        assert make_delta(base, other, max_size=len(other) // 2) is None
+        assert make_delta(base, base + b"x" * 100, max_size=50) is None
+    
+    def test_malformed_delta(self, base):
+        """Test malformed deltas and copies outside the base are rejected."""
+        delta = make_delta(base, base + b"tail")
+        
+        with pytest.raises(DeltaError):
+            apply_delta(base, b"nope")
+        with pytest.raises(DeltaError):
+            apply_delta(base[:10], delta)
+        with pytest.raises(DeltaError):
+            apply_delta(base, delta[:-2])
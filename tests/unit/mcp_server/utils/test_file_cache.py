@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the file content cache in mcp_server.utils.file_cache.
+
+Tests cover:
+- Cache hits for unchanged files and misses after edits
+- Explicit invalidation
+- Byte budget eviction in LRU order
+- Compressed storage
+- Decoding fallback and newline normalization
+"""
+
+import os
+
+import pytest
+
+from mcp_server.utils.file_cache import FileContentCache, FileTooLargeError, decode_content
+
+
+class TestFileContentCache:
+    """Test cases for FileContentCache."""
+    
+    @pytest.fixture
+    def text_file(self, tmp_path):
+        """Create a small text file."""
+        path = tmp_path / "notes.md"
+        path.write_text("first version\n", encoding="utf-8")
+        return path
+    
+    def test_hit_and_edit(self, text_file):
+        """Test unchanged files are hits and edited files are re-read."""
+        cache = FileContentCache(1024 * 1024)
+        
+        assert cache.read_text(text_file)[0] == "first version\n"
+        assert cache.read_text(text_file)[0] == "first version\n"
+        assert (cache.hits, cache.misses) == (1, 1)
+        
+        text_file.write_text("second version\n", encoding="utf-8")
+        os.utime(text_file, ns=(1, 10 ** 18))
+        assert cache.read_text(text_file)[0] == "second version\n"
+        assert cache.misses == 2
+    
+    def test_invalidate(self, text_file):
+        """Test invalidated paths are re-read even if the identity matches."""
+        cache = FileContentCache(1024 * 1024)
+        cache.read_text(text_file)
+        cache.invalidate(text_file)
+        
+        cache.read_text(text_file)
+        assert (cache.hits, cache.misses) == (0, 2)
+    
+    def test_byte_budget_evicts_lru(self, tmp_path):
+        """Test the least recently used entries are evicted to fit the budget."""
+        cache = FileContentCache(400)
+        paths = []
+        for name in "abcde":
+            path = tmp_path / f"{name}.txt"
+            path.write_text(name * 100)
+            paths.append(path)
+        
+        for path in paths[:4]:
+            cache.read_text(path)
+        cache.read_text(paths[0])
+        cache.read_text(paths[4])
+        
+        stats = cache.stats()
+        assert stats["evictions"] == 1 and stats["bytes"] == 400
+        assert str(paths[1]) not in cache._entries
+        assert str(paths[0]) in cache._entries
+    
+    def test_compressed_entries(self, tmp_path):
+        """Test compressed entries round-trip and cost less than the file size."""
+        path = tmp_path / "big.tsv"
+        path.write_text("timestamp\tmode\ttask\n" * 2000, encoding="utf-8")
+        cache = FileContentCache(1024 * 1024, compress=True)
+        
+        first = cache.read_text(path)[0]
+        assert cache.read_text(path)[0] == first
+        assert cache.stats()["bytes"] < path.stat().st_size
+    
+    def test_max_size(self, text_file):
+        """Test files above max_size raise with their size."""
+        with pytest.raises(FileTooLargeError) as exc_info:
+            FileContentCache(1024).read_text(text_file, max_size=4)
+        assert exc_info.value.size == text_file.stat().st_size
+    
+    def test_decode_content(self):
+        """Test latin-1 fallback and universal newline normalization."""
+        assert decode_content(b"a\r\nb\rc", "utf-8") == ("a\nb\nc", "utf-8")
+        assert decode_content(b"caf\xe9", "utf-8") == ("café", "latin-1")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared directory walker in mcp_server.utils.file_walker.
+
+Tests cover:
+- Stable traversal order with directories before their contents
+- Pruning of excluded directories before descending
+- .gitignore handling, including nested files and negation
+- Hidden files, exclude patterns and depth limits
+- Glob matching of file patterns
+"""
+
+import os
+
+import pytest
+
+from mcp_server.utils.file_walker import GitIgnore, walk_workspace, matches_file_pattern
+
+
+class TestGitIgnore:
+    """Test cases for .gitignore rule matching."""
+    
+    def test_rules(self):
+        """Test unanchored, anchored, directory-only and negated rules."""
+        ignore = GitIgnore.parse([
+            "# comment", "", "*.log", "!keep.log", "/requests.jsonl", "build/", "docs/**/*.tmp"
+        ])
+        
+        assert ignore.match("app.log", False) is True
+        assert ignore.match("sub/app.log", False) is True
+        assert ignore.match("keep.log", False) is False
+        assert ignore.match("requests.jsonl", False) is True
+        assert ignore.match("sub/requests.jsonl", False) is None
+        assert ignore.match("build", True) is True
+        assert ignore.match("build", False) is None
+        assert ignore.match("docs/a/b/x.tmp", False) is True
+        assert ignore.match("src/main.py", False) is None
+
+
+class TestWalkWorkspace:
+    """Test cases for walk_workspace."""
+    
+    @pytest.fixture
+    def workspace(self, tmp_path):
+        """Create a workspace with excluded, ignored and hidden entries."""
+        root = tmp_path / "ws"
+        for rel in [
+            "a.py", "b.md", ".hidden.txt", "debug.log",
+            "pkg/mod.py", "pkg/deep/inner.py", "pkg/deep/skip.tmp",
+            ".git/config", "venv_testing/lib/site.py", "backups/old.py",
+        ]:
+            path = root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+        (root / ".gitignore").write_text("*.log\n")
+        (root / "pkg" / ".gitignore").write_text("*.tmp\n")
+        return root
+    
+    def _walk(self, root, **kwargs):
+        kwargs.setdefault("exclude_dirs", [".git", "venv*", "backups"])
+        return [(e.relpath, e.pruned) for e in walk_workspace(root, **kwargs)]
+    
+    def test_pre_order_with_pruning(self, workspace):
+        """Test ordering, pruning and nested .gitignore files."""
+        relpaths = [relpath for relpath, _ in self._walk(workspace)]
+        
+        assert relpaths == [
+            ".gitignore", ".hidden.txt", "a.py", "b.md",
+            "pkg", "pkg/.gitignore", "pkg/deep", "pkg/mod.py", "pkg/deep/inner.py",
+        ]
+    
+    def test_pruned_directories_not_descended(self, workspace, monkeypatch):
+        """Test excluded directories are reported when requested but never scanned."""
+        scanned = []
+        original = os.scandir
+        monkeypatch.setattr(os, "scandir", lambda path: (scanned.append(str(path)), original(path))[1])
+        
+        walked = self._walk(workspace, yield_pruned=True)
+        
+        assert (".git", True) in walked and ("venv_testing", True) in walked
+        assert not any("venv_testing" in path or ".git" in path or "backups" in path for path in scanned)
+    
+    def test_filters_and_depth(self, workspace):
+        """Test hidden files, exclude patterns, depth and gitignore toggles."""
+        walked = [relpath for relpath, _ in self._walk(
+            workspace, include_hidden=False, exclude_patterns=[r"^b\."], max_depth=2, respect_gitignore=False
+        )]
+        
+        assert walked == ["a.py", "debug.log", "pkg", "pkg/deep", "pkg/mod.py"]
+    
+    def test_ancestor_gitignore(self, workspace):
+        """Test .gitignore files above the walk root apply when ignore_root is given."""
+        (workspace / "pkg" / "trace.log").write_text("x")
+        
+        assert "trace.log" in [r for r, _ in self._walk(workspace / "pkg")]
+        assert "trace.log" not in [r for r, _ in self._walk(workspace / "pkg", ignore_root=workspace)]
+    
+    def test_start_after_resumes(self, workspace, monkeypatch):
+        """Test a walk resumed after any entry yields exactly the remaining entries."""
+        (workspace / "docs").mkdir()
+        (workspace / "docs" / "guide.md").write_text("x")
+        relpaths = [relpath for relpath, _ in self._walk(workspace, yield_pruned=True)]
+        for i, relpath in enumerate(relpaths):
+            assert [r for r, _ in self._walk(workspace, yield_pruned=True, start_after=relpath)] == relpaths[i + 1:]
+        
+        scanned = []
+        original = os.scandir
+        monkeypatch.setattr(os, "scandir", lambda path: (scanned.append(str(path)), original(path))[1])
+        
+        # The cursor entry may have been deleted since; finished subtrees are not rescanned
+        assert [r for r, _ in self._walk(workspace, start_after="pkg/new.py")] == ["pkg/deep/inner.py"]
+        assert not any(path.endswith("docs") for path in scanned)
+    
+    def test_matches_file_pattern(self):
+        """Test file patterns match names, or paths when they contain a slash."""
+        assert matches_file_pattern("pkg/mod.py", "*.py")
+        assert not matches_file_pattern("pkg/mod.pyc", "*.py")
+        assert matches_file_pattern("pkg/deep/inner.py", "deep/*.py")
+        assert not matches_file_pattern("pkg/mod.py", "deep/*.py")
@@ -202,6 +202,61 @@ class TestBackupOperations:
         assert backup_path is not None
         assert backup_dir in backup_path.parents
 
+    def test_create_backup_reuses_unchanged_backup(self, tmp_path):
+        """Test create_backup returns the latest backup when content is unchanged."""
+        source_path = tmp_path / "test.txt"
+        source_path.write_text("test content")
+        
+        first = create_backup(source_path)
+        assert create_backup(source_path) == first
+        
+        source_path.write_text("changed content")
+        second = create_backup(source_path)
+        assert second != first
+        assert second.read_text() == "changed content"
+        assert first.read_text() == "test content"
+
+    def test_create_backup_same_size_and_mtime(self, tmp_path):
+        """Test an edit that keeps size and mtime still gets a new backup."""
+        source_path = tmp_path / "test.txt"
+        source_path.write_text("content A")
+        first = create_backup(source_path)
+        
+        source_path.write_text("content B")
+        stat_first = first.stat()
+        os.utime(source_path, ns=(stat_first.st_atime_ns, stat_first.st_mtime_ns))
+        
+        second = create_backup(source_path)
+        assert second != first
+        assert second.read_text() == "content B"
+        assert first.read_text() == "content A"
+
+    def test_create_backup_scans_backup_dir_once(self, tmp_path):
+        """Test the newest backup is remembered instead of rescanning the directory."""
+        source_path = tmp_path / "test.txt"
+        source_path.write_text("v0")
+        create_backup(source_path)
+        
+        with patch("mcp_server.utils.helpers.restore_from_backup") as scan:
+            for i in range(1, 4):
+                source_path.write_text(f"v{i}")
+                assert create_backup(source_path).read_text() == f"v{i}"
+            assert create_backup(source_path).read_text() == "v3"
+        scan.assert_not_called()
+
+    def test_create_backup_link(self, tmp_path):
+        """Test linked backups share the source inode and survive a replace."""
+        source_path = tmp_path / "test.txt"
+        source_path.write_text("old content")
+        
+        backup_path = create_backup(source_path, link=True)
+        assert os.path.samefile(backup_path, source_path)
+        
+        new_path = tmp_path / "new.txt"
+        new_path.write_text("new content")
+        os.replace(new_path, source_path)
+        assert backup_path.read_text() == "old content"
+
     def test_restore_from_backup_no_backup_dir(self, tmp_path):
         """Test restore_from_backup with no backup directory."""
         source_path = tmp_path / "test.txt"
@@ -516,19 +571,47 @@ class TestFileLock:
             assert lock_file.exists()
 
     @pytest.mark.skipif(os.name != 'posix', reason="File locking only supported on POSIX systems")
-    def test_file_lock_cleanup(self, tmp_path):
-        """Test file_lock context manager cleanup."""
+    def test_file_lock_release(self, tmp_path):
+        """Test file_lock releases the lock but keeps the lock file's inode."""
         file_path = tmp_path / "test.txt"
         file_path.touch()  # Create the file
         
         with file_lock(file_path, timeout=1):
             pass
         
-        # Lock file should be cleaned up
+        # Unlinking would let a new locker flock a different inode
         lock_file = file_path.with_suffix(file_path.suffix + ".lock")
-        # May take a moment for cleanup
-        time.sleep(0.1)
-        assert not lock_file.exists()
+        assert lock_file.exists()
+        
+        with file_lock(file_path, timeout=0):
+            pass
+    
+    @pytest.mark.skipif(os.name != 'posix', reason="File locking only supported on POSIX systems")
+    def test_file_lock_contention_times_out(self, tmp_path):
+        """Test a held lock makes a second locker time out instead of entering."""
+        file_path = tmp_path / "test.txt"
+        
+        with file_lock(file_path, timeout=1):
+            start = time.monotonic()
+            with pytest.raises(TimeoutError):
+                with file_lock(file_path, timeout=0.05):
+                    pytest.fail("Entered a lock that is already held")
+            assert time.monotonic() - start < 1
+    
+    @pytest.mark.skipif(os.name != 'posix', reason="File locking only supported on POSIX systems")
+    def test_file_lock_body_error_propagates(self, tmp_path):
+        """Test an OSError from the locked body is raised once, not retried."""
+        file_path = tmp_path / "test.txt"
+        entered = []
+        
+        with pytest.raises(OSError):
+            with file_lock(file_path, timeout=1):
+                entered.append(True)
+                raise OSError("disk full")
+        
+        assert entered == [True]
+        with file_lock(file_path, timeout=0):
+            pass
 
 
 class TestValidationFunctions:
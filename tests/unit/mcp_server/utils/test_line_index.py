@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ranged reads in mcp_server.utils.line_index.
+
+Tests cover:
+- Line offsets across checkpoint and read-chunk boundaries
+- Line ranges with and without a trailing newline
+- Index reuse and rebuild after changes
+- Byte ranges and streaming chunks
+"""
+
+import os
+
+import pytest
+
+from mcp_server.utils import line_index
+from mcp_server.utils.line_index import get_line_index, read_line_range, read_byte_range, read_chunk
+
+
+class TestLineIndex:
+    """Test cases for the line offset index."""
+    
+    @pytest.fixture
+    def log_file(self, tmp_path, monkeypatch):
+        """Create a log file and shrink the build chunk to cross chunk boundaries."""
+        monkeypatch.setattr(line_index, "READ_CHUNK", 1000)
+        monkeypatch.setattr(line_index, "SCAN_CHUNK", 50)
+        path = tmp_path / "app.log"
+        path.write_bytes(b"".join(b"line %d %s\n" % (i, b"x" * (i % 13)) for i in range(1, 501)))
+        return path
+    
+    def test_line_ranges_match_readlines(self, log_file):
+        """Test every checked range equals the same slice of readlines()."""
+        lines = log_file.read_bytes().splitlines(keepends=True)
+        
+        for start, end in [(1, 1), (63, 66), (64, 64), (65, 129), (128, 128), (450, 500), (499, 600)]:
+            data, info = read_line_range(log_file, start, end)
+            assert data == b"".join(lines[start - 1:end]), (start, end)
+            assert info["total_lines"] == 500
+            assert info["end_line"] == min(end, 500)
+    
+    def test_partial_last_line(self, tmp_path):
+        """Test a last line without newline counts and is readable."""
+        path = tmp_path / "notes.txt"
+        path.write_bytes(b"a\nb\nc")
+        
+        assert read_line_range(path, 3)[0] == b"c"
+        assert get_line_index(path).line_count == 3
+        assert read_line_range(path, 4)[0] == b""
+    
+    def test_index_cached_until_changed(self, log_file):
+        """Test the index is reused until the file changes."""
+        first = get_line_index(log_file)
+        assert get_line_index(log_file) is first
+        
+        with open(log_file, "ab") as f:
+            f.write(b"appended\n")
+        os.utime(log_file, ns=(1, 10 ** 18))
+        index = get_line_index(log_file)
+        assert index is not first and index.line_count == 501
+        assert read_line_range(log_file, 501)[0] == b"appended\n"
+    
+    def test_byte_range(self, log_file):
+        """Test byte ranges are clamped to the file."""
+        data, info = read_byte_range(log_file, 5, 4)
+        assert data == log_file.read_bytes()[5:9]
+        assert read_byte_range(log_file, 10 ** 9)[1]["start_byte"] == info["file_size"]
+    
+    def test_stream_chunks(self, tmp_path):
+        """Test chunks end on line or character boundaries and cover the file."""
+        path = tmp_path / "mixed.txt"
+        content = ("short\n" + "é" * 40 + "\n" + "long " * 30 + "\nend").encode("utf-8")
+        path.write_bytes(content)
+        
+        chunks = []
+        offset = 0
+        while offset < len(content):
+            data, offset, _ = read_chunk(path, offset, 16)
+            data.decode("utf-8")
+            chunks.append(data)
+        
+        assert b"".join(chunks) == content
+        assert chunks[0] == b"short\n"
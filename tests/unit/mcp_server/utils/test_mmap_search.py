@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Unit tests for memory-mapped searching in mcp_server.utils.mmap_search.
+
+Tests cover:
+- Bytes prefilter translation and refusal of unsafe constructs
+- Case-insensitive matches of non-ASCII case variants
+- Line numbers and context equal to a text-mode scan
+"""
+
+import re
+
+import pytest
+
+from mcp_server.utils.mmap_search import compile_bytes_prefilter, iter_mapped_matches
+
+
+def _text_scan(path, regex, context_lines):
+    """Reference results from a text-mode read."""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        lines = f.readlines()
+    results = []
+    for number, line in enumerate(lines, 1):
+        for match in regex.finditer(line):
+            start, end = max(0, number - 1 - context_lines), min(len(lines), number + context_lines)
+            context = [l.rstrip() for l in lines[start:end]] if context_lines else None
+            results.append((number, line.rstrip(), match.span(), context))
+    return results
+
+
+class TestBytesPrefilter:
+    """Test cases for compile_bytes_prefilter."""
+    
+    @pytest.mark.parametrize("pattern", ["def search", r"\bhead_path\b", r"(foo|bar)+x?", "^[A-Z_]{2,}$"])
+    def test_translatable(self, pattern):
+        """Test ASCII literals, sets, alternation, anchors and word boundaries translate."""
+        assert compile_bytes_prefilter(pattern) is not None
+    
+    @pytest.mark.parametrize("pattern", [".", r"\w+", r"\d", "[^a]", "é", r"(?<=a)b", r"(foo)\b", r"a\nb", "(?s)x"])
+    def test_untranslatable(self, pattern):
+        """Test constructs whose byte form could miss matches are refused."""
+        assert compile_bytes_prefilter(pattern) is None
+    
+    def test_ignore_case_special_letters(self):
+        """Test non-ASCII characters equal to ASCII letters under IGNORECASE still match."""
+        prefilter = compile_bytes_prefilter("SKI", re.IGNORECASE)
+        assert prefilter.search("ſKİ".encode("utf-8"))
+        assert compile_bytes_prefilter("ski").search(b"SKI") is None
+
+
+class TestMappedMatches:
+    """Test cases for iter_mapped_matches."""
+    
+    @pytest.fixture
+    def log_file(self, tmp_path):
+        """Create a log with CRLF and LF lines, UTF-8 text and no trailing newline."""
+        path = tmp_path / "app.log"
+        lines = [f"INFO request {i} handled" for i in range(200)]
+        lines[10] = "ERROR timeout in café"
+        lines[11] = "error Timeout again\r"
+        lines[199] = "ERROR timeout at end"
+        path.write_bytes("\n".join(lines).encode("utf-8"))
+        return path
+    
+    @pytest.mark.parametrize("context_lines", [0, 2])
+    def test_matches_text_scan(self, log_file, context_lines):
+        """Test line numbers, spans and context equal a text-mode scan."""
+        regex = re.compile(r"\btimeout\b", re.IGNORECASE)
+        prefilter = compile_bytes_prefilter(regex.pattern, regex.flags & re.IGNORECASE)
+        
+        mapped = [
+            (number, line.rstrip(), match.span(), context["context_lines"] if context else None)
+            for number, line, match, context in iter_mapped_matches(log_file, regex, prefilter, context_lines)
+        ]
+        
+        assert mapped == _text_scan(log_file, regex, context_lines)
+        assert [number for number, *_ in mapped] == [11, 12, 200]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the open task index in mcp_server.utils.open_tasks.
+
+Tests cover:
+- Byte offsets for rows, including quoted multi-line fields
+- Index rebuild and incremental start registration
+- Closing a task with a journaled tail rewrite and shifting later offsets
+- Replaying a close interrupted by a crash
+- Recovery when the file changes behind the index
+- Orphaned task reporting
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from mcp_server.models import TaskTimingData, TaskTimingContainer
+from mcp_server.utils import atomic_write
+from mcp_server.utils.open_tasks import OpenTaskIndex, iter_rows_with_offsets
+from mcp_server.utils.orchestrator_io import append_task_timing_entries
+
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def _entry(task_id: str, start: datetime, result: str = "started", task: str = None) -> TaskTimingData:
+    ts = start.isoformat().replace("+00:00", "Z")
+    return TaskTimingData(
+        timestamp=ts,
+        mode="code",
+        task_id=task_id,
+        start_time=ts,
+        end_time=None if result == "started" else ts,
+        duration=None if result == "started" else 60,
+        task=task or f"Task {task_id}",
+        result=result,
+        priority="normal"
+    )
+
+
+def _close(entry: TaskTimingData) -> TaskTimingData:
+    return entry.model_copy(update={"end_time": "2025-06-15T13:00:00Z", "result": "completed", "duration": 3600})
+
+
+class TestOpenTaskIndex:
+    """Test cases for OpenTaskIndex."""
+    
+    @pytest.fixture
+    def index(self, tmp_path):
+        """Create an index over a file with open and closed rows."""
+        head = tmp_path / "task_timing.tsv"
+        entries = [
+            _entry("done", NOW - timedelta(hours=3), result="completed"),
+            _entry("multi", NOW - timedelta(hours=2), task="line one\nline \"two\""),
+            _entry("dup", NOW - timedelta(hours=1)),
+            _entry("dup", NOW - timedelta(minutes=30)),
+            _entry("last", NOW - timedelta(minutes=5)),
+        ]
+        head.write_text(TaskTimingContainer(entries=entries).to_tsv() + "\n", encoding="utf-8")
+        return OpenTaskIndex(head, tmp_path / "open_tasks.json")
+    
+    def test_iter_rows_with_offsets(self, index):
+        """Test offsets cover the file exactly, including multi-line rows."""
+        raw = index.head_path.read_bytes()
+        rows = list(iter_rows_with_offsets(index.head_path))
+        
+        assert rows[0][2] is None
+        assert sum(length for _, length, _ in rows) == len(raw)
+        multi_offset, multi_length, multi = rows[2]
+        assert multi.task == "line one\nline \"two\""
+        assert raw[multi_offset:multi_offset + multi_length].count(b"\n") == 2
+    
+    def test_rebuild_lists_open_tasks(self, index):
+        """Test rebuild finds every open row in file order."""
+        tasks = index.rebuild()["tasks"]
+        
+        assert sorted(tasks) == ["dup", "last", "multi"]
+        assert len(tasks["dup"]) == 2
+    
+    def test_close_rewrites_only_target_row(self, index):
+        """Test closing a task updates its row and keeps later offsets valid."""
+        index.load()
+        
+        started, closed = index.close("multi", _close)
+        assert started.task == closed.task == "line one\nline \"two\""
+        
+        entries = TaskTimingContainer.from_tsv(index.head_path.read_text(encoding="utf-8")).entries
+        assert [e.result for e in entries] == ["completed", "completed", "started", "started", "started"]
+        assert entries[1].duration == 3600
+        
+        # Later rows are still found at their shifted offsets without a rebuild
+        assert index.close("last", _close)[0].task_id == "last"
+        assert index.load()["signature"] == index.signature()
+    
+    def test_close_rewrites_tail_in_place(self, index):
+        """Test closing patches the file from the row onwards and removes its journal."""
+        index.load()
+        before = index.head_path.read_bytes()
+        inode = index.head_path.stat().st_ino
+        
+        index.close("dup", _close)
+        
+        after = index.head_path.read_bytes()
+        assert index.head_path.stat().st_ino == inode
+        assert sorted(p.name for p in index.head_path.parent.iterdir()) == ["open_tasks.json", "task_timing.tsv", "task_timing.tsv.lock"]
+        # Everything outside the closed row is kept byte for byte
+        assert after.startswith(before[:before.index(b"Task dup")])
+        assert after.endswith(before[before.rindex(b"\n", 0, before.index(b"Task last")):])
+    
+    def test_interrupted_close_is_replayed(self, index, monkeypatch):
+        """Test a close that crashed after journaling is finished by the next writer."""
+        index.load()
+        apply_journal = atomic_write._apply_tail_journal
+        calls = []
+        
+        def crash_once(target_path, journal_path):
+            calls.append(journal_path)
+            if len(calls) == 1:
+                raise OSError("crashed before patching")
+            return apply_journal(target_path, journal_path)
+        
+        monkeypatch.setattr(atomic_write, "_apply_tail_journal", crash_once)
+        with pytest.raises(OSError):
+            index.close("multi", _close)
+        assert calls[0].exists()
+        
+        append_task_timing_entries([_entry("after", NOW)], index.head_path)
+        
+        entries = TaskTimingContainer.from_tsv(index.head_path.read_text(encoding="utf-8")).entries
+        assert [(e.task_id, e.result) for e in entries] == [
+            ("done", "completed"), ("multi", "completed"), ("dup", "started"),
+            ("dup", "started"), ("last", "started"), ("after", "started")
+        ]
+        assert not calls[0].exists()
+        assert sorted(t["task_id"] for t in index.open_tasks()) == ["after", "dup", "dup", "last"]
+    
+    def test_close_most_recent_duplicate(self, index):
+        """Test duplicate starts are closed most recent first."""
+        first = index.close("dup", _close)[0]
+        second = index.close("dup", _close)[0]
+        
+        assert first.start_time > second.start_time
+        assert index.close("dup", _close) is None
+    
+    def test_close_unknown_task(self, index):
+        """Test closing a task that is not open."""
+        assert index.close("done", _close) is None
+        assert index.close("missing", _close) is None
+    
+    def test_record_start(self, index):
+        """Test appended starts are registered without a rebuild."""
+        index.load()
+        signature = index.signature()
+        
+        entry = _entry("new", NOW)
+        append_task_timing_entries([entry], index.head_path)
+        
+        assert index.record_start(signature, entry) is True
+        assert index.close("new", _close)[0].task_id == "new"
+    
+    def test_untracked_write_triggers_rebuild(self, index):
+        """Test the index recovers after a write that bypassed it."""
+        index.load()
+        append_task_timing_entries([_entry("external", NOW)], index.head_path)
+        
+        assert index.close("external", _close)[0].task_id == "external"
+    
+    def test_orphaned(self, index):
+        """Test open tasks older than the threshold are reported oldest first."""
+        orphans = index.orphaned(timedelta(minutes=45), now=NOW)
+        
+        assert [o["task_id"] for o in orphans] == ["multi", "dup"]
+        assert orphans[0]["open_hours"] == 2.0
@@ -260,6 +260,7 @@ class TestSchedulesIO:
         with patch('mcp_server.utils.orchestrator_io.get_orchestrator_io') as mock_get_io:
             mock_io = Mock()
             mock_io.schedules_path = schedules_file
+            mock_io.load_if_changed.side_effect = lambda path, loader, copy: copy(loader())
             mock_get_io.return_value = mock_io
             
             result = load_schedules()
@@ -466,6 +467,7 @@ class TestPersistentMemoryIO:
         with patch('mcp_server.utils.orchestrator_io.get_orchestrator_io') as mock_get_io:
             mock_io = Mock()
             mock_io.persistent_memory_path = pm_file
+            mock_io.load_if_changed.side_effect = lambda path, loader, copy: copy(loader())
             mock_get_io.return_value = mock_io
             
             result = load_persistent_memory()
@@ -1075,6 +1077,7 @@ class TestErrorHandling:
         with patch('mcp_server.utils.orchestrator_io.get_orchestrator_io') as mock_get_io:
             mock_io = Mock()
             mock_io.persistent_memory_path = pm_file
+            mock_io.load_if_changed.side_effect = lambda path, loader, copy: copy(loader())
             mock_get_io.return_value = mock_io
             
             result = load_persistent_memory()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-file search results in mcp_server.utils.search_cache.
+
+Tests cover:
+- Reusing results only while the file identity is unchanged
+- Separate results for options that change the matches
+- Dropping results of reported changes
+- Query eviction and the match budget
+"""
+
+import os
+
+from mcp_server.utils import search_cache
+from mcp_server.utils.search_cache import SearchResultCache, file_identity
+from mcp_server.utils.workspace_watcher import FileChange
+
+
+class TestSearchResultCache:
+    """Test cases for SearchResultCache."""
+    
+    def _scan(self, path):
+        return file_identity(os.stat(path)), [{"file": path.name, "line_number": 1}]
+    
+    def test_reuse_until_file_changes(self, tmp_path):
+        """Test results are reused for the same identity and missed once the file changes."""
+        cache = SearchResultCache(4)
+        path = tmp_path / "mod.py"
+        path.write_text("alpha\n")
+        key = cache.query_key("alpha", 0, None, True, 0)
+        identity, matches = self._scan(path)
+        cache.store(key, {str(path): (identity, matches)})
+        
+        assert cache.lookup(key, str(path), identity) == matches
+        assert cache.lookup(cache.query_key("alpha", 0, None, True, 2), str(path), identity) is None
+        assert cache.lookup(cache.query_key("alpha", 0, None, False, 0), str(path), identity) is None
+        
+        path.write_text("alpha alpha\n")
+        assert cache.lookup(key, str(path), file_identity(os.stat(path))) is None
+        assert cache.stats()["hits"] == 1
+    
+    def test_reported_changes_dropped(self, tmp_path):
+        """Test changed files, changed directories and overflows drop results."""
+        cache = SearchResultCache(4)
+        key = cache.query_key("alpha", 0, None, True, 0)
+        paths = [tmp_path / "a.py", tmp_path / "pkg" / "b.py"]
+        paths[1].parent.mkdir()
+        for path in paths:
+            path.write_text("alpha\n")
+        cache.store(key, {str(path): self._scan(path) for path in paths})
+        
+        cache.on_changes([FileChange(str(paths[0]), "modified")])
+        assert cache.lookup(key, str(paths[0]), file_identity(os.stat(paths[0]))) is None
+        assert cache.stats()["files"] == 1
+        cache.on_changes([FileChange(str(tmp_path / "pkg"), "deleted", True)])
+        assert cache.stats()["files"] == 0
+        
+        cache.store(key, {str(paths[0]): self._scan(paths[0])})
+        cache.on_changes([FileChange(str(tmp_path), "overflow", True)])
+        assert cache.stats()["queries"] == 0
+    
+    def test_eviction_and_budget(self, tmp_path, monkeypatch):
+        """Test the oldest query is evicted and oversized queries are not kept."""
+        cache = SearchResultCache(2)
+        path = tmp_path / "mod.py"
+        path.write_text("alpha\n")
+        for pattern in ["a", "b", "c"]:
+            cache.store(cache.query_key(pattern, 0, None, True, 0), {str(path): self._scan(path)})
+        identity = file_identity(os.stat(path))
+        
+        assert cache.lookup(cache.query_key("a", 0, None, True, 0), str(path), identity) is None
+        assert cache.lookup(cache.query_key("c", 0, None, True, 0), str(path), identity) is not None
+        
+        monkeypatch.setattr(search_cache, "MAX_CACHED_MATCHES", 0)
+        cache.store(cache.query_key("c", 0, None, True, 0), {str(path): self._scan(path)})
+        assert cache.stats()["queries"] == 1
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the persistent trigram index in mcp_server.utils.search_index.
+
+Tests cover:
+- Literal extraction from regex patterns
+- Text folding for case-insensitive matching
+- Candidate narrowing as a superset of true matches
+- Incremental updates for modified, added and removed files
+- Files too large to index
+"""
+
+import os
+import re
+
+import pytest
+
+from mcp_server.utils.search_index import TrigramIndex, build_query, trigrams, fold_text
+
+
+class TestBuildQuery:
+    """Test cases for regex literal extraction."""
+    
+    def test_plain_literal(self):
+        """Test a plain pattern is a single literal."""
+        assert build_query("def search") == ("lit", "def search")
+    
+    def test_short_literals_match_everything(self):
+        """Test patterns without a 3-character literal are unconstrained."""
+        assert build_query("ab") is None
+        assert build_query(".*") is None
+    
+    def test_classes_split_literals(self):
+        """Test character classes split literal runs."""
+        assert build_query(r"foo\d+bar") == ("and", [("lit", "foo"), ("lit", "bar")])
+    
+    def test_alternation(self):
+        """Test alternations become OR queries."""
+        assert build_query("(foo|bar)baz") == ("and", [("or", [("lit", "foo"), ("lit", "bar")]), ("lit", "baz")])
+        # An alternative without literals makes the whole branch unconstrained
+        assert build_query("(foo|x)baz") == ("lit", "baz")
+    
+    def test_optional_and_repeated_groups(self):
+        """Test optional groups are dropped and required repeats kept."""
+        assert build_query("(?:abc)?def") == ("lit", "def")
+        assert build_query("(?:abc)+") == ("lit", "abc")
+    
+    def test_word_boundaries_keep_literal(self):
+        """Test zero-width assertions do not split literals."""
+        assert build_query(r"\bhead_path\b") == ("lit", "head_path")
+    
+    def test_invalid_pattern(self):
+        """Test invalid patterns are unconstrained."""
+        assert build_query("(") is None
+
+
+class TestFolding:
+    """Test cases for index text folding."""
+    
+    def test_case_and_special_letters(self):
+        """Test ASCII case and special letters are folded."""
+        assert fold_text("ABCKſ") == "abcks"
+    
+    def test_newlines_and_non_ascii(self):
+        """Test newlines are normalized and non-ASCII characters masked."""
+        assert fold_text("a\r\nbé") == "a\nb\x00"
+        assert trigrams("abécd") == set()
+
+
+class TestTrigramIndex:
+    """Test cases for TrigramIndex."""
+    
+    @pytest.fixture
+    def workspace(self, tmp_path):
+        """Create a small workspace of text files."""
+        root = tmp_path / "ws"
+        root.mkdir()
+        (root / "alpha.py").write_text("def search_in_files(pattern):\n    return pattern\n")
+        (root / "beta.md").write_text("# Notes\nSearch is CASE insensitive here\n")
+        (root / "gamma.txt").write_text("nothing to see\n")
+        return root
+    
+    @pytest.fixture
+    def index(self, tmp_path):
+        """Create an empty index."""
+        return TrigramIndex(tmp_path / "index" / "search.sqlite3")
+    
+    def _files(self, root):
+        return sorted(root.iterdir())
+    
+    def _truth(self, files, pattern, flags=0):
+        regex = re.compile(pattern, flags)
+        return [f for f in files if regex.search(f.read_text())]
+    
+    @pytest.mark.parametrize("pattern,flags", [
+        ("search_in", 0),
+        ("SEARCH", re.IGNORECASE),
+        ("case insensitive", re.IGNORECASE),
+        (r"(notes|nothing)", 0),
+        ("missing entirely", 0),
+    ])
+    def test_candidates_superset(self, index, workspace, pattern, flags):
+        """Test candidates always include every file that matches."""
+        files = self._files(workspace)
+        candidates = index.candidates(files, pattern, flags, root=workspace)
+        
+        assert set(self._truth(files, pattern, flags)) <= set(candidates)
+        assert candidates == [f for f in files if f in candidates]
+    
+    def test_candidates_narrow(self, index, workspace):
+        """Test files without the required literals are skipped."""
+        candidates = index.candidates(self._files(workspace), "search_in_files", root=workspace)
+        assert [f.name for f in candidates] == ["alpha.py"]
+    
+    def test_incremental_update(self, index, workspace):
+        """Test modified, added and removed files are picked up."""
+        index.candidates(self._files(workspace), "anything", root=workspace)
+        
+        gamma = workspace / "gamma.txt"
+        gamma.write_text("now mentions search_in_files too\n")
+        os.utime(gamma, ns=(1, 10 ** 18))
+        (workspace / "delta.txt").write_text("search_in_files again\n")
+        (workspace / "alpha.py").unlink()
+        
+        candidates = index.candidates(self._files(workspace), "search_in_files", root=workspace)
+        assert sorted(f.name for f in candidates) == ["delta.txt", "gamma.txt"]
+        assert index.stats()["files"] == 3
+    
+    def test_large_files_always_candidates(self, tmp_path, workspace):
+        """Test files above the size limit are never skipped."""
+        index = TrigramIndex(tmp_path / "small.sqlite3", max_file_size=40)
+        candidates = index.candidates(self._files(workspace), "zzz_not_present", root=workspace)
+        
+        assert [f.name for f in candidates] == ["alpha.py"]
+        assert index.stats()["unindexed_files"] == 1
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for search scanning backends in mcp_server.utils.search_pool.
+
+Tests cover:
+- Choosing a backend from file count and bytes
+- Contiguous, bounded batches for worker processes
+- Compact matches from single files and batches
+- Scanning a batch on the shared process pool
+"""
+
+import re
+
+import pytest
+
+from mcp_server.utils import search_pool
+from mcp_server.utils.search_pool import (
+    choose_backend, make_batches, scan_file, scan_batch, get_process_pool, shutdown_process_pool
+)
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Create a few files with known matches."""
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"f{i}.py"
+        path.write_text(f"import os\nvalue = {i}\nimport re\n")
+        paths.append((str(path), path.stat().st_size))
+    return paths
+
+
+class TestBackends:
+    """Test cases for backend selection and batching."""
+    
+    def test_choose_backend(self):
+        """Test small scans run inline, large ones on processes given several workers."""
+        mib = 1024 * 1024
+        assert choose_backend(1, 100 * mib, workers=4) == "inline"
+        assert choose_backend(50, 10 * 1024, workers=4) == "inline"
+        assert choose_backend(50, 2 * mib, workers=4) == "thread"
+        assert choose_backend(50, 32 * mib, workers=4) == "process"
+        assert choose_backend(50, 32 * mib, workers=1) == "thread"
+        assert choose_backend(1, 10, requested="process") == "process"
+    
+    def test_make_batches(self, monkeypatch):
+        """Test batches keep file order and respect the byte target and file limit."""
+        monkeypatch.setattr(search_pool, "BATCH_MAX_FILES", 3)
+        files = [(f"f{i}", 100) for i in range(10)]
+        
+        batches = make_batches(files, workers=1)
+        assert [f for batch in batches for f in batch] == files
+        assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+        assert [len(batch) for batch in make_batches(files[:4], workers=4)] == [1, 1, 1, 1]
+
+
+class TestScanning:
+    """Test cases for scan_file and scan_batch."""
+    
+    def test_scan_file(self, files):
+        """Test compact match tuples, context and the per-file limit."""
+        path, size = files[0]
+        found = scan_file(path, size, re.compile("import"), None, context_lines=1)
+        
+        assert [m[:5] for m in found] == [(1, "import os", "import", 0, 6), (3, "import re", "import", 0, 6)]
+        assert found[0][5]["context_lines"] == ["import os", "value = 0"]
+        assert len(scan_file(path, size, re.compile("import"), None, max_matches=1)) == 1
+    
+    def test_scan_batch(self, files, tmp_path):
+        """Test batches match per-file scans, mark unreadable files and stop at the limit."""
+        regex = re.compile("import")
+        missing = (str(tmp_path / "missing.py"), 10)
+        
+        results = scan_batch(files[:2] + [missing], "import", 0)
+        assert results == [scan_file(path, size, regex, None) for path, size in files[:2]] + [None]
+        assert len(scan_batch(files, "import", 0, max_matches=3)) == 2
+    
+    def test_process_pool(self, files):
+        """Test a batch scanned in a worker process returns the in-process result."""
+        try:
+            future = get_process_pool(1).submit(scan_batch, files, "value = \\d", 0)
+            assert future.result(timeout=60) == scan_batch(files, "value = \\d", 0)
+        finally:
+            shutdown_process_pool()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cross-process parse cache in mcp_server.utils.shared_cache.
+
+Tests cover:
+- Reusing stored results only for the signature they were parsed from
+- Dropping the least recently stored entries
+- Parsing through load_shared, with and without the shared tier
+- Restoring TODO documents that still parse appends incrementally
+"""
+
+import pytest
+
+from mcp_server.utils import shared_cache
+from mcp_server.utils.helpers import file_signature
+from mcp_server.utils.shared_cache import SharedParseCache, load_shared
+from mcp_server.utils.todo_parser import TodoDocument, _parse_file
+
+
+class TestSharedParseCache:
+    """Test cases for SharedParseCache and load_shared."""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create an empty shared cache."""
+        return SharedParseCache(tmp_path / "cache" / "shared.sqlite3", max_entries=2)
+    
+    def test_signature_checked(self, cache, tmp_path):
+        """Test results are shared between instances and ignored once the file changes."""
+        path = tmp_path / "notes.md"
+        path.write_text("# Notes\n")
+        signature = file_signature(path)
+        assert cache.put("sections", str(path), signature, {"Notes": ""})
+        
+        other = SharedParseCache(cache.db_path)
+        assert other.get("sections", str(path), signature) == {"Notes": ""}
+        assert other.get("todo", str(path), signature) is None
+        
+        path.write_text("# Notes\nchanged\n")
+        assert other.get("sections", str(path), file_signature(path)) is None
+        assert (other.hits, other.misses) == (1, 2)
+    
+    def test_oldest_entries_dropped(self, cache):
+        """Test the least recently stored entries go beyond max_entries."""
+        for name in ["a", "b", "c"]:
+            cache.put("sections", name, [1, 1, 1], name)
+        
+        assert cache.get("sections", "a", [1, 1, 1]) is None
+        assert cache.get("sections", "c", [1, 1, 1]) == "c"
+        assert cache.stats()["entries"] == 2
+        assert not cache.put("sections", "d", [1, 1, 1], object())
+    
+    def test_load_shared(self, cache, tmp_path, monkeypatch):
+        """Test a stored parse is reused and the parser runs directly without the shared tier."""
+        path = tmp_path / "notes.md"
+        path.write_text("# Notes\n")
+        calls = []
+        
+        def parse():
+            calls.append(1)
+            return {"Notes": ""}
+        
+        monkeypatch.setattr(shared_cache, "get_shared_cache", lambda: cache)
+        assert load_shared("sections", path, parse) == {"Notes": ""}
+        assert load_shared("sections", path, parse) == {"Notes": ""}
+        assert len(calls) == 1
+        
+        monkeypatch.setattr(shared_cache, "get_shared_cache", lambda: None)
+        load_shared("sections", path, parse)
+        assert len(calls) == 2
+    
+    def test_todo_document_round_trip(self, tmp_path, monkeypatch):
+        """Test a restored TODO document matches the parse and keeps parsing appends incrementally."""
+        path = tmp_path / "TODO.md"
+        path.write_text("## Planning\n- [x] Done\n- [ ] Open\n")
+        parsed = _parse_file(path)
+        restored = TodoDocument.from_dict(parsed.to_dict())
+        
+        assert restored.items == parsed.items
+        assert restored.sections == parsed.sections
+        assert restored.section_summary() == parsed.section_summary()
+        
+        with open(path, "a") as f:
+            f.write("- [ ] Appended\n")
+        fed = []
+        original_feed = TodoDocument._feed
+        monkeypatch.setattr(
+            TodoDocument, "_feed",
+            lambda self, lines: (fed.extend(lines), original_feed(self, lines))
+        )
+        
+        updated = _parse_file(path, restored)
+        assert [item["text"] for item in updated.items] == ["Done", "Open", "Appended"]
+        assert "- [x] Done" not in fed
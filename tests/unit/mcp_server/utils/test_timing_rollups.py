@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for task timing rollups in mcp_server.utils.timing_rollups.
+
+Tests cover:
+- Summaries matching a full row scan across segments and the active file
+- Partial edge hours and mode/priority filters
+- Incremental updates applied by writers
+- Lazy rebuild after writes that bypass the incremental hooks
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from mcp_server.models import TaskTimingData, TaskTimingContainer, PriorityType
+from mcp_server.utils.timing_store import TaskTimingStore
+from mcp_server.utils.timing_rollups import TaskTimingRollups, bucket_key
+from mcp_server.utils.orchestrator_io import append_task_timing_entries
+
+
+NOW = datetime(2025, 6, 15, 12, 30, tzinfo=timezone.utc)
+
+
+def _entry(task_id: str, start: datetime, mode: str = "code", duration: int = 60,
+           result: str = "completed", priority: str = "normal") -> TaskTimingData:
+    ts = start.isoformat().replace("+00:00", "Z")
+    return TaskTimingData(
+        timestamp=ts,
+        mode=mode,
+        task_id=task_id,
+        start_time=ts,
+        end_time=None if result == "started" else ts,
+        duration=0 if result == "started" else duration,
+        task=f"Task {task_id}",
+        result=result,
+        priority=priority
+    )
+
+
+def _scan(store, start=None, end=None, mode=None, priority=None):
+    """Reference summary computed by scanning rows."""
+    entries = [
+        e for e in store.iter_entries(start, end)
+        if (not mode or e.mode == mode) and (not priority or e.priority == priority)
+    ]
+    return {
+        "count": len(entries),
+        "completed": len([e for e in entries if e.result == "completed"]),
+        "started": len([e for e in entries if e.result == "started"]),
+        "total_duration": sum(e.duration or 0 for e in entries),
+    }
+
+
+class TestTaskTimingRollups:
+    """Test cases for TaskTimingRollups."""
+    
+    @pytest.fixture
+    def rollups(self, tmp_path):
+        """Create rollups over rows spread across segments and the active file."""
+        head = tmp_path / "task_timing.tsv"
+        entries = [
+            _entry("a", NOW - timedelta(days=3), duration=30),
+            _entry("b", NOW - timedelta(days=1, minutes=10), mode="architect", duration=120),
+            _entry("c", NOW - timedelta(hours=5, minutes=45), priority="schedule", duration=15),
+            _entry("d", NOW - timedelta(minutes=20), duration=45),
+            _entry("e", NOW - timedelta(minutes=5), result="started"),
+        ]
+        head.write_text(TaskTimingContainer(entries=entries).to_tsv() + "\n", encoding="utf-8")
+        store = TaskTimingStore(head, tmp_path / "segments", partition="day", compress_after_days=None)
+        store.rollover(NOW)
+        return TaskTimingRollups(store)
+    
+    def test_bucket_key(self):
+        """Test bucket keys combine hour, mode and priority."""
+        entry = _entry("x", NOW, mode="debug", priority="todo")
+        assert bucket_key(entry) == "2025-06-15T12|debug|todo"
+    
+    @pytest.mark.parametrize("hours", [1, 6, 25, 24 * 7])
+    def test_summarize_matches_scan(self, rollups, hours):
+        """Test windowed summaries match a full row scan, including edge hours."""
+        start = NOW - timedelta(hours=hours)
+        summary = rollups.summarize(start=start)
+        expected = _scan(rollups.store, start=start)
+        
+        for field, value in expected.items():
+            assert summary[field] == value
+    
+    def test_summarize_filters(self, rollups):
+        """Test mode and priority filters."""
+        assert rollups.summarize(mode="architect")["count"] == 1
+        assert rollups.summarize(priority=PriorityType.SCHEDULE)["total_duration"] == 15
+        
+        by_mode = rollups.summarize()["by_mode"]
+        assert by_mode["code"] == {"count": 4, "total_duration": 90, "completed": 3}
+        assert rollups.total_entries() == 5
+    
+    def test_summarize_bounded_range(self, rollups):
+        """Test a range with both bounds inside single hours."""
+        start = NOW - timedelta(hours=6)
+        end = NOW - timedelta(minutes=10)
+        summary = rollups.summarize(start=start, end=end)
+        assert summary["count"] == _scan(rollups.store, start, end)["count"] == 2
+    
+    def test_apply_head_change(self, rollups):
+        """Test incremental updates keep rollups fresh without a rebuild."""
+        rollups.buckets()
+        signature = rollups.head_signature()
+        
+        new_entry = _entry("f", NOW, mode="debug", duration=10)
+        append_task_timing_entries([new_entry], rollups.store.head_path)
+        
+        assert rollups.apply_head_change(signature, added=[new_entry]) is True
+        assert rollups.summarize(mode="debug")["total_duration"] == 10
+    
+    def test_apply_head_change_stale(self, rollups):
+        """Test rollups are rebuilt instead of patched after an untracked write."""
+        rollups.buckets()
+        
+        # Write that bypasses the incremental hooks
+        append_task_timing_entries([_entry("g", NOW, mode="debug", duration=5)], rollups.store.head_path)
+        
+        signature = rollups.head_signature()
+        new_entry = _entry("h", NOW, mode="debug", duration=10)
+        append_task_timing_entries([new_entry], rollups.store.head_path)
+        
+        assert rollups.apply_head_change(signature, added=[new_entry]) is False
+        assert rollups.summarize(mode="debug")["total_duration"] == 15
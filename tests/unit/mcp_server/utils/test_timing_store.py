@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Unit tests for time-partitioned task timing storage in mcp_server.utils.timing_store.
+
+Tests cover:
+- Period keys and bounds for day and week partitions
+- Rollover of closed past-period rows into segments
+- Open rows staying in the active file
+- Rollover backing off when the active file changes mid-split
+- Range queries opening only overlapping segments
+- Segment compression
+- Keeping existing segments when the partition changes
+"""
+
+import gzip
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from mcp_server.models import TaskTimingData, TaskTimingContainer
+from mcp_server.utils import timing_store
+from mcp_server.utils.timing_store import TaskTimingStore
+
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def _entry(task_id: str, start: datetime, result: str = "completed") -> TaskTimingData:
+    ts = start.isoformat().replace("+00:00", "Z")
+    return TaskTimingData(
+        timestamp=ts,
+        mode="code",
+        task_id=task_id,
+        start_time=ts,
+        end_time=None if result == "started" else ts,
+        duration=0 if result == "started" else 60,
+        task=f"Task {task_id}",
+        result=result,
+        priority="normal"
+    )
+
+
+def _write_head(path: Path, entries) -> None:
+    path.write_text(TaskTimingContainer(entries=list(entries)).to_tsv() + "\n", encoding="utf-8")
+
+
+class TestTaskTimingStore:
+    """Test cases for TaskTimingStore."""
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Create a day-partitioned store with rows spread over several days."""
+        head = tmp_path / "task_timing.tsv"
+        _write_head(head, [
+            _entry("old1", NOW - timedelta(days=10)),
+            _entry("old2", NOW - timedelta(days=2)),
+            _entry("open", NOW - timedelta(days=2), result="started"),
+            _entry("today", NOW - timedelta(hours=1)),
+        ])
+        return TaskTimingStore(head, tmp_path / "segments", partition="day", compress_after_days=None)
+    
+    def test_period_keys(self, tmp_path):
+        """Test day and week period keys and bounds."""
+        day_store = TaskTimingStore(tmp_path / "t.tsv", partition="day")
+        week_store = TaskTimingStore(tmp_path / "t.tsv", partition="week")
+        
+        assert day_store.period_key(NOW) == "2025-06-15"
+        assert week_store.period_key(NOW) == "2025-W24"
+        
+        start, end = week_store.period_bounds("2025-W24")
+        assert start <= NOW < end
+        assert end - start == timedelta(weeks=1)
+    
+    def test_invalid_partition(self, tmp_path):
+        """Test that unknown partitions are rejected."""
+        with pytest.raises(ValueError):
+            TaskTimingStore(tmp_path / "t.tsv", partition="month")
+    
+    def test_rollover_moves_closed_past_rows(self, store):
+        """Test rollover keeps current and open rows in the active file."""
+        moved = store.rollover(NOW)
+        
+        assert moved == 2
+        head_ids = [e.task_id for e in TaskTimingContainer.from_tsv(store.head_path.read_text()).entries]
+        assert head_ids == ["open", "today"]
+        
+        manifest = store.load_manifest()
+        assert manifest["head_period"] == "2025-06-15"
+        assert sorted(manifest["segments"]) == ["2025-06-05", "2025-06-13"]
+        assert store.total_entries() == 4
+    
+    def test_rollover_backs_off_on_concurrent_change(self, store, monkeypatch):
+        """Test a head changed during the split is left alone and rolled over later."""
+        original = store.head_path.read_bytes()
+        real_signature = timing_store.file_signature
+        signatures = iter([[0, 0, 0], [1, 1, 1]])
+        monkeypatch.setattr(timing_store, "file_signature", lambda path: next(signatures))
+        
+        assert store.rollover(NOW) == 0
+        assert store.head_path.read_bytes() == original
+        assert store.load_manifest()["head_period"] is None
+        assert sorted(p.name for p in store.segments_dir.iterdir()) == []
+        
+        monkeypatch.setattr(timing_store, "file_signature", real_signature)
+        assert store.maybe_rollover(NOW) == 2
+        assert store.total_entries() == 4
+    
+    def test_maybe_rollover_only_once_per_period(self, store):
+        """Test maybe_rollover is a no-op within the same period."""
+        assert store.maybe_rollover(NOW) == 2
+        assert store.maybe_rollover(NOW + timedelta(hours=1)) == 0
+    
+    def test_iter_entries_range(self, store):
+        """Test range queries across segments and the active file."""
+        store.rollover(NOW)
+        
+        all_ids = sorted(e.task_id for e in store.iter_entries())
+        assert all_ids == ["old1", "old2", "open", "today"]
+        
+        recent = sorted(e.task_id for e in store.iter_entries(start=NOW - timedelta(days=3)))
+        assert recent == ["old2", "open", "today"]
+        
+        segments = store.segments_for_range(start=NOW - timedelta(days=3))
+        assert [key for key, _ in segments] == ["2025-06-13"]
+    
+    def test_compress_segments(self, store):
+        """Test old segments are gzip-compressed and remain readable."""
+        store.rollover(NOW)
+        
+        compressed = store.compress_segments(older_than_days=5, now=NOW)
+        assert compressed == 1
+        
+        info = store.load_manifest()["segments"]["2025-06-05"]
+        assert info["compressed"] is True
+        with gzip.open(store.segments_dir / info["file"], "rt", encoding="utf-8") as f:
+            assert "old1" in f.read()
+        
+        ids = [e.task_id for e in store.iter_entries(end=NOW - timedelta(days=5))]
+        assert ids == ["old1"]
+    
+    def test_partition_change_keeps_segments(self, store, tmp_path):
+        """Test switching from day to week partitioning keeps day segments readable."""
+        store.rollover(NOW)
+        week_store = TaskTimingStore(store.head_path, store.segments_dir, partition="week", compress_after_days=None)
+        
+        assert week_store.total_entries() == 4
+        assert sorted(e.task_id for e in week_store.iter_entries()) == ["old1", "old2", "open", "today"]
+        
+        later = NOW + timedelta(days=8)
+        assert week_store.maybe_rollover(later) == 1
+        manifest = week_store.load_manifest()
+        assert manifest["partition"] == "week"
+        assert sorted(manifest["segments"]) == ["2025-06-05", "2025-06-13", "2025-W24"]
+        assert week_store.total_entries() == 4
+        
+        segments = week_store.segments_for_range(start=NOW - timedelta(days=3))
+        assert [key for key, _ in segments] == ["2025-W24", "2025-06-13"]
+        recent = sorted(e.task_id for e in week_store.iter_entries(start=NOW - timedelta(days=3)))
+        assert recent == ["old2", "open", "today"]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared TODO.md parser in mcp_server.utils.todo_parser.
+
+Tests cover:
+- Single-pass parsing into items, sections and counts
+- Filtering by completion, search pattern and section
+- Cache hits for unchanged files
+- Incremental reparse of appended content
+- Full reparse after in-place edits, including same-inode edits before the parsed boundary
+"""
+
+import re
+
+import pytest
+
+from mcp_server.utils import todo_parser
+from mcp_server.utils.todo_parser import parse_todo_content, get_todo_document
+
+
+TODO_CONTENT = """# TODO
+
+## Planning
+- [x] Completed TODO item
+- [ ] Pending TODO item
+  - [ ] Indented items are notes, not todos
+
+## Backlog
+- [X] Another completed item (uppercase X)
+- [ ] Second pending item
+"""
+
+
+class TestTodoParser:
+    """Test cases for TODO parsing and caching."""
+    
+    @pytest.fixture
+    def todo_file(self, tmp_path):
+        """Create a TODO.md file."""
+        path = tmp_path / "TODO.md"
+        path.write_text(TODO_CONTENT, encoding="utf-8")
+        return path
+    
+    def test_parse_content(self):
+        """Test items, sections and counts from a single pass."""
+        document = parse_todo_content(TODO_CONTENT)
+        
+        assert document.total == 4
+        assert document.completed_count == 2
+        assert document.pending_count == 2
+        assert [item["section"] for item in document.items] == ["## Planning"] * 2 + ["## Backlog"] * 2
+        assert document.section_summary()["## Backlog"] == {"total": 2, "completed": 1, "pending": 1}
+    
+    def test_iter_items_filters(self):
+        """Test completion, search and section filters."""
+        document = parse_todo_content(TODO_CONTENT)
+        
+        pending = [item["text"] for item in document.iter_items(include_completed=False)]
+        assert pending == ["Pending TODO item", "Second pending item"]
+        
+        found = [item["text"] for item in document.iter_items(search_pattern="^second")]
+        assert found == ["Second pending item"]
+        
+        backlog = list(document.iter_items(section="## Backlog"))
+        assert len(backlog) == 2
+        
+        with pytest.raises(re.error):
+            list(document.iter_items(search_pattern="("))
+    
+    def test_cached_until_changed(self, todo_file):
+        """Test unchanged files are served from cache."""
+        first = get_todo_document(todo_file)
+        assert get_todo_document(todo_file) is first
+    
+    def test_incremental_append(self, todo_file, monkeypatch):
+        """Test appended lines are parsed without re-reading the whole file."""
+        first = get_todo_document(todo_file)
+        
+        with open(todo_file, "a", encoding="utf-8") as f:
+            f.write("- [ ] Appended item\n## Later\n- [x] Done later")
+        
+        fed = []
+        original_feed = todo_parser.TodoDocument._feed
+        monkeypatch.setattr(
+            todo_parser.TodoDocument, "_feed",
+            lambda self, lines: (fed.extend(lines), original_feed(self, lines))
+        )
+        
+        document = get_todo_document(todo_file)
+        assert document is not first
+        assert first.total == 4
+        assert document.total == 6
+        assert document.items[-1]["section"] == "## Later"
+        assert "- [ ] Pending TODO item" not in fed
+        
+        # Completing the trailing line re-parses only that line
+        with open(todo_file, "a", encoding="utf-8") as f:
+            f.write("\n- [ ] Final item\n")
+        document = get_todo_document(todo_file)
+        assert [item["text"] for item in document.items[-2:]] == ["Done later", "Final item"]
+        assert document.completed_count == 3
+    
+    def test_full_reparse_after_edit(self, todo_file):
+        """Test in-place edits trigger a full reparse."""
+        get_todo_document(todo_file)
+        todo_file.write_text(TODO_CONTENT.replace("- [ ] Pending", "- [x] Pending") + "\n", encoding="utf-8")
+        
+        document = get_todo_document(todo_file)
+        assert document.total == 4
+        assert document.completed_count == 3
+    
+    def test_same_inode_edit_before_boundary(self, tmp_path):
+        """Test an in-place edit far before the parsed boundary is not missed when appending."""
+        path = tmp_path / "TODO.md"
+        path.write_text("## Backlog\n" + "".join(f"- [ ] Item {i:04d}\n" for i in range(1000)), encoding="utf-8")
+        assert get_todo_document(path).completed_count == 0
+        
+        with open(path, "r+", encoding="utf-8") as f:
+            f.seek(len("## Backlog\n- ["))
+            f.write("x")
+            f.seek(0, 2)
+            f.write("- [ ] Appended\n")
+        
+        document = get_todo_document(path)
+        assert document.completed_count == 1
+        assert document.total == 1001
+        assert document.items[0]["completed"]
+    
+    def test_missing_file(self, tmp_path):
+        """Test a missing file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            get_todo_document(tmp_path / "missing.md")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tool result caching in mcp_server.utils.tool_cache.
+
+Tests cover:
+- Caching only successful tool results
+- Bypassing the cache when cache_enabled is off
+"""
+
+import asyncio
+
+from mcp_server.config import settings
+from mcp_server.utils.tool_cache import cached_tool
+
+
+class TestCachedTool:
+    """Test cases for cached_tool."""
+    
+    def _tool(self):
+        calls = []
+        
+        @cached_tool(key=["name"])
+        async def lookup(name: str, fail: bool = False):
+            calls.append(name)
+            return {"success": not fail, "name": name}
+        
+        return lookup, calls
+    
+    def test_only_successes_cached(self, tmp_path, monkeypatch):
+        """Test successful results are reused and failures recomputed."""
+        monkeypatch.setattr(settings, "_config_instance", settings.ServerConfig(workspace_path=tmp_path))
+        lookup, calls = self._tool()
+        
+        for _ in range(2):
+            asyncio.run(lookup("a"))
+            asyncio.run(lookup("b", fail=True))
+        assert calls == ["a", "b", "b"]
+    
+    def test_cache_disabled(self, tmp_path, monkeypatch):
+        """Test every call runs the tool while cache_enabled is off."""
+        monkeypatch.setattr(
+            settings, "_config_instance", settings.ServerConfig(workspace_path=tmp_path, cache_enabled=False)
+        )
+        lookup, calls = self._tool()
+        
+        asyncio.run(lookup("a"))
+        asyncio.run(lookup("a"))
+        assert calls == ["a", "a"]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-tool instrumentation in mcp_server.utils.tool_metrics.
+
+Tests cover:
+- Recording duration, payload sizes and error types per call
+- Queue wait measured on a real executor, without a concurrency limit
+- Keeping the wrapped tool's name and signature
+- The per-tool report and the Prometheus text output
+"""
+
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from performance_optimizations import PerformanceMonitor
+from mcp_server.config import settings
+from mcp_server.utils import tool_metrics
+from mcp_server.utils.tool_metrics import instrument_tool, track_queue_wait, tool_metrics_report, render_prometheus
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    """Use a fresh, active monitor and a workspace config."""
+    monkeypatch.setattr(settings, "_config_instance", settings.ServerConfig(workspace_path=tmp_path))
+    monitor = PerformanceMonitor()
+    monitor.start_monitoring()
+    monkeypatch.setattr(tool_metrics, "performance_monitor", monitor)
+    return monitor
+
+
+async def lookup_tool(name: str, fail: bool = False):
+    """Look something up."""
+    if name == "boom":
+        raise KeyError(name)
+    return {"success": not fail, "name": name}
+
+
+class TestInstrumentTool:
+    """Test cases for instrument_tool and the metric views."""
+    
+    def test_records_calls(self, monitor):
+        """Test each call records its timings and sizes, and failures their error type."""
+        tool = instrument_tool(lookup_tool)
+        assert tool.__name__ == "lookup_tool"
+        assert inspect.signature(tool) == inspect.signature(lookup_tool)
+        
+        async def run():
+            await asyncio.gather(tool(name="a"), tool(name="b", fail=True))
+            with pytest.raises(KeyError):
+                await tool(name="boom")
+        
+        asyncio.run(run())
+        assert monitor.get_metric("tool_duration_ms")["count"] == 3
+        assert monitor.get_metric("tool_queue_wait_ms")["count"] == 0
+        assert monitor.get_metric("tool_request_bytes")["min"] == len('{"name": "a"}')
+        
+        report = tool_metrics_report()
+        stats = report["tools"][0]
+        assert (stats["tool"], stats["calls"], stats["errors"]) == ("lookup_tool", 3, 2)
+        assert stats["error_types"] == {"tool_error": 1, "KeyError": 1}
+        assert stats["duration_ms"]["p95"] >= stats["duration_ms"]["p50"]
+    
+    def test_no_concurrency_limit(self, monitor, monkeypatch):
+        """Test instrumentation does not serialize calls beyond max_concurrent_operations."""
+        monkeypatch.setattr(settings._config_instance, "max_concurrent_operations", 1)
+        
+        async def slow(name: str):
+            await asyncio.sleep(0.1)
+            return {"success": True}
+        
+        tool = instrument_tool(slow)
+        
+        async def run():
+            await asyncio.gather(*(tool(name=str(i)) for i in range(4)))
+        
+        started = time.perf_counter()
+        asyncio.run(run())
+        assert time.perf_counter() - started < 0.3
+    
+    def test_queue_wait_from_executor(self, monitor):
+        """Test work queued behind a busy executor worker records its wait for the tool."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        
+        async def batch(name: str):
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(executor, track_queue_wait(time.sleep, 0.03)) for _ in range(2)
+            ))
+            return {"success": True}
+        
+        try:
+            asyncio.run(instrument_tool(batch)(name="a"))
+        finally:
+            executor.shutdown()
+        
+        waits = monitor.get_metric("tool_queue_wait_ms")
+        assert waits["count"] == 2
+        assert waits["max"] >= 25
+        assert tool_metrics_report()["tools"][0]["queue_wait_ms"]["max"] == waits["max"]
+        
+        # Work submitted outside a tool call is not attributed to any tool
+        track_queue_wait(time.sleep, 0)()
+        assert monitor.get_metric("tool_queue_wait_ms")["count"] == 2
+    
+    def test_prometheus(self, monitor):
+        """Test summaries with quantiles, sums, counts and escaped labels."""
+        monitor.record_metric("tool_duration_ms", 5, {"tool": 'say "hi"'})
+        monitor.record_metric("tool_duration_ms", 7, {"tool": 'say "hi"'})
+        
+        lines = render_prometheus().splitlines()
+        assert lines[0] == "# TYPE mcp_tool_duration_ms summary"
+        assert 'mcp_tool_duration_ms{tool="say \\"hi\\"",quantile="0.99"} 7' in lines
+        assert 'mcp_tool_duration_ms_count{tool="say \\"hi\\""} 2' in lines
+        assert 'mcp_tool_duration_ms_sum{tool="say \\"hi\\""} 12.0' in lines
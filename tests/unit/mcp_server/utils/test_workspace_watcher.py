@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Unit tests for workspace change notifications in mcp_server.utils.workspace_watcher.
+
+Tests cover:
+- Publishing change batches to subscribers
+- Polling and inotify backends
+- Cache and index subscribers dropping stale data
+- Orchestrator files served from memory until reported changed
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+from mcp_server.utils import workspace_watcher, orchestrator_io
+from mcp_server.utils.workspace_watcher import (
+    FileChange, WorkspaceWatcher, subscribe, unsubscribe, publish, publish_changes, change_generation
+)
+from mcp_server.utils.file_cache import FileContentCache
+from mcp_server.utils.search_index import TrigramIndex
+
+
+@pytest.fixture
+def received():
+    """Collect published changes for the duration of a test."""
+    changes = []
+    callback = subscribe(changes.extend)
+    yield changes
+    unsubscribe(callback)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestPublish:
+    """Test cases for the change bus."""
+    
+    def test_delivers_and_counts(self, received):
+        """Test batches reach subscribers and bump the generation."""
+        generation = change_generation()
+        publish_changes(["a.txt", "b.txt"])
+        publish([])
+        
+        assert [change.kind for change in received] == ["modified", "modified"]
+        assert received[0].path == os.path.abspath("a.txt")
+        assert change_generation() == generation + 1
+    
+    def test_failing_subscriber_isolated(self, received):
+        """Test a subscriber raising does not stop delivery to the others."""
+        def broken(changes):
+            raise RuntimeError("boom")
+        subscribe(broken)
+        try:
+            publish([FileChange("/x", "deleted")])
+        finally:
+            unsubscribe(broken)
+        assert len(received) == 1
+
+
+class TestWorkspaceWatcher:
+    """Test cases for WorkspaceWatcher backends."""
+    
+    @pytest.fixture
+    def workspace(self, tmp_path):
+        """Create a workspace with an excluded directory."""
+        (tmp_path / "notes.md").write_text("one\n")
+        (tmp_path / "venv").mkdir()
+        return tmp_path
+    
+    def _exercise(self, workspace, received, backend):
+        watcher = WorkspaceWatcher(workspace, exclude_dirs=["venv*"], backend=backend, poll_interval=0.05)
+        assert watcher.start() == backend
+        try:
+            assert received and received[0].kind == "overflow"
+            with open(workspace / "notes.md", "a") as f:
+                f.write("two\n")
+            (workspace / "pkg").mkdir()
+            (workspace / "pkg" / "mod.py").write_text("x = 1\n")
+            (workspace / "venv" / "site.py").write_text("ignored\n")
+            os.unlink(workspace / "notes.md")
+            
+            expected = {
+                (str(workspace / "notes.md"), "deleted"),
+                (str(workspace / "pkg" / "mod.py"), "created"),
+            }
+            assert _wait_for(lambda: expected <= {(c.path, c.kind) for c in received})
+            assert not any("venv" in c.path for c in received)
+        finally:
+            watcher.stop()
+        assert not watcher.running
+    
+    def test_poll_backend(self, workspace, received):
+        """Test the polling backend reports created and deleted files."""
+        self._exercise(workspace, received, "poll")
+    
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+    def test_inotify_backend(self, workspace, received):
+        """Test the inotify backend follows new directories and reports changes."""
+        self._exercise(workspace, received, "inotify")
+
+
+class TestSubscribers:
+    """Test cases for the cache and index subscribers."""
+    
+    def test_file_cache_drops_changed_paths(self, tmp_path):
+        """Test changed files, deleted directories and overflows drop cache entries."""
+        cache = FileContentCache(1024 * 1024)
+        files = [tmp_path / "a.txt", tmp_path / "pkg" / "b.txt", tmp_path / "pkg" / "c.txt"]
+        files[1].parent.mkdir()
+        for path in files:
+            path.write_text("data")
+            cache.read_text(path)
+        
+        cache.on_changes([FileChange(str(files[0]), "modified")])
+        assert cache.stats()["entries"] == 2
+        cache.on_changes([FileChange(str(tmp_path / "pkg"), "deleted", True)])
+        assert cache.stats()["entries"] == 0
+        
+        cache.read_text(files[0])
+        cache.on_changes([FileChange(str(tmp_path), "overflow", True)])
+        assert cache.stats()["entries"] == 0
+    
+    def test_search_index_reindexes_reported_file(self, tmp_path):
+        """Test a reported file is re-indexed even when its size and mtime are unchanged."""
+        index = TrigramIndex(tmp_path / "index.sqlite3")
+        path = tmp_path / "mod.py"
+        path.write_text("alpha\n")
+        st = path.stat()
+        assert index.candidates([path], "alpha") == [path]
+        
+        path.write_text("gamma\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert index.candidates([path], "gamma") == []
+        
+        index.on_changes([FileChange(str(path), "modified")])
+        assert index.candidates([path], "gamma") == [path]
+    
+    def test_orchestrator_file_loaded_once(self, tmp_path, monkeypatch):
+        """Test persistent memory is parsed once while no change is reported."""
+        memory_path = tmp_path / "persistent-memory.md"
+        memory_path.write_text("# System Updates\nfirst\n")
+        io = orchestrator_io.OrchestratorIO()
+        io.persistent_memory_path = memory_path
+        io._tracked.add(str(memory_path))
+        monkeypatch.setattr(orchestrator_io, "get_orchestrator_io", lambda: io)
+        monkeypatch.setattr(orchestrator_io, "watcher_active", lambda: True)
+        
+        reads = []
+        original = orchestrator_io._parse_persistent_memory_sections
+        monkeypatch.setattr(
+            orchestrator_io, "_parse_persistent_memory_sections",
+            lambda content: (reads.append(content), original(content))[1]
+        )
+        
+        first = orchestrator_io.load_persistent_memory()
+        expected = dict(first)
+        first.clear()
+        assert orchestrator_io.load_persistent_memory() == expected
+        assert len(reads) == 1
+        assert not io.is_file_changed(memory_path)
+        
+        version = io.file_version(memory_path)
+        memory_path.write_text("# System Updates\nsecond\n")
+        io.on_changes([FileChange(str(memory_path), "modified")])
+        assert io.is_file_changed(memory_path)
+        assert io.file_version(memory_path) == version + 1
+        assert orchestrator_io.load_persistent_memory() != expected
+        assert len(reads) == 2
+
+
+def test_watcher_active_tracks_running_watchers(tmp_path, monkeypatch):
+    """Test watcher_active reflects whether a registered watcher is running."""
+    watcher = WorkspaceWatcher(tmp_path, backend="poll", poll_interval=0.05)
+    monkeypatch.setattr(workspace_watcher, "_watchers", {str(tmp_path): watcher})
+    assert not workspace_watcher.watcher_active()
+    watcher.start()
+    try:
+        assert workspace_watcher.watcher_active()
+    finally:
+        watcher.stop()
+    assert not workspace_watcher.watcher_active()
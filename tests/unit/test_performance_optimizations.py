@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the result cache and monitor in performance_optimizations.
+
+Tests cover:
+- Hit, miss, eviction and expiry counters
+- Expiry measured from insert time, not last access
+- Frequency-based admission keeping popular entries through scans
+- Byte budget accounting
+- Declarative caching of sync and async functions
+- Monitor percentiles, rolling windows and bounded series
+"""
+
+import asyncio
+
+import pytest
+
+import performance_optimizations
+from performance_optimizations import IntelligentCache, PerformanceMonitor
+
+
+class TestIntelligentCache:
+    """Test cases for IntelligentCache."""
+    
+    def test_counters(self):
+        """Test hits and misses are counted per lookup and sets are not."""
+        cache = IntelligentCache(max_size=10, ttl=60)
+        # Tools check the shared instance with "if intelligent_cache"
+        assert cache
+        cache.set("a", 1)
+        cache.set("a", 2)
+        
+        assert cache.get("a") == 2
+        assert cache.get("b") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["total_requests"]) == (1, 1, 2)
+        assert stats["hit_rate"] == 0.5
+        assert cache.delete("a") and not cache.delete("a")
+    
+    def test_ttl_from_insert(self, monkeypatch):
+        """Test entries expire after the TTL even when read constantly."""
+        now = [1000.0]
+        monkeypatch.setattr(performance_optimizations.time, "monotonic", lambda: now[0])
+        cache = IntelligentCache(max_size=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=200)
+        
+        for _ in range(5):
+            now[0] += 11
+            assert cache.get("a") == 1
+        now[0] += 10
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get_stats()["expirations"] == 1
+    
+    def test_scan_resistance(self):
+        """Test a stream of one-off keys does not flush frequently used entries."""
+        cache = IntelligentCache(max_size=100, ttl=60)
+        hot = [f"hot{i}" for i in range(50)]
+        for _ in range(5):
+            for key in hot:
+                if cache.get(key) is None:
+                    cache.set(key, key)
+        for i in range(2000):
+            cache.set(f"scan{i}", i)
+        
+        assert cache.get_stats()["cache_size"] == 100
+        assert sum(cache.get(key) is not None for key in hot) >= 48
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1950
+        assert stats["admissions_rejected"] > 1500
+    
+    def test_byte_budget(self):
+        """Test the byte budget bounds the cache and oversized values are not stored."""
+        cache = IntelligentCache(max_size=100, ttl=60, max_bytes=1000)
+        for i in range(50):
+            cache.set(i, "x", size=100)
+        
+        assert cache.get_stats()["cache_size"] == 10
+        assert cache.get_stats()["bytes"] == 1000
+        
+        cache.set("big", "x", size=5000)
+        assert cache.get("big") is None
+        assert cache.get_stats()["bytes"] == 1000
+    
+    def test_cache_function(self):
+        """Test the decorator returns cached results for repeated arguments."""
+        cache = IntelligentCache(max_size=10, ttl=60)
+        calls = []
+        
+        @cache.cache_function
+        async def square(x):
+            calls.append(x)
+            return x * x
+        
+        assert asyncio.run(square(3)) == 9
+        assert asyncio.run(square(3)) == 9
+        assert calls == [3]
+
+
+class TestGetOrCompute:
+    """Test cases for single-flight loading and stale-while-revalidate."""
+    
+    def test_concurrent_misses_share_one_computation(self):
+        """Test concurrent callers of a cold key wait for a single computation."""
+        cache = IntelligentCache(max_size=10, ttl=60)
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"success": True}
+        
+        async def run():
+            return await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(5)])
+        
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert cache.get_stats()["coalesced"] == 4
+        assert cache.get("k") == {"success": True}
+    
+    def test_errors_and_rejected_results_not_cached(self):
+        """Test failures reach every waiter and results refused by should_cache are recomputed."""
+        cache = IntelligentCache(max_size=10, ttl=60)
+        
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        
+        async def run():
+            return await asyncio.gather(*[cache.get_or_compute("k", fail) for _ in range(3)], return_exceptions=True)
+        
+        assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+        
+        calls = []
+        
+        async def error_result():
+            calls.append(1)
+            return {"success": False}
+        
+        for _ in range(2):
+            asyncio.run(cache.get_or_compute("k", error_result, should_cache=lambda r: r["success"]))
+        assert len(calls) == 2
+    
+    def test_stale_value_served_while_refreshing(self, monkeypatch):
+        """Test a value past its TTL is returned at once and refreshed in the background."""
+        now = [1000.0]
+        monkeypatch.setattr(performance_optimizations.time, "monotonic", lambda: now[0])
+        cache = IntelligentCache(max_size=10, ttl=60)
+        versions = iter(range(10))
+        
+        async def compute():
+            return next(versions)
+        
+        async def run():
+            first = await cache.get_or_compute("k", compute, ttl=10, stale_ttl=100)
+            now[0] += 20
+            stale = await cache.get_or_compute("k", compute, ttl=10, stale_ttl=100)
+            await asyncio.sleep(0)
+            refreshed = await cache.get_or_compute("k", compute, ttl=10, stale_ttl=100)
+            now[0] += 500
+            expired = await cache.get_or_compute("k", compute, ttl=10, stale_ttl=100)
+            return first, stale, refreshed, expired
+        
+        assert asyncio.run(run()) == (0, 0, 1, 2)
+        assert cache.get_stats()["stale_hits"] == 1
+
+
+class TestCachedDecorator:
+    """Test cases for the declarative cached decorator."""
+    
+    def test_sync_key_fields(self):
+        """Test sync functions stay sync and are keyed by the declared arguments only."""
+        cache = IntelligentCache(max_size=10, ttl=60)
+        calls = []
+        
+        @cache.cached(key=["name"], size=7)
+        def greet(name, punctuation="!"):
+            calls.append(name)
+            return f"hello {name}{punctuation}"
+        
+        assert greet("a") == "hello a!"
+        assert greet("a", punctuation="?") == "hello a!"
+        assert greet(name="b") == "hello b!"
+        assert calls == ["a", "b"]
+        assert cache.get_stats()["bytes"] == 14
+        
+        with pytest.raises(ValueError):
+            cache.cached(key=["missing"])(greet.__wrapped__)
+    
+    def test_file_dependencies(self, tmp_path):
+        """Test a change to a declared file misses the cache."""
+        cache = IntelligentCache(max_size=10, ttl=60)
+        path = tmp_path / "notes.md"
+        path.write_text("one")
+        
+        @cache.cached(files=lambda args: [args["path"]])
+        async def read(path):
+            return path.read_text()
+        
+        assert asyncio.run(read(path)) == "one"
+        path.write_text("two!")
+        assert asyncio.run(read(path)) == "two!"
+        assert asyncio.run(read(path)) == "two!"
+        assert cache.get_stats()["hits"] == 1
+    
+    def test_when_and_should_cache(self):
+        """Test calls refused by when bypass the cache and rejected results are recomputed."""
+        cache = IntelligentCache(max_size=10, ttl=60)
+        calls = []
+        
+        @cache.cached(when=lambda args: not args["fresh"], should_cache=lambda result: result > 0)
+        def compute(value, fresh=False):
+            calls.append(value)
+            return value
+        
+        compute(1)
+        compute(1)
+        compute(1, fresh=True)
+        compute(-1)
+        compute(-1)
+        assert calls == [1, 1, -1, -1]
+
+
+class TestPerformanceMonitor:
+    """Test cases for the bounded PerformanceMonitor."""
+    
+    def _monitor(self, **kwargs):
+        monitor = PerformanceMonitor(**kwargs)
+        monitor.start_monitoring()
+        return monitor
+    
+    def test_percentiles(self):
+        """Test quantiles from the histograms are within 2% of the exact values."""
+        monitor = self._monitor()
+        values = [1.5 ** (i % 40) for i in range(4000)]
+        for value in values:
+            monitor.record_metric("latency_ms", value, {"tool": "a"})
+        
+        stats = monitor.get_metric("latency_ms")
+        ordered = sorted(values)
+        for q, name in [(0.5, "p50"), (0.95, "p95"), (0.99, "p99")]:
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert abs(stats[name] - exact) <= exact * 0.02
+        assert (stats["count"], stats["min"], stats["max"]) == (4000, 1.0, 1.5 ** 39)
+    
+    def test_rolling_window(self, monkeypatch):
+        """Test windowed rollups only include recent slots while lifetime totals keep everything."""
+        now = [10000.0]
+        monkeypatch.setattr(performance_optimizations.time, "time", lambda: now[0])
+        monitor = self._monitor(window_seconds=600, slot_seconds=60)
+        
+        monitor.record_metric("latency_ms", 1000)
+        now[0] += 300
+        monitor.record_metric("latency_ms", 10)
+        assert monitor.get_metric("latency_ms", window_seconds=60)["max"] == 10
+        assert monitor.get_metric("latency_ms", window_seconds=600)["count"] == 2
+        
+        now[0] += 1200
+        monitor.record_metric("latency_ms", 20)
+        assert monitor.get_metric("latency_ms", window_seconds=600)["count"] == 1
+        assert monitor.get_metric("latency_ms")["count"] == 3
+        assert monitor.get_recent_values("latency_ms")[-1] == (now[0], 20)
+    
+    def test_bounded_series_and_snapshot(self):
+        """Test series beyond max_series are dropped and the snapshot lists tags and last values."""
+        monitor = self._monitor(max_series=2, recent_samples=3)
+        for i in range(10):
+            monitor.record_metric("calls", i, {"tool": str(i % 3)})
+        
+        snapshot = monitor.snapshot()
+        assert sorted(entry["tags"]["tool"] for entry in snapshot["series"]) == ["0", "1"]
+        assert snapshot["dropped_series"] == 3
+        assert len(monitor.get_recent_values("calls", {"tool": "0"})) == 3
+        assert {entry["last"] for entry in snapshot["series"]} == {9, 7}
+    
+    def test_inactive_and_dashboard(self):
+        """Test nothing is recorded while inactive and the dashboard reports percentiles and alerts."""
+        monitor = PerformanceMonitor()
+        monitor.record_metric("response_time_ms", 5)
+        assert monitor.get_dashboard_data()["status"] == "no_data"
+        
+        monitor.start_monitoring()
+        for value in [5, 10, 2000]:
+            monitor.record_metric("response_time_ms", value)
+        dashboard = monitor.get_dashboard_data()
+        assert dashboard["metrics_count"] == 3
+        assert dashboard["aggregations"]["max_response_time_ms"] == 2000
+        assert 9.5 < dashboard["aggregations"]["p50_response_time_ms"] < 10.5
+        assert [alert["value"] for alert in dashboard["alerts"]] == [2000]